@@ -0,0 +1,83 @@
+# backend/api_authorizer.py
+"""
+API Gateway TOKEN authorizer for the routes machine clients may call
+(POST /feeds, GET and PUT /status).
+
+The Cognito authorizer on the other methods only accepts Cognito tokens, so a
+machine token ('Bearer pfm1.…') would be rejected before the API Lambda runs.
+This authorizer accepts either kind. The API Lambda still checks the token
+itself: machine clients are held to their scopes by require_scope and refused
+on every other route.
+"""
+from jwt.exceptions import PyJWTError
+
+from app.core.auth import GROUPS_CLAIM, MACHINE_SCHEME, verify_machine_token
+from app.core.jwt_verifier import preload_public_keys, verify_jwt_token
+
+# Parse Cognito signing keys during the cold start rather than on the first request
+preload_public_keys()
+
+
+class Unauthorized(Exception):
+    """Makes API Gateway answer 401; it matches on the error message, which must be exactly 'Unauthorized'."""
+
+    def __init__(self):
+        super().__init__('Unauthorized')
+
+
+def build_policy(principal_id: str, method_arn: str, context: dict) -> dict:
+    """
+    Allow policy for every method of the API stage.
+
+    API Gateway caches the result per token and reuses it for all methods
+    behind this authorizer, so the policy cannot be limited to method_arn.
+    """
+    api_id, stage = method_arn.split('/')[:2]
+    return {
+        'principalId': principal_id,
+        'policyDocument': {
+            'Version': '2012-10-17',
+            'Statement': [{
+                'Action': 'execute-api:Invoke',
+                'Effect': 'Allow',
+                'Resource': f"{api_id}/{stage}/*/*",
+            }],
+        },
+        'context': context,
+    }
+
+
+def handler(event, context):
+    """
+    AWS Lambda handler authorizing a bearer token for API Gateway.
+
+    Raising Unauthorized makes API Gateway answer 401 without calling the API.
+    """
+    authorization = event.get('authorizationToken') or ''
+    if not authorization.startswith('Bearer '):
+        raise Unauthorized()
+    token = authorization.replace('Bearer ', '', 1)
+
+    try:
+        if token.startswith(f'{MACHINE_SCHEME}.'):
+            principal = verify_machine_token(token)
+            print(f"Authorized machine client {principal.client_id}")
+            return build_policy(f"machine:{principal.client_id}", event['methodArn'], {
+                'client_id': principal.client_id,
+                'scopes': ' '.join(principal.scopes),
+            })
+
+        claims = verify_jwt_token(token)
+    except PyJWTError as e:
+        print(f"Token rejected: {e}")
+        raise Unauthorized() from e
+
+    if not claims or not claims.get('email'):
+        print("Token rejected: no verified email claim")
+        raise Unauthorized()
+
+    # Read by app.core.auth.get_authorizer_claims, so the API skips a second verification
+    caller = {'email': claims['email'], GROUPS_CLAIM: ','.join(claims.get(GROUPS_CLAIM) or [])}
+    if isinstance(claims.get('exp'), int):
+        caller['exp'] = claims['exp']
+    return build_policy(claims.get('sub') or claims['email'], event['methodArn'], caller)
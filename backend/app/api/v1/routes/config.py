@@ -4,11 +4,19 @@ import decimal
 import logging
 from typing import Any
 
-from fastapi import APIRouter, Body, HTTPException
-
-from app.core.iot import publish_config_update
-from app.crud.config import fetch_config_setting, update_config_setting
-from app.models.config import ConfigItem, ConfigUpdate
+from botocore.exceptions import ClientError
+from fastapi import APIRouter, Body, HTTPException, Query
+
+from app.core.auth import MACHINE_CLIENT_KEY_PREFIX
+from app.crud.config import (
+    RESERVED_CONFIG_KEYS,
+    fetch_config_setting,
+    fetch_config_settings,
+    update_config_setting,
+    update_config_settings,
+)
+from app.models.config import ConfigBatch, ConfigBatchUpdate, ConfigItem, ConfigUpdate
+from app.services.config_sync import sync_device_config
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -16,6 +24,21 @@ router = APIRouter()
 # Default fallback values (must match ESP32 constants)
 DEFAULT_HOLD_DURATION_MS = 3000
 DEFAULT_WEIGHT_THRESHOLD_G = 450
+# Email notifications disabled, all types enabled by default except pet_ate
+DEFAULT_EMAIL_NOTIFICATIONS = '{"email":"","enabled":false,"subscription_arn":"","preferences":{"pet_ate":false,"feedings":true,"failures":true}}'
+
+# Values served for keys that have never been written
+CONFIG_DEFAULTS = {
+    "SERVO_OPEN_HOLD_DURATION_MS": DEFAULT_HOLD_DURATION_MS,
+    "WEIGHT_THRESHOLD_G": DEFAULT_WEIGHT_THRESHOLD_G,
+    "EMAIL_NOTIFICATIONS": DEFAULT_EMAIL_NOTIFICATIONS,
+}
+
+# Keys the ESP32 consumes; changes are published to it over MQTT
+DEVICE_CONFIG_KEYS = ("SERVO_OPEN_HOLD_DURATION_MS", "WEIGHT_THRESHOLD_G")
+
+# Upper bound on keys read or written by one bulk request
+MAX_BULK_CONFIG_KEYS = 100
 
 # Validation bounds for configuration values
 SERVO_DURATION_MIN_MS = 1000
@@ -24,6 +47,81 @@ WEIGHT_THRESHOLD_MIN_G = 100
 WEIGHT_THRESHOLD_MAX_G = 1000
 
 
+def _is_reserved_key(config_key: str) -> bool:
+    """Machine client secrets and the API's own records share the table but are never exposed."""
+    return config_key.startswith(MACHINE_CLIENT_KEY_PREFIX) or config_key in RESERVED_CONFIG_KEYS
+
+
+def _with_default(config_key: str, item: dict | None) -> dict | None:
+    """Stored item ready for the client, the key's default if it is not stored, else None."""
+    if item:
+        # Convert DynamoDB's Decimal type back to a standard integer for the client
+        if isinstance(item.get('value'), decimal.Decimal):
+            item['value'] = int(item['value'])
+        return item
+    if config_key in CONFIG_DEFAULTS:
+        return {"config_key": config_key, "value": CONFIG_DEFAULTS[config_key]}
+    return None
+
+
+def _validate_int(value: Any, minimum: int, maximum: int, out_of_range: str) -> int:
+    try:
+        value_int = int(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Value must be a valid integer.") from None
+    if not minimum <= value_int <= maximum:
+        raise HTTPException(status_code=400, detail=out_of_range)
+    return value_int
+
+
+def validate_config_value(config_key: str, value: Any) -> Any:
+    """
+    Checks a value before it is written and returns it in its stored form.
+
+    Raises:
+        HTTPException: 400 for reserved keys and invalid or out-of-range values
+    """
+    if config_key.startswith(MACHINE_CLIENT_KEY_PREFIX):
+        raise HTTPException(status_code=400, detail="Machine client records cannot be written through the config API.")
+    if config_key in RESERVED_CONFIG_KEYS:
+        raise HTTPException(status_code=400, detail=f"'{config_key}' is maintained by the API and cannot be written.")
+
+    if config_key == "SERVO_OPEN_HOLD_DURATION_MS":
+        return _validate_int(
+            value, SERVO_DURATION_MIN_MS, SERVO_DURATION_MAX_MS,
+            f"Duration must be between {SERVO_DURATION_MIN_MS} ms and {SERVO_DURATION_MAX_MS} ms."
+        )
+    if config_key == "WEIGHT_THRESHOLD_G":
+        return _validate_int(
+            value, WEIGHT_THRESHOLD_MIN_G, WEIGHT_THRESHOLD_MAX_G,
+            f"Weight threshold must be between {WEIGHT_THRESHOLD_MIN_G}g and {WEIGHT_THRESHOLD_MAX_G}g."
+        )
+    # EMAIL_NOTIFICATIONS (a JSON string) and other keys are stored as given
+    return value
+
+
+async def _sync_device_config(values: dict[str, Any]) -> None:
+    """
+    Records changed device settings as desired config and publishes the changes to the fleet.
+    The settings are already stored, so a failed sync is logged, not raised.
+    """
+    changes = {key: value for key, value in values.items() if key in DEVICE_CONFIG_KEYS}
+    if not changes:
+        return
+    try:
+        result = await sync_device_config(changes)
+    except ClientError as e:
+        logger.warning("Failed to record desired device config: %s", e)
+        return
+
+    if result["published"]:
+        logger.info("Config delta v%s published via MQTT: %s", result["version"], result["delta"])
+    elif result["delta"]:
+        logger.warning("Failed to publish config update to MQTT")
+    else:
+        logger.info("Desired config already at v%s; nothing published", result["version"])
+
+
 @router.get(
     "/config/{key}",
     response_model=ConfigItem,
@@ -64,40 +162,15 @@ WEIGHT_THRESHOLD_MAX_G = 1000
 )
 async def get_config_setting(key: str) -> dict[str, str | Any]:
     config_key = key.upper()
+    not_found = HTTPException(status_code=404, detail=f"Configuration key '{key}' not found and has no default value.")
+    if _is_reserved_key(config_key):
+        raise not_found
 
     # Use the imported CRUD function
-    item = await fetch_config_setting(config_key)
-
-    if item:
-        # Convert DynamoDB's Decimal type back to a standard integer for the client
-        if isinstance(item.get('value'), decimal.Decimal):
-            item['value'] = int(item['value'])
-
-        return item
-
-    # --- FALLBACK LOGIC ---
-    if config_key == "SERVO_OPEN_HOLD_DURATION_MS":
-        # Return the default value if the key is not found in DB
-        return {
-            "config_key": config_key,
-            "value": DEFAULT_HOLD_DURATION_MS
-        }
-
-    if config_key == "WEIGHT_THRESHOLD_G":
-        # Return the default value if the key is not found in DB
-        return {
-            "config_key": config_key,
-            "value": DEFAULT_WEIGHT_THRESHOLD_G
-        }
-
-    if config_key == "EMAIL_NOTIFICATIONS":
-        # Return default email notification config (disabled, no email, all types enabled by default except pet_ate)
-        return {
-            "config_key": config_key,
-            "value": '{"email":"","enabled":false,"subscription_arn":"","preferences":{"pet_ate":false,"feedings":true,"failures":true}}'
-        }
-
-    raise HTTPException(status_code=404, detail=f"Configuration key '{key}' not found and has no default value.")
+    item = _with_default(config_key, await fetch_config_setting(config_key))
+    if item is None:
+        raise not_found
+    return item
 
 
 @router.put(
@@ -112,7 +185,9 @@ async def get_config_setting(key: str) -> dict[str, str | Any]:
     - `WEIGHT_THRESHOLD_G`: Integer 100-1000 (grams)
     - `EMAIL_NOTIFICATIONS`: JSON string with email config
 
-    **Real-time sync**: Changes are published to MQTT topic `petfeeder/config` for ESP32 to consume
+    **Real-time sync**: Device settings are recorded in a versioned desired config, and a changed value is
+    published to MQTT topic `petfeeder/config` (every ESP32 subscribes to it); an unchanged value is not.
+    Progress is shown by `GET /api/v1/status/config`
 
     **Persistence**: Values stored in DynamoDB for durability
 
@@ -159,56 +234,125 @@ async def get_config_setting(key: str) -> dict[str, str | Any]:
 )
 async def set_config_setting(key: str, update_data: ConfigUpdate = Body(...)):
     config_key = key.upper()
+    value = validate_config_value(config_key, update_data.value)
 
-    if config_key == "SERVO_OPEN_HOLD_DURATION_MS":
-        try:
-            value_int = int(update_data.value)
-            if not SERVO_DURATION_MIN_MS <= value_int <= SERVO_DURATION_MAX_MS:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Duration must be between {SERVO_DURATION_MIN_MS} ms and {SERVO_DURATION_MAX_MS} ms."
-                )
-
-            updated_item = await update_config_setting(config_key, value_int)
-            mqtt_success = await publish_config_update(config_key, value_int)
-            if mqtt_success:
-                logger.info("Config update published via MQTT: %s=%s", config_key, value_int)
-            else:
-                logger.warning("Failed to publish config update to MQTT")
-
-            return updated_item
-
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Value must be a valid integer.") from None
-
-    if config_key == "WEIGHT_THRESHOLD_G":
-        try:
-            value_int = int(update_data.value)
-            if not WEIGHT_THRESHOLD_MIN_G <= value_int <= WEIGHT_THRESHOLD_MAX_G:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Weight threshold must be between {WEIGHT_THRESHOLD_MIN_G}g and {WEIGHT_THRESHOLD_MAX_G}g."
-                )
-
-            updated_item = await update_config_setting(config_key, value_int)
-            mqtt_success = await publish_config_update(config_key, value_int)
-            if mqtt_success:
-                logger.info("Config update published via MQTT: %s=%s", config_key, value_int)
-            else:
-                logger.warning("Failed to publish config update to MQTT")
-
-            return updated_item
-
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Value must be a valid integer.") from None
-
-    # Email notifications setting (stored as JSON string)
-    if config_key == "EMAIL_NOTIFICATIONS":
-        # The value should be a JSON string containing email config
-        # No special validation needed - just store it
-        updated_item = await update_config_setting(config_key, update_data.value)
-        return updated_item
-
-    # Generic update for other keys
-    updated_item = await update_config_setting(config_key, update_data.value)
+    updated_item = await update_config_setting(config_key, value)
+    await _sync_device_config({config_key: value})
     return updated_item
+
+
+def _parse_keys(keys: str | None) -> list[str]:
+    """Upper-cased, de-duplicated keys from a comma-separated list (all known keys if empty)."""
+    if not keys:
+        return list(CONFIG_DEFAULTS)
+    parsed = list(dict.fromkeys(key.strip().upper() for key in keys.split(",") if key.strip()))
+    if len(parsed) > MAX_BULK_CONFIG_KEYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_CONFIG_KEYS} keys can be requested at once.")
+    return parsed or list(CONFIG_DEFAULTS)
+
+
+@router.get(
+    "/config",
+    response_model=ConfigBatch,
+    summary="Get several configuration settings",
+    description="""
+    Retrieves several configuration values in one request.
+
+    **Keys**: Comma-separated `keys` query parameter (e.g. `?keys=SERVO_OPEN_HOLD_DURATION_MS,WEIGHT_THRESHOLD_G`).
+    Defaults to every supported key.
+
+    **Defaults**: Keys not found in the database get the same defaults as `GET /config/{key}`;
+    keys with no default are listed in `missing`
+
+    **Use case**: Load the settings page with a single call
+    """,
+    responses={
+        200: {
+            "description": "Configuration values retrieved",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "items": [
+                            {"config_key": "SERVO_OPEN_HOLD_DURATION_MS", "value": 3000},
+                            {"config_key": "WEIGHT_THRESHOLD_G", "value": 450}
+                        ],
+                        "missing": []
+                    }
+                }
+            }
+        },
+        400: {
+            "description": "Too many keys requested",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "At most 100 keys can be requested at once."}
+                }
+            }
+        }
+    }
+)
+async def get_config_settings(keys: str | None = Query(None, description="Comma-separated configuration keys")):
+    config_keys = _parse_keys(keys)
+    stored = await fetch_config_settings([key for key in config_keys if not _is_reserved_key(key)])
+
+    items, missing = [], []
+    for config_key in config_keys:
+        item = None if _is_reserved_key(config_key) else _with_default(config_key, stored.get(config_key))
+        if item is None:
+            missing.append(config_key)
+        else:
+            items.append(item)
+    return {"items": items, "missing": missing}
+
+
+@router.put(
+    "/config",
+    response_model=ConfigBatch,
+    summary="Update several configuration settings",
+    description="""
+    Updates several configuration values in one request and publishes device settings to the ESP32.
+
+    **Validation**: Same rules as `PUT /config/{key}`; every value is checked before anything is
+    written, so an invalid value leaves all settings unchanged
+
+    **Persistence**: Values are written together with one DynamoDB batch write
+
+    **Real-time sync**: The device settings that changed are published to every ESP32 in one MQTT message
+    """,
+    responses={
+        200: {
+            "description": "Configuration updated successfully",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "items": [
+                            {"config_key": "SERVO_OPEN_HOLD_DURATION_MS", "value": 2000},
+                            {"config_key": "WEIGHT_THRESHOLD_G", "value": 400}
+                        ],
+                        "missing": []
+                    }
+                }
+            }
+        },
+        400: {
+            "description": "Validation error (value out of range, invalid type or too many keys)",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Weight threshold must be between 100g and 1000g."}
+                }
+            }
+        }
+    }
+)
+async def set_config_settings(update_data: ConfigBatchUpdate = Body(...)):
+    if len(update_data.values) > MAX_BULK_CONFIG_KEYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_CONFIG_KEYS} keys can be written at once.")
+
+    values = {}
+    for key, value in update_data.values.items():
+        config_key = key.upper()
+        values[config_key] = validate_config_value(config_key, value)
+
+    updated_items = await update_config_settings(values)
+    await _sync_device_config(values)
+    return {"items": updated_items, "missing": []}
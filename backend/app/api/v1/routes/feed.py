@@ -1,11 +1,29 @@
 from typing import Any
 
-from fastapi import APIRouter, Header, HTTPException, Query
+from botocore.exceptions import ClientError
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
 
-from app.core.auth import extract_email_from_token, is_admin, redact_email
+from app.core.auth import (
+    SCOPE_FEED_WRITE,
+    SCOPE_FLEET,
+    Principal,
+    can_address_fleet,
+    check_device_access,
+    get_principal,
+    redact_email,
+    require_scope,
+)
+from app.core.config import settings
+from app.core.exceptions import SecurityError
+from app.core.polling import MAX_WAIT_MS
 from app.crud.feed import delete_all_feed_events
-from app.models.feed import FeedRequest, FeedResponse
-from app.services.feed_service import get_feed_history, process_feed
+from app.models.feed import (
+    THING_NAME_PATTERN,
+    FeedRequest,
+    FeedResponse,
+    GroupFeedResponse,
+)
+from app.services.feed_service import get_feed_history, process_feed, process_group_feed
 
 router = APIRouter()
 
@@ -34,16 +52,34 @@ def redact_feed_history(history_data: dict, user_email: str, is_admin_user: bool
     Publishes MQTT command to ESP32 device via AWS IoT Core.
     The device will dispense food for the configured duration (default 3000ms).
     Feed events are logged to DynamoDB with timestamp and attribution.
+
+    **Fleet**: Set `thing_id` to feed a specific device; the command goes to
+    `petfeeder/{thing_id}/commands`. Without it the deployment's device is fed.
+    Only admins and machine clients with the `fleet` scope may name another device.
+
+    **Waiting for the result**: By default the response says `sent` as soon as the
+    command is published. With `?wait=true` the request stays open until the device
+    reports the feed `completed` or `failed` (matched by `feed_id`), or `timeout_ms`
+    passes (default 15000), and returns the final status and bowl weights. On timeout
+    the status stays `sent`.
     """,
     responses={
         200: {
-            "description": "Feed command sent successfully",
+            "description": "Feed command sent (with wait=true, the device's final result)",
             "content": {
                 "application/json": {
                     "example": {
-                        "success": True,
-                        "message": "Feed command sent to device",
-                        "timestamp": "2025-12-14T10:30:00Z"
+                        "feed_id": "7d3c1f0e-2b4a-4e6f-9a8b-1c2d3e4f5a6b",
+                        "requested_by": "user@example.com",
+                        "mode": "api",
+                        "status": "completed",
+                        "timestamp": "2025-12-14T10:30:00",
+                        "event_type": "manual_feed",
+                        "weight_before_g": 120.5,
+                        "weight_after_g": 168.0,
+                        "weight_delta_g": 47.5,
+                        "thing_id": None,
+                        "waited_ms": 7420
                     }
                 }
             }
@@ -58,14 +94,105 @@ def redact_feed_history(history_data: dict, user_email: str, is_admin_user: bool
         }
     }
 )
-async def on_demand(request: FeedRequest):
+async def on_demand(
+    request: FeedRequest,
+    wait: bool = Query(False, description="Wait for the device to finish the feed"),
+    timeout_ms: int | None = Query(
+        None,
+        ge=0,
+        le=MAX_WAIT_MS,
+        description="How long to wait when wait=true (default FEED_WAIT_TIMEOUT_MS)"
+    ),
+    principal: Principal = Depends(require_scope(SCOPE_FEED_WRITE))
+):
+    check_device_access(principal, request.thing_id)
     try:
-        result = await process_feed(request)
+        wait_timeout = None
+        if wait:
+            wait_timeout = (settings.FEED_WAIT_TIMEOUT_MS if timeout_ms is None else timeout_ms) / 1000
+        result = await process_feed(request, wait_timeout)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@router.post(
+    "/feeds/groups/{group}",
+    response_model=GroupFeedResponse,
+    summary="Feed a device group",
+    description="""
+    Triggers an immediate feed on every device in an AWS IoT thing group.
+
+    Group membership is managed in the IoT registry (including child groups) and
+    cached for a minute. Devices whose bowl is at or above the weight threshold are
+    skipped; the others get the command concurrently, each on its own topic.
+    `thing_id` in the body is ignored. Only admins and machine clients with the
+    `fleet` scope may feed a group.
+    """,
+    responses={
+        200: {
+            "description": "Feed commands sent (see each device's status)",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "group": "kennel-a",
+                        "requested": 2,
+                        "sent": 1,
+                        "failed": 0,
+                        "denied": 1,
+                        "feeds": [
+                            {"thing_id": "feeder-1", "status": "sent", "feed_id": "..."},
+                            {"thing_id": "feeder-2", "status": "denied_weight_exceeded", "feed_id": "..."}
+                        ]
+                    }
+                }
+            }
+        },
+        403: {
+            "description": "Caller may not address the fleet",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Feeding a device group requires admin or the 'fleet' scope"}
+                }
+            }
+        },
+        404: {
+            "description": "Group does not exist or has no devices",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Device group 'kennel-a' has no devices"}
+                }
+            }
+        },
+        500: {
+            "description": "Server error (IoT registry or DynamoDB failure)",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Failed to feed device group"}
+                }
+            }
+        }
+    }
+)
+async def feed_group(
+    request: FeedRequest,
+    group: str = Path(..., pattern=THING_NAME_PATTERN, description="AWS IoT thing group name"),
+    principal: Principal = Depends(require_scope(SCOPE_FEED_WRITE))
+):
+    if not can_address_fleet(principal):
+        raise SecurityError(f"Feeding a device group requires admin or the '{SCOPE_FLEET}' scope")
+    try:
+        return await process_group_feed(group, request)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == 'ResourceNotFoundException':
+            raise HTTPException(status_code=404, detail=f"Device group '{group}' not found") from e
+        raise HTTPException(status_code=500, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
 @router.get(
     "/feed-events",
     response_model=dict[str, Any],
@@ -118,7 +245,7 @@ async def read_feed_history(
     limit: int = Query(10, ge=1, le=1000, description="Items per page (max 1000)"),
     start_time: str = Query(None, description="Filter start time (ISO 8601 format)"),
     end_time: str = Query(None, description="Filter end time (ISO 8601 format)"),
-    authorization: str | None = Header(None)
+    principal: Principal = Depends(get_principal)
 ):
     try:
         history_data = await get_feed_history(
@@ -128,10 +255,7 @@ async def read_feed_history(
             end_time=end_time
         )
 
-        user_email = extract_email_from_token(authorization)
-        is_admin_user = is_admin(user_email) if user_email else False
-
-        return redact_feed_history(history_data, user_email or '', is_admin_user)
+        return redact_feed_history(history_data, principal.email or '', principal.is_admin)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
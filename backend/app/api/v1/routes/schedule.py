@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 
-from app.core.auth import extract_email_from_token, is_admin
+from app.core.auth import Principal, check_device_access, get_principal
 from app.crud.schedule import create_schedule as create_schedule_db
 from app.crud.schedule import delete_schedule as delete_schedule_db
 from app.crud.schedule import get_schedule as get_schedule_db
@@ -12,11 +12,9 @@ from app.models.schedule import ScheduleListResponse, ScheduleRequest, ScheduleR
 router = APIRouter()
 
 
-def verify_schedule_ownership(schedule: dict, user_email: str) -> bool:
+def verify_schedule_ownership(schedule: dict, principal: Principal) -> bool:
     """Verify that user owns the schedule or is admin."""
-    if is_admin(user_email):
-        return True
-    return schedule.get('requested_by') == user_email
+    return principal.is_admin or schedule.get('requested_by') == principal.email
 
 
 @router.post(
@@ -28,7 +26,9 @@ def verify_schedule_ownership(schedule: dict, user_email: str) -> bool:
     Creates a new recurring or one-time feeding schedule.
 
     **Schedule types**:
-    - **Recurring**: Cron-based (e.g., "0 8,18 * * *" for 8 AM and 6 PM daily)
+    - **Recurring**: `daily`, `weekly`, `monthly`, or `cron` with a `cron_expression`
+      (e.g., "0 8,18 * * *" for 8 AM and 6 PM daily); `scheduled_time` is the start time
+    - Recurrence follows the schedule's `timezone`, so a daily 08:00 feed stays at 08:00 local across DST
     - **One-time**: Single execution at specified time
 
     **Ownership**: Schedule is automatically attributed to authenticated user.
@@ -62,12 +62,12 @@ def verify_schedule_ownership(schedule: dict, user_email: str) -> bool:
 )
 async def create_schedule(
     request: ScheduleRequest,
-    authorization: str | None = Header(None)
+    principal: Principal = Depends(get_principal)
 ):
+    check_device_access(principal, request.thing_id)
     try:
-        user_email = extract_email_from_token(authorization)
-        if user_email and not request.requested_by:
-            request.requested_by = user_email
+        if principal.email and not request.requested_by:
+            request.requested_by = principal.email
 
         schedule = create_schedule_db(request)
         return ScheduleResponse(**schedule)
@@ -127,14 +127,12 @@ async def list_schedules(
     page: int = Query(1, ge=1, description="Page number (1-indexed)"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page (max 100)"),
     requested_by: str | None = Query(None, description="Filter by user email (admin only)"),
-    authorization: str | None = Header(None)
+    principal: Principal = Depends(get_principal)
 ):
     try:
-        user_email = extract_email_from_token(authorization)
-
         filter_by = requested_by
-        if user_email and not is_admin(user_email) and not requested_by:
-            filter_by = user_email
+        if principal.email and not principal.is_admin and not requested_by:
+            filter_by = principal.email
 
         result = list_schedules_db(page=page, page_size=page_size, requested_by=filter_by)
 
@@ -206,15 +204,14 @@ async def list_schedules(
 )
 async def get_schedule(
     schedule_id: str,
-    authorization: str | None = Header(None)
+    principal: Principal = Depends(get_principal)
 ):
     try:
         schedule = get_schedule_db(schedule_id)
         if not schedule:
             raise HTTPException(status_code=404, detail="Schedule not found")
 
-        user_email = extract_email_from_token(authorization)
-        if user_email and not verify_schedule_ownership(schedule, user_email):
+        if principal.email and not verify_schedule_ownership(schedule, principal):
             raise HTTPException(status_code=403, detail="You can only view your own schedules")
 
         return ScheduleResponse(**schedule)
@@ -281,21 +278,23 @@ async def get_schedule(
 async def update_schedule(
     schedule_id: str,
     update: ScheduleUpdate,
-    authorization: str | None = Header(None)
+    principal: Principal = Depends(get_principal)
 ):
     try:
         existing = get_schedule_db(schedule_id)
         if not existing:
             raise HTTPException(status_code=404, detail="Schedule not found")
 
-        user_email = extract_email_from_token(authorization)
-        if user_email and not verify_schedule_ownership(existing, user_email):
+        if principal.email and not verify_schedule_ownership(existing, principal):
             raise HTTPException(status_code=403, detail="You can only update your own schedules")
 
         updated_schedule = update_schedule_db(schedule_id, update)
         return ScheduleResponse(**updated_schedule)
     except HTTPException:
         raise
+    except ValueError as e:
+        # The update is incomplete once merged with the stored schedule (e.g., cron without an expression)
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         print(f"Error updating schedule: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -344,15 +343,14 @@ async def update_schedule(
 )
 async def delete_schedule(
     schedule_id: str,
-    authorization: str | None = Header(None)
+    principal: Principal = Depends(get_principal)
 ):
     try:
         existing = get_schedule_db(schedule_id)
         if not existing:
             raise HTTPException(status_code=404, detail="Schedule not found")
 
-        user_email = extract_email_from_token(authorization)
-        if user_email and not verify_schedule_ownership(existing, user_email):
+        if principal.email and not verify_schedule_ownership(existing, principal):
             raise HTTPException(status_code=403, detail="You can only delete your own schedules")
 
         delete_schedule_db(schedule_id)
@@ -421,15 +419,14 @@ async def delete_schedule(
 async def toggle_schedule(
     schedule_id: str,
     enabled: bool = Query(..., description="Enable (true) or disable (false) the schedule"),
-    authorization: str | None = Header(None)
+    principal: Principal = Depends(get_principal)
 ):
     try:
         existing = get_schedule_db(schedule_id)
         if not existing:
             raise HTTPException(status_code=404, detail="Schedule not found")
 
-        user_email = extract_email_from_token(authorization)
-        if user_email and not verify_schedule_ownership(existing, user_email):
+        if principal.email and not verify_schedule_ownership(existing, principal):
             raise HTTPException(status_code=403, detail="You can only modify your own schedules")
 
         toggled_schedule = toggle_schedule_db(schedule_id, enabled)
@@ -1,16 +1,36 @@
-import asyncio
+import time
+import uuid
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
+from app.core.auth import (
+    SCOPE_STATUS_READ,
+    Principal,
+    check_device_access,
+    require_scope,
+)
+from app.core.config import settings
 from app.core.hardware_adapter import get_hardware_adapter
+from app.core.polling import MAX_WAIT_MS, poll_until
+from app.models.feed import THING_NAME_PATTERN
+from app.services.config_sync import get_config_sync_status
 
 router = APIRouter()
 
 
+def thing_id_query(
+    thing_id: str | None = Query(None, pattern=THING_NAME_PATTERN, description="Device to query (defaults to the deployment's device)"),
+    principal: Principal = Depends(require_scope(SCOPE_STATUS_READ))
+) -> str | None:
+    check_device_access(principal, thing_id)
+    return thing_id
+
+
 @router.get(
     "",
     response_model=dict[str, Any],
+    dependencies=[Depends(require_scope(SCOPE_STATUS_READ))],
     summary="Get cached device status",
     description="""
     Retrieves the latest cached device status from DynamoDB.
@@ -21,6 +41,9 @@ router = APIRouter()
     **Caching**: Status is cached from device reports, may be slightly stale (up to 30s)
 
     **Real-time alternative**: Use `PUT /api/v1/status` to request fresh status update
+
+    **Fleet**: Pass `?thing_id=` to read another device's status (admins and machine clients
+    with the `fleet` scope only)
     """,
     responses={
         200: {
@@ -55,10 +78,10 @@ router = APIRouter()
         }
     }
 )
-async def get_status():
+async def get_status(thing_id: str | None = Depends(thing_id_query)):
     try:
         hardware = get_hardware_adapter()
-        status_data = await hardware.get_device_status()
+        status_data = await hardware.get_device_status(thing_id)
         if status_data:
             return status_data
         else:
@@ -72,20 +95,22 @@ async def get_status():
 @router.put(
     "",
     response_model=dict[str, Any],
+    dependencies=[Depends(require_scope(SCOPE_STATUS_READ))],
     summary="Request real-time status update",
     description="""
     Requests fresh device status update from ESP32.
 
     **Production mode**:
-    1. Publishes `GET_STATUS` command via MQTT to ESP32
-    2. Waits 2 seconds for device response
-    3. Returns updated status if received, or indicates device offline
+    1. Publishes `GET_STATUS` with a new `request_id` via MQTT to ESP32
+    2. Polls the device status (100ms, backing off to 1s) until the status carrying
+       that `request_id` arrives or `timeout_ms` passes (default 5000)
+    3. Returns the updated status as soon as it is received, or indicates device offline
 
     **Demo mode**: Immediately returns simulated status
 
     **Use case**: Get current weight reading before/after feeding
 
-    **Response time**: ~2-3 seconds in production (includes MQTT round-trip)
+    **Response time**: One MQTT round-trip (typically well under a second) when the device is online
     """,
     responses={
         200: {
@@ -98,6 +123,8 @@ async def get_status():
                             "value": {
                                 "success": True,
                                 "message": "Status request sent and response received",
+                                "request_id": "5f0c6d1e9a8b4c2d8e7f6a5b4c3d2e1f",
+                                "waited_ms": 420,
                                 "status": {
                                     "weight_grams": 1250,
                                     "battery_percent": 85,
@@ -111,6 +138,8 @@ async def get_status():
                             "value": {
                                 "success": True,
                                 "message": "Status request sent, but no response yet. Device may be offline.",
+                                "request_id": "5f0c6d1e9a8b4c2d8e7f6a5b4c3d2e1f",
+                                "waited_ms": 5000,
                                 "status": None
                             }
                         }
@@ -128,28 +157,94 @@ async def get_status():
         }
     }
 )
-async def request_status():
+async def request_status(
+    thing_id: str | None = Depends(thing_id_query),
+    timeout_ms: int | None = Query(
+        None,
+        ge=0,
+        le=MAX_WAIT_MS,
+        description="How long to wait for the device's reply (default STATUS_REQUEST_TIMEOUT_MS)"
+    )
+):
     try:
         hardware = get_hardware_adapter()
-        success = await hardware.request_status_update()
+        request_id = uuid.uuid4().hex
+        success = await hardware.request_status_update(thing_id, request_id)
         if success:
-            # Wait a moment for device to respond (production) or immediate (demo)
-            await asyncio.sleep(2)
-            # Try to fetch the updated status
-            status_data = await hardware.get_device_status()
-            if status_data:
+            # The device echoes request_id in its status, which status_updater keeps as last_request_id
+            timeout = (settings.STATUS_REQUEST_TIMEOUT_MS if timeout_ms is None else timeout_ms) / 1000
+            started = time.monotonic()
+            status_data, answered = await poll_until(
+                lambda: hardware.get_device_status(thing_id, consistent_read=True),
+                lambda status: bool(status) and status.get('last_request_id') == request_id,
+                timeout
+            )
+            waited_ms = round((time.monotonic() - started) * 1000)
+            if answered:
                 return {
                     "success": True,
                     "message": "Status request sent and response received",
+                    "request_id": request_id,
+                    "waited_ms": waited_ms,
                     "status": status_data
                 }
             else:
                 return {
                     "success": True,
                     "message": "Status request sent, but no response yet. Device may be offline.",
+                    "request_id": request_id,
+                    "waited_ms": waited_ms,
                     "status": None
                 }
         else:
             raise HTTPException(status_code=500, detail="Failed to send status request to device.")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error requesting device status: {str(e)}") from e
+
+
+@router.get(
+    "/config",
+    response_model=dict[str, Any],
+    dependencies=[Depends(require_scope(SCOPE_STATUS_READ))],
+    summary="Get device config sync status",
+    description="""
+    Compares the desired device config with the config the ESP32 last reported in its status.
+
+    **Versions**: `desired_version` increments whenever a device setting changes;
+    `reported_version` is the version the device says it applied
+
+    **Pending**: Settings the device has not reported with their desired value yet
+
+    **Use case**: Confirm a settings change reached the device
+    """,
+    responses={
+        200: {
+            "description": "Sync status retrieved",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "desired_version": 4,
+                        "reported_version": 3,
+                        "in_sync": False,
+                        "pending": {"WEIGHT_THRESHOLD_G": {"desired": 500, "reported": 450}},
+                        "desired_updated_at": "2025-12-14T10:30:00Z",
+                        "reported_at": "2025-12-14T10:29:45Z"
+                    }
+                }
+            }
+        },
+        500: {
+            "description": "Server error (DynamoDB query failure)",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Error retrieving config sync status: <error>"}
+                }
+            }
+        }
+    }
+)
+async def get_config_sync(thing_id: str | None = Depends(thing_id_query)):
+    try:
+        return await get_config_sync_status(thing_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving config sync status: {str(e)}") from e
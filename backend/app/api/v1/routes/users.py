@@ -2,17 +2,17 @@
 User Management API Routes
 Handles user approval, rejection, and deletion (admin only)
 """
-import base64
-import json
 import os
 import uuid
 from datetime import datetime
 from typing import Any
 
 import boto3
-from fastapi import APIRouter, Header, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, EmailStr, validator
 
+from app.core.auth import Principal, forget_user_groups, require_admin
+
 router = APIRouter()
 
 # Initialize AWS clients
@@ -211,66 +211,6 @@ Pet Feeder System
         return False
 
 
-def extract_email_from_token(authorization: str) -> str | None:
-    """
-    Extract email from Cognito ID Token (JWT).
-    The ID token is already validated by API Gateway's Cognito Authorizer,
-    so we just need to decode the payload to extract the email claim.
-    """
-    if not authorization or not authorization.startswith('Bearer '):
-        return None
-
-    token = authorization.replace('Bearer ', '')
-
-    try:
-        # JWT format: header.payload.signature
-        # We only need the payload (middle part)
-        parts = token.split('.')
-        if len(parts) != 3:
-            print(f"Invalid JWT token format: expected 3 parts, got {len(parts)}")
-            return None
-
-        payload = parts[1]
-
-        # Add padding if needed for base64 decoding
-        padding = 4 - len(payload) % 4
-        if padding != 4:
-            payload += '=' * padding
-
-        # Decode base64 payload
-        decoded_bytes = base64.urlsafe_b64decode(payload)
-        decoded_str = decoded_bytes.decode('utf-8')
-        payload_data = json.loads(decoded_str)
-
-        # ID tokens contain 'email' claim
-        email = payload_data.get('email')
-        if email:
-            return email
-
-        print("No email found in token payload")
-        print(f"Token payload keys: {list(payload_data.keys())}")
-        return None
-
-    except Exception as e:
-        print(f"Error decoding JWT token: {e}")
-        return None
-
-
-def is_admin(email: str) -> bool:
-    """Check if user is in admin group"""
-    try:
-        response = cognito.admin_list_groups_for_user(
-            Username=email,
-            UserPoolId=USER_POOL_ID
-        )
-
-        groups = [group['GroupName'] for group in response.get('Groups', [])]
-        return 'admin' in groups
-    except Exception as e:
-        print(f"Error checking admin status: {e}")
-        return False
-
-
 def get_user_email_from_attributes(attributes: list[dict]) -> str | None:
     """Extract email from Cognito user attributes list"""
     for attr in attributes:
@@ -306,14 +246,6 @@ def format_cognito_user(user: dict) -> dict:
     }
 
 
-def verify_admin_access(authorization: str | None) -> str:
-    """Verify admin access and return email, or raise HTTPException"""
-    email = extract_email_from_token(authorization)
-    if not email or not is_admin(email):
-        raise HTTPException(status_code=403, detail="Admin access required")
-    return email
-
-
 # ===== Public Endpoints =====
 @router.post("/users/request-access", response_model=dict[str, Any])
 async def request_access(request: AccessRequestModel):
@@ -386,14 +318,12 @@ async def request_access(request: AccessRequestModel):
 
 
 # ===== Admin Endpoints (require authentication and admin role) =====
-@router.get("/users/pending")
-async def list_pending_requests(authorization: str | None = Header(None)):
+@router.get("/users/pending", dependencies=[Depends(require_admin)])
+async def list_pending_requests():
     """
     List all pending user access requests.
     Admin only.
     """
-    verify_admin_access(authorization)
-
     try:
         pending_table = dynamodb.Table(PENDING_USERS_TABLE)
         response = pending_table.scan(
@@ -411,14 +341,12 @@ async def list_pending_requests(authorization: str | None = Header(None)):
 async def approve_user_request(
     request_id: str,
     request_body: ApproveUserRequest | None = None,
-    authorization: str | None = Header(None)
+    admin: Principal = Depends(require_admin)
 ):
     """
     Approve a pending user request and create Cognito user.
     Admin only.
     """
-    email = verify_admin_access(authorization)
-
     try:
         # Get pending request
         pending_table = dynamodb.Table(PENDING_USERS_TABLE)
@@ -460,7 +388,7 @@ async def approve_user_request(
             ExpressionAttributeValues={
                 ':status': 'approved',
                 ':updated_at': datetime.utcnow().isoformat(),
-                ':approved_by': email
+                ':approved_by': admin.email
             }
         )
 
@@ -485,14 +413,12 @@ async def approve_user_request(
 @router.post("/users/reject/{request_id}", response_model=dict[str, Any])
 async def reject_user_request(
     request_id: str,
-    authorization: str | None = Header(None)
+    admin: Principal = Depends(require_admin)
 ):
     """
     Reject a pending user request.
     Admin only.
     """
-    email = verify_admin_access(authorization)
-
     try:
         # Get pending request
         pending_table = dynamodb.Table(PENDING_USERS_TABLE)
@@ -516,7 +442,7 @@ async def reject_user_request(
             ExpressionAttributeValues={
                 ':status': 'rejected',
                 ':updated_at': datetime.utcnow().isoformat(),
-                ':rejected_by': email
+                ':rejected_by': admin.email
             }
         )
 
@@ -533,7 +459,7 @@ async def reject_user_request(
 @router.delete("/users/{user_email}", response_model=dict[str, Any])
 async def delete_user(
     user_email: str,
-    authorization: str | None = Header(None)
+    admin: Principal = Depends(require_admin)
 ):
     """
     Delete a user and all associated data.
@@ -543,10 +469,8 @@ async def delete_user(
     - Pending user requests from DynamoDB
     Admin only. Cannot delete yourself.
     """
-    admin_email = verify_admin_access(authorization)
-
     # Prevent self-deletion
-    if admin_email == user_email:
+    if admin.email == user_email:
         raise HTTPException(
             status_code=400,
             detail="Cannot delete your own account"
@@ -566,6 +490,7 @@ async def delete_user(
                 Username=user_email
             )
             deletion_results['cognito'] = True
+            forget_user_groups(user_email)
         except cognito.exceptions.UserNotFoundException:
             # User doesn't exist in Cognito, continue with cleanup
             pass
@@ -615,14 +540,12 @@ async def delete_user(
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
-@router.get("/users")
-async def list_users(authorization: str | None = Header(None)):
+@router.get("/users", dependencies=[Depends(require_admin)])
+async def list_users():
     """
     List all users in Cognito.
     Admin only.
     """
-    verify_admin_access(authorization)
-
     try:
         users = []
         paginator = cognito.get_paginator('list_users')
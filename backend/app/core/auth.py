@@ -1,18 +1,45 @@
 """Shared authentication utilities."""
 
+import base64
+import hashlib
+import hmac
 import logging
 import os
+import time
+from dataclasses import dataclass
 
 import boto3
 from botocore.exceptions import ClientError
-from jwt.exceptions import ExpiredSignatureError, InvalidSignatureError, InvalidTokenError
+from fastapi import Depends, Header, Request
+from jwt.exceptions import ExpiredSignatureError, InvalidSignatureError, InvalidTokenError, PyJWTError
 
+from app.core.cache import TTLCache
+from app.core.exceptions import SecurityError
 from app.core.jwt_verifier import verify_jwt_token
+from app.db.client import get_config_table
 
 logger = logging.getLogger(__name__)
 
 ENVIRONMENT = os.environ.get('ENVIRONMENT', 'prd').lower()
 USER_POOL_ID = os.environ.get('COGNITO_USER_POOL_ID')
+# 'gateway': trust claims verified by the API Gateway Cognito authorizer when present; 'local': always verify here
+AUTH_MODE = os.environ.get('AUTH_MODE', 'gateway').lower()
+
+ADMIN_GROUP = 'admin'
+GROUPS_CLAIM = 'cognito:groups'
+
+# Group memberships by username, filled from verified token claims or Cognito lookups
+GROUP_CACHE_TTL = int(os.environ.get('GROUP_CACHE_TTL_SECONDS', '300'))
+_group_cache = TTLCache(maxsize=512, ttl=GROUP_CACHE_TTL)
+
+# Machine clients: HMAC-SHA256 signed tokens, secrets stored in the config table
+MACHINE_SCHEME = 'pfm1'  # Version tag leading every machine token
+MACHINE_CLIENT_KEY_PREFIX = 'MACHINE_CLIENT#'
+SCOPE_FEED_WRITE = 'feed:write'
+SCOPE_STATUS_READ = 'status:read'
+SCOPE_FLEET = 'fleet'  # Address any device or device group, not only IOT_THING_ID
+MACHINE_CLIENT_CACHE_TTL = int(os.environ.get('MACHINE_CLIENT_CACHE_TTL_SECONDS', '60'))
+_machine_clients = TTLCache(maxsize=128, ttl=MACHINE_CLIENT_CACHE_TTL)
 
 _cognito_client = None
 
@@ -25,14 +52,15 @@ def _get_cognito_client():
     return _cognito_client
 
 
-def extract_email_from_token(authorization: str | None) -> str | None:
-    """Extract email from JWT token with signature verification.
+def get_token_claims(authorization: str | None) -> dict | None:
+    """Verified claims of the bearer token in an Authorization header.
 
     Args:
         authorization: Authorization header value (e.g., 'Bearer <token>')
 
     Returns:
-        Email address if token is valid, None otherwise
+        Token payload if the token is valid, None if there is no bearer token
+        or verification is not configured
 
     Raises:
         InvalidTokenError: If token format is invalid
@@ -44,33 +72,293 @@ def extract_email_from_token(authorization: str | None) -> str | None:
 
     token = authorization.replace('Bearer ', '')
 
-    # Verify JWT signature and extract email
     try:
         payload = verify_jwt_token(token)
         if payload:
-            return payload.get('email')
-        return None
+            remember_token_groups(payload)
+        return payload
     except (InvalidTokenError, ExpiredSignatureError, InvalidSignatureError) as e:
         logger.warning(f"JWT verification failed: {str(e)}")
         raise
 
 
-def is_admin(email: str | None) -> bool:
-    """Check if user is in admin group."""
-    if not email:
-        return False
-    if ENVIRONMENT == 'demo' or not USER_POOL_ID:
-        return True
+def extract_email_from_token(authorization: str | None) -> str | None:
+    """Extract email from JWT token with signature verification.
+
+    Args:
+        authorization: Authorization header value (e.g., 'Bearer <token>')
+
+    Returns:
+        Email address if token is valid, None otherwise
+
+    Raises:
+        InvalidTokenError: If the token fails verification (see get_token_claims)
+    """
+    payload = get_token_claims(authorization)
+    return payload.get('email') if payload else None
+
+
+def remember_token_groups(payload: dict) -> None:
+    """Cache the group memberships carried by a verified token's 'cognito:groups' claim."""
+    email = payload.get('email')
+    groups = payload.get(GROUPS_CLAIM)
+    if email and isinstance(groups, list):
+        # Authorizer claims carry 'exp' as a date string; only a numeric exp bounds the entry
+        exp = payload.get('exp')
+        _group_cache.set(email, groups, expires_at=exp if isinstance(exp, int | float) else None)
+
+
+def get_user_groups(username: str) -> list[str] | None:
+    """Group names of a Cognito user, cached for GROUP_CACHE_TTL_SECONDS.
+
+    Returns:
+        Group names, or None if Cognito could not be reached (not cached)
+    """
+    groups = _group_cache.get(username)
+    if groups is not None:
+        return groups
     try:
         response = _get_cognito_client().admin_list_groups_for_user(
-            Username=email,
+            Username=username,
             UserPoolId=USER_POOL_ID
         )
-        groups = [group['GroupName'] for group in response.get('Groups', [])]
-        return 'admin' in groups
     except ClientError as e:
-        logger.warning("Failed to check admin status for %s: %s", email, e.response['Error']['Message'])
+        logger.warning("Failed to list groups for %s: %s", redact_email(username), e.response['Error']['Message'])
+        return None
+    groups = [group['GroupName'] for group in response.get('Groups', [])]
+    _group_cache.set(username, groups)
+    return groups
+
+
+def forget_user_groups(username: str) -> None:
+    """Drop a user's cached group memberships (e.g., after they change)."""
+    _group_cache.pop(username)
+
+
+def is_admin(email: str | None, groups: list[str] | None = None) -> bool:
+    """Check if user is in admin group.
+
+    Args:
+        email: User email (Cognito username)
+        groups: Groups from the user's verified 'cognito:groups' claim, if known;
+            otherwise memberships come from the group cache or Cognito
+    """
+    if not email:
         return False
+    if ENVIRONMENT == 'demo' or not USER_POOL_ID:
+        return True
+    if groups is None:
+        groups = get_user_groups(email) or []
+    return ADMIN_GROUP in groups
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The caller of a request, resolved once from its bearer token."""
+
+    email: str | None = None
+    groups: tuple[str, ...] = ()
+    is_admin: bool = False
+    client_id: str | None = None  # Set for machine clients, which are limited to their scopes
+    scopes: tuple[str, ...] = ()
+
+
+def _sign_machine_token(secret: str, message: str) -> str:
+    digest = hmac.new(secret.encode(), message.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+
+
+def issue_machine_token(client_id: str, secret: str, scopes: list[str], ttl_seconds: int = 3600) -> str:
+    """Create a signed machine token ('pfm1.<client>.<expires>.<scope+scope>.<signature>').
+
+    Args:
+        client_id: Machine client ID (its secret lives under MACHINE_CLIENT#<client_id>)
+        secret: The client's shared secret
+        scopes: Scopes requested; only those also granted to the client take effect
+        ttl_seconds: Token lifetime
+    """
+    message = f"{MACHINE_SCHEME}.{client_id}.{int(time.time()) + ttl_seconds}.{'+'.join(scopes)}"
+    return f"{message}.{_sign_machine_token(secret, message)}"
+
+
+def get_machine_client(client_id: str) -> dict | None:
+    """Machine client record ({'secret', 'scopes', 'enabled'}) from the config table.
+
+    Records, and the absence of one, are cached for MACHINE_CLIENT_CACHE_TTL_SECONDS,
+    so revoking a client (enabled=false or deleting it) takes effect within that time.
+    """
+    client = _machine_clients.get(client_id)
+    if client is None:
+        try:
+            item = get_config_table().get_item(Key={'config_key': f"{MACHINE_CLIENT_KEY_PREFIX}{client_id}"})
+        except ClientError as e:
+            logger.warning("Failed to load machine client %s: %s", client_id, e.response['Error']['Message'])
+            return None
+        client = (item.get('Item') or {}).get('value') or {}
+        _machine_clients.set(client_id, client)
+    return client or None
+
+
+def forget_machine_client(client_id: str) -> None:
+    """Drop a machine client's cached record (e.g., right after revoking it)."""
+    _machine_clients.pop(client_id)
+
+
+def verify_machine_token(token: str) -> Principal:
+    """Verify a machine token's HMAC signature, expiry and client.
+
+    Raises:
+        InvalidTokenError: If the token is malformed or its client is unknown or disabled
+        ExpiredSignatureError: If the token has expired
+        InvalidSignatureError: If the signature does not match the client's secret
+    """
+    parts = token.split('.')
+    if len(parts) != 5 or parts[0] != MACHINE_SCHEME or not parts[2].isdigit():
+        raise InvalidTokenError("Malformed machine token")
+    _, client_id, expires, scopes, signature = parts
+    if int(expires) <= time.time():
+        raise ExpiredSignatureError("Machine token has expired")
+
+    client = get_machine_client(client_id)
+    if not client or not client.get('enabled', True) or not client.get('secret'):
+        raise InvalidTokenError(f"Unknown or disabled machine client: {client_id}")
+
+    expected = _sign_machine_token(client['secret'], token.rsplit('.', 1)[0])
+    if not hmac.compare_digest(expected, signature):
+        raise InvalidSignatureError("Machine token signature mismatch")
+
+    granted = sorted(set(scopes.split('+')) & set(client.get('scopes', [])))
+    return Principal(email=f"machine:{client_id}", client_id=client_id, scopes=tuple(granted))
+
+
+def _parse_groups_claim(value: str) -> list[str]:
+    """Groups from an authorizer claim string ('admin,users' or '[admin users]')."""
+    return [group for group in value.strip('[]').replace(',', ' ').split() if group]
+
+
+def get_authorizer_claims(scope: dict) -> dict | None:
+    """Claims an API Gateway authorizer already verified, from the Mangum scope.
+
+    Reads requestContext.authorizer.claims (REST API Cognito authorizer),
+    requestContext.authorizer.jwt.claims (HTTP API JWT authorizer) or the context
+    of the api_authorizer Lambda, which sits at requestContext.authorizer itself.
+
+    Returns:
+        Claims with 'cognito:groups' as a list, or None if the request did not go
+        through an authorizer
+    """
+    event = scope.get('aws.event') or {}
+    authorizer = (event.get('requestContext') or {}).get('authorizer') or {}
+    claims = authorizer.get('claims') or (authorizer.get('jwt') or {}).get('claims') or authorizer
+    if not claims or not claims.get('email'):
+        return None
+    groups = claims.get(GROUPS_CLAIM)
+    if isinstance(groups, str):
+        claims = {**claims, GROUPS_CLAIM: _parse_groups_claim(groups)}
+    return claims
+
+
+def resolve_principal(authorization: str | None, authorizer_claims: dict | None = None) -> Principal:
+    """Work out who the caller is.
+
+    Uses claims already verified by the API Gateway authorizer when given, otherwise
+    makes one local token verification. Only if the claims carry no groups is there
+    one (cached) group lookup. Machine tokens are checked by verify_machine_token.
+    Without a token the caller is anonymous.
+    """
+    if authorization and authorization.startswith(f'Bearer {MACHINE_SCHEME}.'):
+        return verify_machine_token(authorization.replace('Bearer ', '', 1))
+    if authorizer_claims:
+        remember_token_groups(authorizer_claims)
+        claims = authorizer_claims
+    else:
+        claims = get_token_claims(authorization) or {}
+    email = claims.get('email')
+    if not email:
+        return Principal()
+    groups = claims.get(GROUPS_CLAIM)
+    if not isinstance(groups, list) and ENVIRONMENT != 'demo' and USER_POOL_ID:
+        groups = get_user_groups(email)
+    groups = list(groups or [])
+    return Principal(email=email, groups=tuple(groups), is_admin=is_admin(email, groups))
+
+
+def authenticate(request: Request, authorization: str | None = Header(None)) -> Principal:
+    """FastAPI dependency resolving the request's Principal, memoized on the request.
+
+    Machine clients pass through; routes use get_principal or require_scope instead.
+
+    Raises:
+        SecurityError: 401 if the bearer token fails verification
+    """
+    principal = getattr(request.state, 'principal', None)
+    if principal is None:
+        authorizer_claims = get_authorizer_claims(request.scope) if AUTH_MODE == 'gateway' else None
+        try:
+            principal = resolve_principal(authorization, authorizer_claims)
+        except PyJWTError as e:
+            raise SecurityError("Invalid or expired token", internal_detail=str(e), status_code=401) from e
+        request.state.principal = principal
+    return principal
+
+
+def get_principal(request: Request, authorization: str | None = Header(None)) -> Principal:
+    """FastAPI dependency for user routes: the caller, who must not be a machine client.
+
+    Machine clients are denied by default; only routes guarded by require_scope accept them.
+
+    Raises:
+        SecurityError: 401 if the bearer token fails verification, 403 for machine clients
+    """
+    principal = authenticate(request, authorization)
+    if principal.client_id:
+        raise SecurityError("Machine clients are not allowed on this route")
+    return principal
+
+
+def require_admin(principal: Principal = Depends(get_principal)) -> Principal:
+    """FastAPI dependency allowing only admins through.
+
+    Raises:
+        SecurityError: 403 if the caller is not an admin
+    """
+    if not principal.email or not principal.is_admin:
+        raise SecurityError("Admin access required")
+    return principal
+
+
+def require_scope(scope: str):
+    """FastAPI dependency factory opening a route to machine clients that hold `scope`.
+
+    Users are not limited by scopes; their routes are guarded as before.
+
+    Raises:
+        SecurityError: 403 if a machine client lacks the scope
+    """
+    def dependency(principal: Principal = Depends(authenticate)) -> Principal:
+        if principal.client_id and scope not in principal.scopes:
+            raise SecurityError(f"Missing scope '{scope}'")
+        return principal
+    return dependency
+
+
+def can_address_fleet(principal: Principal) -> bool:
+    """Whether the caller may address any device: admins and machine clients with SCOPE_FLEET.
+
+    Devices have no per-user owner; every caller of a device route may use the
+    deployment's device (IOT_THING_ID), while the rest of the fleet is admin-managed.
+    """
+    return principal.is_admin or SCOPE_FLEET in principal.scopes
+
+
+def check_device_access(principal: Principal, thing_id: str | None) -> None:
+    """Refuse a request naming a device other than the deployment's own unless the caller may address the fleet.
+
+    Raises:
+        SecurityError: 403 if the caller may not address thing_id
+    """
+    if thing_id and thing_id != os.environ.get('IOT_THING_ID') and not can_address_fleet(principal):
+        raise SecurityError(f"Access to device '{thing_id}' requires admin or the '{SCOPE_FLEET}' scope")
 
 
 def redact_email(email: str) -> str:
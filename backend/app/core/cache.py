@@ -0,0 +1,180 @@
+"""Small in-process caches shared across warm Lambda invocations."""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire at their own deadline.
+
+    Entries live for `ttl` seconds unless set with an earlier `expires_at`. When full,
+    the least recently used entry is evicted. Safe to share between the threads
+    FastAPI runs sync dependencies on.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Cached value for key, or default if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, expires_at: float | None = None) -> None:
+        """Store value until expires_at (epoch seconds), capped at the cache TTL."""
+        deadline = time.time() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        with self._lock:
+            self._entries[key] = (value, deadline)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        """Drop one entry if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self, reset_stats: bool = True) -> None:
+        """Drop every entry and (unless reset_stats is False) reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            if reset_stats:
+                self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Hit/miss counters for logging or a metrics endpoint."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Cached marker for keys known to be missing from the table
+_NOT_FOUND = object()
+
+
+class ConfigCache:
+    """
+    Read-through cache of config table items, invalidated by a version counter.
+
+    Every write bumps a counter stored in the table itself (see bump_version). Readers
+    re-read that counter at most every `version_check_interval` seconds and drop all
+    cached items when it moved, so a write in one Lambda container reaches the others
+    within that interval without each read going to DynamoDB. Missing keys are cached
+    too, so keys that fall back to defaults cost no reads either.
+    """
+
+    VERSION_KEY = "CONFIG_VERSION"
+
+    def __init__(
+        self,
+        get_table: Callable[[], Any],
+        key_name: str = "config_key",
+        ttl: float = 300,
+        version_check_interval: float = 5,
+        maxsize: int = 128,
+        batch_get: Callable[[list[str]], list[dict]] | None = None
+    ):
+        self._get_table = get_table
+        self._batch_get = batch_get
+        self.key_name = key_name
+        self.version_check_interval = version_check_interval
+        self._items = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._version: Any = None
+        self._version_checked_at: float = 0
+
+    def get(self, key: str) -> dict | None:
+        """Config item for key (a copy, safe to modify), or None if it does not exist."""
+        self._sync_version()
+        item = self._items.get(key)
+        if item is None:
+            item = self._get_table().get_item(Key={self.key_name: key}).get('Item', _NOT_FOUND)
+            self._items.set(key, item)
+        return None if item is _NOT_FOUND else dict(item)
+
+    def get_many(self, keys: list[str]) -> dict[str, dict]:
+        """
+        Config items for several keys, keyed by config key (missing keys are left out).
+
+        Keys not cached are loaded together through `batch_get` when one was given,
+        otherwise one GetItem at a time.
+        """
+        self._sync_version()
+        cached = {key: self._items.get(key) for key in keys}
+        missing = [key for key, item in cached.items() if item is None]
+        if missing:
+            if self._batch_get is not None:
+                loaded = {item[self.key_name]: item for item in self._batch_get(missing)}
+            else:
+                loaded = {
+                    key: response['Item']
+                    for key in missing
+                    if 'Item' in (response := self._get_table().get_item(Key={self.key_name: key}))
+                }
+            for key in missing:
+                cached[key] = loaded.get(key, _NOT_FOUND)
+                self._items.set(key, cached[key])
+        return {key: dict(item) for key, item in cached.items() if item is not _NOT_FOUND}
+
+    def bump_version(self) -> None:
+        """Record a write: increment the shared version and drop this process's entries."""
+        response = self._get_table().update_item(
+            Key={self.key_name: self.VERSION_KEY},
+            UpdateExpression="ADD #value :one",
+            ExpressionAttributeNames={"#value": "value"},
+            ExpressionAttributeValues={":one": 1},
+            ReturnValues="UPDATED_NEW"
+        )
+        self._items.clear(reset_stats=False)
+        self._version = response.get('Attributes', {}).get('value')
+        self._version_checked_at = time.time()
+
+    def _sync_version(self) -> None:
+        current_time = time.time()
+        if current_time - self._version_checked_at < self.version_check_interval:
+            return
+        item = self._get_table().get_item(Key={self.key_name: self.VERSION_KEY}).get('Item') or {}
+        version = item.get('value')
+        if version != self._version:
+            self._items.clear(reset_stats=False)
+            self._version = version
+        self._version_checked_at = current_time
+
+    def clear(self) -> None:
+        """Forget every cached item and the known version."""
+        self._items.clear()
+        self._version = None
+        self._version_checked_at = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters plus the config version the entries belong to."""
+        return {**self._items.stats(), "version": self._version}
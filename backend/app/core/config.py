@@ -13,9 +13,22 @@ class Settings(BaseSettings):
     DEVICE_STATUS_TABLE_NAME: str
     DYNAMO_FEED_CONFIG_TABLE_NAME: str
     IOT_ENDPOINT: str | None = None  # Not required for demo mode
-    IOT_THING_ID: str
-    IOT_TOPIC_FEED: str = "petfeeder/commands"
-    IOT_TOPIC_CONFIG: str = "petfeeder/config"
+    IOT_THING_ID: str  # Default device for requests that do not name one
+    IOT_TOPIC_PREFIX: str = "petfeeder"  # Per-device topics are {prefix}/{thing_id}/{channel}
+    IOT_TOPIC_CONFIG: str = "petfeeder/config"  # Fleet-wide, every device subscribes
+    IOT_GROUP_CACHE_SECONDS: float = 60  # How long thing group membership is reused
+    STATUS_REQUEST_TIMEOUT_MS: int = 5000  # Default wait for a device to answer PUT /status
+    FEED_WAIT_TIMEOUT_MS: int = 15000  # Default wait for a feed to finish with POST /feeds?wait=true
+    # Shared iot-data client tuning (see app.core.iot.get_iot_data_client)
+    IOT_MAX_POOL_CONNECTIONS: int = 10
+    IOT_CONNECT_TIMEOUT_SECONDS: float = 2
+    IOT_READ_TIMEOUT_SECONDS: float = 5
+    # IoT publish retries and circuit breaker (see app.core.publish_policy)
+    IOT_PUBLISH_MAX_ATTEMPTS: int = 3
+    IOT_PUBLISH_BASE_DELAY_SECONDS: float = 0.2  # Jittered, doubled per retry
+    IOT_PUBLISH_MAX_DELAY_SECONDS: float = 2
+    IOT_CIRCUIT_FAILURE_THRESHOLD: int = 5  # Unavailable errors in a row before publishes fail fast
+    IOT_CIRCUIT_RESET_SECONDS: float = 30  # Time open before one trial publish is let through
     SNS_TOPIC_ARN: str | None = None  # Optional for local development
 
     # CORS allowed origins - explicit whitelist for security
@@ -0,0 +1,196 @@
+"""Cron expressions compiled to bitsets for fast next/previous occurrence lookups."""
+
+import calendar
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+# (name, lowest value, highest value, value aliases)
+FIELDS = (
+    ("minute", 0, 59, {}),
+    ("hour", 0, 23, {}),
+    ("day of month", 1, 31, {}),
+    ("month", 1, 12, {name.lower(): i for i, name in enumerate(calendar.month_abbr) if name}),
+    ("day of week", 0, 7, {name.lower(): (i + 1) % 7 for i, name in enumerate(calendar.day_abbr)}),
+)
+
+# How far ahead/back to search before deciding an expression never matches (e.g., '0 0 30 2 *')
+MAX_SEARCH_YEARS = 8
+
+
+def _next_bit(mask: int, start: int) -> int | None:
+    """Lowest set bit at or above start."""
+    remaining = mask >> start << start
+    return (remaining & -remaining).bit_length() - 1 if remaining else None
+
+
+def _prev_bit(mask: int, start: int) -> int | None:
+    """Highest set bit at or below start."""
+    remaining = mask & ((1 << (start + 1)) - 1) if start >= 0 else 0
+    return remaining.bit_length() - 1 if remaining else None
+
+
+def _parse_value(value: str, low: int, high: int, aliases: dict) -> int:
+    number = aliases.get(value.lower())
+    if number is None:
+        if not value.isdigit():
+            raise ValueError(f"invalid value '{value}'")
+        number = int(value)
+    if not low <= number <= high:
+        raise ValueError(f"value {number} out of range {low}-{high}")
+    return number
+
+
+def _parse_field(text: str, low: int, high: int, aliases: dict) -> int:
+    """Parse one cron field ('*', '*/15', '1-5', '8,18', 'MON-FRI') into a bitset."""
+    mask = 0
+    for part in text.split(","):
+        range_part, _, step_part = part.partition("/")
+        step = int(step_part) if step_part.isdigit() else None
+        if step_part and not step:
+            raise ValueError(f"invalid step '{step_part}'")
+
+        if range_part == "*":
+            start, end = low, high
+        elif "-" in range_part:
+            start, end = (_parse_value(v, low, high, aliases) for v in range_part.split("-", 1))
+            if start > end:
+                raise ValueError(f"invalid range '{range_part}'")
+        else:
+            start = _parse_value(range_part, low, high, aliases)
+            end = high if step else start
+
+        for value in range(start, end + 1, step or 1):
+            mask |= 1 << value
+    return mask
+
+
+class CronSchedule:
+    """
+    A compiled five-field cron expression (minute hour day-of-month month day-of-week).
+
+    Matching works on naive wall-clock times; the scheduler reads the expression in the
+    schedule's own timezone (see app.core.scheduler).
+
+    Each field is stored as a bitset, so finding the next matching minute/hour/day is a
+    couple of integer operations rather than a minute-by-minute walk. As in standard cron,
+    when both day of month and day of week are restricted a day matching either one fires.
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != len(FIELDS):
+            raise ValueError(f"Invalid cron expression '{expression}': expected 5 fields")
+
+        masks = []
+        for text, (name, low, high, aliases) in zip(fields, FIELDS, strict=True):
+            try:
+                masks.append(_parse_field(text, low, high, aliases))
+            except ValueError as e:
+                raise ValueError(f"Invalid cron expression '{expression}': {name} {e}") from None
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = masks
+        # Sunday may be written as 0 or 7
+        self.weekdays = (weekdays | (weekdays >> 7)) & 0x7F
+        self.days_restricted = not fields[2].startswith("*")
+        self.weekdays_restricted = not fields[4].startswith("*")
+        self._day_masks: dict[tuple[int, int], int] = {}
+
+    def day_mask(self, year: int, month: int) -> int:
+        """Bitset of the days (bit 1 = day 1) of a month that match the expression."""
+        key = (year, month)
+        if key not in self._day_masks:
+            first_weekday, days_in_month = calendar.monthrange(year, month)
+            first_weekday = (first_weekday + 1) % 7  # Cron counts from Sunday = 0
+
+            weekday_days = 0
+            for day in range(1, days_in_month + 1):
+                if self.weekdays >> ((first_weekday + day - 1) % 7) & 1:
+                    weekday_days |= 1 << day
+
+            if self.days_restricted and self.weekdays_restricted:
+                mask = self.days | weekday_days
+            elif self.weekdays_restricted:
+                mask = weekday_days
+            else:
+                mask = self.days
+            self._day_masks[key] = mask & ((1 << (days_in_month + 1)) - 2)
+        return self._day_masks[key]
+
+    def next_after(self, moment: datetime) -> datetime | None:
+        """First matching minute strictly after moment (None if there is none)."""
+        moment = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        year, month, day, hour, minute = moment.year, moment.month, moment.day, moment.hour, moment.minute
+
+        while year <= moment.year + MAX_SEARCH_YEARS:
+            next_month = _next_bit(self.months, month)
+            if next_month is None:
+                year, month, day, hour, minute = year + 1, 1, 1, 0, 0
+                continue
+            if next_month != month:
+                month, day, hour, minute = next_month, 1, 0, 0
+
+            next_day = _next_bit(self.day_mask(year, month), day)
+            if next_day is None:
+                month, day, hour, minute = month + 1, 1, 0, 0
+                continue
+            if next_day != day:
+                day, hour, minute = next_day, 0, 0
+
+            next_hour = _next_bit(self.hours, hour)
+            if next_hour is None:
+                day, hour, minute = day + 1, 0, 0
+                continue
+            if next_hour != hour:
+                hour, minute = next_hour, 0
+
+            next_minute = _next_bit(self.minutes, minute)
+            if next_minute is None:
+                hour, minute = hour + 1, 0
+                continue
+            return datetime(year, month, day, hour, next_minute)
+        return None
+
+    def previous_at_or_before(self, moment: datetime) -> datetime | None:
+        """Last matching minute at or before moment (None if there is none)."""
+        year, month, day, hour, minute = moment.year, moment.month, moment.day, moment.hour, moment.minute
+
+        while year >= moment.year - MAX_SEARCH_YEARS:
+            prev_month = _prev_bit(self.months, month)
+            if prev_month is None:
+                year, month, day, hour, minute = year - 1, 12, 31, 23, 59
+                continue
+            if prev_month != month:
+                month, day, hour, minute = prev_month, 31, 23, 59
+
+            prev_day = _prev_bit(self.day_mask(year, month), day)
+            if prev_day is None:
+                month, day, hour, minute = month - 1, 31, 23, 59
+                continue
+            if prev_day != day:
+                day, hour, minute = prev_day, 23, 59
+
+            prev_hour = _prev_bit(self.hours, hour)
+            if prev_hour is None:
+                day, hour, minute = day - 1, 23, 59
+                continue
+            if prev_hour != hour:
+                hour, minute = prev_hour, 59
+
+            prev_minute = _prev_bit(self.minutes, minute)
+            if prev_minute is None:
+                hour, minute = hour - 1, 59
+                continue
+            return datetime(year, month, day, hour, prev_minute)
+        return None
+
+
+@lru_cache(maxsize=256)
+def compile_cron(expression: str) -> CronSchedule:
+    """
+    Parse and compile a cron expression, reusing the compiled form for repeated expressions.
+
+    Raises:
+        ValueError: If the expression is invalid
+    """
+    return CronSchedule(" ".join(expression.split()))
@@ -1,104 +1,269 @@
 """
 Hardware Adapter - Interface for ESP32 hardware interactions via AWS IoT Core
 """
+import asyncio
 import json
 import logging
 import os
+import threading
 from abc import ABC, abstractmethod
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import UTC, datetime
 from typing import Any
 
-import boto3
+from app.core.iot_codec import PAYLOAD_FORMAT_COMPACT, encode_feed_command
 
 logger = logging.getLogger(__name__)
 
+# publish_many: messages in flight at once, attempts per message, and the first retry delay (jittered, doubled per round)
+PUBLISH_CONCURRENCY = int(os.environ.get('IOT_PUBLISH_CONCURRENCY', '8'))
+PUBLISH_MAX_ATTEMPTS = int(os.environ.get('IOT_PUBLISH_MAX_ATTEMPTS', '3'))
+PUBLISH_RETRY_DELAY_SECONDS = 0.2
+
+# (topic, payload, qos)
+PublishMessage = tuple[str, str | bytes, int]
+
+
+@dataclass(frozen=True)
+class PublishResult:
+    """Outcome of one message passed to publish_many."""
+
+    topic: str
+    success: bool
+    attempts: int
+    error: str | None = None
+
 
 class HardwareAdapter(ABC):
     """Abstract base class for hardware interactions"""
 
     @abstractmethod
-    async def trigger_feed(self, requested_by: str, mode: str = "manual", feed_cycles: int | None = None) -> dict[str, Any]:
-        """Trigger a feed event (real or simulated)"""
-        pass
+    async def trigger_feed(
+        self,
+        requested_by: str,
+        mode: str = "manual",
+        feed_cycles: int | None = None,
+        thing_id: str | None = None,
+        feed_id: str | None = None,
+        payload_format: str | None = None
+    ) -> dict[str, Any]:
+        """
+        Trigger a feed event (real or simulated) on one device (default: IOT_THING_ID), logged under feed_id.
+        payload_format is the format the device last reported (JSON when unknown).
+        """
+
+    @abstractmethod
+    async def trigger_group_feed(
+        self,
+        thing_ids: list[str],
+        requested_by: str,
+        mode: str = "manual",
+        feed_cycles: int | None = None,
+        feed_ids: dict[str, str] | None = None,
+        payload_formats: dict[str, str | None] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """Trigger a feed on several devices, each logged under its feed_ids entry, returning results keyed by thing_id"""
 
     @abstractmethod
-    async def get_device_status(self) -> dict[str, Any] | None:
+    async def get_device_status(self, thing_id: str | None = None, consistent_read: bool = False) -> dict[str, Any] | None:
         """Get current device status (real or simulated)"""
-        pass
 
     @abstractmethod
-    async def request_status_update(self) -> bool:
-        """Request device to publish status (real or simulated)"""
-        pass
+    async def request_status_update(self, thing_id: str | None = None, request_id: str | None = None) -> bool:
+        """Request device to publish status (real or simulated), tagged with request_id"""
 
     @abstractmethod
-    async def update_config(self, config_key: str, value: Any) -> bool:
-        """Update device configuration (real or simulated)"""
-        pass
+    async def publish_many(self, messages: list[PublishMessage]) -> list[PublishResult]:
+        """Publish several messages, returning one result per message in the same order"""
 
 
 class ProductionHardwareAdapter(HardwareAdapter):
     """Real hardware adapter - communicates with ESP32 via IoT Core"""
 
     def __init__(self):
-        self.iot_client = boto3.client('iot-data')
+        from app.core.iot import get_iot_data_client
+        self.iot_client = get_iot_data_client()
         self.iot_endpoint = os.environ['IOT_ENDPOINT']
-        self.iot_topic = os.environ.get('IOT_PUBLISH_TOPIC', 'petfeeder/commands')
         self.thing_id = os.environ['IOT_THING_ID']
 
-    async def trigger_feed(self, requested_by: str, mode: str = "manual", feed_cycles: int | None = None) -> dict[str, Any]:
-        """Publish MQTT command to real ESP32"""
+    def command_topic(self, thing_id: str | None = None) -> str:
+        """Command topic of one device (default: this deployment's IOT_THING_ID)."""
+        from app.core.iot import device_topic
+        return device_topic(thing_id or self.thing_id, "commands")
+
+    async def _publish(self, topic: str, payload: str | bytes, qos: int = 1) -> dict[str, Any]:
+        """Publish on the shared IoT publish executor so the event loop keeps serving requests."""
+        from app.core.iot import run_in_publish_executor
+        return await run_in_publish_executor(
+            lambda: self.iot_client.publish(topic=topic, qos=qos, payload=payload)
+        )
+
+    @staticmethod
+    def _feed_command(
+        requested_by: str,
+        mode: str,
+        feed_cycles: int | None,
+        feed_id: str | None = None,
+        payload_format: str | None = None
+    ) -> str | bytes:
+        if payload_format == PAYLOAD_FORMAT_COMPACT:
+            return encode_feed_command(requested_by, mode, feed_cycles, feed_id)
+
         command = {
             "command": "FEED_NOW",
             "requested_by": requested_by,
             "mode": mode,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": datetime.now(UTC).replace(tzinfo=None).isoformat()
         }
 
         if feed_cycles is not None:
             command["feed_cycles"] = feed_cycles
+        if feed_id is not None:
+            # The device logs its feed events under this id instead of generating one
+            command["feed_id"] = feed_id
 
-        self.iot_client.publish(
-            topic=self.iot_topic,
-            qos=1,
-            payload=json.dumps(command)
-        )
+        return json.dumps(command)
+
+    @staticmethod
+    def _feed_result(result: PublishResult) -> dict[str, Any]:
+        if not result.success:
+            return {
+                "status": "failed",
+                "message": f"Feed command could not be sent: {result.error}"
+            }
 
         return {
             "status": "sent",
             "message": "Feed command sent to device"
         }
 
-    async def get_device_status(self) -> dict[str, Any] | None:
+    async def trigger_feed(
+        self,
+        requested_by: str,
+        mode: str = "manual",
+        feed_cycles: int | None = None,
+        thing_id: str | None = None,
+        feed_id: str | None = None,
+        payload_format: str | None = None
+    ) -> dict[str, Any]:
+        """Publish MQTT command to one real ESP32"""
+        command = self._feed_command(requested_by, mode, feed_cycles, feed_id, payload_format)
+        [result] = await self.publish_many([(self.command_topic(thing_id), command, 1)])
+        return self._feed_result(result)
+
+    async def trigger_group_feed(
+        self,
+        thing_ids: list[str],
+        requested_by: str,
+        mode: str = "manual",
+        feed_cycles: int | None = None,
+        feed_ids: dict[str, str] | None = None,
+        payload_formats: dict[str, str | None] | None = None,
+        concurrency: int = PUBLISH_CONCURRENCY
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Publish a feed command to several ESP32s, at most `concurrency` at a time.
+
+        Every device gets its own message on its own topic, so a device that cannot be
+        reached is reported as failed without holding back the rest of the group.
+        Each command carries the device's entry in feed_ids and is sent in the format
+        the device reported in payload_formats.
+        """
+        feed_ids = feed_ids or {}
+        payload_formats = payload_formats or {}
+        messages = [
+            (
+                self.command_topic(thing_id),
+                self._feed_command(requested_by, mode, feed_cycles, feed_ids.get(thing_id), payload_formats.get(thing_id)),
+                1
+            )
+            for thing_id in thing_ids
+        ]
+        results = await self.publish_many(messages, concurrency=concurrency)
+        return {thing_id: self._feed_result(result) for thing_id, result in zip(thing_ids, results, strict=True)}
+
+    async def get_device_status(self, thing_id: str | None = None, consistent_read: bool = False) -> dict[str, Any] | None:
         """Get status from DynamoDB (updated by IoT Rule)"""
         from app.crud.feed import get_latest_device_status
-        return await get_latest_device_status()
+        return await get_latest_device_status(thing_id or self.thing_id, consistent_read)
 
-    async def request_status_update(self) -> bool:
+    async def request_status_update(self, thing_id: str | None = None, request_id: str | None = None) -> bool:
         """Request ESP32 to publish status"""
         from app.core.iot import request_device_status
-        return await request_device_status()
+        return await request_device_status(thing_id or self.thing_id, request_id)
 
-    async def update_config(self, config_key: str, value: Any) -> bool:
-        """Broadcast config update to ESP32 via MQTT"""
-        config_topic = os.environ.get('IOT_CONFIG_TOPIC', 'petfeeder/config')
+    async def publish_many(
+        self,
+        messages: list[PublishMessage],
+        concurrency: int = PUBLISH_CONCURRENCY,
+        max_attempts: int = PUBLISH_MAX_ATTEMPTS,
+        retry_delay: float = PUBLISH_RETRY_DELAY_SECONDS
+    ) -> list[PublishResult]:
+        """
+        Publish several messages concurrently, at most `concurrency` at a time.
 
-        message = {
-            "config_key": config_key,
-            "value": value,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        Messages that fail with a retryable error (throttling, 5xx, connection problems)
+        are retried, after a jittered doubling delay, for up to `max_attempts` rounds;
+        messages that went through or were rejected are never re-sent. One failing
+        message does not stop the others. Every publish goes through the shared IoT
+        circuit breaker, so while the endpoint is unhealthy messages fail at once.
 
-        self.iot_client.publish(
-            topic=config_topic,
-            qos=1,
-            payload=json.dumps(message)
-        )
-        return True
+        Returns:
+            One PublishResult per message, in the order given
+        """
+        from app.core.iot import publish_policy
+        from app.core.publish_policy import is_retryable
+
+        semaphore = asyncio.Semaphore(concurrency)
+        results: list[PublishResult | None] = [None] * len(messages)
+        retryable: set[int] = set()
+
+        async def send(index: int, attempt: int) -> None:
+            topic, payload, qos = messages[index]
+            async with semaphore:
+                try:
+                    await publish_policy.call(lambda: self._publish(topic, payload, qos))
+                    results[index] = PublishResult(topic, True, attempt)
+                except Exception as e:
+                    results[index] = PublishResult(topic, False, attempt, str(e))
+                    if is_retryable(e):
+                        retryable.add(index)
+
+        pending = list(range(len(messages)))
+        for attempt in range(1, max_attempts + 1):
+            if attempt > 1:
+                publish_policy.retries += len(pending)
+                await asyncio.sleep(publish_policy.backoff(attempt - 1, base_delay=retry_delay))
+            retryable.clear()
+            await asyncio.gather(*(send(index, attempt) for index in pending))
+            pending = [index for index in pending if index in retryable]
+            if not pending:
+                break
+
+        for result in results:
+            if not result.success:
+                logger.warning("Publish to %s failed after %d attempts: %s", result.topic, result.attempts, result.error)
+        return results
+
+
+_adapter: HardwareAdapter | None = None
+_adapter_lock = threading.Lock()
 
 
 def get_hardware_adapter() -> HardwareAdapter:
     """
-    Factory function to get the hardware adapter for production ESP32 device
+    Hardware adapter for the production ESP32 fleet, built once per process
+    and reused by every request and executor dispatch.
     """
-    return ProductionHardwareAdapter()
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                _adapter = ProductionHardwareAdapter()
+    return _adapter
+
+
+def reset_hardware_adapter() -> None:
+    """Drop the cached adapter so the next call builds a new one (e.g. after env changes)."""
+    global _adapter
+    _adapter = None
@@ -1,40 +1,170 @@
 import asyncio
 import json
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.publish_policy import (
+    CIRCUIT_STATE_CODES,
+    CircuitBreaker,
+    CircuitOpenError,
+    PublishPolicy,
+)
+
+_iot_client = None
+_iot_client_lock = threading.Lock()
+_iot_control_client = None
+
+# Thing group name -> member thing names, so fan-out does not list the registry per request
+_group_members = TTLCache(maxsize=256, ttl=settings.IOT_GROUP_CACHE_SECONDS)
+
+# Dedicated threads for blocking IoT calls, sized to the client's connection pool so
+# publishes never queue behind DynamoDB work in the default executor or exceed the pool
+_publish_executor = ThreadPoolExecutor(max_workers=settings.IOT_MAX_POOL_CONNECTIONS, thread_name_prefix="iot-publish")
+
+
+def _report_circuit_state(previous: str, state: str) -> None:
+    """Log a breaker transition as a CloudWatch embedded metric (PetFeeder/IoT PublishCircuitState)."""
+    print(json.dumps({
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": "PetFeeder/IoT",
+                "Dimensions": [["Environment"]],
+                "Metrics": [{"Name": "PublishCircuitState", "Unit": "None"}],
+            }],
+        },
+        "Environment": settings.ENVIRONMENT,
+        "PublishCircuitState": CIRCUIT_STATE_CODES[state],
+        "previous_state": previous,
+        "state": state,
+    }))
 
-# Initialize boto3 IoT Data Plane client globally
-# This client is synchronous, so its calls will be wrapped in run_in_executor.
-# It will automatically pick up credentials from Lambda's execution role.
-iot_client = boto3.client(
-    "iot-data",
-    region_name=settings.AWS_REGION,
-    endpoint_url=f"https://{settings.IOT_ENDPOINT}"
+
+# Retries and circuit breaker shared by every publish to the iot-data endpoint in this process
+publish_policy = PublishPolicy(
+    CircuitBreaker(
+        failure_threshold=settings.IOT_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=settings.IOT_CIRCUIT_RESET_SECONDS,
+        on_state_change=_report_circuit_state
+    ),
+    max_attempts=settings.IOT_PUBLISH_MAX_ATTEMPTS,
+    base_delay=settings.IOT_PUBLISH_BASE_DELAY_SECONDS,
+    max_delay=settings.IOT_PUBLISH_MAX_DELAY_SECONDS
 )
 
 
-async def publish_feed_command(command: str) -> bool:
+def get_iot_data_client():
+    """
+    The process-wide IoT Data Plane client, built on first use.
+
+    Shared by this module and the hardware adapter, so a warm Lambda keeps one
+    connection pool to the IoT endpoint instead of building a client per request.
+    The client is synchronous; async callers run its calls in an executor.
+    It picks up credentials from Lambda's execution role.
+    """
+    global _iot_client
+    if _iot_client is None:
+        with _iot_client_lock:
+            if _iot_client is None:
+                _iot_client = boto3.client(
+                    "iot-data",
+                    region_name=settings.AWS_REGION,
+                    endpoint_url=f"https://{settings.IOT_ENDPOINT}" if settings.IOT_ENDPOINT else None,
+                    config=Config(
+                        max_pool_connections=settings.IOT_MAX_POOL_CONNECTIONS,
+                        connect_timeout=settings.IOT_CONNECT_TIMEOUT_SECONDS,
+                        read_timeout=settings.IOT_READ_TIMEOUT_SECONDS,
+                        # No retries inside botocore: publish_policy retries and sees every failure
+                        retries={"max_attempts": 1, "mode": "standard"},
+                        tcp_keepalive=True
+                    )
+                )
+    return _iot_client
+
+
+def get_iot_control_client():
+    """The process-wide IoT control plane client (thing registry), built on first use."""
+    global _iot_control_client
+    if _iot_control_client is None:
+        with _iot_client_lock:
+            if _iot_control_client is None:
+                _iot_control_client = boto3.client("iot", region_name=settings.AWS_REGION)
+    return _iot_control_client
+
+
+def device_topic(thing_id: str | None, channel: str) -> str:
+    """
+    MQTT topic for one device, e.g. petfeeder/feeder-42/commands.
+
+    Each device only subscribes to its own topics, so one deployment can address any
+    number of feeders; thing_id defaults to the deployment's IOT_THING_ID.
+    """
+    return f"{settings.IOT_TOPIC_PREFIX}/{thing_id or settings.IOT_THING_ID}/{channel}"
+
+
+def list_thing_group_members(group: str) -> list[str]:
+    """
+    Thing names in an IoT thing group (including its child groups), sorted.
+
+    Device groups live in the IoT registry, so adding a feeder to a group needs no
+    change here. Membership is cached for IOT_GROUP_CACHE_SECONDS.
+    """
+    members = _group_members.get(group)
+    if members is None:
+        paginator = get_iot_control_client().get_paginator("list_things_in_thing_group")
+        pages = paginator.paginate(thingGroupName=group, recursive=True)
+        members = sorted({thing for page in pages for thing in page.get("things", [])})
+        _group_members.set(group, members)
+    return list(members)
+
+
+async def run_in_publish_executor(call: Callable[[], Any]) -> Any:
+    """Run a blocking IoT call on the publish executor without blocking the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_publish_executor, call)
+
+
+async def publish(topic: str, payload: str | bytes, qos: int = 0) -> Any:
+    """
+    Publish one message under publish_policy.
+
+    Throttled and unavailable errors are retried with jittered backoff; while the
+    endpoint is unhealthy the call fails at once with CircuitOpenError.
+    """
+    return await publish_policy.run(
+        lambda: run_in_publish_executor(
+            lambda: get_iot_data_client().publish(topic=topic, qos=qos, payload=payload)
+        )
+    )
+
+
+def get_publish_metrics() -> dict:
+    """Circuit breaker state and retry counters of IoT publishes in this process."""
+    return publish_policy.metrics()
+
+
+async def publish_feed_command(command: str, thing_id: str | None = None) -> bool:
     if not settings.IOT_ENDPOINT:
         print("Error: AWS IoT Endpoint is not configured in app.core.config.py.")
         return False
 
+    topic = device_topic(thing_id, "commands")
     try:
-        loop = asyncio.get_event_loop()
-        # Run the synchronous boto3 publish call in a separate thread
         print(command)
-        await loop.run_in_executor(
-            None,
-            lambda: iot_client.publish(
-                topic=settings.IOT_TOPIC_FEED,
-                qos=0,
-                payload=command
-            )
-        )
-        print(f"Successfully published command to topic '{settings.IOT_TOPIC_FEED}': {command}")
+        await publish(topic, command, qos=0)
+        print(f"Successfully published command to topic '{topic}': {command}")
         return True
+    except CircuitOpenError as e:
+        print(f"Feed command to '{topic}' not sent: {e}")
+        return False
     except ClientError as e:
         print(f"Error publishing MQTT message via boto3: {e}")
         return False
@@ -43,27 +173,25 @@ async def publish_feed_command(command: str) -> bool:
         return False
 
 
-async def request_device_status() -> bool:
+async def request_device_status(thing_id: str | None = None, request_id: str | None = None) -> bool:
     """
     Publishes a GET_STATUS command to request real-time device status.
-    The ESP32 will respond by publishing to petfeeder/status topic.
+    The ESP32 will respond by publishing to its petfeeder/{thing_id}/status topic,
+    echoing request_id (when given) so the caller can recognise that reply.
     """
     if not settings.IOT_ENDPOINT:
         print("Error: AWS IoT Endpoint is not configured in app.core.config.py.")
         return False
 
+    topic = device_topic(thing_id, "commands")
+    payload = json.dumps({"command": "GET_STATUS", "request_id": request_id}) if request_id else "GET_STATUS"
     try:
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
-            lambda: iot_client.publish(
-                topic=settings.IOT_TOPIC_FEED,
-                qos=0,
-                payload="GET_STATUS"
-            )
-        )
-        print(f"Successfully published GET_STATUS command to topic '{settings.IOT_TOPIC_FEED}'")
+        await publish(topic, payload, qos=0)
+        print(f"Successfully published GET_STATUS command to topic '{topic}'")
         return True
+    except CircuitOpenError as e:
+        print(f"GET_STATUS to '{topic}' not sent: {e}")
+        return False
     except ClientError as e:
         print(f"Error publishing GET_STATUS message via boto3: {e}")
         return False
@@ -72,14 +200,15 @@ async def request_device_status() -> bool:
         return False
 
 
-async def publish_config_update(config_key: str, value: int) -> bool:
+async def publish_desired_config(values: dict, version: int) -> bool:
     """
-    Publishes configuration updates to the ESP32 via MQTT.
-    The device subscribes to petfeeder/config and updates its cached values.
+    Publishes desired configuration values to the fleet via MQTT, in one message.
+    Every device subscribes to petfeeder/config, applies the keys present and reports
+    the version back in its status.
 
     Args:
-        config_key: Configuration key (e.g., "SERVO_OPEN_HOLD_DURATION_MS")
-        value: New configuration value
+        values: Configuration values to apply (the changed keys, or all of them on a re-send)
+        version: Desired config version the values belong to
 
     Returns:
         bool: True if publish succeeded, False otherwise
@@ -89,22 +218,15 @@ async def publish_config_update(config_key: str, value: int) -> bool:
         return False
 
     try:
-        # Build JSON payload with the config update
-        payload = json.dumps({
-            config_key: value
-        })
-
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
-            lambda: iot_client.publish(
-                topic=settings.IOT_TOPIC_CONFIG,
-                qos=1,  # QoS 1 for reliable delivery
-                payload=payload
-            )
-        )
+        # Flat payload so firmware that predates versioning still applies the keys
+        payload = json.dumps({"version": version, **values})
+
+        await publish(settings.IOT_TOPIC_CONFIG, payload, qos=1)  # QoS 1 for reliable delivery
         print(f"Successfully published config update to '{settings.IOT_TOPIC_CONFIG}': {payload}")
         return True
+    except CircuitOpenError as e:
+        print(f"Config update not sent: {e}")
+        return False
     except ClientError as e:
         print(f"Error publishing config update via boto3: {e}")
         return False
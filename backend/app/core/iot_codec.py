@@ -0,0 +1,289 @@
+"""
+Compact binary encoding of device MQTT messages.
+
+Version 1 is a fixed-field little-endian layout. Every message starts with a 7-byte
+header: a magic byte (never the first byte of JSON or of the plain-text commands),
+the format version, the message type and the send time in epoch seconds (0 when
+the sender has no clock). Enumerations travel as one-byte codes and weights as
+signed decigrams; encoding a value its table has no code for raises ValueError,
+except in OPEN_TABLES. The only variable-length field is requested_by, which is
+sent as one length byte followed by up to 255 bytes of UTF-8.
+
+The firmware keeps its own copy of these tables and layouts, so codes may be
+appended but never reordered; anything else needs a new FORMAT_VERSION.
+"""
+import base64
+import json
+import struct
+import time
+import uuid
+from typing import Any
+
+FORMAT_MAGIC = 0xA5
+FORMAT_VERSION = 1
+
+# Values of payload_format, kept per device in the status table
+PAYLOAD_FORMAT_JSON = "json"
+PAYLOAD_FORMAT_COMPACT = f"compact-v{FORMAT_VERSION}"
+
+MESSAGE_FEED_COMMAND = 1
+MESSAGE_STATUS = 2
+MESSAGE_FEED_EVENT = 3
+
+MODES = ("unknown", "manual", "api", "scheduled", "consumption", "refill")
+FEED_STATUSES = ("initiated", "completed", "failed")
+EVENT_TYPES = ("manual_feed", "scheduled_feed", "consumption", "refill")
+FEEDER_STATES = ("IDLE", "OPENING", "OPEN", "CLOSING", "CLOSED")
+NETWORK_STATUSES = ("ONLINE", "WIFI_CONNECTED_MQTT_DISCONNECTED", "OFFLINE_WIFI_DISCONNECTED")
+TRIGGERS = (
+    "unknown", "system", "api", "manual", "scheduled", "button",
+    "servo_event", "weight_monitor", "network_change", "servo_state_change",
+)
+# Code 0 is a message outside the table; it decodes to no message at all
+STATUS_MESSAGES = (
+    "", "Ready", "Reconnected", "Heartbeat", "Status requested", "Status changed", "Config applied",
+    "Feeder opening", "Feeder open", "Feeder closing", "Feed completed", "Multi-cycle feeding",
+    "Feeder busy", "Feed denied - threshold exceeded", "Pet ate food", "Food refilled", "Container placed",
+    "Weight changing",
+)
+# Tables whose code 0 stands for every value they do not list; the others reject such values
+OPEN_TABLES = (MODES, TRIGGERS, STATUS_MESSAGES)
+
+# magic, version, message type, epoch seconds
+HEADER = struct.Struct("<BBBI")
+# mode, feed cycles (0 = device default), feed_id (zeros = none); then requested_by
+FEED_COMMAND = struct.Struct("<BB16s")
+# weight (dg), feeder state, network status, message, trigger, config version,
+# servo hold (ms), weight threshold (dg), flags; then request_id if flagged.
+# The three config fields are zero, and ignored, unless STATUS_HAS_CONFIG is set
+STATUS = struct.Struct("<iBBBBIIIB")
+# feed_id, status, mode, event type, trigger, flags, weight before (dg), weight after (dg), cycles; then requested_by
+FEED_EVENT = struct.Struct("<16sBBBBBiiB")
+
+STATUS_HAS_REQUEST_ID = 0x01
+STATUS_HAS_CONFIG = 0x02
+EVENT_HAS_WEIGHT_BEFORE = 0x01
+EVENT_HAS_WEIGHT_AFTER = 0x02
+
+_NO_ID = bytes(16)
+
+
+def is_compact(data: bytes | str) -> bool:
+    """Whether a payload is in the compact format (of any version)."""
+    return isinstance(data, bytes | bytearray) and len(data) > 0 and data[0] == FORMAT_MAGIC
+
+
+def encode_feed_command(
+    requested_by: str,
+    mode: str,
+    feed_cycles: int | None = None,
+    feed_id: str | None = None,
+    timestamp: float | None = None
+) -> bytes:
+    """FEED_NOW for a device that reported payload_format compact-v1."""
+    return (
+        _header(MESSAGE_FEED_COMMAND, timestamp)
+        + FEED_COMMAND.pack(_code(MODES, mode), feed_cycles or 0, _id_bytes(feed_id))
+        + _text(requested_by)
+    )
+
+
+def encode_status(status: dict[str, Any], timestamp: float | None = None) -> bytes:
+    """A device status in the compact format (the firmware's publishDeviceStatus)."""
+    config = status.get("config")
+    request_id = status.get("request_id")
+    flags = (STATUS_HAS_REQUEST_ID if request_id else 0) | (STATUS_HAS_CONFIG if config is not None else 0)
+    config = config or {}
+    data = _header(MESSAGE_STATUS, timestamp) + STATUS.pack(
+        _decigrams(status.get("current_weight_g", 0.0)),
+        _code(FEEDER_STATES, status.get("feeder_state")),
+        _code(NETWORK_STATUSES, status.get("network_status")),
+        _code(STATUS_MESSAGES, status.get("message")),
+        _code(TRIGGERS, status.get("trigger_method")),
+        int(config.get("version", 0)),
+        int(config.get("SERVO_OPEN_HOLD_DURATION_MS", 0)),
+        _decigrams(config.get("WEIGHT_THRESHOLD_G", 0.0)),
+        flags
+    )
+    return data + uuid.UUID(hex=request_id).bytes if request_id else data
+
+
+def encode_feed_event(event: dict[str, Any], timestamp: float | None = None) -> bytes:
+    """A feed event in the compact format (the firmware's publishFeedEvent)."""
+    flags = 0
+    if event.get("weight_before_g") is not None:
+        flags |= EVENT_HAS_WEIGHT_BEFORE
+    if event.get("weight_after_g") is not None:
+        flags |= EVENT_HAS_WEIGHT_AFTER
+    return _header(MESSAGE_FEED_EVENT, timestamp) + FEED_EVENT.pack(
+        _id_bytes(event["feed_id"]),
+        FEED_STATUSES.index(event["status"]),
+        _code(MODES, event.get("mode")),
+        _code(EVENT_TYPES, event.get("event_type")),
+        _code(TRIGGERS, event.get("trigger_method")),
+        flags,
+        _decigrams(event.get("weight_before_g") or 0.0),
+        _decigrams(event.get("weight_after_g") or 0.0),
+        event.get("cycles", 1)
+    ) + _text(event.get("requested_by", ""))
+
+
+def decode(data: bytes) -> dict[str, Any]:
+    """
+    Decode a compact message into the dict its JSON form would parse to.
+
+    The send time is returned as `timestamp` (epoch seconds) when the sender had a
+    clock, and `payload_format` is set so consumers can tell which format a device
+    speaks.
+
+    Raises:
+        ValueError: If the payload is not compact, of an unknown version or type, or truncated
+    """
+    if not is_compact(data) or len(data) < HEADER.size:
+        raise ValueError("Not a compact payload")
+    _, version, message_type, sent_at = HEADER.unpack_from(data)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compact payload version {version}")
+
+    try:
+        if message_type == MESSAGE_FEED_COMMAND:
+            message = _decode_feed_command(data, HEADER.size)
+        elif message_type == MESSAGE_STATUS:
+            message = _decode_status(data, HEADER.size)
+        elif message_type == MESSAGE_FEED_EVENT:
+            message = _decode_feed_event(data, HEADER.size)
+        else:
+            raise ValueError(f"Unknown compact message type {message_type}")
+    except struct.error as e:
+        raise ValueError(f"Truncated compact payload: {e}") from e
+
+    if sent_at:
+        message["timestamp"] = sent_at
+    message["payload_format"] = PAYLOAD_FORMAT_COMPACT
+    return message
+
+
+def decode_device_message(event: Any) -> dict[str, Any]:
+    """
+    The device's message from an IoT rule event, in whichever format the device sent it.
+
+    The rules select the raw payload as base64 (`encode(*, 'base64') AS raw`) plus the
+    thing_id from the topic, so JSON and compact devices can share a topic. Events from
+    rules that select the JSON fields directly, or JSON strings, are passed through.
+
+    Raises:
+        TypeError: If the event or its decoded payload is not an object
+        ValueError: If the payload cannot be decoded
+    """
+    if isinstance(event, str):
+        return json.loads(event)
+    if not isinstance(event, dict):
+        raise TypeError("Unexpected event format. Expected string or dict.")
+    if "raw" not in event:
+        return event
+
+    data = base64.b64decode(event["raw"])
+    message = decode(data) if is_compact(data) else json.loads(data)
+    if not isinstance(message, dict):
+        raise TypeError("Device payload is not an object")
+    return {**message, **{key: value for key, value in event.items() if key != "raw"}}
+
+
+def _decode_feed_command(data: bytes, offset: int) -> dict[str, Any]:
+    mode, feed_cycles, feed_id = FEED_COMMAND.unpack_from(data, offset)
+    requested_by, _ = _read_text(data, offset + FEED_COMMAND.size)
+    command = {"command": "FEED_NOW", "requested_by": requested_by, "mode": _value(MODES, mode)}
+    if feed_cycles:
+        command["feed_cycles"] = feed_cycles
+    if feed_id != _NO_ID:
+        command["feed_id"] = str(uuid.UUID(bytes=feed_id))
+    return command
+
+
+def _decode_status(data: bytes, offset: int) -> dict[str, Any]:
+    (weight, state, network, message, trigger, config_version,
+     servo_hold_ms, threshold, flags) = STATUS.unpack_from(data, offset)
+    status = {
+        "current_weight_g": weight / 10,
+        "feeder_state": _value(FEEDER_STATES, state),
+        "network_status": _value(NETWORK_STATUSES, network),
+        "trigger_method": _value(TRIGGERS, trigger),
+    }
+    if flags & STATUS_HAS_CONFIG:
+        status["config"] = {
+            "version": config_version,
+            "SERVO_OPEN_HOLD_DURATION_MS": servo_hold_ms,
+            "WEIGHT_THRESHOLD_G": threshold / 10,
+        }
+    if _value(STATUS_MESSAGES, message):
+        status["message"] = STATUS_MESSAGES[message]
+    if flags & STATUS_HAS_REQUEST_ID:
+        request_id = data[offset + STATUS.size:offset + STATUS.size + 16]
+        if len(request_id) != 16:
+            raise ValueError("Truncated compact payload: request_id")
+        status["request_id"] = uuid.UUID(bytes=request_id).hex
+    return status
+
+
+def _decode_feed_event(data: bytes, offset: int) -> dict[str, Any]:
+    (feed_id, status, mode, event_type, trigger, flags,
+     weight_before, weight_after, cycles) = FEED_EVENT.unpack_from(data, offset)
+    requested_by, _ = _read_text(data, offset + FEED_EVENT.size)
+    event = {
+        "feed_id": str(uuid.UUID(bytes=feed_id)),
+        "status": _value(FEED_STATUSES, status),
+        "mode": _value(MODES, mode),
+        "event_type": _value(EVENT_TYPES, event_type),
+        "trigger_method": _value(TRIGGERS, trigger),
+        "requested_by": requested_by,
+    }
+    if flags & EVENT_HAS_WEIGHT_BEFORE:
+        event["weight_before_g"] = weight_before / 10
+    if flags & EVENT_HAS_WEIGHT_AFTER:
+        event["weight_after_g"] = weight_after / 10
+    if cycles > 1:
+        event["cycles"] = cycles
+    return event
+
+
+def _header(message_type: int, timestamp: float | None) -> bytes:
+    return HEADER.pack(FORMAT_MAGIC, FORMAT_VERSION, message_type, int(time.time() if timestamp is None else timestamp))
+
+
+def _code(table: tuple[str, ...], value: str | None) -> int:
+    """Code of value in table; values an OPEN_TABLES table does not list get code 0."""
+    if value in table:
+        return table.index(value)
+    if table in OPEN_TABLES:
+        return 0
+    raise ValueError(f"No code for {value!r} (known: {', '.join(table)})")
+
+
+def _value(table: tuple[str, ...], code: int) -> str:
+    if code >= len(table):
+        raise ValueError(f"Unknown code {code} (known: 0-{len(table) - 1})")
+    return table[code]
+
+
+def _decigrams(grams: float) -> int:
+    return round(float(grams) * 10)
+
+
+def _id_bytes(value: str | None) -> bytes:
+    return uuid.UUID(value).bytes if value else _NO_ID
+
+
+def _text(value: str) -> bytes:
+    # Cut at 255 bytes without splitting a multi-byte character
+    encoded = value.encode("utf-8")[:255].decode("utf-8", "ignore").encode("utf-8")
+    return bytes([len(encoded)]) + encoded
+
+
+def _read_text(data: bytes, offset: int) -> tuple[str, int]:
+    if offset >= len(data):
+        raise ValueError("Truncated compact payload: text length")
+    length = data[offset]
+    end = offset + 1 + length
+    if end > len(data):
+        raise ValueError("Truncated compact payload: text")
+    return data[offset + 1:end].decode("utf-8", errors="replace"), end
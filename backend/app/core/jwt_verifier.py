@@ -1,12 +1,16 @@
 """JWT signature verification using Cognito public keys."""
 
+import hashlib
 import json
 import logging
 import os
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from urllib.request import urlopen
 
 import jwt
+from jwt.algorithms import RSAAlgorithm
 from jwt.exceptions import (
     DecodeError,
     ExpiredSignatureError,
@@ -18,62 +22,165 @@ from jwt.exceptions import (
     InvalidTokenError,
 )
 
+from app.core.cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
 _jwks_cache: dict | None = None
 _jwks_cache_timestamp: float = 0
 JWKS_CACHE_TTL = 3600  # 1 hour
-
-
-def _get_jwks() -> dict:
-    """Fetch JWKS from Cognito with caching."""
+JWKS_REFRESH_AHEAD = 300  # Start a background refresh this long before the cache expires
+JWKS_RETRY_INTERVAL = 60  # Minimum seconds between background attempts after a failure
+JWKS_FETCH_TIMEOUT = 10  # Seconds a caller waits on a shared fetch
+
+# Single in-flight JWKS fetch, run off the request path
+_jwks_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='jwks-refresh')
+_jwks_refresh_lock = threading.Lock()
+_jwks_refresh: Future | None = None
+_jwks_last_attempt: float = 0
+
+# Public key objects parsed from the cached JWKS, by kid
+_public_keys: dict = {}
+_public_keys_source: dict | None = None
+_last_unknown_kid_refresh: float = 0
+JWKS_REFRESH_COOLDOWN = 300  # Minimum seconds between refreshes triggered by unknown kids
+
+# Verified payloads keyed by token digest; an entry never outlives the token's own 'exp'
+TOKEN_CACHE_MAX_SIZE = int(os.environ.get('JWT_CACHE_MAX_SIZE', '1024'))
+TOKEN_CACHE_MAX_TTL = int(os.environ.get('JWT_CACHE_MAX_TTL_SECONDS', '300'))
+_verified_tokens = TTLCache(maxsize=TOKEN_CACHE_MAX_SIZE, ttl=TOKEN_CACHE_MAX_TTL)
+
+
+def _fetch_jwks() -> dict:
+    """Download the JWKS from Cognito into the cache (runs on the refresh thread)."""
     global _jwks_cache, _jwks_cache_timestamp
 
-    current_time = time.time()
-    if _jwks_cache and (current_time - _jwks_cache_timestamp) < JWKS_CACHE_TTL:
-        return _jwks_cache
-
     cognito_region = os.environ.get('AWS_REGION', 'us-east-2')
     cognito_user_pool_id = os.environ.get('COGNITO_USER_POOL_ID')
 
     jwks_url = f'https://cognito-idp.{cognito_region}.amazonaws.com/{cognito_user_pool_id}/.well-known/jwks.json'
     try:
         with urlopen(jwks_url, timeout=5) as response:
-            _jwks_cache = json.loads(response.read())
-            _jwks_cache_timestamp = current_time
-            logger.info("JWKS fetched and cached successfully")
-            return _jwks_cache
+            jwks = json.loads(response.read())
     except Exception as e:
         logger.error(f"Failed to fetch JWKS: {str(e)}")
+        raise
+    _jwks_cache, _jwks_cache_timestamp = jwks, time.time()
+    logger.info("JWKS fetched and cached successfully")
+    return jwks
+
+
+def _start_jwks_refresh() -> Future:
+    """Start a JWKS fetch unless one is already in flight; concurrent callers share it."""
+    global _jwks_refresh, _jwks_last_attempt
+    with _jwks_refresh_lock:
+        if _jwks_refresh is None or _jwks_refresh.done():
+            _jwks_last_attempt = time.time()
+            _jwks_refresh = _jwks_executor.submit(_fetch_jwks)
+        return _jwks_refresh
+
+
+def _get_jwks(wait: bool = False) -> dict:
+    """Fetch JWKS from Cognito with caching.
+
+    Cached keys are served as they are; from JWKS_REFRESH_AHEAD before expiry on,
+    one background fetch revalidates them (stale-while-revalidate), so requests do
+    not wait on Cognito. Callers only wait when nothing is cached yet or a refresh is
+    forced (wait=True), and then share the single in-flight fetch.
+    """
+    current_time = time.time()
+    if _jwks_cache and not wait:
+        refresh_due = current_time - _jwks_cache_timestamp >= JWKS_CACHE_TTL - JWKS_REFRESH_AHEAD
+        if refresh_due and current_time - _jwks_last_attempt >= JWKS_RETRY_INTERVAL:
+            _start_jwks_refresh()
+        return _jwks_cache
+
+    try:
+        return _start_jwks_refresh().result(timeout=JWKS_FETCH_TIMEOUT)
+    except Exception:
         if _jwks_cache:
             logger.warning("Using stale JWKS cache due to fetch failure")
             return _jwks_cache
         raise
 
 
+def _parse_public_keys(jwks: dict) -> dict:
+    """Build RSA key objects for every key in a JWKS document, keyed by kid."""
+    keys = {}
+    for key in jwks.get('keys', []):
+        try:
+            keys[key['kid']] = RSAAlgorithm.from_jwk(key)
+        except (KeyError, ValueError, InvalidKeyError) as e:
+            logger.warning(f"Skipping unusable JWKS key {key.get('kid')}: {str(e)}")
+    return keys
+
+
+def _get_public_keys(force_refresh: bool = False) -> dict:
+    """Parsed public keys from the JWKS cache, re-parsed only when the JWKS changes."""
+    global _public_keys, _public_keys_source
+
+    jwks = _get_jwks(wait=force_refresh)
+    if jwks is not _public_keys_source:
+        _public_keys = _parse_public_keys(jwks)
+        _public_keys_source = jwks
+    return _public_keys
+
+
+def preload_public_keys() -> None:
+    """Fetch and parse the JWKS at cold start so the first request skips it."""
+    if not os.environ.get('COGNITO_USER_POOL_ID') or not os.environ.get('COGNITO_APP_CLIENT_ID'):
+        return
+    try:
+        _get_public_keys()
+    except Exception as e:
+        logger.warning(f"JWKS preload failed, will retry on first request: {str(e)}")
+
+
 def _get_public_key(token: str):
-    """Extract public key from JWKS based on token's kid."""
+    """Look up the public key for the token's kid.
+
+    An unknown kid (e.g., after Cognito rotates its keys) triggers one JWKS refresh,
+    at most once per JWKS_REFRESH_COOLDOWN so forged kids cannot hammer Cognito.
+    """
+    global _last_unknown_kid_refresh
+
     try:
         headers = jwt.get_unverified_header(token)
         kid = headers.get('kid')
         if not kid:
             raise InvalidTokenError("Token missing 'kid' in header")
 
-        jwks = _get_jwks()
-        for key in jwks.get('keys', []):
-            if key.get('kid') == kid:
-                from jwt.algorithms import RSAAlgorithm
-                return RSAAlgorithm.from_jwk(json.dumps(key))
+        public_key = _get_public_keys().get(kid)
+        current_time = time.time()
+        if public_key is None and current_time - _last_unknown_kid_refresh >= JWKS_REFRESH_COOLDOWN:
+            _last_unknown_kid_refresh = current_time
+            logger.info(f"Unknown kid {kid}, refreshing JWKS")
+            public_key = _get_public_keys(force_refresh=True).get(kid)
 
-        raise InvalidKeyError(f"Public key not found for kid: {kid}")
+        if public_key is None:
+            raise InvalidKeyError(f"Public key not found for kid: {kid}")
+        return public_key
     except Exception as e:
         logger.error(f"Failed to get public key: {str(e)}")
         raise
 
 
+def _token_digest(token: str) -> str:
+    """Cache key for a token, so raw tokens are never held as dictionary keys."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def get_token_cache_stats() -> dict:
+    """Hit/miss metrics of the verified-token cache."""
+    return _verified_tokens.stats()
+
+
 def verify_jwt_token(token: str) -> dict | None:
     """Verify JWT token signature and claims.
 
+    Verified payloads are cached by token digest until the token expires (capped at
+    JWT_CACHE_MAX_TTL_SECONDS), so repeat requests with the same token skip the RSA work.
+
     Args:
         token: JWT token string (without 'Bearer ' prefix)
 
@@ -93,6 +200,11 @@ def verify_jwt_token(token: str) -> dict | None:
         logger.warning("JWT verification skipped: missing token or configuration")
         return None
 
+    digest = _token_digest(token)
+    cached = _verified_tokens.get(digest)
+    if cached is not None:
+        return cached
+
     try:
         public_key = _get_public_key(token)
 
@@ -111,6 +223,7 @@ def verify_jwt_token(token: str) -> dict | None:
         )
 
         logger.debug(f"JWT token verified successfully for user: {payload.get('email', 'unknown')}")
+        _verified_tokens.set(digest, payload, expires_at=payload.get('exp'))
         return payload
 
     except ExpiredSignatureError:
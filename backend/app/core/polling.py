@@ -0,0 +1,41 @@
+"""Waiting on device replies that arrive in DynamoDB through IoT rules."""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+# Longest wait a caller may ask for; stays under API Gateway's 29s integration timeout
+MAX_WAIT_MS = 25000
+
+
+async def poll_until(
+    fetch: Callable[[], Awaitable[Any]],
+    done: Callable[[Any], bool],
+    timeout: float,
+    initial_interval: float = 0.1,
+    max_interval: float = 1.0,
+    backoff: float = 2.0
+) -> tuple[Any, bool]:
+    """
+    Call fetch until done(result) is true or `timeout` seconds have passed.
+
+    The first read happens immediately and the wait between reads grows from
+    `initial_interval` to `max_interval`, so a fast reply is seen within a few
+    hundred milliseconds while a slow one costs only a handful of reads. The
+    last read happens at the deadline.
+
+    Returns:
+        (last result, whether it satisfied done)
+    """
+    deadline = time.monotonic() + timeout
+    interval = initial_interval
+    while True:
+        result = await fetch()
+        if done(result):
+            return result, True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return result, False
+        await asyncio.sleep(min(interval, remaining))
+        interval = min(interval * backoff, max_interval)
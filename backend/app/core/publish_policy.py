@@ -0,0 +1,272 @@
+"""
+Retry and circuit breaker policy for IoT publishes.
+
+Errors are sorted into three kinds:
+
+- throttled (ThrottlingException, HTTP 429): the endpoint is healthy but busy, so
+  the call is retried after a jittered, doubling delay
+- unavailable (5xx, connection errors and timeouts): retried the same way, and
+  counted by the circuit breaker
+- anything else (bad request, authorization, bugs): returned to the caller at once
+
+After `failure_threshold` unavailable errors in a row the breaker opens and calls fail
+at once with CircuitOpenError instead of waiting on timeouts. After `reset_timeout`
+seconds one trial call is let through (half-open): its success closes the breaker
+and its failure opens it again.
+
+This module does not read settings, so Lambdas can build their own policy.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from botocore.exceptions import ClientError, HTTPClientError
+from botocore.exceptions import ConnectionError as BotoConnectionError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+# Numeric state for metrics and alarms: anything above 0 means publishes are failing fast
+CIRCUIT_STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+THROTTLING_ERROR_CODES = frozenset({
+    "ThrottlingException", "Throttling", "TooManyRequestsException", "LimitExceededException",
+    "RequestLimitExceeded",
+})
+UNAVAILABLE_ERROR_CODES = frozenset({
+    "ServiceUnavailableException", "ServiceUnavailable", "InternalFailureException", "InternalFailure",
+    "InternalServerException", "RequestTimeoutException", "RequestTimeout",
+})
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint the circuit breaker considers unhealthy."""
+
+
+def is_throttling(error: BaseException) -> bool:
+    """Whether the endpoint answered but asked the caller to slow down."""
+    if not isinstance(error, ClientError):
+        return False
+    return (error.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+            or error.response.get("ResponseMetadata", {}).get("HTTPStatusCode") == 429)
+
+
+def is_unavailable(error: BaseException) -> bool:
+    """Whether the endpoint could not be reached or failed on its side (5xx)."""
+    if isinstance(error, BotoConnectionError | HTTPClientError | ConnectionError | TimeoutError):
+        return True
+    if not isinstance(error, ClientError):
+        return False
+    return (error.response.get("Error", {}).get("Code") in UNAVAILABLE_ERROR_CODES
+            or error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0) >= 500)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether the same call may succeed if tried again shortly."""
+    return is_throttling(error) or is_unavailable(error)
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker over consecutive endpoint failures.
+
+    Thread-safe. `on_state_change(previous, state)` is called on every transition,
+    outside the lock.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        on_state_change: Callable[[str, str], None] | None = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.on_state_change = on_state_change
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Close the breaker and zero the counters."""
+        with self._lock:
+            self._state = CLOSED
+            self._changed_at = self._clock()
+            self._half_open_calls = 0
+            self.consecutive_failures = 0
+            self.successes = self.failures = self.rejected = self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        """Current state; an open breaker whose reset_timeout has passed reports half-open."""
+        with self._lock:
+            transition = self._advance()
+        self._notify(transition)
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now. A call that is allowed must be followed by one record_* call."""
+        with self._lock:
+            transition = self._advance()
+            if self._state == CLOSED:
+                allowed = True
+            elif self._state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                allowed = True
+            else:
+                self.rejected += 1
+                allowed = False
+        self._notify(transition)
+        return allowed
+
+    def record_success(self) -> None:
+        """The endpoint answered: close the breaker."""
+        with self._lock:
+            self.successes += 1
+            self.consecutive_failures = 0
+            transition = self._move_to(CLOSED) if self._state != CLOSED else None
+        self._notify(transition)
+
+    def record_failure(self) -> None:
+        """The endpoint was unavailable: open the breaker on a failed trial or at the threshold."""
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            transition = None
+            if self._state == HALF_OPEN or (
+                self._state == CLOSED and self.consecutive_failures >= self.failure_threshold
+            ):
+                transition = self._move_to(OPEN)
+        self._notify(transition)
+
+    def release(self) -> None:
+        """Give back an allowed call that ended without a verdict (e.g. it was cancelled)."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._half_open_calls:
+                self._half_open_calls -= 1
+
+    def metrics(self) -> dict:
+        """State and counters for logging or a metrics endpoint."""
+        state = self.state
+        return {
+            "state": state,
+            "state_code": CIRCUIT_STATE_CODES[state],
+            "seconds_in_state": round(self._clock() - self._changed_at, 3),
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout_seconds": self.reset_timeout,
+            "successes": self.successes,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+        }
+
+    def _advance(self) -> tuple[str, str] | None:
+        if self._state == OPEN and self._clock() - self._changed_at >= self.reset_timeout:
+            return self._move_to(HALF_OPEN)
+        return None
+
+    def _move_to(self, state: str) -> tuple[str, str]:
+        previous, self._state = self._state, state
+        self._changed_at = self._clock()
+        self._half_open_calls = 0
+        if state == OPEN:
+            self.times_opened += 1
+        return previous, state
+
+    def _notify(self, transition: tuple[str, str] | None) -> None:
+        if transition is None:
+            return
+        previous, state = transition
+        log = logger.warning if state == OPEN else logger.info
+        log("IoT publish circuit %s -> %s", previous, state)
+        if self.on_state_change:
+            self.on_state_change(previous, state)
+
+
+class PublishPolicy:
+    """Retries with full-jitter exponential backoff, behind a circuit breaker."""
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        max_attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 2.0
+    ):
+        self.breaker = breaker
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+
+    def backoff(self, retry: int, base_delay: float | None = None) -> float:
+        """
+        Delay before retry number `retry` (1 for the first retry): a random time up to
+        base_delay * 2^(retry - 1), capped at max_delay, so callers that failed
+        together do not retry together.
+        """
+        ceiling = min(self.max_delay, (self.base_delay if base_delay is None else base_delay) * 2 ** (retry - 1))
+        return random.uniform(0, ceiling)
+
+    async def call(self, operation: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        One attempt through the breaker, with no retry.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, without calling operation
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError("IoT endpoint unavailable, failing fast until the circuit half-opens")
+        try:
+            result = await operation()
+        except Exception as e:
+            if is_unavailable(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def run(self, operation: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Call operation, retrying throttled and unavailable errors up to max_attempts in all.
+
+        Raises:
+            CircuitOpenError: If the breaker is (or becomes) open
+            Exception: The last error, once it is not retryable or attempts run out
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return await self.call(operation)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                if attempt == self.max_attempts or not is_retryable(e):
+                    raise
+                self.retries += 1
+                delay = self.backoff(attempt)
+                logger.info("Retrying IoT publish in %.3fs after attempt %d: %s", delay, attempt, e)
+                await asyncio.sleep(delay)
+
+    def metrics(self) -> dict:
+        """Breaker metrics plus the number of retries made."""
+        return {**self.breaker.metrics(), "retries": self.retries}
+
+    def reset(self) -> None:
+        """Close the breaker and zero the counters."""
+        self.breaker.reset()
+        self.retries = 0
@@ -0,0 +1,267 @@
+"""
+Recurrence math and missed-occurrence catch-up planning for scheduled feeds.
+
+Times passed in and returned are naive UTC; recurrence steps are taken in the
+schedule's local wall-clock time (see app.core.timezones).
+"""
+
+import calendar
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import StrEnum
+
+from app.core.cron import CronSchedule, compile_cron
+from app.core.timezones import to_local, to_utc
+
+FIXED_STEPS = {
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+}
+
+# Upper bound on occurrences planned for one schedule in a single pass
+MAX_CATCH_UP_OCCURRENCES = 100
+
+
+class CatchUpPolicy(StrEnum):
+    """What to do with occurrences that were missed while the executor was not running."""
+
+    LATEST = "latest"  # Fire the most recent missed occurrence once, drop the rest
+    ALL = "all"        # Fire every missed occurrence, oldest first
+    SKIP = "skip"      # Only fire an occurrence still within the grace period
+
+
+@dataclass
+class ExecutionPlan:
+    """Result of planning one schedule against the current time."""
+
+    fire_times: list[datetime] = field(default_factory=list)
+    skipped: list[datetime] = field(default_factory=list)
+    next_time: datetime | None = None
+
+    @property
+    def has_work(self) -> bool:
+        """True if the schedule must be fired or moved forward."""
+        return bool(self.fire_times or self.skipped)
+
+
+def add_months(dt: datetime, months: int) -> datetime:
+    """Add months to a datetime, clamping the day (e.g., Jan 31 -> Feb 28)."""
+    month_index = dt.month - 1 + months
+    year = dt.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(dt.day, calendar.monthrange(year, month)[1])
+    return dt.replace(year=year, month=month, day=day)
+
+
+def next_occurrence(
+    dt: datetime,
+    recurrence: str,
+    cron_expression: str | None = None,
+    timezone: str = "UTC",
+    wall_clock_anchor: datetime | None = None
+) -> datetime | None:
+    """
+    Occurrence following dt for a recurrence pattern.
+
+    Steps are taken in the schedule's local wall-clock time, so a daily 08:00 feed
+    stays at 08:00 local across DST changes. Steps are counted from wall_clock_anchor
+    when given, so an occurrence moved by a DST gap (02:30 -> 03:30) does not shift
+    the ones after it.
+
+    Args:
+        dt: Current occurrence (naive UTC)
+        recurrence: 'none', 'daily', 'weekly', 'monthly' or 'cron'
+        cron_expression: Cron expression for 'cron' recurrence
+        timezone: Schedule timezone the recurrence is defined in
+        wall_clock_anchor: Local wall-clock time the recurrence was defined at, if known
+
+    Returns:
+        Next occurrence (naive UTC), or None for one-time schedules
+    """
+    if recurrence in FIXED_STEPS or recurrence == "monthly":
+        return first_occurrence_after(
+            dt, recurrence, dt, timezone=timezone, wall_clock_anchor=wall_clock_anchor
+        )
+    if recurrence == "cron":
+        return _next_cron_after(compile_cron(cron_expression), dt, timezone)
+    return None
+
+
+def nth_occurrence(anchor: datetime, recurrence: str, n: int) -> datetime:
+    """Occurrence n steps after anchor (monthly steps are counted from the anchor's day)."""
+    if recurrence == "monthly":
+        return add_months(anchor, n)
+    return anchor + FIXED_STEPS[recurrence] * n
+
+
+def _last_index_at_or_before(anchor: datetime, recurrence: str, moment: datetime) -> int:
+    """Index of the last occurrence at or before moment (0 if anchor is after it)."""
+    if anchor > moment:
+        return 0
+    if recurrence in FIXED_STEPS:
+        return (moment - anchor) // FIXED_STEPS[recurrence]
+    # Monthly: estimate from the calendar, then correct for day clamping/time of day
+    n = (moment.year - anchor.year) * 12 + moment.month - anchor.month
+    while n > 0 and add_months(anchor, n) > moment:
+        n -= 1
+    return n
+
+
+def _next_cron_after(cron: CronSchedule, after: datetime, timezone: str) -> datetime | None:
+    """First cron match strictly after a UTC instant, with the expression read in local time."""
+    local = cron.next_after(to_local(after, timezone))
+    while local is not None:
+        # A wall-clock time repeated or skipped by a DST change can map back to or before `after`
+        utc = to_utc(local, timezone)
+        if utc > after:
+            return utc
+        local = cron.next_after(local)
+    return None
+
+
+def first_occurrence_after(
+    anchor: datetime,
+    recurrence: str,
+    after: datetime,
+    cron_expression: str | None = None,
+    timezone: str = "UTC",
+    wall_clock_anchor: datetime | None = None
+) -> datetime | None:
+    """
+    First occurrence of a schedule strictly after `after`, starting from `anchor`.
+
+    Computed arithmetically in local wall-clock time (or from the compiled cron bitsets),
+    so a schedule that is years behind jumps forward in one step instead of advancing one
+    occurrence at a time.
+
+    Args:
+        anchor: Pending occurrence (naive UTC)
+        recurrence: Recurrence pattern
+        after: Naive UTC instant to search from
+        cron_expression: Cron expression for 'cron' recurrence
+        timezone: Schedule timezone the recurrence is defined in
+        wall_clock_anchor: Local wall-clock time the recurrence was defined at, if known
+            (keeps e.g. 02:30 or the 31st even after one occurrence had to be moved)
+    """
+    if anchor > after:
+        return anchor
+    if recurrence == "cron":
+        return _next_cron_after(compile_cron(cron_expression), after, timezone)
+    if recurrence not in FIXED_STEPS and recurrence != "monthly":
+        return None
+
+    base = wall_clock_anchor or to_local(anchor, timezone)
+    n = _last_index_at_or_before(base, recurrence, to_local(after, timezone))
+    while (candidate := to_utc(nth_occurrence(base, recurrence, n), timezone)) <= after:
+        n += 1
+    return candidate
+
+
+def next_execution_time(
+    scheduled_time: datetime,
+    recurrence: str,
+    now: datetime,
+    cron_expression: str | None = None,
+    timezone: str = "UTC",
+    wall_clock_anchor: datetime | None = None
+) -> datetime | None:
+    """
+    When a schedule whose pending occurrence is scheduled_time runs next (naive UTC).
+
+    A pending occurrence still ahead of now is the answer. An overdue recurring schedule
+    runs next at its first occurrence after now; an overdue one-time schedule is still
+    pending, so its own time is returned.
+    """
+    if scheduled_time >= now or recurrence == "none":
+        return scheduled_time
+    return first_occurrence_after(scheduled_time, recurrence, now, cron_expression, timezone, wall_clock_anchor)
+
+
+def due_occurrences(
+    anchor: datetime,
+    recurrence: str,
+    now: datetime,
+    limit: int = MAX_CATCH_UP_OCCURRENCES,
+    cron_expression: str | None = None,
+    timezone: str = "UTC",
+    wall_clock_anchor: datetime | None = None
+) -> list[datetime]:
+    """
+    Occurrences from anchor up to and including now, oldest first (naive UTC).
+
+    Only the most recent `limit` occurrences are returned. See first_occurrence_after
+    for the timezone arguments.
+    """
+    if anchor > now:
+        return []
+    if recurrence == "cron":
+        # Walk back from now so a schedule far behind only visits the last `limit` matches
+        cron = compile_cron(cron_expression)
+        occurrences = []
+        moment = cron.previous_at_or_before(to_local(now, timezone))
+        while moment is not None and len(occurrences) < limit:
+            utc = to_utc(moment, timezone)
+            if utc < anchor:
+                break
+            if utc <= now:
+                occurrences.append(utc)
+            moment = cron.previous_at_or_before(moment - timedelta(minutes=1))
+        return occurrences[::-1]
+    if recurrence not in FIXED_STEPS and recurrence != "monthly":
+        return [anchor]
+
+    base = wall_clock_anchor or to_local(anchor, timezone)
+    last = _last_index_at_or_before(base, recurrence, to_local(now, timezone))
+    # One extra step each side absorbs occurrences moved across `now` by a DST change
+    candidates = (to_utc(nth_occurrence(base, recurrence, n), timezone) for n in range(max(0, last - limit), last + 2))
+    return [t for t in candidates if anchor <= t <= now][-limit:]
+
+
+def plan_execution(
+    scheduled_time: datetime,
+    recurrence: str,
+    now: datetime,
+    last_executed_at: datetime | None = None,
+    policy: CatchUpPolicy = CatchUpPolicy.SKIP,
+    grace: timedelta = timedelta(minutes=60),
+    limit: int = MAX_CATCH_UP_OCCURRENCES,
+    cron_expression: str | None = None,
+    timezone: str = "UTC",
+    wall_clock_anchor: datetime | None = None
+) -> ExecutionPlan:
+    """
+    Work out, in one pass, which occurrences of a schedule to fire now and where it goes next.
+
+    Args:
+        scheduled_time: Pending occurrence stored on the schedule (naive UTC)
+        recurrence: Recurrence pattern
+        now: Current time (naive UTC)
+        last_executed_at: Last time the schedule was executed; occurrences up to it are done
+        policy: How to treat occurrences older than the grace period
+        grace: How late an occurrence may be and still count as on time
+        limit: Maximum number of occurrences considered
+        cron_expression: Cron expression for 'cron' recurrence
+        timezone: Schedule timezone the recurrence is defined in
+        wall_clock_anchor: Local wall-clock time the recurrence was defined at, if known
+
+    Returns:
+        ExecutionPlan with the occurrences to fire, the ones dropped and the next future occurrence
+    """
+    rule = {"cron_expression": cron_expression, "timezone": timezone, "wall_clock_anchor": wall_clock_anchor}
+    occurrences = due_occurrences(scheduled_time, recurrence, now, limit, **rule)
+    if last_executed_at is not None:
+        occurrences = [t for t in occurrences if t > last_executed_at]
+
+    plan = ExecutionPlan(next_time=first_occurrence_after(scheduled_time, recurrence, now, **rule))
+    if not occurrences:
+        return plan
+
+    latest = occurrences[-1]
+    if policy == CatchUpPolicy.ALL:
+        plan.fire_times = occurrences
+    elif policy == CatchUpPolicy.LATEST or now - latest <= grace:
+        plan.fire_times = [latest]
+        plan.skipped = occurrences[:-1]
+    else:
+        plan.skipped = occurrences
+    return plan
@@ -0,0 +1,82 @@
+"""Cached per-zone UTC offset tables for converting between UTC and local wall-clock time."""
+
+from bisect import bisect_right
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+_DAY = timedelta(days=1)
+
+
+@lru_cache(maxsize=64)
+def get_zone(name: str) -> ZoneInfo:
+    """ZoneInfo for a zone name (raises ZoneInfoNotFoundError for unknown zones)."""
+    return ZoneInfo(name)
+
+
+def _offset_at(zone: ZoneInfo, utc: datetime) -> timedelta:
+    return utc.replace(tzinfo=UTC).astimezone(zone).utcoffset()
+
+
+@lru_cache(maxsize=512)
+def transition_table(zone_name: str, year: int) -> tuple[tuple[datetime, ...], tuple[timedelta, ...]]:
+    """
+    Offset changes of a zone during one UTC year.
+
+    Offsets are sampled daily and every change is bisected down to the second,
+    so each (zone, year) costs a few hundred zoneinfo lookups once and is then
+    answered by a binary search.
+
+    Returns:
+        (starts, offsets): offsets[i] applies from starts[i] (naive UTC) until starts[i + 1]
+    """
+    zone = get_zone(zone_name)
+    start = datetime(year, 1, 1)
+    starts, offsets = [start], [_offset_at(zone, start)]
+
+    day = start
+    while day.year == year:
+        next_day = day + _DAY
+        offset = _offset_at(zone, next_day)
+        if offset != offsets[-1]:
+            low, high = day, next_day  # offset changes in (low, high]
+            while high - low > timedelta(seconds=1):
+                middle = low + (high - low) / 2
+                if _offset_at(zone, middle) == offsets[-1]:
+                    low = middle
+                else:
+                    high = middle
+            starts.append(high.replace(microsecond=0))
+            offsets.append(offset)
+        day = next_day
+
+    return tuple(starts), tuple(offsets)
+
+
+def utc_offset(utc: datetime, zone_name: str) -> timedelta:
+    """UTC offset of a zone at a naive UTC instant."""
+    if zone_name == "UTC":
+        return timedelta(0)
+    starts, offsets = transition_table(zone_name, utc.year)
+    return offsets[bisect_right(starts, utc) - 1]
+
+
+def to_local(utc: datetime, zone_name: str) -> datetime:
+    """Naive local wall-clock time of a naive UTC instant."""
+    return utc + utc_offset(utc, zone_name)
+
+
+def to_utc(local: datetime, zone_name: str) -> datetime:
+    """
+    Naive UTC instant of a naive local wall-clock time.
+
+    Follows zoneinfo's fold=0 rules: an ambiguous time (clocks going back) resolves
+    to its first occurrence, and a time skipped by clocks going forward is read with
+    the offset in effect before the change (so 02:30 becomes 03:30 local).
+    """
+    if zone_name == "UTC":
+        return local
+    before = utc_offset(local - _DAY, zone_name)
+    after = utc_offset(local + _DAY, zone_name)
+    valid = [local - offset for offset in (before, after) if utc_offset(local - offset, zone_name) == offset]
+    return min(valid) if valid else local - before
@@ -1,39 +1,76 @@
 # app/crud/config.py
 
 import asyncio
+import os
+from datetime import UTC, datetime
 from typing import Any
 
 from botocore.exceptions import ClientError
 
-from app.db.client import get_config_table
+from app.core.cache import ConfigCache
+from app.core.serialization import convert_decimal
+from app.db.client import batch_get_items, get_config_table
 
 CONFIG_PARTITION_KEY = "config_key"
+CONFIG_VERSION_KEY = ConfigCache.VERSION_KEY
+# Versioned document of the settings the device should be running with
+DESIRED_CONFIG_KEY = "DESIRED_CONFIG"
+# Items kept in the config table by the API itself, never read or written as settings
+RESERVED_CONFIG_KEYS = frozenset({CONFIG_VERSION_KEY, DESIRED_CONFIG_KEY})
+# Attempts at a desired-config write before a concurrent-writer conflict is raised
+DESIRED_CONFIG_MAX_ATTEMPTS = 3
+
+
+def batch_get_config_items(keys: list[str]) -> list[dict[str, Any]]:
+    """Reads several config items with BatchGetItem (see app.db.client.batch_get_items)."""
+    return batch_get_items(get_config_table(), CONFIG_PARTITION_KEY, keys)
+
+
+# Shared read-through cache for every config read made by the API
+config_cache = ConfigCache(
+    lambda: get_config_table(),
+    key_name=CONFIG_PARTITION_KEY,
+    ttl=int(os.environ.get('CONFIG_CACHE_TTL_SECONDS', '300')),
+    version_check_interval=float(os.environ.get('CONFIG_VERSION_CHECK_SECONDS', '5')),
+    batch_get=lambda keys: batch_get_config_items(keys)
+)
 
 
 async def fetch_config_setting(key: str) -> dict[str, Any] | None:
     """
     Retrieves a single configuration setting from the DynamoDB config table.
-    The table is accessed via get_config_table().
+    Reads go through config_cache, so repeated reads (including of keys that
+    are not in the table) are served from memory until the config version changes.
     """
     loop = asyncio.get_event_loop()
-    table = get_config_table()
 
     try:
-        response = await loop.run_in_executor(
-            None,
-            lambda: table.get_item(Key={CONFIG_PARTITION_KEY: key})
-        )
         # Returns the item if found, otherwise None
-        return response.get('Item')
+        return await loop.run_in_executor(None, config_cache.get, key)
     except ClientError as e:
         print(f"Error getting config setting '{key}' from DynamoDB: {e}")
         # Re-raise the exception for the service/route layer to handle
         raise e
 
 
+async def fetch_config_settings(keys: list[str]) -> dict[str, dict[str, Any]]:
+    """
+    Retrieves several configuration settings, keyed by config key.
+    Keys not in the table are left out; uncached keys are read in one BatchGetItem.
+    """
+    loop = asyncio.get_event_loop()
+
+    try:
+        return await loop.run_in_executor(None, config_cache.get_many, keys)
+    except ClientError as e:
+        print(f"Error getting config settings {keys} from DynamoDB: {e}")
+        raise
+
+
 async def update_config_setting(key: str, value: Any) -> dict[str, Any]:
     """
-    Updates or creates a single configuration setting in the DynamoDB config table.
+    Updates or creates a single configuration setting in the DynamoDB config table,
+    then bumps the config version so cached reads see the change.
     """
     loop = asyncio.get_event_loop()
     table = get_config_table()
@@ -50,9 +87,98 @@ async def update_config_setting(key: str, value: Any) -> dict[str, Any]:
             None,
             lambda: table.put_item(Item=item)
         )
+        await loop.run_in_executor(None, config_cache.bump_version)
         # Return the item structure for the response
         return item
     except ClientError as e:
         print(f"Error updating config setting '{key}' in DynamoDB: {e}")
         # Re-raise the exception for the service/route layer to handle
         raise e
+
+
+async def update_config_settings(values: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    Updates or creates several configuration settings with one batch write,
+    then bumps the config version once for the whole change.
+    """
+    loop = asyncio.get_event_loop()
+    table = get_config_table()
+    items = [{CONFIG_PARTITION_KEY: key, "value": value} for key, value in values.items()]
+
+    def write_items():
+        with table.batch_writer() as batch:
+            for item in items:
+                batch.put_item(Item=item)
+
+    try:
+        await loop.run_in_executor(None, write_items)
+        await loop.run_in_executor(None, config_cache.bump_version)
+        return items
+    except ClientError as e:
+        print(f"Error updating config settings {list(values)} in DynamoDB: {e}")
+        raise
+
+
+def _read_desired_config(table) -> dict[str, Any]:
+    item = table.get_item(Key={CONFIG_PARTITION_KEY: DESIRED_CONFIG_KEY}, ConsistentRead=True).get('Item') or {}
+    return {
+        "version": int(item.get('version', 0)),
+        "values": convert_decimal(item.get('values', {})),
+        "updated_at": item.get('updated_at')
+    }
+
+
+async def fetch_desired_config() -> dict[str, Any]:
+    """
+    Retrieves the desired device config document: {"version", "values", "updated_at"}.
+    Version 0 with no values means no device setting has been written yet.
+    """
+    loop = asyncio.get_event_loop()
+    table = get_config_table()
+
+    try:
+        return await loop.run_in_executor(None, _read_desired_config, table)
+    except ClientError as e:
+        print(f"Error getting desired config from DynamoDB: {e}")
+        raise
+
+
+async def merge_desired_config(changes: dict[str, Any]) -> dict[str, Any]:
+    """
+    Merges changed device settings into the desired config document.
+
+    The version is only incremented when a value actually changes. Writes are
+    conditional on the version that was read, and retried on conflict, so two
+    concurrent updates cannot lose each other's keys.
+
+    Returns:
+        The desired config plus "changed": the values this write changed (empty if none)
+    """
+    loop = asyncio.get_event_loop()
+    table = get_config_table()
+
+    def merge():
+        for attempt in range(DESIRED_CONFIG_MAX_ATTEMPTS):
+            current = _read_desired_config(table)
+            changed = {key: value for key, value in changes.items() if key not in current["values"] or current["values"][key] != value}
+            if not changed:
+                return {**current, "changed": {}}
+
+            values = {**current["values"], **changed}
+            desired = {"version": current["version"] + 1, "values": values, "updated_at": datetime.now(UTC).isoformat().replace("+00:00", "Z")}
+            try:
+                table.put_item(
+                    Item={CONFIG_PARTITION_KEY: DESIRED_CONFIG_KEY, **desired},
+                    ConditionExpression="attribute_not_exists(version) OR version = :expected",
+                    ExpressionAttributeValues={":expected": current["version"]}
+                )
+                return {**desired, "changed": changed}
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException' or attempt == DESIRED_CONFIG_MAX_ATTEMPTS - 1:
+                    raise
+
+    try:
+        return await loop.run_in_executor(None, merge)
+    except ClientError as e:
+        print(f"Error updating desired config in DynamoDB: {e}")
+        raise
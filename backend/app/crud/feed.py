@@ -4,7 +4,11 @@ from typing import Any
 from botocore.exceptions import ClientError
 
 from app.core.serialization import convert_decimal
-from app.db.client import get_device_status_table, get_feed_history_table
+from app.db.client import (
+    batch_get_items,
+    get_device_status_table,
+    get_feed_history_table,
+)
 
 
 async def save_feed_event(
@@ -30,6 +34,28 @@ async def save_feed_event(
     return item
 
 
+async def get_feed_event(feed_id: str, consistent_read: bool = False) -> dict[str, Any] | None:
+    """
+    Retrieves one feed event by feed_id, or None if the device has not logged it yet.
+    Use consistent_read when waiting for the device's completed/failed update.
+    """
+    loop = asyncio.get_event_loop()
+    table = get_feed_history_table()
+
+    try:
+        response = await loop.run_in_executor(
+            None,
+            lambda: table.get_item(Key={'feed_id': feed_id}, ConsistentRead=consistent_read)
+        )
+        item = response.get('Item')
+        if item:
+            item = convert_decimal(item)
+        return item
+    except ClientError as e:
+        print(f"Error getting feed event {feed_id} from DynamoDB: {e}")
+        raise
+
+
 async def fetch_feed_events_from_db(
     limit: int,
     exclusive_start_key: dict[str, Any] = None
@@ -71,20 +97,21 @@ async def fetch_feed_events_from_db(
         raise e
 
 
-async def get_latest_device_status() -> dict[str, Any]:
+async def get_latest_device_status(thing_id: str | None = None, consistent_read: bool = False) -> dict[str, Any]:
     """
     Retrieves the latest device status from the DynamoDB table.
-    Assumes 'thingId' is the partition key and we want the item for the configured IOT_THING_ID.
+    'thing_id' is the partition key; defaults to the configured IOT_THING_ID.
+    Use consistent_read when waiting for a write that just happened.
     """
     from app.core.config import settings
     loop = asyncio.get_event_loop()
     table = get_device_status_table()
-    thing_id = settings.IOT_THING_ID
+    thing_id = thing_id or settings.IOT_THING_ID
 
     try:
         response = await loop.run_in_executor(
             None,
-            lambda: table.get_item(Key={'thing_id': thing_id})
+            lambda: table.get_item(Key={'thing_id': thing_id}, ConsistentRead=consistent_read)
         )
         item = response.get('Item')
         if item:
@@ -98,6 +125,28 @@ async def get_latest_device_status() -> dict[str, Any]:
         raise e
 
 
+def batch_get_device_statuses(thing_ids: list[str]) -> dict[str, dict[str, Any]]:
+    """
+    Reads the status of several devices with BatchGetItem, keyed by thing_id.
+
+    Chunked and retried by app.db.client.batch_get_items; devices that never
+    reported are left out.
+    """
+    items = batch_get_items(get_device_status_table(), 'thing_id', thing_ids)
+    return {item['thing_id']: convert_decimal(item) for item in items}
+
+
+async def get_device_statuses(thing_ids: list[str]) -> dict[str, dict[str, Any]]:
+    """Latest status of several devices, keyed by thing_id (one BatchGetItem per 100 devices)."""
+    loop = asyncio.get_event_loop()
+
+    try:
+        return await loop.run_in_executor(None, batch_get_device_statuses, thing_ids)
+    except ClientError as e:
+        print(f"Error getting device statuses from DynamoDB: {e}")
+        raise
+
+
 async def delete_all_feed_events() -> int:
     """
     Deletes all feed events from the DynamoDB feed history table.
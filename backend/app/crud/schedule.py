@@ -1,41 +1,63 @@
-from datetime import datetime
+from datetime import UTC, datetime, timedelta
 from typing import Any
 from uuid import uuid4
 from zoneinfo import ZoneInfo
 
 from botocore.exceptions import ClientError
 
+from app.core.scheduler import next_occurrence
 from app.core.serialization import convert_decimal
+from app.core.timezones import to_local, to_utc
 from app.db.client import get_feed_schedule_table
 from app.models.schedule import ScheduleRequest, ScheduleUpdate
 
 
-def convert_to_utc(scheduled_time_str: str, timezone: str) -> str:
+def to_wall_clock(scheduled_time_str: str, timezone: str) -> datetime:
     """
-    Convert a scheduled time from user's timezone to UTC.
+    Wall-clock time of a scheduled time in the user's timezone.
 
     Args:
         scheduled_time_str: ISO 8601 datetime string (e.g., '2025-10-18T14:30:00')
         timezone: User's timezone (e.g., 'America/New_York')
 
     Returns:
-        str: ISO 8601 datetime string in UTC with 'Z' suffix
+        datetime: Naive local datetime (times without an offset are already local)
     """
-    # Parse the datetime string
     dt = datetime.fromisoformat(scheduled_time_str.replace('Z', ''))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(ZoneInfo(timezone)).replace(tzinfo=None)
+    return dt
 
-    # If no timezone info, assume user's timezone
-    if dt.tzinfo is None:
-        user_tz = ZoneInfo(timezone)
-        dt = dt.replace(tzinfo=user_tz)
 
-    # Convert to UTC
-    dt_utc = dt.astimezone(ZoneInfo('UTC'))
+def convert_to_utc(scheduled_time_str: str, timezone: str) -> str:
+    """
+    Convert a scheduled time from user's timezone to UTC.
+
+    Args:
+        scheduled_time_str: ISO 8601 datetime string (e.g., '2025-10-18T14:30:00')
+        timezone: User's timezone (e.g., 'America/New_York')
+
+    Returns:
+        str: ISO 8601 datetime string in UTC with 'Z' suffix
+    """
+    dt_utc = to_utc(to_wall_clock(scheduled_time_str, timezone), timezone)
 
     # Return as ISO string with Z suffix
     return dt_utc.strftime('%Y-%m-%dT%H:%M:%S') + 'Z'
 
 
+def align_to_cron(scheduled_time_utc: str, cron_expression: str, timezone: str = "UTC") -> str:
+    """
+    Move a UTC scheduled time to the first cron occurrence at or after it.
+
+    The expression is read in the schedule's timezone. Cron schedules store their next
+    pending occurrence in scheduled_time, so the executor handles them like any other schedule.
+    """
+    start = datetime.fromisoformat(scheduled_time_utc.replace('Z', ''))
+    first = next_occurrence(start - timedelta(microseconds=1), "cron", cron_expression, timezone)
+    return first.strftime('%Y-%m-%dT%H:%M:%S') + 'Z'
+
+
 def create_schedule(request: ScheduleRequest) -> dict[str, Any]:
     """
     Create a new schedule in DynamoDB.
@@ -47,6 +69,8 @@ def create_schedule(request: ScheduleRequest) -> dict[str, Any]:
 
     # Convert scheduled_time from user's timezone to UTC
     scheduled_time_utc = convert_to_utc(request.scheduled_time, request.timezone)
+    if request.recurrence == "cron":
+        scheduled_time_utc = align_to_cron(scheduled_time_utc, request.cron_expression, request.timezone)
 
     item = {
         "schedule_id": schedule_id,
@@ -56,9 +80,15 @@ def create_schedule(request: ScheduleRequest) -> dict[str, Any]:
         "recurrence": request.recurrence,
         "enabled": request.enabled,
         "timezone": request.timezone,
+        # Local time the recurrence is anchored to, so it keeps its wall-clock time across DST
+        "wall_clock_time": to_wall_clock(request.scheduled_time, request.timezone).isoformat(),
         "created_at": now,
         "updated_at": now
     }
+    if request.recurrence == "cron":
+        item["cron_expression"] = request.cron_expression
+    if request.thing_id:
+        item["thing_id"] = request.thing_id
 
     try:
         table.put_item(Item=item)
@@ -137,6 +167,7 @@ def update_schedule(schedule_id: str, update: ScheduleUpdate) -> dict[str, Any]
         return None
 
     existing_timezone = existing.get("timezone", "UTC")
+    timezone = update.timezone if update.timezone is not None else existing_timezone
 
     # Build update expression dynamically
     update_parts = []
@@ -145,10 +176,33 @@ def update_schedule(schedule_id: str, update: ScheduleUpdate) -> dict[str, Any]
     expr_attr_names = {}
     scheduled_time_changed = False
 
+    # Validate the cron rule against the merged record, so an update may switch back to cron
+    # with the expression already stored
+    recurrence = update.recurrence if update.recurrence is not None else existing.get("recurrence")
+    cron_expression = update.cron_expression or existing.get("cron_expression")
+    if recurrence == "cron" and not cron_expression:
+        raise ValueError("cron_expression is required when recurrence is 'cron'")
+
+    scheduled_time_utc = None
     if update.scheduled_time is not None:
         # Use updated timezone if provided, otherwise use existing
-        timezone = update.timezone if update.timezone is not None else existing_timezone
         scheduled_time_utc = convert_to_utc(update.scheduled_time, timezone)
+        update_parts.append("wall_clock_time = :wct")
+        expr_attr_values[":wct"] = to_wall_clock(update.scheduled_time, timezone).isoformat()
+    elif recurrence == "cron" and (update.recurrence is not None or update.cron_expression is not None):
+        # New cron rule without a new start time: start from now
+        scheduled_time_utc = datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%S') + 'Z'
+    elif timezone != existing_timezone:
+        # Same local wall-clock time, read in the new timezone
+        pending = datetime.fromisoformat(existing["scheduled_time"].replace('Z', ''))
+        local = to_local(pending, existing_timezone)
+        scheduled_time_utc = to_utc(local, timezone).strftime('%Y-%m-%dT%H:%M:%S') + 'Z'
+        update_parts.append("wall_clock_time = :wct")
+        expr_attr_values[":wct"] = existing.get("wall_clock_time") or local.isoformat()
+
+    if scheduled_time_utc is not None:
+        if recurrence == "cron":
+            scheduled_time_utc = align_to_cron(scheduled_time_utc, cron_expression, timezone)
 
         update_parts.append("#st = :st")
         expr_attr_names["#st"] = "scheduled_time"
@@ -163,6 +217,14 @@ def update_schedule(schedule_id: str, update: ScheduleUpdate) -> dict[str, Any]
         update_parts.append("recurrence = :rec")
         expr_attr_values[":rec"] = update.recurrence
 
+    if recurrence != "cron":
+        # A cron expression only means something for cron recurrence
+        if existing.get("cron_expression"):
+            remove_parts.append("cron_expression")
+    elif update.cron_expression is not None:
+        update_parts.append("cron_expression = :cron")
+        expr_attr_values[":cron"] = update.cron_expression
+
     if update.enabled is not None:
         update_parts.append("enabled = :en")
         expr_attr_values[":en"] = update.enabled
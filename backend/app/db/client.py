@@ -1,7 +1,14 @@
+from typing import Any
+
 import boto3
 
 from app.core.config import settings
 
+# DynamoDB accepts at most 100 keys per BatchGetItem request
+BATCH_GET_MAX_KEYS = 100
+# Rounds spent retrying keys DynamoDB returned as unprocessed before reading them one by one
+BATCH_GET_MAX_ATTEMPTS = 3
+
 
 def get_dynamodb_resource():
     return boto3.resource("dynamodb", region_name=settings.AWS_REGION)
@@ -21,3 +28,29 @@ def get_device_status_table():
 
 def get_config_table():
     return get_dynamodb_resource().Table(settings.DYNAMO_FEED_CONFIG_TABLE_NAME)
+
+
+def batch_get_items(table, key_name: str, keys: list[str]) -> list[dict[str, Any]]:
+    """
+    Reads the items of a single-key table with BatchGetItem (chunked to the request limit).
+
+    Keys DynamoDB leaves unprocessed are retried, and read with GetItem if they
+    still are after BATCH_GET_MAX_ATTEMPTS rounds, so every existing item is returned.
+    """
+    dynamodb = get_dynamodb_resource()
+    items = []
+
+    for start in range(0, len(keys), BATCH_GET_MAX_KEYS):
+        request = {table.name: {'Keys': [{key_name: key} for key in keys[start:start + BATCH_GET_MAX_KEYS]]}}
+        for _ in range(BATCH_GET_MAX_ATTEMPTS):
+            response = dynamodb.batch_get_item(RequestItems=request)
+            items.extend(response.get('Responses', {}).get(table.name, []))
+            request = response.get('UnprocessedKeys') or {}
+            if not request:
+                break
+        for key in request.get(table.name, {}).get('Keys', []):
+            item = table.get_item(Key=key).get('Item')
+            if item:
+                items.append(item)
+
+    return items
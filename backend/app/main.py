@@ -5,6 +5,8 @@ from fastapi.responses import JSONResponse
 from app.api.v1.routes import config, feed, notifications, schedule, status, users
 from app.core.config import settings
 from app.core.exceptions import SecurityError, sanitize_error
+from app.core.iot import get_publish_metrics
+from app.core.jwt_verifier import get_token_cache_stats
 
 TAGS_METADATA = [
     {
@@ -91,6 +93,26 @@ def health_check():
     return {"status": "ok", "message": "Smart Pet Feeder API is running"}
 
 
+@app.get("/health/iot", tags=["Health"])
+def iot_health_check():
+    """
+    State of IoT publishes from this instance: the circuit breaker (closed, half_open
+    or open, with state_code 0-2), its counters and the number of retries made.
+    "degraded" means feed commands and status requests are currently failing fast.
+    """
+    metrics = get_publish_metrics()
+    return {"status": "ok" if metrics["state"] == "closed" else "degraded", "iot_publish": metrics}
+
+
+@app.get("/health/auth", tags=["Health"])
+def auth_health_check():
+    """
+    Verified-token cache of this instance: entries held, hits, misses and hit rate.
+    A low hit rate means most requests pay for a full JWT signature check.
+    """
+    return {"status": "ok", "token_cache": get_token_cache_stats()}
+
+
 @app.exception_handler(SecurityError)
 async def security_exception_handler(request: Request, exc: SecurityError):
     """Handle security exceptions with sanitized messages."""
@@ -53,3 +53,43 @@ class ConfigUpdate(BaseModel):
             ]
         }
     }
+
+
+# --- ConfigBatch Model ---
+# Returned by the bulk GET/PUT /config endpoints.
+class ConfigBatch(BaseModel):
+    """Model representing several configuration items read or written together."""
+
+    items: list[ConfigItem] = Field(
+        ...,
+        description="Configuration items, in the order the keys were requested"
+    )
+
+    missing: list[str] = Field(
+        default_factory=list,
+        description="Requested keys that are not set and have no default value"
+    )
+
+
+# --- ConfigBatchUpdate Model ---
+class ConfigBatchUpdate(BaseModel):
+    """Model used for updating several configuration values in one request."""
+
+    values: dict[str, Any] = Field(
+        ...,
+        min_length=1,
+        description="New values keyed by configuration key"
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "values": {
+                        "SERVO_OPEN_HOLD_DURATION_MS": 2000,
+                        "WEIGHT_THRESHOLD_G": 400
+                    }
+                }
+            ]
+        }
+    }
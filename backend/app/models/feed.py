@@ -3,20 +3,35 @@ from typing import Literal
 
 from pydantic import BaseModel, Field
 
+# AWS IoT thing (and thing group) names; also keeps MQTT wildcards and '/' out of topics
+THING_NAME_PATTERN = r"^[a-zA-Z0-9:_-]{1,128}$"
+
 
 class FeedRequest(BaseModel):
     mode: Literal["manual", "api", "scheduled"] = Field(default="api", description="How the feed was triggered: 'api' for web/app, 'manual' for physical button, 'scheduled' for scheduled feeds")
     requested_by: str = Field(default="manual", examples=["user@example.com"])
     feed_cycles: int | None = Field(default=None, description="Number of feed cycles (overrides config if provided)")
+    thing_id: str | None = Field(default=None, pattern=THING_NAME_PATTERN, examples=["feeder-kitchen"], description="Device to feed (defaults to the deployment's device)")
 
 
 class FeedResponse(BaseModel):
     feed_id: str
     requested_by: str
     mode: str
-    status: Literal["queued", "sent", "failed", "denied_weight_exceeded"]
+    status: Literal["queued", "sent", "completed", "failed", "denied_weight_exceeded"]
     timestamp: datetime
     event_type: str | None = Field(default="manual_feed", description="Type of event: manual_feed, consumption, refill")
     weight_before_g: float | None = Field(default=None, description="Weight in grams before the event")
     weight_after_g: float | None = Field(default=None, description="Weight in grams after the event")
     weight_delta_g: float | None = Field(default=None, description="Change in weight (positive = added, negative = consumed)")
+    thing_id: str | None = Field(default=None, description="Device the feed was sent to (None for the deployment's device)")
+    waited_ms: int | None = Field(default=None, description="How long the request waited for the device to finish (only with wait=true)")
+
+
+class GroupFeedResponse(BaseModel):
+    group: str
+    requested: int = Field(description="Devices in the group")
+    sent: int
+    failed: int
+    denied: int = Field(description="Devices skipped because their bowl is above the weight threshold")
+    feeds: list[FeedResponse]
@@ -1,9 +1,26 @@
-from datetime import datetime
+from datetime import UTC, datetime
 from typing import Literal
 from zoneinfo import ZoneInfo
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
+from app.core.cron import compile_cron
+from app.core.scheduler import next_execution_time
+from app.models.feed import THING_NAME_PATTERN
+
+Recurrence = Literal["none", "daily", "weekly", "monthly", "cron"]
+
+
+def validate_cron_expression(v: str | None) -> str | None:
+    """Compile a cron expression and reject ones that never fire (e.g., '0 0 30 2 *')."""
+    if v is None:
+        return v
+    cron = compile_cron(v)
+    if cron.next_after(datetime.now(UTC).replace(tzinfo=None)) is None:
+        raise ValueError(f"Cron expression '{v}' never matches")
+    return cron.expression
+
+
 VALID_TIMEZONES = [
     "UTC", "America/New_York", "America/Chicago", "America/Denver", "America/Los_Angeles",
     "America/Sao_Paulo", "Europe/London", "Europe/Paris", "Europe/Berlin",
@@ -15,9 +32,15 @@ class ScheduleRequest(BaseModel):
     requested_by: str = Field(..., examples=["user@example.com"])
     scheduled_time: str = Field(..., description="ISO 8601 datetime (e.g., '2025-10-18T14:30:00Z')")
     feed_cycles: int = Field(1, ge=1, le=10, description="Number of feed cycles (1-10)")
-    recurrence: Literal["none", "daily", "weekly", "monthly"] | None = Field("none", description="Recurrence pattern")
+    recurrence: Recurrence | None = Field("none", description="Recurrence pattern")
+    cron_expression: str | None = Field(
+        None,
+        examples=["0 8,18 * * *"],
+        description="Cron expression (minute hour day month weekday, in the schedule's timezone) when recurrence is 'cron'"
+    )
     enabled: bool = Field(True, description="Whether the schedule is active")
     timezone: str = Field("UTC", description="User's timezone (e.g., 'America/New_York')")
+    thing_id: str | None = Field(None, pattern=THING_NAME_PATTERN, description="Device to feed (defaults to the deployment's device)")
 
     @field_validator('scheduled_time')
     @classmethod
@@ -28,6 +51,18 @@ class ScheduleRequest(BaseModel):
         except ValueError:
             raise ValueError("scheduled_time must be in ISO 8601 format (e.g., '2025-10-18T14:30:00Z')") from None
 
+    @field_validator('cron_expression')
+    @classmethod
+    def validate_cron_expression(cls, v):
+        return validate_cron_expression(v)
+
+    @model_validator(mode='after')
+    def validate_cron_recurrence(self):
+        """Require a cron expression for cron recurrence."""
+        if self.recurrence == "cron" and not self.cron_expression:
+            raise ValueError("cron_expression is required when recurrence is 'cron'")
+        return self
+
     @field_validator('timezone')
     @classmethod
     def validate_timezone(cls, v):
@@ -72,10 +107,16 @@ class ScheduleRequest(BaseModel):
 class ScheduleUpdate(BaseModel):
     scheduled_time: str | None = Field(None, description="ISO 8601 datetime")
     feed_cycles: int | None = Field(None, ge=1, le=10, description="Number of feed cycles (1-10)")
-    recurrence: Literal["none", "daily", "weekly", "monthly"] | None = None
+    recurrence: Recurrence | None = None
+    cron_expression: str | None = Field(None, description="Cron expression when recurrence is 'cron' (defaults to the stored one)")
     enabled: bool | None = None
     timezone: str | None = Field(None, description="User's timezone")
 
+    @field_validator('cron_expression')
+    @classmethod
+    def validate_cron_expression(cls, v):
+        return validate_cron_expression(v)
+
     @field_validator('timezone')
     @classmethod
     def validate_timezone(cls, v):
@@ -94,12 +135,37 @@ class ScheduleResponse(BaseModel):
     scheduled_time: str
     feed_cycles: int
     recurrence: str
+    cron_expression: str | None = None
     enabled: bool
     created_at: str
     updated_at: str | None = None
     last_executed_at: str | None = Field(None, description="Last time this schedule was executed")
     next_execution: str | None = Field(None, description="Next scheduled execution time")
     timezone: str = Field("UTC", description="User's timezone")
+    thing_id: str | None = Field(None, description="Device the schedule feeds (None for the deployment's device)")
+
+    @model_validator(mode="before")
+    @classmethod
+    def fill_next_execution(cls, data):
+        """Derive next_execution from the stored pending occurrence and the recurrence rule."""
+        if not isinstance(data, dict) or data.get("next_execution") or not data.get("enabled"):
+            return data
+        try:
+            scheduled_time = datetime.fromisoformat(data["scheduled_time"].replace("Z", ""))
+            wall_clock_time = data.get("wall_clock_time")
+            next_time = next_execution_time(
+                scheduled_time,
+                data.get("recurrence", "none"),
+                datetime.now(UTC).replace(tzinfo=None),
+                data.get("cron_expression"),
+                data.get("timezone") or "UTC",
+                datetime.fromisoformat(wall_clock_time) if wall_clock_time else None,
+            )
+        except (AttributeError, KeyError, ValueError):
+            return data  # Let field validation report the bad value
+        if next_time is None:
+            return data
+        return {**data, "next_execution": next_time.strftime('%Y-%m-%dT%H:%M:%S') + 'Z'}
 
 
 class ScheduleListResponse(BaseModel):
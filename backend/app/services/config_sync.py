@@ -0,0 +1,71 @@
+"""Desired vs reported device config, and publishing the desired config to the fleet."""
+
+from typing import Any
+
+from botocore.exceptions import ClientError
+
+from app.core.iot import publish_desired_config
+from app.crud.config import fetch_desired_config, merge_desired_config
+from app.crud.feed import get_latest_device_status
+
+
+def _same_value(desired: Any, reported: Any) -> bool:
+    # The ESP32 keeps thresholds as floats, so 450 and 450.0 are the same setting
+    if isinstance(desired, int | float) and isinstance(reported, int | float):
+        return float(desired) == float(reported)
+    return desired == reported
+
+
+def config_delta(desired: dict[str, Any], reported: dict[str, Any]) -> dict[str, Any]:
+    """Desired values the device has not reported yet (missing or different)."""
+    return {key: value for key, value in desired.items() if key not in reported or not _same_value(value, reported[key])}
+
+
+async def _reported_config(thing_id: str | None = None) -> tuple[dict[str, Any], dict[str, Any]]:
+    """(reported values, full device status); both empty if the status cannot be read."""
+    try:
+        status = await get_latest_device_status(thing_id) or {}
+    except ClientError:
+        return {}, {}
+    return status.get('reported_config') or {}, status
+
+
+async def sync_device_config(changes: dict[str, Any] | None = None) -> dict[str, Any]:
+    """
+    Records changed device settings in the desired config and publishes the delta.
+
+    Config is fleet-wide: every device subscribes to the shared config topic. Only
+    the values this write changed go out, with the new version; a write that
+    changes nothing does not bump the version and publishes nothing.
+
+    Args:
+        changes: Device settings just written (None to re-send the whole desired config)
+
+    Returns:
+        {"version": desired version, "delta": values published, "published": bool}
+    """
+    if changes:
+        desired = await merge_desired_config(changes)
+        delta = desired["changed"]
+    else:
+        desired = await fetch_desired_config()
+        delta = desired["values"]
+
+    published = bool(delta) and await publish_desired_config(delta, desired["version"])
+    return {"version": desired["version"], "delta": delta, "published": published}
+
+
+async def get_config_sync_status(thing_id: str | None = None) -> dict[str, Any]:
+    """How far a device's config (default: IOT_THING_ID) is behind the desired config."""
+    desired = await fetch_desired_config()
+    reported, status = await _reported_config(thing_id)
+    delta = config_delta(desired["values"], reported)
+
+    return {
+        "desired_version": desired["version"],
+        "reported_version": status.get('reported_config_version'),
+        "in_sync": not delta,
+        "pending": {key: {"desired": value, "reported": reported.get(key)} for key, value in delta.items()},
+        "desired_updated_at": desired["updated_at"],
+        "reported_at": status.get('reported_config_at')
+    }
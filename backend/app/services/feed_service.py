@@ -1,17 +1,41 @@
+import asyncio
+import time
 import uuid
-from datetime import datetime
+from datetime import UTC, datetime
 from typing import Any
 
 from app.core.hardware_adapter import get_hardware_adapter
+from app.core.iot import list_thing_group_members
+from app.core.polling import poll_until
 from app.core.serialization import convert_decimal
 from app.crud.config import fetch_config_setting
-from app.crud.feed import fetch_feed_events_from_db
-from app.models.feed import FeedRequest, FeedResponse
+from app.crud.feed import fetch_feed_events_from_db, get_device_statuses, get_feed_event
+from app.models.feed import FeedRequest, FeedResponse, GroupFeedResponse
 
 
-async def process_feed(request: FeedRequest) -> FeedResponse:
+async def _weight_threshold() -> float:
+    """Bowl weight (grams) at or above which feeds are denied."""
+    threshold_config = await fetch_config_setting('WEIGHT_THRESHOLD_G')
+    if threshold_config and 'value' in threshold_config:
+        return float(threshold_config['value'])
+    return 450.0  # Default
+
+
+# Feed statuses feed_event_logger writes once the device is done with a feed
+FINAL_FEED_STATUSES = ('completed', 'failed')
+
+
+async def process_feed(request: FeedRequest, wait_timeout: float | None = None) -> FeedResponse:
+    """
+    Sends a feed command to one device.
+
+    The command carries feed_id, which the device reuses for its feed events. With
+    wait_timeout (seconds) the call then waits for the completed/failed record that
+    feed_event_logger writes and returns its status and weights; if none arrives in
+    time the feed is reported as 'sent'.
+    """
     feed_id = str(uuid.uuid4())
-    timestamp = datetime.utcnow().isoformat()
+    timestamp = datetime.now(UTC).replace(tzinfo=None).isoformat()
 
     # Get hardware adapter (production or demo)
     hardware = get_hardware_adapter()
@@ -20,16 +44,14 @@ async def process_feed(request: FeedRequest) -> FeedResponse:
     event_type = "scheduled_feed" if request.mode == "scheduled" else "manual_feed"
 
     # Check current weight against threshold
+    device_status = None
     try:
-        device_status = await hardware.get_device_status()
+        device_status = await hardware.get_device_status(request.thing_id)
         if device_status:
             current_weight = device_status.get('current_weight_g', 0.0)
 
             # Fetch weight threshold from config
-            threshold_config = await fetch_config_setting('WEIGHT_THRESHOLD_G')
-            weight_threshold = 450.0  # Default
-            if threshold_config and 'value' in threshold_config:
-                weight_threshold = float(threshold_config['value'])
+            weight_threshold = await _weight_threshold()
 
             # Check if current weight exceeds threshold
             if current_weight >= weight_threshold:
@@ -40,7 +62,8 @@ async def process_feed(request: FeedRequest) -> FeedResponse:
                     mode=request.mode,
                     status="denied_weight_exceeded",
                     timestamp=datetime.fromisoformat(timestamp),
-                    event_type=event_type
+                    event_type=event_type,
+                    thing_id=request.thing_id
                 )
     except Exception as e:
         print(f"Error checking weight threshold: {e}. Proceeding with feed command.")
@@ -51,7 +74,10 @@ async def process_feed(request: FeedRequest) -> FeedResponse:
     result = await hardware.trigger_feed(
         requested_by=request.requested_by,
         mode=request.mode,
-        feed_cycles=request.feed_cycles
+        feed_cycles=request.feed_cycles,
+        thing_id=request.thing_id,
+        feed_id=feed_id,
+        payload_format=(device_status or {}).get('payload_format')
     )
 
     # Determine status from result
@@ -60,14 +86,102 @@ async def process_feed(request: FeedRequest) -> FeedResponse:
     else:
         status = 'failed'
 
-    # Return response
-    return FeedResponse(
+    response = FeedResponse(
         requested_by=request.requested_by,
         feed_id=feed_id,
         mode=request.mode,
         status=status,
         timestamp=datetime.fromisoformat(timestamp),
-        event_type=event_type
+        event_type=event_type,
+        thing_id=request.thing_id
+    )
+
+    if wait_timeout is None or status != 'sent':
+        return response
+
+    started = time.monotonic()
+    feed_event, finished = await poll_until(
+        lambda: get_feed_event(feed_id, consistent_read=True),
+        lambda event: bool(event) and event.get('status') in FINAL_FEED_STATUSES,
+        wait_timeout
+    )
+    response.waited_ms = round((time.monotonic() - started) * 1000)
+    if finished:
+        response.status = feed_event['status']
+        response.weight_before_g = feed_event.get('weight_before_g')
+        response.weight_after_g = feed_event.get('weight_after_g')
+        response.weight_delta_g = feed_event.get('weight_delta_g')
+    return response
+
+
+async def process_group_feed(group: str, request: FeedRequest) -> GroupFeedResponse:
+    """
+    Feeds every device in an IoT thing group.
+
+    Bowl weights are read for the whole group in batches and checked against the
+    shared threshold; the remaining devices get the command concurrently through
+    the adapter's bounded fan-out. Every device gets its own feed_id, sent in its
+    command and returned in its FeedResponse. request.thing_id is ignored.
+
+    Raises:
+        LookupError: If the group has no devices
+    """
+    timestamp = datetime.now(UTC).replace(tzinfo=None)
+    event_type = "scheduled_feed" if request.mode == "scheduled" else "manual_feed"
+    hardware = get_hardware_adapter()
+
+    loop = asyncio.get_event_loop()
+    thing_ids = await loop.run_in_executor(None, list_thing_group_members, group)
+    if not thing_ids:
+        raise LookupError(f"Device group '{group}' has no devices")
+    feed_ids = {thing_id: str(uuid.uuid4()) for thing_id in thing_ids}
+
+    denied = set()
+    statuses = {}
+    try:
+        statuses = await get_device_statuses(thing_ids)
+        if statuses:
+            weight_threshold = await _weight_threshold()
+            denied = {
+                thing_id for thing_id, status in statuses.items()
+                if status.get('current_weight_g', 0.0) >= weight_threshold
+            }
+    except Exception as e:
+        print(f"Error checking weight threshold for group '{group}': {e}. Proceeding with feed command.")
+
+    targets = [thing_id for thing_id in thing_ids if thing_id not in denied]
+    results = await hardware.trigger_group_feed(
+        targets,
+        requested_by=request.requested_by,
+        mode=request.mode,
+        feed_cycles=request.feed_cycles,
+        feed_ids={thing_id: feed_ids[thing_id] for thing_id in targets},
+        payload_formats={thing_id: status.get('payload_format') for thing_id, status in statuses.items()}
+    ) if targets else {}
+
+    feeds = []
+    for thing_id in thing_ids:
+        if thing_id in denied:
+            status = 'denied_weight_exceeded'
+        else:
+            status = 'sent' if results[thing_id].get('status') in ['sent', 'simulated', 'completed'] else 'failed'
+        feeds.append(FeedResponse(
+            requested_by=request.requested_by,
+            feed_id=feed_ids[thing_id],
+            mode=request.mode,
+            status=status,
+            timestamp=timestamp,
+            event_type=event_type,
+            thing_id=thing_id
+        ))
+
+    return GroupFeedResponse(
+        group=group,
+        requested=len(thing_ids),
+        sent=sum(feed.status == 'sent' for feed in feeds),
+        failed=sum(feed.status == 'failed' for feed in feeds),
+        denied=len(denied),
+        feeds=feeds
     )
 
 
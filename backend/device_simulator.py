@@ -0,0 +1,759 @@
+#!/usr/bin/env python3
+"""
+Device Fleet Simulator - Standalone Script
+
+Runs a fleet of virtual ESP32 feeders that behave like the firmware on MQTT
+(FEED_NOW, GET_STATUS, config updates, heartbeats, the pet eating and bowl refills)
+against a local stand-in for AWS IoT Core and in-memory stand-ins for the device
+status, feed history and config tables, and reports how the backend pipeline keeps up.
+
+Commands go out through the real API code (feed_service.process_feed,
+iot.request_device_status, iot.publish_desired_config). Device messages go through the
+real Lambda handlers the IoT rules invoke (status_updater, feed_event_logger), and
+feed history writes reach the real feed_notifier as DynamoDB stream batches:
+
+    API -> broker -> device -> petfeeder/<thing>/feed_event -> feed_event_logger
+        -> feed history stream -> feed_notifier -> SNS
+                               -> petfeeder/<thing>/status -> status_updater
+
+Everything runs on a fake clock. Network, rule and stream delays are fixed
+parameters; the time each handler invocation takes is measured and added to the
+simulated time, so the report shows both handler throughput and end-to-end latency.
+
+Usage:
+    python device_simulator.py --feeders 1000 --minutes 30
+    python device_simulator.py --feeders 5000 --minutes 10 --feeds-per-hour 6 --json
+    python device_simulator.py --feeders 1000 --compact-fraction 1.0
+
+No AWS access is needed: nothing leaves the process.
+"""
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import heapq
+import inspect
+import io
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from decimal import Decimal
+from functools import partial
+from unittest.mock import patch
+
+from boto3.dynamodb.types import TypeSerializer
+
+os.environ.setdefault("AWS_REGION", "us-east-1")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("DYNAMO_FEED_HISTORY_TABLE", "simulated-feed-history")
+os.environ.setdefault("DYNAMO_FEED_SCHEDULE_TABLE", "simulated-feed-schedules")
+os.environ.setdefault("DEVICE_STATUS_TABLE_NAME", "simulated-device-status")
+os.environ.setdefault("DYNAMO_FEED_CONFIG_TABLE_NAME", "simulated-feed-config")
+os.environ.setdefault("DYNAMO_CONFIG_TABLE", "simulated-feed-config")
+os.environ.setdefault("IOT_THING_ID", "simulated-feeder")
+os.environ.setdefault("IOT_ENDPOINT", "simulated.iot.local")
+os.environ.setdefault("SNS_TOPIC_ARN", "arn:aws:sns:us-east-1:000000000000:simulated-feed-notifications")
+
+import feed_event_logger
+import feed_notifier
+import status_updater
+from app.core import iot
+from app.core.cache import ConfigCache
+from app.core.config import settings
+from app.core.hardware_adapter import reset_hardware_adapter
+from app.core.iot_codec import (
+    decode,
+    decode_device_message,
+    encode_feed_event,
+    encode_status,
+    is_compact,
+)
+from app.crud import config as crud_config
+from app.crud import feed as crud_feed
+from app.models.feed import FeedRequest
+from app.services.feed_service import FINAL_FEED_STATUSES, process_feed
+from schedule_simulator import FakeClock, InMemoryTable, summarize
+
+# Firmware timings (iot-pet-feeder.ino)
+SERVO_SWEEP_SECONDS = 0.15
+CYCLE_PAUSE_SECONDS = 0.5
+WEIGHT_STABILIZATION_SECONDS = 3.0
+HEARTBEAT_INTERVAL_SECONDS = 600
+MINIMAL_FOOD_WEIGHT_G = 10.0
+WEIGHT_CHANGE_THRESHOLD_G = 5.0
+
+_FEED_ID = re.compile(r"Feed ID: (\S+)")
+_serializer = TypeSerializer()
+
+
+def topic_matches(topic_filter: str, topic: str) -> bool:
+    """MQTT topic filter match with '+' (one level) and '#' (all remaining levels)."""
+    filter_levels, topic_levels = topic_filter.split("/"), topic.split("/")
+    for index, level in enumerate(filter_levels):
+        if level == "#":
+            return True
+        if index >= len(topic_levels) or level not in ("+", topic_levels[index]):
+            return False
+    return len(filter_levels) == len(topic_levels)
+
+
+class EventQueue:
+    """Actions ordered by simulated time; running one may schedule more."""
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.processed = 0
+        self._queue: list = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()  # The API publishes from the IoT executor's threads
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def at(self, when: datetime, action: Callable) -> None:
+        with self._lock:
+            heapq.heappush(self._queue, (when, next(self._sequence), action))
+
+    def after(self, seconds: float, action: Callable) -> None:
+        self.at(self.clock.now() + timedelta(seconds=seconds), action)
+
+    async def run(self, after_each: Callable[[], None] | None = None) -> None:
+        """Run actions in time order until none are left, awaiting those that are coroutines."""
+        while self._queue:
+            with self._lock:
+                when, _, action = heapq.heappop(self._queue)
+            self.clock.set(max(self.clock.now(), when))
+            result = action()
+            if inspect.isawaitable(result):
+                await result
+            self.processed += 1
+            if after_each:
+                after_each()
+
+
+class LocalBroker:
+    """
+    Stand-in for AWS IoT Core: the iot-data publish call plus MQTT delivery and rules.
+
+    Devices subscribe to exact topics. Rules subscribe with a topic filter and get the
+    payload base64-encoded as raw with the topic's second level as thing_id, like the
+    deployed "SELECT encode(*, 'base64') AS raw, topic(2) AS thing_id" rules, together
+    with the publish time. Messages reach subscribers `latency` seconds after the
+    publish and rule actions `rule_latency` seconds after that. Subscribers get text
+    payloads as str and compact ones as bytes.
+    """
+
+    def __init__(self, events: EventQueue, latency: float = 0.03, rule_latency: float = 0.05):
+        self.events = events
+        self.latency = latency
+        self.rule_latency = rule_latency
+        self.subscriptions: dict[str, list[Callable[[str, str | bytes], None]]] = defaultdict(list)
+        self.rules: list[tuple[str, Callable[[dict, datetime], None]]] = []
+        self.published = 0
+        self.bytes_published = 0
+        self.delivered = 0
+        self.rule_matches = 0
+
+    def subscribe(self, topic: str, callback: Callable[[str, str | bytes], None]) -> None:
+        self.subscriptions[topic].append(callback)
+
+    def add_rule(self, topic_filter: str, action: Callable[[dict, datetime], None]) -> None:
+        self.rules.append((topic_filter, action))
+
+    def publish(self, topic: str, qos: int = 0, payload: str | bytes = "") -> dict:
+        data = payload if isinstance(payload, bytes) else payload.encode("utf-8")
+        if not is_compact(data):
+            payload = data.decode("utf-8")
+        published_at = self.events.clock.now()
+        self.published += 1
+        self.bytes_published += len(data)
+        for callback in list(self.subscriptions.get(topic, ())):
+            self.delivered += 1
+            self.events.after(self.latency, partial(callback, topic, payload))
+        for topic_filter, action in self.rules:
+            if topic_matches(topic_filter, topic):
+                self.rule_matches += 1
+                event = {"raw": base64.b64encode(data).decode("ascii"), "thing_id": topic.split("/")[1]}
+                self.events.after(self.latency + self.rule_latency, partial(action, event, published_at))
+        return {}
+
+
+class StubSNSClient:
+    """Records notifications instead of sending them."""
+
+    def __init__(self):
+        self.messages: list[dict] = []
+
+    def publish(self, **kwargs) -> dict:
+        self.messages.append(kwargs)
+        return {"MessageId": str(len(self.messages))}
+
+
+class VirtualFeeder:
+    """
+    One ESP32 feeder as seen over MQTT, following iot-pet-feeder.ino.
+
+    Subscribes to its command topic and the fleet config topic, answers FEED_NOW
+    (JSON, compact or plain), GET_STATUS and config updates, and publishes status and
+    feed events with the firmware's payloads and servo timings: compact ones when
+    `compact` (firmware built with COMPACT_PAYLOADS), JSON otherwise. Between commands
+    it sends heartbeats and, at random, reports the pet eating and the bowl being refilled.
+    """
+
+    def __init__(
+        self, thing_id: str, broker: LocalBroker, rng: random.Random, weight_g: float = 100.0, compact: bool = False
+    ):
+        self.thing_id = thing_id
+        self.compact = compact
+        self.broker = broker
+        self.events = broker.events
+        self.rng = rng
+        self.weight_g = weight_g
+        self.servo_open_hold_ms = 3000
+        self.weight_threshold_g = 350.0
+        self.default_feed_cycles = 1
+        self.config_version = 0
+        self.state = "CLOSED"
+        self.feed_id = ""
+        self.trigger: str | None = None
+        self.requested_by = ""
+        self.total_cycles = 0
+        self.cycle = 0
+        self.command_topic = f"petfeeder/{thing_id}/commands"
+        self.status_topic = f"petfeeder/{thing_id}/status"
+        self.feed_event_topic = f"petfeeder/{thing_id}/feed_event"
+
+    def connect(self, until: datetime, meals_per_hour: float = 0.0, refills_per_hour: float = 0.0) -> None:
+        """Subscribe, report "Ready" and start the periodic behaviour, which stops at `until`."""
+        self.until = until
+        self.broker.subscribe(self.command_topic, self.on_message)
+        self.broker.subscribe(settings.IOT_TOPIC_CONFIG, self.on_message)
+        self.publish_status("Ready", "system")
+        self._schedule_heartbeat(self.rng.uniform(0, HEARTBEAT_INTERVAL_SECONDS))
+        if meals_per_hour > 0:
+            self._schedule(self._eat, meals_per_hour)
+        if refills_per_hour > 0:
+            self._schedule(self._refill, refills_per_hour)
+
+    def on_message(self, topic: str, payload: str | bytes) -> None:
+        if topic == self.command_topic:
+            self._handle_command(payload)
+        else:
+            self._handle_config(payload)
+
+    def publish_status(self, message: str, trigger: str | None = None, request_id: str | None = None) -> None:
+        status = {
+            "current_weight_g": round(self.weight_g, 1),
+            "feeder_state": self.state,
+            "network_status": "ONLINE",
+            "message": message,
+            "trigger_method": trigger or "unknown",
+        }
+        if request_id:
+            status["request_id"] = request_id
+        status["config"] = {
+            "version": self.config_version,
+            "SERVO_OPEN_HOLD_DURATION_MS": self.servo_open_hold_ms,
+            "WEIGHT_THRESHOLD_G": self.weight_threshold_g,
+        }
+        self.broker.publish(self.status_topic, 0, encode_status(status) if self.compact else json.dumps(status))
+
+    def publish_feed_event(self, trigger: str, status: str, feed_id: str | None = None) -> None:
+        event = {"feed_id": feed_id or self.feed_id}
+        if trigger == "button":
+            event.update(mode="manual", requested_by="physical_button", event_type="manual_feed")
+        elif trigger == "api":
+            event.update(mode="api", requested_by=self.requested_by or "api_user", event_type="manual_feed")
+        elif trigger == "scheduled":
+            event.update(mode="scheduled", requested_by=self.requested_by or "scheduler", event_type="scheduled_feed")
+        else:
+            event.update(mode="unknown", requested_by="unknown", event_type="manual_feed")
+        event["status"] = status
+        event["trigger_method"] = trigger
+        if status == "initiated":
+            event["weight_before_g"] = round(self.weight_g, 1)
+        elif status == "completed":
+            event["weight_after_g"] = round(self.weight_g, 1)
+        if self.total_cycles > 1:
+            event["cycles"] = self.total_cycles
+        self._publish_feed_event(event)
+
+    def _publish_feed_event(self, event: dict) -> None:
+        self.broker.publish(self.feed_event_topic, 0, encode_feed_event(event) if self.compact else json.dumps(event))
+
+    def _handle_command(self, payload: str | bytes) -> None:
+        try:
+            command = decode(payload) if is_compact(payload) else json.loads(payload)
+        except ValueError:
+            command = None
+
+        if isinstance(command, dict) and "command" in command:
+            if command["command"] == "FEED_NOW":
+                cycles = command.get("feed_cycles", self.default_feed_cycles)
+                trigger = command.get("mode", "api")
+                feed_id = command.get("feed_id")
+                self.requested_by = command.get("requested_by", "api_user")
+                if not 1 <= cycles <= 10:
+                    cycles = self.default_feed_cycles
+                if self._can_feed():
+                    self._activate(trigger, cycles, feed_id)
+                else:
+                    self.publish_status("Feed denied - threshold exceeded", trigger)
+                    if feed_id:
+                        self.publish_feed_event(trigger, "failed", feed_id)
+            elif command["command"] == "GET_STATUS":
+                self.publish_status("Status requested", "system", command.get("request_id"))
+        elif payload == "FEED_NOW":
+            if self._can_feed():
+                self._activate("api", self.default_feed_cycles)
+            else:
+                self.publish_status("Feed denied - threshold exceeded", "api")
+        elif payload == "GET_STATUS":
+            self.publish_status("Status requested", "system")
+
+    def _handle_config(self, payload: str) -> None:
+        try:
+            config = json.loads(payload)
+        except ValueError:
+            return
+        if config.get("SERVO_OPEN_HOLD_DURATION_MS", 0) >= 1000:
+            self.servo_open_hold_ms = int(config["SERVO_OPEN_HOLD_DURATION_MS"])
+        if config.get("WEIGHT_THRESHOLD_G", 0) >= 50.0:
+            self.weight_threshold_g = float(config["WEIGHT_THRESHOLD_G"])
+        if 1 <= config.get("DEFAULT_FEED_CYCLES", 0) <= 10:
+            self.default_feed_cycles = int(config["DEFAULT_FEED_CYCLES"])
+        if "version" in config:
+            self.config_version = int(config["version"])
+        self.publish_status("Config applied", "system")
+
+    def _can_feed(self) -> bool:
+        return self.weight_g < self.weight_threshold_g
+
+    def _activate(self, trigger: str, cycles: int, feed_id: str | None = None) -> None:
+        if self.state != "CLOSED":
+            self.publish_status("Feeder busy", trigger)
+            self.publish_feed_event(trigger, "failed", feed_id)
+            return
+        self.feed_id = feed_id or str(uuid.uuid4())
+        self.trigger = trigger
+        self.total_cycles = cycles
+        self.cycle = 0
+        self.state = "OPENING"
+        self.publish_status("Feeder opening", trigger)
+        self.publish_feed_event(trigger, "initiated")
+        self.events.after(SERVO_SWEEP_SECONDS, self._opened)
+
+    def _opened(self) -> None:
+        self.state = "OPEN"
+        self.publish_status("Feeder open", "servo_event")
+        self.events.after(self.servo_open_hold_ms / 1000, self._closing)
+
+    def _closing(self) -> None:
+        self.state = "CLOSING"
+        self.weight_g += self.rng.uniform(15, 35) * self.servo_open_hold_ms / 3000
+        self.publish_status("Feeder closing", "servo_event")
+        self.events.after(SERVO_SWEEP_SECONDS, self._closed)
+
+    def _closed(self) -> None:
+        self.state = "CLOSED"
+        self.cycle += 1
+        if self.cycle < self.total_cycles:
+            self.events.after(CYCLE_PAUSE_SECONDS, self._next_cycle)
+            return
+        self.publish_status("Feed completed", self.trigger)
+        self.publish_feed_event(self.trigger, "completed")
+        self.total_cycles = self.cycle = 0
+        self.trigger = None
+
+    def _next_cycle(self) -> None:
+        self.state = "OPENING"
+        self.publish_status("Multi-cycle feeding", self.trigger)
+        self.events.after(SERVO_SWEEP_SECONDS, self._opened)
+
+    def _schedule_heartbeat(self, delay: float) -> None:
+        if self.events.clock.now() + timedelta(seconds=delay) < self.until:
+            self.events.after(delay, self._heartbeat)
+
+    def _heartbeat(self) -> None:
+        self.publish_status("Heartbeat", "system")
+        self._schedule_heartbeat(HEARTBEAT_INTERVAL_SECONDS)
+
+    def _schedule(self, action: Callable[[], None], per_hour: float) -> None:
+        delay = self.rng.expovariate(per_hour / 3600)
+        if self.events.clock.now() + timedelta(seconds=delay) < self.until:
+            self.events.after(delay, partial(self._repeat, action, per_hour))
+
+    def _repeat(self, action: Callable[[], None], per_hour: float) -> None:
+        action()
+        self._schedule(action, per_hour)
+
+    def _eat(self) -> None:
+        if self.state == "CLOSED" and self.weight_g > MINIMAL_FOOD_WEIGHT_G:
+            before = self.weight_g
+            self.weight_g -= min(self.weight_g, self.rng.uniform(5, 40))
+            self.events.after(WEIGHT_STABILIZATION_SECONDS, partial(self._report_weight_change, before))
+
+    def _refill(self) -> None:
+        if self.state == "CLOSED":
+            before = self.weight_g
+            self.weight_g += self.rng.uniform(50, 200)
+            self.events.after(WEIGHT_STABILIZATION_SECONDS, partial(self._report_weight_change, before))
+
+    def _report_weight_change(self, before: float) -> None:
+        """The firmware's monitorWeightChanges once the scale has stabilized."""
+        delta = self.weight_g - before
+        if abs(delta) < WEIGHT_CHANGE_THRESHOLD_G:
+            return
+        if delta < 0 and before > MINIMAL_FOOD_WEIGHT_G:
+            kind, requested_by, message = "consumption", "pet", "Pet ate food"
+        elif delta > MINIMAL_FOOD_WEIGHT_G and before >= 5.0:
+            kind, requested_by, message = "refill", "human", "Food refilled"
+        else:
+            return
+        event = {
+            "feed_id": str(uuid.uuid4()),
+            "mode": kind,
+            "requested_by": requested_by,
+            "trigger_method": "weight_monitor",
+            "event_type": kind,
+        }
+        self._publish_feed_event({**event, "status": "initiated", "weight_before_g": round(before, 1)})
+        self._publish_feed_event({**event, "status": "completed", "weight_after_g": round(self.weight_g, 1)})
+        self.publish_status(message, "weight_monitor")
+
+
+def stream_record(change: tuple[str, dict | None, dict]) -> dict:
+    """One InMemoryTable change as a DynamoDB stream record (NEW_AND_OLD_IMAGES)."""
+    event_name, old, new = change
+    record = {
+        "eventName": event_name,
+        "dynamodb": {"NewImage": {key: _serializer.serialize(value) for key, value in new.items()}},
+    }
+    if old:
+        record["dynamodb"]["OldImage"] = {key: _serializer.serialize(value) for key, value in old.items()}
+    return record
+
+
+def run_simulation(
+    feeders: int = 1000,
+    minutes: float = 10,
+    feeds_per_hour: float = 2.0,
+    status_requests_per_hour: float = 1.0,
+    meals_per_hour: float = 1.0,
+    refills_per_hour: float = 0.25,
+    config_update_at_minutes: float | None = None,
+    broker_latency_ms: float = 30,
+    rule_latency_ms: float = 50,
+    stream_batch_size: int = 100,
+    stream_window_ms: float = 500,
+    weight_threshold_g: float = 350.0,
+    compact_fraction: float = 0.0,
+    start: datetime = datetime(2025, 1, 1),
+    seed: int = 0,
+) -> dict:
+    """
+    Run a simulated fleet through the real API code and IoT Lambdas and report on it.
+
+    Feed commands and status requests (per feeder, per hour) are spread at random over
+    the run; one fleet-wide config update goes out at `config_update_at_minutes`
+    (default: half way). After the run, in-flight feeds are allowed to finish.
+    `compact_fraction` of the feeders publish compact payloads instead of JSON.
+    Handler and API output is discarded.
+
+    Returns:
+        dict: Report with handler timings, throughput, feed outcomes and
+              stage-by-stage pipeline latency percentiles
+    """
+    return asyncio.run(_simulate(
+        feeders, minutes, feeds_per_hour, status_requests_per_hour, meals_per_hour, refills_per_hour,
+        minutes / 2 if config_update_at_minutes is None else config_update_at_minutes,
+        broker_latency_ms, rule_latency_ms, stream_batch_size, stream_window_ms, weight_threshold_g,
+        compact_fraction, start, seed
+    ))
+
+
+async def _simulate(
+    feeders, minutes, feeds_per_hour, status_requests_per_hour, meals_per_hour, refills_per_hour,
+    config_update_at_minutes, broker_latency_ms, rule_latency_ms, stream_batch_size, stream_window_ms,
+    weight_threshold_g, compact_fraction, start, seed
+) -> dict:
+    rng = random.Random(seed)
+    clock = FakeClock(start)
+    events = EventQueue(clock)
+    broker = LocalBroker(events, latency=broker_latency_ms / 1000, rule_latency=rule_latency_ms / 1000)
+    end = start + timedelta(minutes=minutes)
+
+    status_table = InMemoryTable("thing_id")
+    history_table = InMemoryTable("feed_id", stream=True)
+    config_table = InMemoryTable(crud_config.CONFIG_PARTITION_KEY)
+    config_table.put_item(Item={"config_key": "WEIGHT_THRESHOLD_G", "value": Decimal(str(weight_threshold_g))})
+    config_table.put_item(Item={"config_key": "EMAIL_NOTIFICATIONS", "value": json.dumps({
+        "email": "owner@example.com",
+        "enabled": True,
+        "preferences": {"pet_ate": True, "feedings": True, "failures": True},
+    })})
+    sns = StubSNSClient()
+
+    handler_ms: dict[str, list[float]] = defaultdict(list)
+    handler_errors: Counter = Counter()
+    api_ms: dict[str, list[float]] = defaultdict(list)
+    stage_seconds: dict[str, list[float]] = defaultdict(list)
+    feed_outcomes: Counter = Counter()
+    feeds: dict[str, dict] = {}
+    status_requests: dict[str, dict] = {}
+    config_rollout = {"version": 1, "published_at": None, "applied": {}}
+    stream_backlog: list[tuple[datetime, dict]] = []
+
+    def invoke(name: str, handler: Callable, event: dict) -> datetime:
+        """Run a handler, record its wall time, and return the simulated time it finished."""
+        started = time.perf_counter()
+        response = handler(event, None)
+        elapsed = time.perf_counter() - started
+        handler_ms[name].append(elapsed * 1000)
+        if response.get("statusCode") != 200:
+            handler_errors[name] += 1
+        return clock.now() + timedelta(seconds=elapsed)
+
+    def on_status(event: dict, published_at: datetime) -> None:
+        done = invoke("status_updater", status_updater.handler, event)
+        stage_seconds["device_to_status_row"].append((done - published_at).total_seconds())
+        status = decode_device_message(event)
+        request = status_requests.get(status.get("request_id"))
+        if request and "answered_at" not in request:
+            request["answered_at"] = done
+        if status["config"]["version"] == config_rollout["version"]:
+            config_rollout["applied"].setdefault(status["thing_id"], done)
+
+    def on_feed_event(event: dict, published_at: datetime) -> None:
+        done = invoke("feed_event_logger", feed_event_logger.handler, event)
+        stage_seconds["device_to_feed_history_row"].append((done - published_at).total_seconds())
+        stream_backlog.extend((done, stream_record(change)) for change in history_table.stream)
+        history_table.stream.clear()
+        feed_event = decode_device_message(event)
+        feed = feeds.get(feed_event["feed_id"])
+        if feed and feed_event["status"] in FINAL_FEED_STATUSES and "finished_at" not in feed:
+            feed.update(finished_at=done, status=feed_event["status"])
+
+    def poll_stream() -> None:
+        """Deliver up to one batch of stream records to feed_notifier, like the event source mapping."""
+        ready = [entry for entry in stream_backlog[:stream_batch_size] if entry[0] <= clock.now()]
+        if ready:
+            del stream_backlog[:len(ready)]
+            notified = len(sns.messages)
+            done = invoke("feed_notifier", feed_notifier.handler, {"Records": [record for _, record in ready]})
+            for written_at, _ in ready:
+                stage_seconds["feed_history_row_to_notifier"].append((done - written_at).total_seconds())
+            for message in sns.messages[notified:]:
+                match = _FEED_ID.search(message["Message"])
+                feed = feeds.get(match.group(1)) if match else None
+                if feed and "notified_at" not in feed:
+                    feed["notified_at"] = done
+        if clock.now() < end or stream_backlog or len(events):
+            events.after(stream_window_ms / 1000, poll_stream)
+
+    async def send_feed(thing_id: str) -> None:
+        started = time.perf_counter()
+        response = await process_feed(FeedRequest(
+            requested_by="simulator@example.com", mode="api", feed_cycles=rng.choice([1, 1, 2]), thing_id=thing_id
+        ))
+        api_ms["process_feed"].append((time.perf_counter() - started) * 1000)
+        feed_outcomes[response.status] += 1
+        if response.status == "sent":
+            feeds[response.feed_id] = {"sent_at": clock.now()}
+
+    async def send_status_request(thing_id: str) -> None:
+        request_id = uuid.uuid4().hex
+        started = time.perf_counter()
+        sent = await iot.request_device_status(thing_id, request_id)
+        api_ms["request_device_status"].append((time.perf_counter() - started) * 1000)
+        if sent:
+            status_requests[request_id] = {"sent_at": clock.now()}
+
+    async def send_config_update() -> None:
+        await iot.publish_desired_config({"SERVO_OPEN_HOLD_DURATION_MS": 2500}, config_rollout["version"])
+        config_rollout["published_at"] = clock.now()
+
+    broker.add_rule("petfeeder/+/status", on_status)
+    broker.add_rule("petfeeder/+/feed_event", on_feed_event)
+
+    compact_feeders = round(feeders * compact_fraction)
+    devices = [
+        VirtualFeeder(
+            f"sim-feeder-{index:05d}", broker, random.Random(rng.random()), weight_g=rng.uniform(0, 300),
+            compact=index < compact_feeders
+        )
+        for index in range(feeders)
+    ]
+    span = (end - start).total_seconds()
+    for device in devices:
+        events.at(start + timedelta(seconds=rng.uniform(0, 5)), partial(
+            device.connect, end, meals_per_hour=meals_per_hour, refills_per_hour=refills_per_hour
+        ))
+    for _ in range(round(feeders * feeds_per_hour * minutes / 60)):
+        events.at(start + timedelta(seconds=rng.uniform(5, span)), partial(send_feed, rng.choice(devices).thing_id))
+    for _ in range(round(feeders * status_requests_per_hour * minutes / 60)):
+        events.at(start + timedelta(seconds=rng.uniform(5, span)), partial(send_status_request, rng.choice(devices).thing_id))
+    events.at(start + timedelta(minutes=config_update_at_minutes), send_config_update)
+    events.at(start + timedelta(milliseconds=stream_window_ms), poll_stream)
+
+    api_config_cache = ConfigCache(lambda: config_table, key_name=crud_config.CONFIG_PARTITION_KEY)
+    notifier_config_cache = ConfigCache(lambda: config_table)
+
+    reset_hardware_adapter()
+    wall_started = time.perf_counter()
+    try:
+        with patch.dict(os.environ, {"IOT_ENDPOINT": settings.IOT_ENDPOINT or "simulated.iot.local"}), \
+                patch.object(settings, "IOT_ENDPOINT", settings.IOT_ENDPOINT or "simulated.iot.local"), \
+                patch.object(iot, "_iot_client", broker), \
+                patch.object(crud_feed, "get_device_status_table", lambda: status_table), \
+                patch.object(crud_config, "config_cache", api_config_cache), \
+                patch.object(status_updater, "table", status_table), \
+                patch.object(feed_event_logger, "table", history_table), \
+                patch.object(feed_notifier, "config_cache", notifier_config_cache), \
+                patch.object(feed_notifier, "sns_client", sns), \
+                contextlib.redirect_stdout(io.StringIO()) as output:
+
+            def discard_output() -> None:
+                # Drop handler logs as we go so long runs don't hold them in memory
+                output.seek(0)
+                output.truncate()
+
+            await events.run(after_each=discard_output)
+    finally:
+        reset_hardware_adapter()
+    wall_seconds = time.perf_counter() - wall_started
+
+    finished = [feed for feed in feeds.values() if "finished_at" in feed]
+    answered = [request for request in status_requests.values() if "answered_at" in request]
+    applied = config_rollout["applied"].values()
+    invocations = sum(len(samples) for samples in handler_ms.values())
+    handler_seconds = sum(sum(samples) for samples in handler_ms.values()) / 1000
+
+    return {
+        "feeders": feeders,
+        "simulated_minutes": minutes,
+        "wall_seconds": round(wall_seconds, 3),
+        "events_processed": events.processed,
+        "compact_feeders": compact_feeders,
+        "messages": {
+            "published": broker.published,
+            "bytes_published": broker.bytes_published,
+            "bytes_per_message": round(broker.bytes_published / broker.published, 1) if broker.published else None,
+            "delivered_to_devices": broker.delivered,
+            "rule_invocations": broker.rule_matches,
+        },
+        "throughput": {
+            "messages_per_wall_second": round(broker.published / wall_seconds, 1) if wall_seconds else None,
+            "handler_invocations_per_handler_second": round(invocations / handler_seconds, 1) if handler_seconds else None,
+        },
+        "handlers": {
+            name: {"invocations": len(handler_ms[name]), "errors": handler_errors[name], "ms": summarize(handler_ms[name])}
+            for name in ("status_updater", "feed_event_logger", "feed_notifier")
+        },
+        "api_ms": {name: summarize(samples) for name, samples in api_ms.items()},
+        "feeds": {
+            "requested": sum(feed_outcomes.values()),
+            "outcomes": dict(feed_outcomes),
+            "completed": sum(feed["status"] == "completed" for feed in finished),
+            "failed": sum(feed["status"] == "failed" for feed in finished),
+            "lost": len(feeds) - len(finished),
+            "notified": sum("notified_at" in feed for feed in feeds.values()),
+        },
+        "status_requests": {"sent": len(status_requests), "answered": len(answered)},
+        "config_rollout": {
+            "devices_applied": len(config_rollout["applied"]),
+            "seconds_to_converge": round(
+                (max(applied) - config_rollout["published_at"]).total_seconds(), 3
+            ) if applied and config_rollout["published_at"] else None,
+        },
+        "latency_seconds": {
+            **{stage: summarize(samples) for stage, samples in stage_seconds.items()},
+            "command_to_final_feed_row": summarize([
+                (feed["finished_at"] - feed["sent_at"]).total_seconds() for feed in finished
+            ]),
+            "command_to_notification": summarize([
+                (feed["notified_at"] - feed["sent_at"]).total_seconds() for feed in feeds.values() if "notified_at" in feed
+            ]),
+            "status_request_round_trip": summarize([
+                (request["answered_at"] - request["sent_at"]).total_seconds() for request in answered
+            ]),
+        },
+        "tables": {
+            "device_status_writes": status_table.write_requests,
+            "feed_history_writes": history_table.write_requests,
+            "feed_history_items": len(history_table.items),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Simulate a fleet of feeders against the real IoT Lambdas and report pipeline throughput and latency'
+    )
+    parser.add_argument('--feeders', type=int, default=1000, help='Number of virtual feeders (default: 1000)')
+    parser.add_argument('--minutes', type=float, default=10, help='Simulated period in minutes (default: 10)')
+    parser.add_argument('--feeds-per-hour', type=float, default=2.0, help='API feeds per feeder per hour (default: 2)')
+    parser.add_argument(
+        '--status-requests-per-hour', type=float, default=1.0, help='GET_STATUS requests per feeder per hour (default: 1)'
+    )
+    parser.add_argument('--meals-per-hour', type=float, default=1.0, help='Pet meals per feeder per hour (default: 1)')
+    parser.add_argument('--refills-per-hour', type=float, default=0.25, help='Bowl refills per feeder per hour (default: 0.25)')
+    parser.add_argument(
+        '--config-update-at-minutes', type=float, default=None, help='When the fleet config update goes out (default: half way)'
+    )
+    parser.add_argument('--broker-latency-ms', type=float, default=30, help='MQTT delivery delay (default: 30)')
+    parser.add_argument('--rule-latency-ms', type=float, default=50, help='IoT rule to Lambda delay (default: 50)')
+    parser.add_argument('--stream-batch-size', type=int, default=100, help='Stream records per notifier call (default: 100)')
+    parser.add_argument('--stream-window-ms', type=float, default=500, help='Stream polling interval (default: 500)')
+    parser.add_argument('--weight-threshold-g', type=float, default=350.0, help='API weight threshold (default: 350)')
+    parser.add_argument(
+        '--compact-fraction', type=float, default=0.0, help='Share of feeders publishing compact payloads (default: 0)'
+    )
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    args = parser.parse_args()
+
+    report = run_simulation(
+        feeders=args.feeders,
+        minutes=args.minutes,
+        feeds_per_hour=args.feeds_per_hour,
+        status_requests_per_hour=args.status_requests_per_hour,
+        meals_per_hour=args.meals_per_hour,
+        refills_per_hour=args.refills_per_hour,
+        config_update_at_minutes=args.config_update_at_minutes,
+        broker_latency_ms=args.broker_latency_ms,
+        rule_latency_ms=args.rule_latency_ms,
+        stream_batch_size=args.stream_batch_size,
+        stream_window_ms=args.stream_window_ms,
+        weight_threshold_g=args.weight_threshold_g,
+        compact_fraction=args.compact_fraction,
+        seed=args.seed,
+    )
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"\n{'='*60}")
+        print(f"Device fleet simulation: {report['feeders']} feeders, {report['simulated_minutes']} minute(s)")
+        print(f"{'='*60}")
+        for key, value in report.items():
+            print(f"  {key}: {value}")
+        print(f"{'='*60}\n")
+
+    handler_errors = sum(handler["errors"] for handler in report["handlers"].values())
+    return 1 if report["feeds"]["lost"] or handler_errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,6 +9,8 @@ from decimal import Decimal
 import boto3
 from botocore.exceptions import ClientError
 
+from app.core.iot_codec import decode_device_message
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
@@ -25,7 +27,8 @@ table = dynamodb.Table(FEED_HISTORY_TABLE_NAME)
 def handler(event, context):
     """
     AWS Lambda handler for logging feed events from IoT device.
-    Triggered by IoT Rule on topic 'petfeeder/feed_event'.
+    Triggered by IoT Rule on topic 'petfeeder/+/feed_event', which passes the payload
+    (JSON or compact binary, base64-encoded) and the device's thing_id taken from the topic.
 
     Handles both creating new events (status='initiated') and updating existing events
     (status='completed' or 'failed') using the same feed_id.
@@ -33,12 +36,7 @@ def handler(event, context):
     logger.info("Event received: %s", json.dumps(event, default=str))
 
     try:
-        if isinstance(event, str):
-            payload = json.loads(event)
-        elif isinstance(event, dict):
-            payload = event
-        else:
-            raise ValueError("Unexpected event format. Expected string or dict.")
+        payload = decode_device_message(event)
 
         feed_id = payload.get("feed_id")
         if not feed_id:
@@ -51,6 +49,7 @@ def handler(event, context):
         event_type = payload.get("event_type", "manual_feed")
         weight_before_g = payload.get("weight_before_g")
         weight_after_g = payload.get("weight_after_g")
+        thing_id = payload.get("thing_id")
 
         if status in ["completed", "failed"]:
             logger.info("Updating feed event %s with status '%s'", feed_id, status)
@@ -99,6 +98,8 @@ def handler(event, context):
 
                 if weight_after_g is not None:
                     item['weight_after_g'] = Decimal(str(weight_after_g))
+                if thing_id:
+                    item['thing_id'] = thing_id
 
                 table.put_item(Item=item)
                 logger.info("Created feed event %s with status '%s'", feed_id, status)
@@ -118,6 +119,8 @@ def handler(event, context):
 
             if weight_before_g is not None:
                 item['weight_before_g'] = Decimal(str(weight_before_g))
+            if thing_id:
+                item['thing_id'] = thing_id
 
             try:
                 table.put_item(
@@ -142,6 +145,12 @@ def handler(event, context):
             'statusCode': 400,
             'body': json.dumps(f"Invalid JSON payload: {e}")
         }
+    except (TypeError, ValueError) as e:
+        logger.error("Error decoding payload: %s", e)
+        return {
+            'statusCode': 400,
+            'body': json.dumps(f"Invalid payload: {e}")
+        }
     except ClientError as e:
         logger.error("DynamoDB Client Error: %s", e)
         return {
@@ -5,6 +5,8 @@ import os
 import boto3
 from botocore.exceptions import ClientError
 
+from app.core.cache import ConfigCache
+
 # Environment variables
 CONFIG_TABLE_NAME = os.environ.get("DYNAMO_CONFIG_TABLE")
 AWS_REGION = os.environ.get("AWS_REGION", os.environ.get("AWS_DEFAULT_REGION", "us-east-1"))
@@ -20,6 +22,12 @@ if not SNS_TOPIC_ARN:
 dynamodb = boto3.resource('dynamodb', region_name=AWS_REGION)
 sns_client = boto3.client('sns', region_name=AWS_REGION)
 config_table = dynamodb.Table(CONFIG_TABLE_NAME)
+# Email settings change rarely; the API bumps the shared config version on every write
+config_cache = ConfigCache(
+    lambda: config_table,
+    ttl=int(os.environ.get('CONFIG_CACHE_TTL_SECONDS', '300')),
+    version_check_interval=float(os.environ.get('CONFIG_VERSION_CHECK_SECONDS', '5'))
+)
 
 
 def get_email_config():
@@ -28,9 +36,9 @@ def get_email_config():
     Returns dict with 'email' and 'enabled' keys, or None if not configured.
     """
     try:
-        response = config_table.get_item(Key={'config_key': 'EMAIL_NOTIFICATIONS'})
-        if 'Item' in response:
-            config_value = response['Item'].get('value')
+        item = config_cache.get('EMAIL_NOTIFICATIONS')
+        if item:
+            config_value = item.get('value')
             if config_value:
                 return json.loads(config_value)
         return None
@@ -4,6 +4,10 @@ import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
 from mangum import Mangum
 
+from app.core.jwt_verifier import preload_public_keys
 from app.main import app as fastapi_app
 
+# Parse Cognito signing keys during the cold start rather than on the first request
+preload_public_keys()
+
 handler = Mangum(fastapi_app)
@@ -2,20 +2,49 @@
 import asyncio
 import json
 import os
-from datetime import datetime, timedelta
+import zlib
+from datetime import UTC, datetime, timedelta
 from decimal import Decimal
 
 import boto3
 from botocore.exceptions import ClientError
 
+from app.core.hardware_adapter import PUBLISH_CONCURRENCY
+from app.core.scheduler import (
+    CatchUpPolicy,
+    ExecutionPlan,
+    first_occurrence_after,
+    next_occurrence,
+    plan_execution,
+)
+
 # Environment variables
 ENVIRONMENT = os.environ.get("ENVIRONMENT", "prd").lower()
 FEED_SCHEDULE_TABLE_NAME = os.environ.get("DYNAMO_FEED_SCHEDULE_TABLE")
 SCHEDULE_EXECUTION_HISTORY_TABLE = os.environ.get("SCHEDULE_EXECUTION_HISTORY_TABLE")
 IOT_ENDPOINT = os.environ.get("IOT_ENDPOINT")
-IOT_TOPIC_FEED = os.environ.get("IOT_TOPIC_FEED", "petfeeder/commands")
 AWS_REGION = os.environ.get("AWS_REGION", os.environ.get("AWS_DEFAULT_REGION", "us-east-1"))
 
+# Lookahead dispatch: when > 0, each tick reserves the schedules due within the next
+# SCHEDULE_LOOKAHEAD_SECONDS and fires each one at its exact second instead of waiting
+# for the next EventBridge tick. Should match the EventBridge rate (60s for rate(1 minute)).
+SCHEDULE_LOOKAHEAD_SECONDS = int(os.environ.get("SCHEDULE_LOOKAHEAD_SECONDS", "0"))
+# How long a reservation blocks other invocations from dispatching the same occurrence
+CLAIM_LEASE_SECONDS = int(os.environ.get("SCHEDULE_CLAIM_LEASE_SECONDS", "120"))
+
+# Horizontal sharding: each invocation handles one partition of the schedule table.
+# 'segment' uses DynamoDB parallel scan segments (each worker reads only its segment);
+# 'hash' assigns schedules by a stable hash of schedule_id (each worker reads the whole table).
+EXECUTOR_WORKER_COUNT = int(os.environ.get("EXECUTOR_WORKER_COUNT", "1"))
+EXECUTOR_PARTITION_STRATEGY = os.environ.get("EXECUTOR_PARTITION_STRATEGY", "segment").lower()
+
+# Catch-up for occurrences missed while the executor was down (see app.core.scheduler.CatchUpPolicy):
+# 'skip' only fires occurrences less than MAX_OVERDUE_MINUTES late, 'latest' fires the most recent
+# missed occurrence once, 'all' fires every missed occurrence. Recurring schedules always jump
+# straight to their next future occurrence.
+SCHEDULE_CATCH_UP_POLICY = os.environ.get("SCHEDULE_CATCH_UP_POLICY", CatchUpPolicy.SKIP.value).lower()
+MAX_OVERDUE_MINUTES = 60
+
 # Validate environment variables
 if not FEED_SCHEDULE_TABLE_NAME:
     print("ERROR: Missing required environment variable: DYNAMO_FEED_SCHEDULE_TABLE")
@@ -25,17 +54,31 @@ dynamodb = boto3.resource('dynamodb', region_name=AWS_REGION)
 schedule_table = dynamodb.Table(FEED_SCHEDULE_TABLE_NAME)
 execution_history_table = dynamodb.Table(SCHEDULE_EXECUTION_HISTORY_TABLE) if SCHEDULE_EXECUTION_HISTORY_TABLE else None
 
-# IoT client only needed for production (real ESP32)
-iot_client = None
-if ENVIRONMENT != "demo":
-    if not IOT_ENDPOINT:
-        print("ERROR: Missing required environment variable: IOT_ENDPOINT for production environment")
-    else:
-        iot_client = boto3.client(
-            "iot-data",
-            region_name=AWS_REGION,
-            endpoint_url=f"https://{IOT_ENDPOINT}"
-        )
+# Feeds are published through process_feed, which uses the shared per-process IoT client
+if ENVIRONMENT != "demo" and not IOT_ENDPOINT:
+    print("ERROR: Missing required environment variable: IOT_ENDPOINT for production environment")
+
+
+def _now() -> datetime:
+    """Current UTC time (naive). Single clock source so executions can be timed precisely."""
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+async def _sleep_until(fire_at: datetime) -> None:
+    """Sleep until the given UTC time (returns immediately if it has already passed)."""
+    delay = (fire_at - _now()).total_seconds()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+def parse_schedule_time(schedule_time_str: str) -> datetime:
+    """Parse a stored ISO 8601 UTC time (e.g. '2025-10-18T14:30:00Z') into a naive UTC datetime."""
+    return datetime.fromisoformat(schedule_time_str.replace('Z', '+00:00')).replace(tzinfo=None)
+
+
+def format_schedule_time(dt: datetime) -> str:
+    """Format a naive UTC datetime the way schedule times are stored (ISO 8601 with 'Z')."""
+    return dt.isoformat() + 'Z'
 
 
 def convert_decimal(obj):
@@ -57,7 +100,9 @@ def log_execution_history(
     feed_cycles: int,
     recurrence: str,
     requested_by: str,
-    error_message: str = None
+    error_message: str = None,
+    lateness_seconds: float | None = None,
+    missed_occurrences: int = 0
 ) -> None:
     """
     Log schedule execution to history table for audit trail.
@@ -65,11 +110,13 @@ def log_execution_history(
     Args:
         schedule_id: ID of the schedule that was executed
         scheduled_time: Scheduled time of the execution
-        status: 'success' or 'failed'
+        status: 'success', 'failed' or 'skipped' (missed occurrences dropped by the catch-up policy)
         feed_cycles: Number of feed cycles
         recurrence: Recurrence pattern
         requested_by: User who created the schedule
         error_message: Optional error message if failed
+        lateness_seconds: Seconds between scheduled_time and the actual dispatch
+        missed_occurrences: Number of missed occurrences dropped alongside this execution
     """
     if not execution_history_table:
         print("Warning: Execution history table not configured, skipping history log")
@@ -81,7 +128,7 @@ def log_execution_history(
             'execution_id': str(uuid.uuid4()),
             'schedule_id': schedule_id,
             'scheduled_time': scheduled_time,
-            'executed_at': datetime.utcnow().isoformat() + 'Z',
+            'executed_at': _now().isoformat() + 'Z',
             'status': status,
             'feed_cycles': feed_cycles,
             'recurrence': recurrence,
@@ -92,13 +139,26 @@ def log_execution_history(
         if error_message:
             execution_record['error_message'] = error_message
 
+        if lateness_seconds is not None:
+            # DynamoDB requires Decimal type for numeric values, not float
+            execution_record['lateness_seconds'] = Decimal(str(round(lateness_seconds, 3)))
+
+        if missed_occurrences:
+            execution_record['missed_occurrences'] = missed_occurrences
+
         execution_history_table.put_item(Item=execution_record)
         print(f"Logged execution history: {execution_record['execution_id']}")
     except Exception as e:
         print(f"Warning: Failed to log execution history: {e}")
 
 
-def is_schedule_due(schedule_time_str: str, current_time: datetime, tolerance_minutes: int = 1, max_overdue_minutes: int = 60) -> bool:
+def is_schedule_due(
+    schedule_time_str: str,
+    current_time: datetime,
+    tolerance_minutes: int = 1,
+    max_overdue_minutes: int = 60,
+    lookahead_seconds: int = 0
+) -> bool:
     """
     Check if a schedule is due to execute.
 
@@ -109,20 +169,23 @@ def is_schedule_due(schedule_time_str: str, current_time: datetime, tolerance_mi
         current_time: Current UTC datetime
         tolerance_minutes: Number of minutes tolerance for normal execution (default: 1)
         max_overdue_minutes: Maximum minutes overdue to still execute (default: 60)
+        lookahead_seconds: Also treat schedules due within the next N seconds as due (default: 0)
 
     Returns:
-        bool: True if schedule is due for execution (past scheduled time but not too old)
+        bool: True if schedule is due for execution (past scheduled time but not too old,
+              or coming up within the lookahead window)
     """
     try:
-        # Parse the scheduled time (stored in UTC)
-        scheduled_time = datetime.fromisoformat(schedule_time_str.replace('Z', '+00:00'))
-
-        # Remove timezone info for comparison (both are UTC)
-        scheduled_time = scheduled_time.replace(tzinfo=None)
+        # Parse the scheduled time (stored in UTC, timezone info removed for comparison)
+        scheduled_time = parse_schedule_time(schedule_time_str)
 
         # Calculate how overdue the schedule is
         time_diff = (current_time - scheduled_time).total_seconds() / 60  # minutes
 
+        # Lookahead window is half-open [now, now + lookahead) so the next tick owns its boundary
+        if lookahead_seconds > 0:
+            return -lookahead_seconds / 60 < time_diff <= max_overdue_minutes
+
         # Schedule is due if:
         # 1. It's past the scheduled time (time_diff >= 0)
         # 2. It's not too old (time_diff <= max_overdue_minutes)
@@ -133,53 +196,85 @@ def is_schedule_due(schedule_time_str: str, current_time: datetime, tolerance_mi
         return False
 
 
-def calculate_next_execution(schedule_time_str: str, recurrence: str) -> str:
+def calculate_next_execution(
+    schedule_time_str: str,
+    recurrence: str,
+    cron_expression: str | None = None,
+    timezone: str = "UTC",
+    wall_clock_anchor: datetime | None = None
+) -> str:
     """
     Calculate the next execution time based on recurrence pattern.
-    All times are in UTC.
+    Times are stored in UTC; recurrence steps keep the wall-clock time in the schedule's timezone.
 
     Args:
         schedule_time_str: Current scheduled time in UTC (ISO 8601)
-        recurrence: Recurrence pattern ('none', 'daily', 'weekly', 'monthly')
+        recurrence: Recurrence pattern ('none', 'daily', 'weekly', 'monthly', 'cron')
+        cron_expression: Cron expression for 'cron' recurrence (e.g., '0 8,18 * * *')
+        timezone: Schedule timezone (e.g., 'America/New_York')
+        wall_clock_anchor: Local wall-clock time the schedule was defined at (from wall_clock_time)
 
     Returns:
         str: Next scheduled time in ISO 8601 UTC format
     """
     try:
-        scheduled_time = datetime.fromisoformat(schedule_time_str.replace('Z', '+00:00'))
-        scheduled_time = scheduled_time.replace(tzinfo=None)
-
-        if recurrence == 'daily':
-            next_time = scheduled_time + timedelta(days=1)
-        elif recurrence == 'weekly':
-            next_time = scheduled_time + timedelta(weeks=1)
-        elif recurrence == 'monthly':
-            # Add approximately 30 days, then adjust to same day of month
-            month = scheduled_time.month
-            year = scheduled_time.year
-            if month == 12:
-                next_month = 1
-                next_year = year + 1
-            else:
-                next_month = month + 1
-                next_year = year
-
-            # Handle edge case: if current day doesn't exist in next month (e.g., Jan 31 -> Feb 28)
-            import calendar
-            max_day = calendar.monthrange(next_year, next_month)[1]
-            next_day = min(scheduled_time.day, max_day)
-
-            next_time = scheduled_time.replace(year=next_year, month=next_month, day=next_day)
-        else:  # 'none' or any other value
+        next_time = next_occurrence(
+            parse_schedule_time(schedule_time_str), recurrence, cron_expression, timezone, wall_clock_anchor
+        )
+        if next_time is None:  # 'none' or any other value
             return schedule_time_str  # Don't update
-
-        return next_time.isoformat() + 'Z'
+        return format_schedule_time(next_time)
     except Exception as e:
         print(f"Error calculating next execution: {e}")
         return schedule_time_str
 
 
-def trigger_scheduled_feed(schedule_id: str, feed_cycles: int, requested_by: str) -> bool:
+def shard_for(schedule_id: str, worker_count: int) -> int:
+    """Stable shard index for a schedule (same on every invocation and Python process)."""
+    return zlib.crc32(schedule_id.encode('utf-8')) % worker_count
+
+
+def scan_enabled_schedules(worker_index: int = 0, worker_count: int = 1, strategy: str = "segment") -> list[dict]:
+    """
+    Read the enabled schedules owned by one executor worker, following scan pagination.
+
+    Args:
+        worker_index: Index of this worker (0-based)
+        worker_count: Total number of workers sharing the table
+        strategy: 'segment' (DynamoDB parallel scan) or 'hash' (schedule_id hash)
+
+    Returns:
+        list: Raw DynamoDB items for this worker's partition
+    """
+    scan_params = {
+        "FilterExpression": "enabled = :enabled",
+        "ExpressionAttributeValues": {":enabled": True}
+    }
+    if worker_count > 1 and strategy == "segment":
+        scan_params["Segment"] = worker_index
+        scan_params["TotalSegments"] = worker_count
+
+    items = []
+    while True:
+        response = schedule_table.scan(**scan_params)
+        items.extend(response.get("Items", []))
+        last_evaluated_key = response.get("LastEvaluatedKey")
+        if not last_evaluated_key:
+            break
+        scan_params["ExclusiveStartKey"] = last_evaluated_key
+
+    if worker_count > 1 and strategy == "hash":
+        items = [item for item in items if shard_for(item["schedule_id"], worker_count) == worker_index]
+
+    return items
+
+
+async def trigger_scheduled_feed_async(
+    schedule_id: str,
+    feed_cycles: int,
+    requested_by: str,
+    thing_id: str | None = None
+) -> bool:
     """
     Trigger a scheduled feed by calling the feed service.
     This ensures feed events are created in DynamoDB with proper event_type.
@@ -188,6 +283,7 @@ def trigger_scheduled_feed(schedule_id: str, feed_cycles: int, requested_by: str
         schedule_id: Unique identifier of the schedule
         feed_cycles: Number of feed cycles to execute
         requested_by: User who created the schedule
+        thing_id: Device the schedule feeds (None for the deployment's device)
 
     Returns:
         bool: True if succeeded, False otherwise
@@ -201,13 +297,14 @@ def trigger_scheduled_feed(schedule_id: str, feed_cycles: int, requested_by: str
         feed_request = FeedRequest(
             mode="scheduled",
             requested_by=requested_by,
-            feed_cycles=feed_cycles
+            feed_cycles=feed_cycles,
+            thing_id=thing_id
         )
 
         # Process feed - this will:
         # 1. Publish MQTT to ESP32
         # 2. Create feed event in DynamoDB with event_type="scheduled_feed"
-        result = asyncio.run(process_feed(feed_request))
+        result = await process_feed(feed_request)
 
         if result.status == 'sent':
             print(f"Scheduled feed triggered successfully: schedule_id={schedule_id}, feed_id={result.feed_id}")
@@ -223,45 +320,117 @@ def trigger_scheduled_feed(schedule_id: str, feed_cycles: int, requested_by: str
         return False
 
 
-def update_schedule_after_execution(schedule_id: str, scheduled_time: str, recurrence: str) -> bool:
+def claim_execution(schedule_id: str, scheduled_time: str, lease_seconds: int = CLAIM_LEASE_SECONDS) -> bool:
+    """
+    Reserve one occurrence of a schedule for this invocation.
+
+    Uses a conditional update so that only one executor invocation can hold the
+    reservation for a given (schedule_id, scheduled_time) pair. The reservation
+    expires after lease_seconds so a crashed invocation does not block it forever.
+
+    Args:
+        schedule_id: ID of the schedule to reserve
+        scheduled_time: Occurrence being reserved (ISO 8601 UTC)
+        lease_seconds: How long the reservation stays valid
+
+    Returns:
+        bool: True if this invocation now owns the occurrence
+    """
+    now = _now()
+    try:
+        schedule_table.update_item(
+            Key={"schedule_id": schedule_id},
+            UpdateExpression="SET claimed_for = :st, claim_expires_at = :exp",
+            ConditionExpression=(
+                "scheduled_time = :st AND enabled = :enabled AND "
+                "(attribute_not_exists(claimed_for) OR claimed_for <> :st OR claim_expires_at < :now)"
+            ),
+            ExpressionAttributeValues={
+                ":st": scheduled_time,
+                ":enabled": True,
+                ":exp": (now + timedelta(seconds=lease_seconds)).isoformat(),
+                ":now": now.isoformat()
+            }
+        )
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            print(f"Schedule {schedule_id} at {scheduled_time} already reserved by another invocation")
+        else:
+            print(f"Error reserving schedule {schedule_id}: {e}")
+        return False
+
+
+def release_claim(schedule_id: str, scheduled_time: str) -> None:
+    """Release a reservation after a failed dispatch so a later tick can retry the occurrence."""
+    try:
+        schedule_table.update_item(
+            Key={"schedule_id": schedule_id},
+            UpdateExpression="REMOVE claimed_for, claim_expires_at",
+            ConditionExpression="claimed_for = :st",
+            ExpressionAttributeValues={":st": scheduled_time}
+        )
+    except ClientError as e:
+        print(f"Warning: Failed to release reservation for schedule {schedule_id}: {e}")
+
+
+def update_schedule_after_execution(
+    schedule_id: str,
+    scheduled_time: str,
+    recurrence: str,
+    next_time: str | None = None,
+    executed: bool = True,
+    cron_expression: str | None = None,
+    timezone: str = "UTC",
+    wall_clock_anchor: datetime | None = None
+) -> bool:
     """
     Update schedule after execution - either disable it or set next execution time.
-    Also tracks last_executed_at timestamp.
+    Also tracks last_executed_at timestamp and releases any reservation.
 
     Args:
         schedule_id: ID of the schedule to update
         scheduled_time: Current scheduled time
         recurrence: Recurrence pattern
+        next_time: Next occurrence from the catch-up planner (computed from scheduled_time if omitted)
+        executed: False when the occurrence was skipped rather than fired (last_executed_at untouched)
+        cron_expression: Cron expression for 'cron' recurrence
+        timezone: Schedule timezone
+        wall_clock_anchor: Local wall-clock time the schedule was defined at
 
     Returns:
         bool: True if update succeeded
     """
     try:
-        current_time = datetime.utcnow().isoformat()
+        current_time = _now().isoformat()
+        executed_clause = ", last_executed_at = :lea" if executed else ""
+        values = {":ua": current_time}
+        if executed:
+            values[":lea"] = current_time
 
         if recurrence == 'none':
             # One-time schedule - disable it after execution
             schedule_table.update_item(
                 Key={"schedule_id": schedule_id},
-                UpdateExpression="SET enabled = :disabled, updated_at = :ua, last_executed_at = :lea",
-                ExpressionAttributeValues={
-                    ":disabled": False,
-                    ":ua": current_time,
-                    ":lea": current_time
-                }
+                UpdateExpression=(
+                    f"SET enabled = :disabled, updated_at = :ua{executed_clause} "
+                    "REMOVE claimed_for, claim_expires_at"
+                ),
+                ExpressionAttributeValues={":disabled": False, **values}
             )
             print(f"One-time schedule {schedule_id} disabled after execution")
         else:
             # Recurring schedule - update to next execution time
-            next_time = calculate_next_execution(scheduled_time, recurrence)
+            next_time = next_time or calculate_next_execution(
+                scheduled_time, recurrence, cron_expression, timezone, wall_clock_anchor
+            )
             schedule_table.update_item(
                 Key={"schedule_id": schedule_id},
-                UpdateExpression="SET scheduled_time = :st, updated_at = :ua, last_executed_at = :lea",
-                ExpressionAttributeValues={
-                    ":st": next_time,
-                    ":ua": current_time,
-                    ":lea": current_time
-                }
+                UpdateExpression=(
+                    f"SET scheduled_time = :st, updated_at = :ua{executed_clause} "
+                    "REMOVE claimed_for, claim_expires_at"
+                ),
+                ExpressionAttributeValues={":st": next_time, **values}
             )
             print(f"Recurring schedule {schedule_id} updated to next execution: {next_time}")
 
@@ -271,6 +440,241 @@ def update_schedule_after_execution(schedule_id: str, scheduled_time: str, recur
         return False
 
 
+def record_execution(
+    schedule_data: dict,
+    fired: list[tuple[datetime, bool, float]],
+    skipped: int = 0,
+    next_time: datetime | None = None
+) -> bool:
+    """
+    Persist the outcome of a dispatched schedule: advance/disable it and write the audit records.
+
+    Args:
+        schedule_data: Schedule item (already converted from DynamoDB types)
+        fired: (occurrence, triggered, lateness_seconds) for every occurrence dispatched
+        skipped: Number of missed occurrences dropped by the catch-up policy
+        next_time: Next future occurrence from the catch-up planner (defaults to the occurrence
+            following scheduled_time)
+
+    Returns:
+        bool: True if every occurrence was dispatched and the schedule was updated
+    """
+    schedule_id = schedule_data.get("schedule_id")
+    scheduled_time = schedule_data.get("scheduled_time")
+    recurrence = schedule_data.get("recurrence", "none")
+    rule = recurrence_rule(schedule_data)
+    if next_time is None:
+        scheduled_dt = parse_schedule_time(scheduled_time)
+        next_time = first_occurrence_after(scheduled_dt, recurrence, scheduled_dt, **rule)
+    history = {
+        "schedule_id": schedule_id,
+        "feed_cycles": schedule_data.get("feed_cycles", 1),
+        "recurrence": recurrence,
+        "requested_by": schedule_data.get("requested_by", "scheduler")
+    }
+    next_time_str = format_schedule_time(next_time) if next_time else None
+
+    if not fired:
+        # Nothing to fire: missed occurrences were dropped, just move the schedule forward
+        print(f"Skipped {skipped} missed occurrence(s) of schedule {schedule_id}")
+        updated = update_schedule_after_execution(
+            schedule_id, scheduled_time, recurrence, next_time=next_time_str, executed=False, **rule
+        )
+        log_execution_history(
+            scheduled_time=scheduled_time, status='skipped', missed_occurrences=skipped, **history
+        )
+        return updated
+
+    if not any(triggered for _, triggered, _ in fired):
+        print(f"Failed to execute schedule {schedule_id}")
+        release_claim(schedule_id, scheduled_time)
+        for occurrence, _, lateness in fired:
+            log_execution_history(
+                scheduled_time=format_schedule_time(occurrence), status='failed',
+                error_message='Failed to trigger feed', lateness_seconds=lateness, **history
+            )
+        return False
+
+    # Update schedule after successful execution
+    updated = update_schedule_after_execution(
+        schedule_id, scheduled_time, recurrence, next_time=next_time_str, **rule
+    )
+    if not updated:
+        print(f"Executed schedule {schedule_id} but failed to update it")
+
+    for index, (occurrence, triggered, lateness) in enumerate(fired):
+        error_message = None
+        if not triggered:
+            error_message = 'Failed to trigger feed'
+        elif not updated:
+            error_message = 'Failed to update schedule after execution'
+        log_execution_history(
+            scheduled_time=format_schedule_time(occurrence),
+            status='failed' if error_message else 'success',
+            error_message=error_message,
+            lateness_seconds=lateness,
+            missed_occurrences=skipped if index == len(fired) - 1 else 0,
+            **history
+        )
+
+    success = updated and all(triggered for _, triggered, _ in fired)
+    if success:
+        print(f"Successfully executed schedule {schedule_id} ({fired[-1][2]:.3f}s after scheduled time)")
+    return success
+
+
+async def execute_schedule(schedule_data: dict, plan: ExecutionPlan | None = None) -> tuple[bool, float | None] | None:
+    """
+    Claim a due schedule occurrence and dispatch it (and any missed occurrences) immediately.
+
+    Args:
+        schedule_data: Schedule item (already converted from DynamoDB types)
+        plan: Catch-up plan for this schedule (defaults to firing scheduled_time once)
+
+    Returns:
+        tuple: (success, worst lateness_seconds), or None if another invocation owns the occurrence
+    """
+    schedule_id = schedule_data.get("schedule_id")
+    scheduled_time = schedule_data["scheduled_time"]
+    if plan is None:
+        plan = ExecutionPlan(fire_times=[parse_schedule_time(scheduled_time)])
+
+    if not await asyncio.to_thread(claim_execution, schedule_id, scheduled_time):
+        return None
+
+    fired = []
+    for occurrence in plan.fire_times:
+        lateness = (_now() - occurrence).total_seconds()
+        triggered = await trigger_scheduled_feed_async(
+            schedule_id,
+            schedule_data.get("feed_cycles", 1),
+            schedule_data.get("requested_by", "scheduler"),
+            schedule_data.get("thing_id")
+        )
+        fired.append((occurrence, triggered, lateness))
+
+    success = await asyncio.to_thread(
+        record_execution, schedule_data, fired, skipped=len(plan.skipped), next_time=plan.next_time
+    )
+    return success, max((lateness for _, _, lateness in fired), default=None)
+
+
+async def execute_due_schedules(
+    due_schedules: list[tuple[dict, ExecutionPlan]],
+    semaphore: asyncio.Semaphore
+) -> list[tuple[bool, float | None] | None]:
+    """
+    Execute every due schedule concurrently, each holding a slot of `semaphore`.
+
+    Each feed still goes through process_feed (weight check, feed event) and from there
+    through the adapter's publish_many, so a slow or failing device only holds up its
+    own schedule.
+    """
+    async def execute(schedule_data: dict, plan: ExecutionPlan) -> tuple[bool, float | None] | None:
+        async with semaphore:
+            return await execute_schedule(schedule_data, plan)
+
+    return list(await asyncio.gather(*(execute(schedule_data, plan) for schedule_data, plan in due_schedules)))
+
+
+async def dispatch_at_scheduled_time(schedule_data: dict, semaphore: asyncio.Semaphore) -> tuple[bool, float] | None:
+    """
+    Reserve a schedule occurrence, wait until its exact scheduled second, then dispatch it.
+
+    A slot of `semaphore` is only held for the dispatch itself, not while waiting.
+
+    Returns:
+        tuple: (success, lateness_seconds), or None if another invocation owns the occurrence
+    """
+    schedule_id = schedule_data.get("schedule_id")
+    scheduled_time = schedule_data["scheduled_time"]
+    fire_at = parse_schedule_time(scheduled_time)
+
+    if not await asyncio.to_thread(claim_execution, schedule_id, scheduled_time):
+        return None
+
+    await _sleep_until(fire_at)
+
+    async with semaphore:
+        lateness = (_now() - fire_at).total_seconds()
+        triggered = await trigger_scheduled_feed_async(
+            schedule_id,
+            schedule_data.get("feed_cycles", 1),
+            schedule_data.get("requested_by", "scheduler"),
+            schedule_data.get("thing_id")
+        )
+        success = await asyncio.to_thread(record_execution, schedule_data, [(fire_at, triggered, lateness)])
+    return success, lateness
+
+
+async def dispatch_lookahead(schedules: list[dict], semaphore: asyncio.Semaphore) -> list[tuple[bool, float] | None]:
+    """Dispatch every reserved schedule concurrently, each as an in-process delayed task."""
+    ordered = sorted(schedules, key=lambda s: parse_schedule_time(s["scheduled_time"]))
+    tasks = [asyncio.create_task(dispatch_at_scheduled_time(schedule, semaphore)) for schedule in ordered]
+    return list(await asyncio.gather(*tasks))
+
+
+async def run_schedules(
+    due_schedules: list[tuple[dict, ExecutionPlan]],
+    upcoming_schedules: list[dict],
+    concurrency: int = PUBLISH_CONCURRENCY
+) -> list[tuple[bool, float | None] | None]:
+    """
+    Run catch-up and lookahead dispatch together on one event loop.
+
+    Both share one semaphore, so at most `concurrency` schedules are dispatching at a
+    time, and a long catch-up does not delay the lookahead tasks' wait for their second.
+
+    Returns:
+        Outcomes of the due schedules followed by those of the upcoming ones
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    due, upcoming = await asyncio.gather(
+        execute_due_schedules(due_schedules, semaphore),
+        dispatch_lookahead(upcoming_schedules, semaphore)
+    )
+    return due + upcoming
+
+
+def recurrence_rule(schedule_data: dict) -> dict:
+    """Recurrence arguments for app.core.scheduler taken from a schedule item."""
+    wall_clock_time = schedule_data.get("wall_clock_time")
+    return {
+        "cron_expression": schedule_data.get("cron_expression"),
+        "timezone": schedule_data.get("timezone", "UTC"),
+        "wall_clock_anchor": datetime.fromisoformat(wall_clock_time) if wall_clock_time else None
+    }
+
+
+def plan_schedule(schedule_data: dict, current_time: datetime, policy: CatchUpPolicy) -> ExecutionPlan | None:
+    """
+    Plan a schedule whose scheduled_time has passed.
+
+    Args:
+        schedule_data: Schedule item (already converted from DynamoDB types)
+        current_time: Current UTC time
+        policy: Catch-up policy for missed occurrences
+
+    Returns:
+        ExecutionPlan, or None if the schedule has nothing to fire or skip yet
+    """
+    scheduled_dt = parse_schedule_time(schedule_data["scheduled_time"])
+    if scheduled_dt > current_time:
+        return None
+
+    last_executed_at = schedule_data.get("last_executed_at")
+    plan = plan_execution(
+        scheduled_dt,
+        schedule_data.get("recurrence", "none"),
+        current_time,
+        last_executed_at=parse_schedule_time(last_executed_at) if last_executed_at else None,
+        policy=policy,
+        grace=timedelta(minutes=MAX_OVERDUE_MINUTES),
+        **recurrence_rule(schedule_data)
+    )
+    return plan if plan.has_work else None
+
+
 def handler(event, context):
     """
     AWS Lambda handler for executing scheduled feeds.
@@ -278,97 +682,104 @@ def handler(event, context):
 
     This function:
     1. Queries all enabled schedules from DynamoDB
-    2. Checks which schedules are due for execution
-    3. Publishes MQTT commands to the IoT device
+    2. Checks which schedules are due for execution (or due within the lookahead window)
+    3. Publishes MQTT commands to the IoT device, at the exact scheduled second in lookahead mode
     4. Updates schedules (disable one-time, or update recurring)
+
+    Every dispatch is first claimed with a conditional update on (schedule_id, scheduled_time),
+    so overlapping or parallel invocations never fire the same occurrence twice.
+
+    Occurrences missed while the executor was not running are handled by the catch-up policy
+    ({"catch_up_policy": "latest" | "all" | "skip"}), and recurring schedules jump straight to
+    their next future occurrence instead of advancing one step per invocation.
+
+    The event may override the lookahead window with {"lookahead_seconds": N} and select a
+    partition with {"worker_index": i, "worker_count": N} (one EventBridge target per worker).
     """
-    print(f"Schedule executor invoked at {datetime.utcnow().isoformat()}")
+    print(f"Schedule executor invoked at {_now().isoformat()}")
     print(f"Event: {json.dumps(event)}")
 
-    current_time = datetime.utcnow()
+    current_time = _now()
+    event = event or {}
     executed_count = 0
     failed_count = 0
 
     try:
-        # Scan for all enabled schedules
-        response = schedule_table.scan(
-            FilterExpression="enabled = :enabled",
-            ExpressionAttributeValues={":enabled": True}
-        )
-
-        schedules = response.get("Items", [])
-        print(f"Found {len(schedules)} enabled schedule(s)")
-
+        # Parsed inside the try so a malformed event gets the normal error response
+        lookahead_seconds = int(event.get("lookahead_seconds", SCHEDULE_LOOKAHEAD_SECONDS))
+        worker_count = max(1, int(event.get("worker_count", EXECUTOR_WORKER_COUNT)))
+        worker_index = int(event.get("worker_index", 0))
+        strategy = event.get("partition_strategy", EXECUTOR_PARTITION_STRATEGY)
+        catch_up_policy = CatchUpPolicy(event.get("catch_up_policy", SCHEDULE_CATCH_UP_POLICY))
+
+        # Scan for the enabled schedules in this worker's partition
+        schedules = scan_enabled_schedules(worker_index, worker_count, strategy)
+        print(f"Found {len(schedules)} enabled schedule(s) for worker {worker_index + 1}/{worker_count}")
+
+        due_schedules = []
+        upcoming_schedules = []
         for schedule in schedules:
             schedule_data = convert_decimal(schedule)
             schedule_id = schedule_data.get("schedule_id")
             scheduled_time = schedule_data.get("scheduled_time")
-            feed_cycles = schedule_data.get("feed_cycles", 1)
-            recurrence = schedule_data.get("recurrence", "none")
-            requested_by = schedule_data.get("requested_by", "scheduler")
             last_executed_at = schedule_data.get("last_executed_at")
 
             print(f"\nChecking schedule {schedule_id}:")
             print(f"   Scheduled time: {scheduled_time}")
             print(f"   Last executed: {last_executed_at}")
-            print(f"   Feed cycles: {feed_cycles}")
-            print(f"   Recurrence: {recurrence}")
-            print(f"   Requested by: {requested_by}")
-
-            # Check if this schedule is due for execution
-            if is_schedule_due(scheduled_time, current_time, tolerance_minutes=1):
-                # Prevent re-execution: only execute if never executed OR if scheduled_time changed
-                if last_executed_at is None or last_executed_at != scheduled_time:
-                    print(f"Schedule {schedule_id} is due for execution")
-
-                    # Trigger feed (real or simulated based on environment)
-                    if trigger_scheduled_feed(schedule_id, feed_cycles, requested_by):
-                        # Update schedule after successful execution
-                        if update_schedule_after_execution(schedule_id, scheduled_time, recurrence):
-                            executed_count += 1
-                            print(f"Successfully executed schedule {schedule_id}")
-                            log_execution_history(
-                                schedule_id=schedule_id,
-                                scheduled_time=scheduled_time,
-                                status='success',
-                                feed_cycles=feed_cycles,
-                                recurrence=recurrence,
-                                requested_by=requested_by
-                            )
-                        else:
-                            failed_count += 1
-                            print(f"Executed schedule {schedule_id} but failed to update it")
-                            log_execution_history(
-                                schedule_id=schedule_id,
-                                scheduled_time=scheduled_time,
-                                status='failed',
-                                feed_cycles=feed_cycles,
-                                recurrence=recurrence,
-                                requested_by=requested_by,
-                                error_message='Failed to update schedule after execution'
-                            )
-                    else:
-                        failed_count += 1
-                        print(f"Failed to execute schedule {schedule_id}")
-                        log_execution_history(
-                            schedule_id=schedule_id,
-                            scheduled_time=scheduled_time,
-                            status='failed',
-                            feed_cycles=feed_cycles,
-                            recurrence=recurrence,
-                            requested_by=requested_by,
-                            error_message='Failed to trigger feed'
-                        )
-                else:
-                    print(f"Schedule {schedule_id} already executed for this time (last_executed_at={last_executed_at})")
+            print(f"   Feed cycles: {schedule_data.get('feed_cycles', 1)}")
+            print(f"   Recurrence: {schedule_data.get('recurrence', 'none')}")
+            print(f"   Requested by: {schedule_data.get('requested_by', 'scheduler')}")
+
+            try:
+                plan = plan_schedule(schedule_data, current_time, catch_up_policy)
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Error planning schedule {schedule_id}: {e}")
+                continue
+
+            if plan is not None:
+                # Occurrences already passed: fire them (per the catch-up policy) and move on
+                print(
+                    f"Schedule {schedule_id} is due: firing {len(plan.fire_times)}, "
+                    f"skipping {len(plan.skipped)} missed occurrence(s)"
+                )
+                due_schedules.append((schedule_data, plan))
+            elif lookahead_seconds > 0 and is_schedule_due(
+                scheduled_time, current_time, lookahead_seconds=lookahead_seconds
+            ):
+                print(f"Schedule {schedule_id} is due within the lookahead window")
+                upcoming_schedules.append(schedule_data)
             else:
                 print(f"Schedule {schedule_id} not due yet")
 
+        outcomes = asyncio.run(run_schedules(due_schedules, upcoming_schedules)) if due_schedules or upcoming_schedules else []
+
+        lateness = []
+        skipped_count = 0
+        for outcome in outcomes:
+            if outcome is None:
+                skipped_count += 1  # Claimed by an overlapping invocation
+                continue
+            success, lateness_seconds = outcome
+            if lateness_seconds is not None:
+                lateness.append(lateness_seconds)
+            if success:
+                executed_count += 1
+            else:
+                failed_count += 1
+
         # Summary
         summary = {
             "total_schedules": len(schedules),
             "executed": executed_count,
             "failed": failed_count,
+            "claimed_elsewhere": skipped_count,
+            "missed_skipped": sum(len(plan.skipped) for _, plan in due_schedules),
+            "catch_up_policy": catch_up_policy.value,
+            "worker_index": worker_index,
+            "worker_count": worker_count,
+            "lookahead_seconds": lookahead_seconds,
+            "max_lateness_seconds": round(max(lateness), 3) if lateness else None,
             "timestamp": current_time.isoformat()
         }
 
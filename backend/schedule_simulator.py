@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+Schedule Executor Simulator - Standalone Script
+
+Drives the real schedule_executor.handler tick by tick under a fake clock, against
+an in-memory stand-in for the schedule/execution history tables and a stub IoT
+client, and reports how it behaved: per-tick latency, items read, dispatch counts,
+duplicate and missed executions, and lateness percentiles.
+
+Usage:
+    python schedule_simulator.py --schedules 1000 --days 2
+    python schedule_simulator.py --schedules 10000 --days 30 --lookahead-seconds 60 --json
+    python schedule_simulator.py --outage-at-hours 12 --outage-minutes 180 --catch-up-policy latest
+
+No AWS access is needed: nothing leaves the process.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from botocore.exceptions import ClientError
+
+os.environ.setdefault("ENVIRONMENT", "demo")  # No real IoT client
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("DYNAMO_FEED_SCHEDULE_TABLE", "simulated-feed-schedules")
+os.environ.setdefault("SCHEDULE_EXECUTION_HISTORY_TABLE", "simulated-schedule-execution-history")
+
+import schedule_executor
+from app.core.cron import compile_cron
+from app.core.scheduler import due_occurrences
+from app.core.timezones import to_local, to_utc
+
+RECURRENCES = ["none", "daily", "weekly", "monthly", "cron"]
+RECURRENCE_WEIGHTS = [0.2, 0.4, 0.15, 0.1, 0.15]
+TIMEZONES = ["UTC", "America/New_York", "Europe/London", "Australia/Sydney"]
+CRON_EXPRESSIONS = ["0 8,18 * * *", "*/30 * * * *", "15 6-22/4 * * MON-FRI", "0 12 * * SAT,SUN"]
+
+_TOKEN = re.compile(r"\s*(<>|<=|>=|=|<|>|\(|\)|,|:\w+|[A-Za-z_][\w.]*)")
+_COMPARATORS = {
+    "=": lambda a, b: a == b,
+    "<>": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+class FakeClock:
+    """Controllable UTC clock patched over schedule_executor._now and _sleep_until."""
+
+    def __init__(self, start: datetime, time_scale: float = 0.0001):
+        self.current = start
+        self.time_scale = time_scale  # Wall seconds slept per simulated second
+        self.slept_seconds = 0.0  # Wall time spent in sleep_until, excluded from tick latency
+        self._lock = threading.Lock()
+
+    def now(self) -> datetime:
+        return self.current
+
+    def set(self, moment: datetime) -> None:
+        self.current = moment
+
+    async def sleep_until(self, fire_at: datetime) -> None:
+        """
+        Sleep until fire_at on the simulated clock.
+
+        Sleeps a scaled-down amount of real time so concurrent dispatches wake in
+        scheduled order, then moves the clock forward (never backwards).
+        """
+        delay = (fire_at - self.current).total_seconds()
+        if delay > 0:
+            started = time.perf_counter()
+            await asyncio.sleep(delay * self.time_scale)
+            self.slept_seconds += time.perf_counter() - started
+        with self._lock:
+            self.current = max(self.current, fire_at)
+
+
+class InMemoryTable:
+    """
+    Thread-safe stand-in for the boto3 DynamoDB Table resource.
+
+    Supports the calls the executor and the IoT Lambdas make: get_item, paginated
+    (parallel) scans with a filter, and put_item / update_item (SET/REMOVE) with a
+    condition expression and #name placeholders. With stream=True every write is
+    also appended to `stream` as a (event name, old item, new item) change, like a
+    DynamoDB stream with NEW_AND_OLD_IMAGES.
+    """
+
+    def __init__(self, key_name: str, page_size: int = 1000, stream: bool = False):
+        self.key_name = key_name
+        self.page_size = page_size
+        self.items: dict[str, dict] = {}
+        self.items_read = 0
+        self.read_requests = 0
+        self.write_requests = 0
+        self.conditional_failures = 0
+        self.stream: list[tuple[str, dict | None, dict]] | None = [] if stream else None
+        self._lock = threading.Lock()
+
+    def get_item(self, **kwargs) -> dict:
+        key = kwargs["Key"][self.key_name]
+        with self._lock:
+            self.read_requests += 1
+            item = self.items.get(key)
+            if item is None:
+                return {}
+            self.items_read += 1
+            return {"Item": dict(item)}
+
+    def put_item(self, **kwargs) -> dict:
+        item = kwargs["Item"]
+        condition = _resolve_names(kwargs.get("ConditionExpression"), kwargs.get("ExpressionAttributeNames"))
+        with self._lock:
+            self.write_requests += 1
+            old = self.items.get(item[self.key_name])
+            if condition and not evaluate_condition(condition, old or {}, kwargs.get("ExpressionAttributeValues", {})):
+                self._reject("PutItem")
+            self.items[item[self.key_name]] = dict(item)
+            self._record(old, item)
+        return {}
+
+    def scan(self, **kwargs) -> dict:
+        filter_expression = kwargs.get("FilterExpression")
+        values = kwargs.get("ExpressionAttributeValues", {})
+        segment, total_segments = kwargs.get("Segment"), kwargs.get("TotalSegments")
+        start_key = kwargs.get("ExclusiveStartKey")
+        with self._lock:
+            self.read_requests += 1
+            keys = list(self.items)
+            if total_segments:
+                keys = [k for k in keys if zlib.crc32(str(k).encode('utf-8')) % total_segments == segment]
+            start = keys.index(start_key[self.key_name]) + 1 if start_key else 0
+            page = keys[start:start + self.page_size]
+            self.items_read += len(page)
+
+            matched = [
+                dict(self.items[k]) for k in page
+                if filter_expression is None or evaluate_condition(filter_expression, self.items[k], values)
+            ]
+            response = {"Items": matched, "Count": len(matched), "ScannedCount": len(page)}
+            if start + self.page_size < len(keys):
+                response["LastEvaluatedKey"] = {self.key_name: page[-1]}
+            return response
+
+    def update_item(self, **kwargs) -> dict:
+        key = kwargs["Key"][self.key_name]
+        names = kwargs.get("ExpressionAttributeNames")
+        condition = _resolve_names(kwargs.get("ConditionExpression"), names)
+        values = kwargs.get("ExpressionAttributeValues", {})
+        with self._lock:
+            self.write_requests += 1
+            old = self.items.get(key)
+            item = dict(old or kwargs["Key"])
+            if condition and not evaluate_condition(condition, item, values):
+                self._reject("UpdateItem")
+            apply_update(_resolve_names(kwargs["UpdateExpression"], names), item, values)
+            self.items[key] = item
+            self._record(old, item)
+        return {}
+
+    def _reject(self, operation: str) -> None:
+        self.conditional_failures += 1
+        raise ClientError(
+            {"Error": {"Code": "ConditionalCheckFailedException", "Message": "The conditional request failed"}},
+            operation
+        )
+
+    def _record(self, old: dict | None, new: dict) -> None:
+        if self.stream is not None:
+            self.stream.append(("MODIFY" if old else "INSERT", dict(old) if old else None, dict(new)))
+
+
+class StubIoTClient:
+    """Records publishes instead of sending them; can fail a fraction of them."""
+
+    def __init__(self, clock: FakeClock, failure_rate: float = 0.0, seed: int = 0):
+        self.clock = clock
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.attempts = 0
+        self.messages: list[dict] = []
+
+    def publish(self, topic: str, qos: int, payload: str) -> dict:
+        self.attempts += 1
+        if self.random.random() < self.failure_rate:
+            raise ClientError({"Error": {"Code": "ServiceUnavailable", "Message": "Simulated failure"}}, "Publish")
+        self.messages.append({"topic": topic, "qos": qos, "payload": payload, "published_at": self.clock.now()})
+        return {}
+
+
+def _resolve_names(expression: str | None, names: dict | None) -> str | None:
+    """Replace #name placeholders with the attribute names they stand for."""
+    if not expression or not names:
+        return expression
+    return re.sub(r"#\w+", lambda match: names[match.group(0)], expression)
+
+
+def _tokenize(expression: str) -> list[str]:
+    tokens = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _TOKEN.match(expression, position)
+        if not match:
+            raise ValueError(f"Unsupported expression: {expression!r}")
+        tokens.append(match.group(1))
+        position = match.end()
+    return tokens
+
+
+def evaluate_condition(expression: str, item: dict, values: dict) -> bool:
+    """
+    Evaluate a DynamoDB condition/filter expression against an item.
+
+    Supports AND, OR, NOT, parentheses, comparisons and attribute_exists /
+    attribute_not_exists. Comparisons against a missing attribute are false.
+    """
+    tokens = _tokenize(expression)
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take(expected=None):
+        nonlocal position
+        token = tokens[position]
+        if expected and token != expected:
+            raise ValueError(f"Expected {expected!r}, got {token!r} in {expression!r}")
+        position += 1
+        return token
+
+    def operand(token):
+        return (True, values[token]) if token.startswith(":") else (token in item, item.get(token))
+
+    def parse_or():
+        result = parse_and()
+        while peek() == "OR":
+            take()
+            result = parse_and() or result
+        return result
+
+    def parse_and():
+        result = parse_factor()
+        while peek() == "AND":
+            take()
+            result = parse_factor() and result
+        return result
+
+    def parse_factor():
+        word = take()
+        if word == "NOT":
+            return not parse_factor()
+        if word == "(":
+            result = parse_or()
+            take(")")
+            return result
+        if word in ("attribute_exists", "attribute_not_exists"):
+            take("(")
+            name = take()
+            take(")")
+            return (name in item) == (word == "attribute_exists")
+        comparator = take()
+        if comparator not in _COMPARATORS:
+            raise ValueError(f"Unsupported comparator {comparator!r} in {expression!r}")
+        (left_present, left), (right_present, right) = operand(word), operand(take())
+        return left_present and right_present and _COMPARATORS[comparator](left, right)
+
+    result = parse_or()
+    if peek() is not None:
+        raise ValueError(f"Unexpected {peek()!r} in {expression!r}")
+    return result
+
+
+def apply_update(expression: str, item: dict, values: dict) -> None:
+    """Apply a 'SET a = :x, b = :y REMOVE c, d' update expression to an item in place."""
+    for action, clause in re.findall(r"\b(SET|REMOVE)\b\s+(.*?)(?=\s+\b(?:SET|REMOVE)\b|$)", expression.strip()):
+        for part in clause.split(","):
+            if action == "SET":
+                name, value = (side.strip() for side in part.split("="))
+                item[name] = values[value]
+            else:
+                item.pop(part.strip(), None)
+
+
+def percentile(samples: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile (None for no samples)."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(samples: list[float], digits: int = 3) -> dict:
+    """p50/p90/p99/max of the samples, rounded (None for no samples)."""
+    return {
+        "p50": _round(percentile(samples, 50), digits),
+        "p90": _round(percentile(samples, 90), digits),
+        "p99": _round(percentile(samples, 99), digits),
+        "max": _round(max(samples) if samples else None, digits),
+    }
+
+
+def _round(value: float | None, digits: int) -> float | None:
+    return round(value, digits) if value is not None else None
+
+
+def generate_schedules(count: int, start: datetime, span: timedelta, seed: int = 0) -> list[dict]:
+    """Random enabled schedules whose first occurrence falls inside the simulated span."""
+    rng = random.Random(seed)
+    seconds = max(1, int(span.total_seconds()))
+    schedules = []
+    for index in range(count):
+        first = start + timedelta(seconds=rng.randrange(seconds))
+        schedule = {
+            "schedule_id": f"sim-{index:06d}",
+            "recurrence": rng.choices(RECURRENCES, RECURRENCE_WEIGHTS)[0],
+            "feed_cycles": rng.randint(1, 3),
+            "enabled": True,
+            "requested_by": "simulator@example.com",
+        }
+        schedule["timezone"] = timezone = rng.choice(TIMEZONES)
+        schedule["wall_clock_time"] = to_local(first, timezone).isoformat()
+        if schedule["recurrence"] == "cron":
+            # Cron schedules store their first matching slot, as app.crud.schedule does
+            schedule["cron_expression"] = rng.choice(CRON_EXPRESSIONS)
+            local = compile_cron(schedule["cron_expression"]).next_after(to_local(first, timezone) - timedelta(seconds=1))
+            first = to_utc(local, timezone)
+        schedule["scheduled_time"] = first.isoformat() + "Z"
+        schedules.append(schedule)
+    return schedules
+
+
+def run_simulation(
+    schedules: int = 1000,
+    days: float = 2,
+    tick_seconds: int = 60,
+    lookahead_seconds: int = 0,
+    workers: int = 1,
+    partition_strategy: str = "segment",
+    catch_up_policy: str = "skip",
+    publish_failure_rate: float = 0.0,
+    outage_at_hours: float | None = None,
+    outage_minutes: float = 0,
+    page_size: int = 1000,
+    time_scale: float = 0.0001,
+    start: datetime = datetime(2025, 1, 1),
+    seed: int = 0,
+) -> dict:
+    """
+    Run schedule_executor.handler over a simulated period and report its behaviour.
+
+    Every tick invokes the handler once per worker at the simulated tick time. Executor
+    output is discarded. An outage window skips the ticks inside it, as if EventBridge or
+    the Lambda were down.
+
+    Returns:
+        dict: Report with tick latency, items read, dispatch counts, duplicates, missed
+              executions and lateness percentiles
+    """
+    span = timedelta(days=days)
+    clock = FakeClock(start, time_scale=time_scale)
+    schedule_table = InMemoryTable("schedule_id", page_size=page_size)
+    history_table = InMemoryTable("execution_id")
+    iot = StubIoTClient(clock, failure_rate=publish_failure_rate, seed=seed)
+
+    seeded = generate_schedules(schedules, start, span, seed=seed)
+    for item in seeded:
+        schedule_table.put_item(Item=item)
+
+    async def trigger(schedule_id: str, feed_cycles: int, requested_by: str, thing_id: str | None = None) -> bool:
+        payload = {
+            "command": "FEED_NOW",
+            "feed_cycles": feed_cycles,
+            "mode": "scheduled",
+            "requested_by": requested_by,
+            "schedule_id": schedule_id,
+        }
+        try:
+            iot.publish(topic=f"petfeeder/{thing_id or 'simulated-feeder'}/commands", qos=1, payload=json.dumps(payload))
+            return True
+        except ClientError:
+            return False
+
+    outage_start = start + timedelta(hours=outage_at_hours) if outage_at_hours is not None else None
+    outage_end = outage_start + timedelta(minutes=outage_minutes) if outage_start else None
+
+    tick_latency_ms = []
+    items_read_per_tick = []
+    ticks = 0
+    last_tick = start
+    tick_count = int(span.total_seconds() // tick_seconds)
+
+    with patch.object(schedule_executor, "schedule_table", schedule_table), \
+            patch.object(schedule_executor, "execution_history_table", history_table), \
+            patch.object(schedule_executor, "_now", clock.now), \
+            patch.object(schedule_executor, "_sleep_until", clock.sleep_until), \
+            patch.object(schedule_executor, "trigger_scheduled_feed_async", trigger), \
+            contextlib.redirect_stdout(io.StringIO()) as executor_output:
+        for tick in range(tick_count + 1):
+            tick_time = start + timedelta(seconds=tick * tick_seconds)
+            if outage_start and outage_start <= tick_time < outage_end:
+                continue
+
+            for worker_index in range(workers):
+                clock.set(tick_time)
+                items_before = schedule_table.items_read
+                slept_before = clock.slept_seconds
+                started = time.perf_counter()
+                schedule_executor.handler({
+                    "lookahead_seconds": lookahead_seconds,
+                    "worker_index": worker_index,
+                    "worker_count": workers,
+                    "partition_strategy": partition_strategy,
+                    "catch_up_policy": catch_up_policy,
+                }, None)
+                elapsed = time.perf_counter() - started - (clock.slept_seconds - slept_before)
+                tick_latency_ms.append(elapsed * 1000)
+                items_read_per_tick.append(schedule_table.items_read - items_before)
+                # Drop the executor's log output as we go so long runs don't hold it in memory
+                executor_output.seek(0)
+                executor_output.truncate()
+
+            ticks += 1
+            last_tick = tick_time
+
+    # Ground truth: every occurrence the executor has had a chance to reach by the last tick
+    horizon = last_tick + timedelta(seconds=lookahead_seconds)
+    expected = {
+        (item["schedule_id"], occurrence.isoformat() + "Z")
+        for item in seeded
+        for occurrence in due_occurrences(
+            schedule_executor.parse_schedule_time(item["scheduled_time"]), item["recurrence"],
+            horizon, limit=int(span.total_seconds() // 60) + 2, cron_expression=item.get("cron_expression"),
+            timezone=item["timezone"], wall_clock_anchor=datetime.fromisoformat(item["wall_clock_time"])
+        )
+    }
+
+    records = list(history_table.items.values())
+    fired = [(r["schedule_id"], r["scheduled_time"]) for r in records if r["status"] == "success"]
+    fired_once = set(fired)
+    lateness = [float(r["lateness_seconds"]) for r in records if r["status"] == "success" and "lateness_seconds" in r]
+
+    return {
+        "schedules": schedules,
+        "simulated_days": days,
+        "ticks": ticks,
+        "invocations": len(tick_latency_ms),
+        "workers": workers,
+        "lookahead_seconds": lookahead_seconds,
+        "catch_up_policy": catch_up_policy,
+        "tick_latency_ms": {**summarize(tick_latency_ms), "total": round(sum(tick_latency_ms), 3)},
+        "items_read": {
+            "total": schedule_table.items_read,
+            "per_tick_mean": round(sum(items_read_per_tick) / len(items_read_per_tick), 1) if items_read_per_tick else 0,
+            "scan_requests": schedule_table.read_requests,
+        },
+        "writes": schedule_table.write_requests + history_table.write_requests,
+        "conditional_check_failures": schedule_table.conditional_failures,
+        "dispatches": {
+            "published": len(iot.messages),
+            "publish_attempts": iot.attempts,
+            "success": len(fired),
+            "failed": sum(1 for r in records if r["status"] == "failed"),
+            "skipped_occurrences": sum(int(r.get("missed_occurrences", 0)) for r in records),
+        },
+        "expected_occurrences": len(expected),
+        "duplicates": len(fired) - len(fired_once),
+        "missed": len(expected - fired_once),
+        "lateness_seconds": summarize(lateness),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Simulate the schedule executor under a fake clock and report its behaviour'
+    )
+    parser.add_argument('--schedules', type=int, default=1000, help='Number of schedules (default: 1000)')
+    parser.add_argument('--days', type=float, default=2, help='Simulated period in days (default: 2)')
+    parser.add_argument('--tick-seconds', type=int, default=60, help='EventBridge interval (default: 60)')
+    parser.add_argument('--lookahead-seconds', type=int, default=0, help='Executor lookahead window (default: 0)')
+    parser.add_argument('--workers', type=int, default=1, help='Executor workers per tick (default: 1)')
+    parser.add_argument(
+        '--partition-strategy', choices=['segment', 'hash'], default='segment',
+        help='Worker partitioning (default: segment)'
+    )
+    parser.add_argument(
+        '--catch-up-policy', choices=['skip', 'latest', 'all'], default='skip',
+        help='Missed-occurrence policy (default: skip)'
+    )
+    parser.add_argument('--publish-failure-rate', type=float, default=0.0, help='Fraction of failed publishes')
+    parser.add_argument('--outage-at-hours', type=float, default=None, help='Start of an executor outage')
+    parser.add_argument('--outage-minutes', type=float, default=0, help='Length of the executor outage')
+    parser.add_argument('--page-size', type=int, default=1000, help='Items per scan page (default: 1000)')
+    parser.add_argument(
+        '--start', type=datetime.fromisoformat, default=datetime(2025, 1, 1),
+        help='Simulated start time, naive UTC (default: 2025-01-01; try 2025-03-08 for a DST change)'
+    )
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    args = parser.parse_args()
+
+    report = run_simulation(
+        schedules=args.schedules,
+        days=args.days,
+        tick_seconds=args.tick_seconds,
+        lookahead_seconds=args.lookahead_seconds,
+        workers=args.workers,
+        partition_strategy=args.partition_strategy,
+        catch_up_policy=args.catch_up_policy,
+        publish_failure_rate=args.publish_failure_rate,
+        outage_at_hours=args.outage_at_hours,
+        outage_minutes=args.outage_minutes,
+        page_size=args.page_size,
+        start=args.start,
+        seed=args.seed,
+    )
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"\n{'='*60}")
+        print(f"Schedule executor simulation: {report['schedules']} schedules, {report['simulated_days']} day(s)")
+        print(f"{'='*60}")
+        for key, value in report.items():
+            print(f"  {key}: {value}")
+        print(f"{'='*60}\n")
+
+    return 1 if report["duplicates"] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,6 +7,8 @@ from decimal import Decimal
 import boto3
 from botocore.exceptions import ClientError
 
+from app.core.iot_codec import PAYLOAD_FORMAT_JSON, decode_device_message
+
 DYNAMODB_TABLE_NAME = os.environ.get("DEVICE_STATUS_TABLE_NAME")
 IOT_THING_ID = os.environ.get("IOT_THING_ID")
 AWS_REGION = os.environ.get("AWS_REGION", os.environ.get("AWS_DEFAULT_REGION", "us-east-1"))
@@ -31,23 +33,18 @@ def handler(event, context):
     print(f"Received event: {json.dumps(event)}")
 
     try:
-        # The IoT rule "SELECT * FROM 'petfeeder/status'" forwards the entire MQTT payload
-        # as the event body. It's usually a JSON string.
-        # Ensure the event structure matches what the IoT rule sends.
-        # For a simple SELECT *, the MQTT payload is directly the event body.
-        # If the payload is a string, parse it. If it's already an object, use it directly.
-        if isinstance(event, str):
-            payload = json.loads(event)
-        elif isinstance(event, dict):
-            payload = event
-        else:
-            raise ValueError("Unexpected event format. Expected string or dict.")
+        # The IoT rule "SELECT encode(*, 'base64') AS raw, topic(2) AS thing_id FROM 'petfeeder/+/status'"
+        # forwards the MQTT payload, JSON or compact binary, plus the device's thing name.
+        # Events that already carry the JSON fields (e.g. from a "SELECT *" rule) are used directly.
+        payload = decode_device_message(event)
 
         feeder_state = payload.get("feeder_state", "unknown")
         network_status = payload.get("network_status", "unknown")
         message = payload.get("message", "No message")
         trigger_method = payload.get("trigger_method", "unknown")
         current_weight_g = payload.get("current_weight_g", 0.0)
+        # Payloads without a thing_id (e.g. from a rule that does not add it) belong to the deployment's device
+        thing_id = payload.get("thing_id") or IOT_THING_ID
 
         current_timestamp = datetime.utcnow().isoformat() + "Z"  # ISO 8601 with Z for UTC
 
@@ -55,19 +52,45 @@ def handler(event, context):
         # The 'thing_id' is the partition key for the DeviceStatus table.
         # DynamoDB requires Decimal type for numeric values, not float
         item = {
-            'thing_id': IOT_THING_ID,
+            'thing_id': thing_id,
             'feeder_state': feeder_state,
             'network_status': network_status,
             'message': message,
             'trigger_method': trigger_method,
             'current_weight_g': Decimal(str(current_weight_g)),  # Convert to Decimal for DynamoDB
-            'last_updated': current_timestamp
+            'last_updated': current_timestamp,
+            # The format this device publishes in is also the one it accepts commands in
+            'payload_format': payload.get("payload_format", PAYLOAD_FORMAT_JSON)
         }
 
-        # PutItem will create a new item or replace an existing item with the same primary key.
-        table.put_item(Item=item)
+        # Firmware that supports versioned config reports what it is running with,
+        # which the API compares with the desired config to publish only deltas
+        reported_config = payload.get("config")
+        if isinstance(reported_config, dict):
+            item['reported_config_version'] = int(reported_config.get("version", 0))
+            item['reported_config'] = {
+                key: Decimal(str(value)) if isinstance(value, int | float) else value
+                for key, value in reported_config.items()
+                if key != "version"
+            }
+            item['reported_config_at'] = current_timestamp
+
+        # A reply to PUT /api/v1/status echoes the API's request id, which the API polls for
+        request_id = payload.get("request_id")
+        if request_id:
+            item['last_request_id'] = str(request_id)
+
+        # SET only the attributes in this message, so last_request_id survives the unsolicited
+        # status updates that may land between a reply and the API reading it
+        attributes = {key: value for key, value in item.items() if key != 'thing_id'}
+        table.update_item(
+            Key={'thing_id': thing_id},
+            UpdateExpression="SET " + ", ".join(f"#{key} = :{key}" for key in attributes),
+            ExpressionAttributeNames={f"#{key}": key for key in attributes},
+            ExpressionAttributeValues={f":{key}": value for key, value in attributes.items()}
+        )
 
-        print(f"Successfully updated device status for {IOT_THING_ID}: weight={current_weight_g}g, state={feeder_state}")
+        print(f"Successfully updated device status for {thing_id}: weight={current_weight_g}g, state={feeder_state}")
         return {
             'statusCode': 200,
             'body': json.dumps('Device status updated successfully!')
@@ -85,7 +108,7 @@ def handler(event, context):
             'statusCode': 500,
             'body': json.dumps(f"DynamoDB error: {e}")
         }
-    except ValueError as e:
+    except (TypeError, ValueError) as e:
         print(f"Validation Error: {e}")
         return {
             'statusCode': 400,
@@ -111,3 +111,38 @@ def mock_lambda_context():
     context.invoked_function_arn = "arn:aws:lambda:us-east-2:123456789:function:test"
     context.aws_request_id = "test-request-id"
     return context
+
+
+@pytest.fixture(autouse=True)
+def reset_auth_caches():
+    """Clear in-process auth and config caches so tests never see each other's entries."""
+    from app.core import auth, jwt_verifier
+    from app.crud.config import config_cache
+    config_cache.clear()
+    jwt_verifier._verified_tokens.clear()
+    jwt_verifier._last_unknown_kid_refresh = 0
+    jwt_verifier._jwks_last_attempt = 0
+    auth._group_cache.clear()
+    auth._machine_clients.clear()
+    yield
+    config_cache.clear()
+    jwt_verifier._verified_tokens.clear()
+    auth._group_cache.clear()
+    auth._machine_clients.clear()
+    jwt_verifier._public_keys = {}
+    jwt_verifier._public_keys_source = None
+
+
+@pytest.fixture(autouse=True)
+def reset_iot_clients():
+    """Make each test build its own hardware adapter and IoT clients, with no cached group members and a closed circuit."""
+    from app.core import hardware_adapter, iot
+    hardware_adapter.reset_hardware_adapter()
+    iot._iot_client = iot._iot_control_client = None
+    iot._group_members.clear()
+    iot.publish_policy.reset()
+    yield
+    hardware_adapter.reset_hardware_adapter()
+    iot._iot_client = iot._iot_control_client = None
+    iot._group_members.clear()
+    iot.publish_policy.reset()
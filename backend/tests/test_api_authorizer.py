@@ -0,0 +1,88 @@
+"""
+Tests for the API Gateway token authorizer Lambda.
+"""
+from unittest.mock import patch
+
+import pytest
+from jwt.exceptions import ExpiredSignatureError, InvalidSignatureError
+
+from app.core.auth import Principal
+
+METHOD_ARN = "arn:aws:execute-api:us-east-1:123456789012:abc123/dev/POST/api/v1/feeds"
+
+
+def authorizer_event(authorization):
+    """TOKEN authorizer event for POST /api/v1/feeds."""
+    return {'type': 'TOKEN', 'authorizationToken': authorization, 'methodArn': METHOD_ARN}
+
+
+class TestApiAuthorizer:
+    """Test cases for the api_authorizer handler."""
+
+    @patch('api_authorizer.verify_machine_token')
+    def test_machine_token_is_allowed_with_its_scopes(self, mock_verify_machine):
+        """Test a valid machine token gets an Allow policy for the whole stage."""
+        from api_authorizer import handler
+        mock_verify_machine.return_value = Principal(
+            email='machine:bot', client_id='bot', scopes=('feed:write', 'status:read')
+        )
+
+        result = handler(authorizer_event('Bearer pfm1.bot.1.feed:write.sig'), None)
+
+        mock_verify_machine.assert_called_once_with('pfm1.bot.1.feed:write.sig')
+        assert result['principalId'] == 'machine:bot'
+        statement = result['policyDocument']['Statement'][0]
+        assert (statement['Effect'], statement['Resource']) == (
+            'Allow', 'arn:aws:execute-api:us-east-1:123456789012:abc123/dev/*/*'
+        )
+        assert result['context'] == {'client_id': 'bot', 'scopes': 'feed:write status:read'}
+
+    @patch('api_authorizer.verify_jwt_token')
+    def test_cognito_token_passes_its_claims(self, mock_verify_jwt):
+        """Test a valid Cognito token is allowed with the email and groups the API reads."""
+        from api_authorizer import handler
+        mock_verify_jwt.return_value = {
+            'sub': 'user-123', 'email': 'admin@example.com', 'cognito:groups': ['admin', 'users'], 'exp': 1900000000
+        }
+
+        result = handler(authorizer_event('Bearer header.payload.signature'), None)
+
+        assert result['principalId'] == 'user-123'
+        assert result['context'] == {'email': 'admin@example.com', 'cognito:groups': 'admin,users', 'exp': 1900000000}
+
+    @patch('api_authorizer.verify_jwt_token')
+    def test_cognito_token_without_groups(self, mock_verify_jwt):
+        """Test a user in no group gets an empty groups string."""
+        from api_authorizer import handler
+        mock_verify_jwt.return_value = {'email': 'user@example.com'}
+
+        result = handler(authorizer_event('Bearer header.payload.signature'), None)
+
+        assert result['principalId'] == 'user@example.com'
+        assert result['context'] == {'email': 'user@example.com', 'cognito:groups': ''}
+
+    @pytest.mark.parametrize("authorization", ['', 'Basic dXNlcjpwYXNz'])
+    def test_missing_bearer_token_is_unauthorized(self, authorization):
+        """Test requests without a bearer token are rejected."""
+        from api_authorizer import Unauthorized, handler
+
+        with pytest.raises(Unauthorized, match='^Unauthorized$'):
+            handler(authorizer_event(authorization), None)
+
+    @patch('api_authorizer.verify_machine_token', side_effect=InvalidSignatureError('mismatch'))
+    def test_invalid_machine_token_is_unauthorized(self, mock_verify_machine):
+        """Test machine tokens that fail verification are rejected."""
+        from api_authorizer import Unauthorized, handler
+
+        with pytest.raises(Unauthorized, match='^Unauthorized$'):
+            handler(authorizer_event('Bearer pfm1.bot.1.feed:write.sig'), None)
+
+    @pytest.mark.parametrize("verify", [ExpiredSignatureError('expired'), None, {'sub': 'user-123'}])
+    def test_unverified_cognito_token_is_unauthorized(self, verify):
+        """Test expired tokens, and tokens that verify to no email, are rejected."""
+        from api_authorizer import Unauthorized, handler
+        side_effect = verify if isinstance(verify, Exception) else None
+
+        with patch('api_authorizer.verify_jwt_token', return_value=verify, side_effect=side_effect):
+            with pytest.raises(Unauthorized, match='^Unauthorized$'):
+                handler(authorizer_event('Bearer header.payload.signature'), None)
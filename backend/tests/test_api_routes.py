@@ -16,6 +16,13 @@ class TestFeedRoutes:
         from app.main import app
         return TestClient(app)
 
+    @pytest.fixture
+    def as_admin(self):
+        """Resolve every request to an admin, who may address the whole fleet."""
+        from app.core.auth import Principal
+        with patch('app.core.auth.resolve_principal', return_value=Principal(email='admin@example.com', is_admin=True)):
+            yield
+
     def test_health_check(self, client):
         """Test health check endpoint."""
         response = client.get("/")
@@ -23,6 +30,27 @@ class TestFeedRoutes:
         data = response.json()
         assert data["status"] == "ok"
 
+    def test_iot_health_reports_circuit_state(self, client):
+        """Test the IoT health check exposes the publish circuit breaker."""
+        from app.core.iot import publish_policy
+
+        assert client.get("/health/iot").json()["iot_publish"]["state"] == "closed"
+
+        for _ in range(publish_policy.breaker.failure_threshold):
+            publish_policy.breaker.record_failure()
+        data = client.get("/health/iot").json()
+
+        assert data["status"] == "degraded"
+        assert (data["iot_publish"]["state"], data["iot_publish"]["state_code"]) == ("open", 2)
+        assert data["iot_publish"]["times_opened"] == 1
+
+    def test_auth_health_reports_token_cache(self, client):
+        """Test the auth health check exposes the verified-token cache counters."""
+        with patch('app.main.get_token_cache_stats', return_value={'size': 2, 'hits': 8, 'misses': 2, 'hit_rate': 0.8}):
+            data = client.get("/health/auth").json()
+
+        assert data == {"status": "ok", "token_cache": {'size': 2, 'hits': 8, 'misses': 2, 'hit_rate': 0.8}}
+
     @patch('app.api.v1.routes.feed.process_feed')
     def test_on_demand_feed_success(self, mock_process, client):
         """Test on-demand feed endpoint."""
@@ -45,6 +73,134 @@ class TestFeedRoutes:
         assert data["feed_id"] == "test-123"
         assert data["status"] == "sent"
 
+    @patch('app.api.v1.routes.feed.process_feed')
+    def test_on_demand_feed_waits_for_result(self, mock_process, client):
+        """Test wait=true passes the timeout in seconds to the service."""
+        mock_process.return_value = {
+            "feed_id": "test-123",
+            "status": "completed",
+            "requested_by": "test@example.com",
+            "mode": "api",
+            "timestamp": "2025-12-13T14:00:00Z",
+            "weight_delta_g": 47.5,
+            "waited_ms": 7420
+        }
+
+        response = client.post("/api/v1/feeds?wait=true&timeout_ms=8000", json={"requested_by": "test@example.com"})
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "completed"
+        assert response.json()["weight_delta_g"] == 47.5
+        assert mock_process.await_args.args[1] == 8.0
+
+    @patch('app.api.v1.routes.feed.process_feed')
+    def test_on_demand_feed_wait_default_timeout(self, mock_process, client):
+        """Test wait=true without timeout_ms uses FEED_WAIT_TIMEOUT_MS and no wait is the default."""
+        mock_process.return_value = {
+            "feed_id": "test-123",
+            "status": "sent",
+            "requested_by": "test@example.com",
+            "mode": "api",
+            "timestamp": "2025-12-13T14:00:00Z"
+        }
+
+        client.post("/api/v1/feeds?wait=true", json={"requested_by": "test@example.com"})
+        client.post("/api/v1/feeds", json={"requested_by": "test@example.com"})
+
+        assert [c.args[1] for c in mock_process.await_args_list] == [15.0, None]
+
+    def test_on_demand_feed_rejects_long_wait(self, client):
+        """Test a wait longer than the API Gateway timeout allows is rejected."""
+        response = client.post("/api/v1/feeds?wait=true&timeout_ms=60000", json={"requested_by": "test@example.com"})
+
+        assert response.status_code == 422
+
+    def test_on_demand_feed_rejects_invalid_thing_id(self, client):
+        """Test a thing_id that could change the MQTT topic is rejected."""
+        response = client.post("/api/v1/feeds", json={"requested_by": "test@example.com", "thing_id": "feeder/#"})
+
+        assert response.status_code == 422
+
+    @patch('app.api.v1.routes.feed.process_feed')
+    def test_on_demand_feed_other_device_needs_fleet_access(self, mock_process, client):
+        """Test a user who may not address the fleet cannot feed another device."""
+        from app.core.auth import Principal
+        with patch('app.core.auth.resolve_principal', return_value=Principal(email='user@example.com')):
+            response = client.post("/api/v1/feeds", json={"requested_by": "user@example.com", "thing_id": "feeder-2"})
+
+        assert response.status_code == 403
+        mock_process.assert_not_called()
+
+    @patch('app.api.v1.routes.feed.process_feed')
+    def test_on_demand_feed_other_device_with_fleet_scope(self, mock_process, client):
+        """Test a machine client with the fleet scope can feed another device."""
+        from app.core.auth import Principal
+        mock_process.return_value = {
+            "feed_id": "test-123", "status": "sent", "requested_by": "machine:bot",
+            "mode": "api", "timestamp": "2025-12-13T14:00:00Z", "thing_id": "feeder-2"
+        }
+        principal = Principal(email='machine:bot', client_id='bot', scopes=('feed:write', 'fleet'))
+        with patch('app.core.auth.resolve_principal', return_value=principal):
+            response = client.post("/api/v1/feeds", json={"requested_by": "machine:bot", "thing_id": "feeder-2"})
+
+        assert response.status_code == 200
+        assert mock_process.call_args.args[0].thing_id == "feeder-2"
+
+    @patch('app.api.v1.routes.feed.process_group_feed')
+    def test_group_feed_needs_fleet_access(self, mock_process, client):
+        """Test a user who may not address the fleet cannot feed a group."""
+        from app.core.auth import Principal
+        with patch('app.core.auth.resolve_principal', return_value=Principal(email='user@example.com')):
+            response = client.post("/api/v1/feeds/groups/kennel-a", json={"requested_by": "user@example.com"})
+
+        assert response.status_code == 403
+        mock_process.assert_not_called()
+
+    @pytest.mark.usefixtures('as_admin')
+    @patch('app.api.v1.routes.feed.process_group_feed')
+    def test_group_feed_success(self, mock_process, client):
+        """Test feeding a device group returns every device's outcome."""
+        mock_process.return_value = {
+            "group": "kennel-a",
+            "requested": 1,
+            "sent": 1,
+            "failed": 0,
+            "denied": 0,
+            "feeds": [{
+                "feed_id": "test-123",
+                "status": "sent",
+                "requested_by": "test@example.com",
+                "mode": "api",
+                "timestamp": "2025-12-13T14:00:00Z",
+                "thing_id": "feeder-1"
+            }]
+        }
+
+        response = client.post("/api/v1/feeds/groups/kennel-a", json={"requested_by": "test@example.com"})
+
+        assert response.status_code == 200
+        assert response.json()["feeds"][0]["thing_id"] == "feeder-1"
+        assert mock_process.call_args.args[0] == "kennel-a"
+
+    @pytest.mark.parametrize("error, status_code", [
+        (LookupError("Device group 'kennel-a' has no devices"), 404),
+        ("ResourceNotFoundException", 404),
+        ("ThrottlingException", 500),
+        (Exception("boom"), 500),
+    ])
+    @pytest.mark.usefixtures('as_admin')
+    @patch('app.api.v1.routes.feed.process_group_feed')
+    def test_group_feed_errors(self, mock_process, client, error, status_code):
+        """Test missing groups map to 404 and other failures to 500."""
+        from botocore.exceptions import ClientError
+        if isinstance(error, str):
+            error = ClientError({'Error': {'Code': error, 'Message': 'x'}}, 'ListThingsInThingGroup')
+        mock_process.side_effect = error
+
+        response = client.post("/api/v1/feeds/groups/kennel-a", json={"requested_by": "test@example.com"})
+
+        assert response.status_code == status_code
+
     @patch('app.api.v1.routes.feed.get_feed_history')
     def test_get_feed_history(self, mock_history, client):
         """Test feed history endpoint."""
@@ -1,5 +1,6 @@
 """Tests for authentication utilities."""
 
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -83,3 +84,425 @@ class TestIsAdmin:
     def test_returns_false_for_empty_email(self):
         """Should return False when email is empty string."""
         assert auth.is_admin('') is False
+
+    @patch('app.core.auth.ENVIRONMENT', 'dev')
+    @patch('app.core.auth.USER_POOL_ID', 'pool-123')
+    @patch('app.core.auth._get_cognito_client')
+    def test_uses_groups_claim_without_cognito_call(self, mock_get_client):
+        """Should decide from the token's groups claim when given."""
+        assert auth.is_admin('admin@example.com', groups=['admin']) is True
+        assert auth.is_admin('user@example.com', groups=[]) is False
+        mock_get_client.assert_not_called()
+
+    @patch('app.core.auth.ENVIRONMENT', 'demo')
+    def test_demo_users_are_admins(self):
+        """Should treat every signed-in user as admin in demo mode."""
+        assert auth.is_admin('user@example.com', groups=[]) is True
+
+
+class TestUserGroupCache:
+    """Tests for the cached group membership lookup."""
+
+    @patch('app.core.auth.USER_POOL_ID', 'pool-123')
+    @patch('app.core.auth._get_cognito_client')
+    def test_lookup_is_cached(self, mock_get_client):
+        """Should call Cognito once per user within the cache TTL."""
+        mock_client = mock_get_client.return_value
+        mock_client.admin_list_groups_for_user.return_value = {'Groups': [{'GroupName': 'admin'}]}
+
+        assert auth.get_user_groups('admin@example.com') == ['admin']
+        assert auth.get_user_groups('admin@example.com') == ['admin']
+        mock_client.admin_list_groups_for_user.assert_called_once_with(
+            Username='admin@example.com', UserPoolId='pool-123'
+        )
+
+    @patch('app.core.auth._get_cognito_client')
+    def test_failed_lookup_is_not_cached(self, mock_get_client):
+        """Should return None on errors and retry on the next call."""
+        from botocore.exceptions import ClientError
+        mock_client = mock_get_client.return_value
+        mock_client.admin_list_groups_for_user.side_effect = ClientError(
+            {'Error': {'Code': 'TooManyRequestsException', 'Message': 'Rate exceeded'}}, 'test'
+        )
+
+        assert auth.get_user_groups('user@example.com') is None
+        assert auth.get_user_groups('user@example.com') is None
+        assert mock_client.admin_list_groups_for_user.call_count == 2
+
+    @patch('app.core.auth.ENVIRONMENT', 'dev')
+    @patch('app.core.auth.USER_POOL_ID', 'pool-123')
+    @patch('app.core.auth._get_cognito_client')
+    @patch('app.core.auth.verify_jwt_token')
+    def test_verified_token_groups_seed_cache(self, mock_verify, mock_get_client):
+        """Should answer is_admin from the groups claim of a verified token."""
+        mock_verify.return_value = {
+            'email': 'admin@example.com', 'cognito:groups': ['admin'], 'exp': time.time() + 3600
+        }
+
+        auth.extract_email_from_token('Bearer valid.token')
+
+        assert auth.is_admin('admin@example.com') is True
+        mock_get_client.assert_not_called()
+
+    def test_token_without_groups_claim_is_not_cached(self):
+        """Should leave users without a groups claim to the Cognito lookup."""
+        auth.remember_token_groups({'email': 'user@example.com'})
+
+        assert len(auth._group_cache) == 0
+
+    @patch('app.core.auth._get_cognito_client')
+    def test_forget_user_groups(self, mock_get_client):
+        """Should drop a user's cached memberships."""
+        auth.remember_token_groups({'email': 'user@example.com', 'cognito:groups': ['admin']})
+        auth.forget_user_groups('user@example.com')
+        mock_get_client.return_value.admin_list_groups_for_user.return_value = {'Groups': []}
+
+        assert auth.get_user_groups('user@example.com') == []
+
+
+class TestResolvePrincipal:
+    """Tests for resolve_principal."""
+
+    def test_anonymous_without_token(self):
+        """Should return an anonymous principal when there is no bearer token."""
+        assert auth.resolve_principal(None) == auth.Principal()
+
+    @patch('app.core.auth.ENVIRONMENT', 'dev')
+    @patch('app.core.auth.USER_POOL_ID', 'pool-123')
+    @patch('app.core.auth._get_cognito_client')
+    @patch('app.core.auth.verify_jwt_token')
+    def test_uses_groups_claim(self, mock_verify, mock_get_client):
+        """Should take groups from the token without calling Cognito."""
+        mock_verify.return_value = {'email': 'admin@example.com', 'cognito:groups': ['admin']}
+
+        principal = auth.resolve_principal('Bearer valid.token')
+
+        assert principal == auth.Principal(email='admin@example.com', groups=('admin',), is_admin=True)
+        mock_get_client.assert_not_called()
+
+    @patch('app.core.auth.ENVIRONMENT', 'dev')
+    @patch('app.core.auth.USER_POOL_ID', 'pool-123')
+    @patch('app.core.auth._get_cognito_client')
+    @patch('app.core.auth.verify_jwt_token')
+    def test_looks_up_groups_once_without_claim(self, mock_verify, mock_get_client):
+        """Should make a single group lookup when the token has no groups claim."""
+        mock_verify.return_value = {'email': 'user@example.com'}
+        mock_client = mock_get_client.return_value
+        mock_client.admin_list_groups_for_user.return_value = {'Groups': [{'GroupName': 'users'}]}
+
+        principal = auth.resolve_principal('Bearer valid.token')
+
+        assert principal == auth.Principal(email='user@example.com', groups=('users',), is_admin=False)
+        mock_client.admin_list_groups_for_user.assert_called_once()
+
+    @patch('app.core.auth.ENVIRONMENT', 'dev')
+    @patch('app.core.auth.USER_POOL_ID', 'pool-123')
+    @patch('app.core.auth._get_cognito_client')
+    @patch('app.core.auth.verify_jwt_token')
+    def test_failed_group_lookup_is_not_admin(self, mock_verify, mock_get_client):
+        """Should treat a user as having no groups when the Cognito lookup fails."""
+        from botocore.exceptions import ClientError
+        mock_verify.return_value = {'email': 'admin@example.com'}
+        mock_get_client.return_value.admin_list_groups_for_user.side_effect = ClientError(
+            {'Error': {'Code': 'InternalErrorException', 'Message': 'Error'}}, 'AdminListGroupsForUser'
+        )
+
+        principal = auth.resolve_principal('Bearer valid.token')
+
+        assert principal == auth.Principal(email='admin@example.com', groups=(), is_admin=False)
+
+    @patch('app.core.auth.ENVIRONMENT', 'demo')
+    @patch('app.core.auth._get_cognito_client')
+    @patch('app.core.auth.verify_jwt_token')
+    def test_demo_mode_skips_group_lookup(self, mock_verify, mock_get_client):
+        """Should not look up groups in demo mode, where every user is admin."""
+        mock_verify.return_value = {'email': 'user@example.com'}
+
+        assert auth.resolve_principal('Bearer valid.token').is_admin is True
+        mock_get_client.assert_not_called()
+
+
+class TestPrincipalDependencies:
+    """Tests for the get_principal and require_admin dependencies."""
+
+    @patch('app.core.auth.resolve_principal')
+    def test_principal_is_memoized_per_request(self, mock_resolve):
+        """Should resolve the principal once per request."""
+        from starlette.requests import Request
+        mock_resolve.return_value = auth.Principal(email='user@example.com')
+        request = Request({'type': 'http', 'headers': []})
+
+        first = auth.get_principal(request, 'Bearer token')
+        second = auth.get_principal(request, 'Bearer token')
+
+        assert first is second
+        mock_resolve.assert_called_once_with('Bearer token', None)
+
+    @patch('app.core.auth.resolve_principal')
+    def test_invalid_token_is_unauthorized(self, mock_resolve):
+        """Should turn token verification failures into a 401."""
+        from starlette.requests import Request
+
+        from app.core.exceptions import SecurityError
+        mock_resolve.side_effect = ExpiredSignatureError("Token expired")
+
+        with pytest.raises(SecurityError) as exc_info:
+            auth.get_principal(Request({'type': 'http', 'headers': []}), 'Bearer expired.token')
+
+        assert exc_info.value.status_code == 401
+
+    @patch('app.core.auth.resolve_principal')
+    def test_machine_clients_are_denied_by_default(self, mock_resolve):
+        """Should refuse machine clients on routes that do not grant a scope."""
+        from starlette.requests import Request
+
+        from app.core.exceptions import SecurityError
+        machine = auth.Principal(email='machine:bot', client_id='bot', scopes=('feed:write',))
+        mock_resolve.return_value = machine
+        request = Request({'type': 'http', 'headers': []})
+
+        with pytest.raises(SecurityError) as exc_info:
+            auth.get_principal(request, 'Bearer pfm1.token')
+
+        assert exc_info.value.status_code == 403
+        assert auth.authenticate(request, 'Bearer pfm1.token') is machine
+
+    def test_require_admin(self):
+        """Should only let admins through."""
+        from app.core.exceptions import SecurityError
+        admin = auth.Principal(email='admin@example.com', is_admin=True)
+
+        assert auth.require_admin(admin) is admin
+        with pytest.raises(SecurityError):
+            auth.require_admin(auth.Principal(email='user@example.com'))
+        with pytest.raises(SecurityError):
+            auth.require_admin(auth.Principal())
+
+
+class TestAuthorizerClaims:
+    """Tests for trusting claims verified by the API Gateway authorizer."""
+
+    @staticmethod
+    def _scope(authorizer: dict) -> dict:
+        return {'type': 'http', 'headers': [], 'aws.event': {'requestContext': {'authorizer': authorizer}}}
+
+    def test_reads_rest_api_cognito_claims(self):
+        """Should read REST API authorizer claims and split the groups string."""
+        claims = auth.get_authorizer_claims(self._scope({
+            'claims': {'email': 'admin@example.com', 'cognito:groups': 'admin,users'}
+        }))
+
+        assert claims == {'email': 'admin@example.com', 'cognito:groups': ['admin', 'users']}
+
+    def test_reads_http_api_jwt_claims(self):
+        """Should read HTTP API JWT authorizer claims with bracketed groups."""
+        claims = auth.get_authorizer_claims(self._scope({
+            'jwt': {'claims': {'email': 'admin@example.com', 'cognito:groups': '[admin users]'}}
+        }))
+
+        assert claims['cognito:groups'] == ['admin', 'users']
+
+    def test_reads_lambda_authorizer_context(self):
+        """Should read the flat context set by the api_authorizer Lambda."""
+        claims = auth.get_authorizer_claims(self._scope({
+            'principalId': 'user-123', 'email': 'admin@example.com', 'cognito:groups': 'admin', 'exp': 1900000000
+        }))
+
+        assert claims['email'] == 'admin@example.com'
+        assert claims['cognito:groups'] == ['admin']
+        assert auth.get_authorizer_claims(self._scope({'principalId': 'machine:bot', 'client_id': 'bot'})) is None
+
+    def test_missing_claims(self):
+        """Should return None outside Lambda or for routes without an authorizer."""
+        assert auth.get_authorizer_claims({'type': 'http'}) is None
+        assert auth.get_authorizer_claims(self._scope({})) is None
+        assert auth.get_authorizer_claims(self._scope({'claims': {'sub': 'user-123'}})) is None
+
+    @patch('app.core.auth.ENVIRONMENT', 'dev')
+    @patch('app.core.auth.USER_POOL_ID', 'pool-123')
+    @patch('app.core.auth.verify_jwt_token')
+    def test_gateway_claims_skip_local_verification(self, mock_verify):
+        """Should build the principal from authorizer claims without verifying the token again."""
+        from starlette.requests import Request
+        request = Request(self._scope({
+            'claims': {'email': 'admin@example.com', 'cognito:groups': 'admin', 'exp': 'Mon Jan 01 00:00:00 UTC 2030'}
+        }))
+
+        principal = auth.get_principal(request, 'Bearer valid.token')
+
+        assert principal == auth.Principal(email='admin@example.com', groups=('admin',), is_admin=True)
+        mock_verify.assert_not_called()
+
+    @patch('app.core.auth.AUTH_MODE', 'local')
+    @patch('app.core.auth.verify_jwt_token')
+    def test_local_mode_ignores_gateway_claims(self, mock_verify):
+        """Should always verify locally in 'local' auth mode."""
+        from starlette.requests import Request
+        mock_verify.return_value = {'email': 'user@example.com', 'cognito:groups': []}
+        request = Request(self._scope({'claims': {'email': 'admin@example.com', 'cognito:groups': 'admin'}}))
+
+        principal = auth.get_principal(request, 'Bearer valid.token')
+
+        assert principal.email == 'user@example.com'
+        mock_verify.assert_called_once_with('valid.token')
+
+
+class TestMachineTokens:
+    """Tests for HMAC-signed machine client tokens."""
+
+    CLIENT = {'secret': 'test-machine-secret', 'scopes': ['feed:write', 'status:read'], 'enabled': True}
+
+    @staticmethod
+    def _table(client):
+        table = MagicMock()
+        table.get_item.return_value = {'Item': {'config_key': 'MACHINE_CLIENT#feeder-bot', 'value': client}}
+        return table
+
+    @patch('app.core.auth.get_config_table')
+    def test_roundtrip(self, mock_get_table):
+        """Should verify an issued token and grant the requested scopes the client holds."""
+        mock_get_table.return_value = self._table(self.CLIENT)
+        token = auth.issue_machine_token('feeder-bot', 'test-machine-secret', ['feed:write', 'schedules:write'])
+
+        principal = auth.verify_machine_token(token)
+
+        assert principal == auth.Principal(
+            email='machine:feeder-bot', client_id='feeder-bot', scopes=('feed:write',)
+        )
+        mock_get_table.return_value.get_item.assert_called_once_with(
+            Key={'config_key': 'MACHINE_CLIENT#feeder-bot'}
+        )
+
+    @patch('app.core.auth.get_config_table')
+    def test_client_record_is_cached(self, mock_get_table):
+        """Should read the client's secret from the table once within the cache TTL."""
+        mock_get_table.return_value = self._table(self.CLIENT)
+        token = auth.issue_machine_token('feeder-bot', 'test-machine-secret', ['feed:write'])
+
+        auth.verify_machine_token(token)
+        auth.verify_machine_token(token)
+
+        mock_get_table.return_value.get_item.assert_called_once()
+
+    @patch('app.core.auth.get_config_table')
+    def test_unknown_client_is_negatively_cached(self, mock_get_table):
+        """Should reject unknown clients and not re-read the table for each attempt."""
+        mock_get_table.return_value.get_item.return_value = {}
+        token = auth.issue_machine_token('ghost', 'whatever', ['feed:write'])
+
+        for _ in range(2):
+            with pytest.raises(InvalidTokenError, match="Unknown or disabled"):
+                auth.verify_machine_token(token)
+
+        mock_get_table.return_value.get_item.assert_called_once()
+
+    @patch('app.core.auth.get_config_table')
+    def test_disabled_client_is_rejected(self, mock_get_table):
+        """Should reject tokens of a revoked client."""
+        mock_get_table.return_value = self._table({**self.CLIENT, 'enabled': False})
+
+        with pytest.raises(InvalidTokenError):
+            auth.verify_machine_token(auth.issue_machine_token('feeder-bot', 'test-machine-secret', []))
+
+    @patch('app.core.auth.get_config_table')
+    def test_wrong_secret_is_rejected(self, mock_get_table):
+        """Should reject tokens signed with another secret."""
+        from jwt.exceptions import InvalidSignatureError
+        mock_get_table.return_value = self._table(self.CLIENT)
+
+        with pytest.raises(InvalidSignatureError):
+            auth.verify_machine_token(auth.issue_machine_token('feeder-bot', 'guessed-secret', ['feed:write']))
+
+    @patch('app.core.auth.get_config_table')
+    def test_tampered_scopes_are_rejected(self, mock_get_table):
+        """Should reject a token whose scopes were edited after signing."""
+        from jwt.exceptions import InvalidSignatureError
+        mock_get_table.return_value = self._table(self.CLIENT)
+        prefix, client_id, expires, _, signature = auth.issue_machine_token(
+            'feeder-bot', 'test-machine-secret', ['status:read']
+        ).split('.')
+
+        with pytest.raises(InvalidSignatureError):
+            auth.verify_machine_token('.'.join([prefix, client_id, expires, 'feed:write', signature]))
+
+    def test_expired_token_is_rejected(self):
+        """Should reject expired tokens before loading the client."""
+        token = auth.issue_machine_token('feeder-bot', 'test-machine-secret', ['feed:write'], ttl_seconds=-1)
+
+        with pytest.raises(ExpiredSignatureError):
+            auth.verify_machine_token(token)
+
+    def test_malformed_token_is_rejected(self):
+        """Should reject tokens that do not have the machine token layout."""
+        for token in ('pfm1.only.three', 'xxx1.bot.123.feed:write.sig', 'pfm1.bot.soon.feed:write.sig'):
+            with pytest.raises(InvalidTokenError, match="Malformed"):
+                auth.verify_machine_token(token)
+
+    @patch('app.core.auth.get_config_table')
+    def test_table_errors_are_not_cached(self, mock_get_table):
+        """Should treat a failed lookup as unknown without caching it."""
+        from botocore.exceptions import ClientError
+        mock_get_table.return_value.get_item.side_effect = ClientError(
+            {'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': 'Slow down'}}, 'GetItem'
+        )
+
+        assert auth.get_machine_client('feeder-bot') is None
+        assert auth.get_machine_client('feeder-bot') is None
+        assert mock_get_table.return_value.get_item.call_count == 2
+
+    @patch('app.core.auth.get_config_table')
+    def test_forget_machine_client(self, mock_get_table):
+        """Should re-read a client after its cached record is dropped."""
+        mock_get_table.return_value = self._table(self.CLIENT)
+        auth.get_machine_client('feeder-bot')
+        auth.forget_machine_client('feeder-bot')
+        auth.get_machine_client('feeder-bot')
+
+        assert mock_get_table.return_value.get_item.call_count == 2
+
+    @patch('app.core.auth.verify_jwt_token')
+    @patch('app.core.auth.get_config_table')
+    def test_resolve_principal_routes_machine_tokens(self, mock_get_table, mock_verify):
+        """Should verify machine tokens with HMAC instead of as JWTs."""
+        mock_get_table.return_value = self._table(self.CLIENT)
+        token = auth.issue_machine_token('feeder-bot', 'test-machine-secret', ['status:read'])
+
+        principal = auth.resolve_principal(f'Bearer {token}')
+
+        assert principal.client_id == 'feeder-bot'
+        mock_verify.assert_not_called()
+
+    def test_require_scope(self):
+        """Should hold machine clients to their scopes and leave users alone."""
+        from app.core.exceptions import SecurityError
+        check = auth.require_scope('feed:write')
+        machine = auth.Principal(email='machine:bot', client_id='bot', scopes=('feed:write',))
+        user = auth.Principal(email='user@example.com')
+
+        assert check(machine) is machine
+        assert check(user) is user
+        with pytest.raises(SecurityError):
+            check(auth.Principal(email='machine:bot', client_id='bot', scopes=('status:read',)))
+
+
+class TestDeviceAccess:
+    """Tests for check_device_access."""
+
+    def test_deployment_device_open_to_every_caller(self):
+        """Should let anyone address the deployment's own device."""
+        for thing_id in (None, 'test-thing-id'):
+            auth.check_device_access(auth.Principal(email='user@example.com'), thing_id)
+
+    def test_other_devices_need_admin_or_fleet_scope(self):
+        """Should only let admins and fleet-scoped machine clients name another device."""
+        from app.core.exceptions import SecurityError
+
+        auth.check_device_access(auth.Principal(email='admin@example.com', is_admin=True), 'feeder-2')
+        auth.check_device_access(auth.Principal(email='machine:bot', client_id='bot', scopes=('fleet',)), 'feeder-2')
+        for principal in (
+            auth.Principal(),
+            auth.Principal(email='user@example.com'),
+            auth.Principal(email='machine:bot', client_id='bot', scopes=('feed:write',)),
+        ):
+            with pytest.raises(SecurityError):
+                auth.check_device_access(principal, 'feeder-2')
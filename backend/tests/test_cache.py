@@ -0,0 +1,197 @@
+"""Tests for the in-process TTL/LRU cache."""
+
+from unittest.mock import MagicMock, patch
+
+from app.core.cache import ConfigCache, TTLCache
+
+
+class TestTTLCache:
+    """Tests for TTLCache."""
+
+    def test_get_returns_default_for_missing_key(self):
+        """Should return the default and count a miss."""
+        cache = TTLCache(maxsize=2, ttl=60)
+
+        assert cache.get('missing', 'default') == 'default'
+        assert cache.misses == 1
+
+    @patch('app.core.cache.time.time')
+    def test_entry_expires_after_ttl(self, mock_time):
+        """Should drop entries once the cache TTL has passed."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        mock_time.return_value = 1000
+        cache.set('key', 'value')
+
+        mock_time.return_value = 1059
+        assert cache.get('key') == 'value'
+        mock_time.return_value = 1060
+        assert cache.get('key') is None
+        assert len(cache) == 0
+
+    @patch('app.core.cache.time.time')
+    def test_expires_at_is_capped_by_ttl(self, mock_time):
+        """Should use the earlier of expires_at and the cache TTL."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        mock_time.return_value = 1000
+        cache.set('early', 'value', expires_at=1010)
+        cache.set('late', 'value', expires_at=5000)
+
+        mock_time.return_value = 1010
+        assert cache.get('early') is None
+        assert cache.get('late') == 'value'
+        mock_time.return_value = 1060
+        assert cache.get('late') is None
+
+    def test_evicts_least_recently_used(self):
+        """Should evict the least recently used entry when full."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.get('c') == 3
+        assert cache.evictions == 1
+
+    def test_pop_and_clear(self):
+        """Should drop single entries and reset everything on clear."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.pop('a')
+        cache.pop('missing')
+
+        assert cache.get('a') is None
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.misses == 0
+
+    def test_stats(self):
+        """Should report size, counters and hit rate."""
+        cache = TTLCache(maxsize=4, ttl=60)
+        assert cache.stats()['hit_rate'] == 0.0
+
+        cache.set('a', 1)
+        cache.get('a')
+        cache.get('b')
+
+        assert cache.stats() == {
+            'size': 1, 'maxsize': 4, 'hits': 1, 'misses': 1, 'evictions': 0, 'hit_rate': 0.5
+        }
+
+
+class TestConfigCache:
+    """Tests for ConfigCache."""
+
+    @staticmethod
+    def _table(items, version=1):
+        table = MagicMock()
+        store = {**items, 'CONFIG_VERSION': {'config_key': 'CONFIG_VERSION', 'value': version}}
+        table.get_item.side_effect = lambda **kwargs: {'Item': store[kwargs['Key']['config_key']]} if kwargs['Key']['config_key'] in store else {}
+        table.store = store
+        return table
+
+    @patch('app.core.cache.time.time')
+    def test_version_checked_at_most_once_per_interval(self, mock_time):
+        """Should only re-read the version item after the check interval."""
+        table = self._table({'A': {'config_key': 'A', 'value': 1}})
+        cache = ConfigCache(lambda: table, version_check_interval=5)
+        mock_time.return_value = 1000
+
+        cache.get('A')
+        cache.get('A')
+        mock_time.return_value = 1004
+        cache.get('A')
+
+        assert table.get_item.call_count == 2  # Version + A
+
+    @patch('app.core.cache.time.time')
+    def test_version_change_from_another_writer_drops_entries(self, mock_time):
+        """Should re-read items once the shared version moved."""
+        table = self._table({'A': {'config_key': 'A', 'value': 1}})
+        cache = ConfigCache(lambda: table, version_check_interval=5)
+        mock_time.return_value = 1000
+        assert cache.get('A')['value'] == 1
+
+        table.store['A'] = {'config_key': 'A', 'value': 2}
+        table.store['CONFIG_VERSION'] = {'config_key': 'CONFIG_VERSION', 'value': 2}
+        mock_time.return_value = 1003
+        assert cache.get('A')['value'] == 1
+        mock_time.return_value = 1005
+        assert cache.get('A')['value'] == 2
+        assert cache.stats()['version'] == 2
+
+    @patch('app.core.cache.time.time')
+    def test_unchanged_version_keeps_entries(self, mock_time):
+        """Should keep serving cached items while the version stays the same."""
+        table = self._table({'A': {'config_key': 'A', 'value': 1}})
+        cache = ConfigCache(lambda: table, version_check_interval=5)
+        mock_time.return_value = 1000
+        cache.get('A')
+
+        mock_time.return_value = 1010
+        cache.get('A')
+
+        keys = [call.kwargs['Key']['config_key'] for call in table.get_item.call_args_list]
+        assert keys == ['CONFIG_VERSION', 'A', 'CONFIG_VERSION']
+
+    @patch('app.core.cache.time.time')
+    def test_missing_keys_are_cached(self, mock_time):
+        """Should remember keys that are not in the table until the TTL expires."""
+        table = self._table({})
+        cache = ConfigCache(lambda: table, ttl=60, version_check_interval=600)
+        mock_time.return_value = 1000
+
+        assert cache.get('MISSING') is None
+        assert cache.get('MISSING') is None
+        assert table.get_item.call_count == 2
+        mock_time.return_value = 1060
+        assert cache.get('MISSING') is None
+        assert table.get_item.call_count == 3
+
+    def test_bump_version_clears_entries(self):
+        """Should increment the stored version and forget local entries."""
+        table = self._table({'A': {'config_key': 'A', 'value': 1}})
+        table.update_item.return_value = {'Attributes': {'value': 7}}
+        cache = ConfigCache(lambda: table, key_name='config_key')
+        cache.get('A')
+
+        cache.bump_version()
+
+        assert cache.stats()['size'] == 0
+        assert cache.stats()['version'] == 7
+        assert table.update_item.call_args.kwargs['ExpressionAttributeValues'] == {':one': 1}
+
+    def test_clear_resets_version_and_stats(self):
+        """Should forget entries, counters and the known version."""
+        table = self._table({'A': {'config_key': 'A', 'value': 1}})
+        cache = ConfigCache(lambda: table)
+        cache.get('A')
+
+        cache.clear()
+
+        assert cache.stats() == {
+            'size': 0, 'maxsize': 128, 'hits': 0, 'misses': 0, 'evictions': 0, 'hit_rate': 0.0, 'version': None
+        }
+
+    def test_get_many_batches_uncached_keys(self):
+        """Should load only the uncached keys, in one batch call, and remember missing ones."""
+        table = self._table({})
+        batch_get = MagicMock(return_value=[{'config_key': 'A', 'value': 1}])
+        cache = ConfigCache(lambda: table, batch_get=batch_get)
+        table.store['B'] = {'config_key': 'B', 'value': 2}
+        assert cache.get('B')['value'] == 2
+
+        assert cache.get_many(['A', 'B', 'C']) == {'A': {'config_key': 'A', 'value': 1}, 'B': {'config_key': 'B', 'value': 2}}
+        assert cache.get_many(['A', 'C']) == {'A': {'config_key': 'A', 'value': 1}}
+        batch_get.assert_called_once_with(['A', 'C'])
+
+    def test_get_many_without_batch_loader_reads_each_key(self):
+        """Should fall back to one GetItem per uncached key."""
+        table = self._table({'A': {'config_key': 'A', 'value': 1}})
+        cache = ConfigCache(lambda: table)
+
+        assert cache.get_many(['A', 'B']) == {'A': {'config_key': 'A', 'value': 1}}
+        assert table.get_item.call_count == 3  # Version + A + B
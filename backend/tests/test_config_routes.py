@@ -5,6 +5,7 @@ from decimal import Decimal
 from unittest.mock import AsyncMock, patch
 
 import pytest
+from botocore.exceptions import ClientError
 from fastapi.testclient import TestClient
 
 
@@ -92,15 +93,23 @@ class TestConfigRoutes:
 
         assert response.status_code == 404
 
-    @patch('app.api.v1.routes.config.publish_config_update')
+    @patch('app.api.v1.routes.config.fetch_config_setting')
+    def test_get_config_hides_machine_clients(self, mock_fetch, client):
+        """Test machine client records are never served by the config API."""
+        response = client.get("/api/v1/config/MACHINE_CLIENT%23feeder-bot")
+
+        assert response.status_code == 404
+        mock_fetch.assert_not_called()
+
+    @patch('app.api.v1.routes.config.sync_device_config')
     @patch('app.api.v1.routes.config.update_config_setting')
-    def test_set_config_setting_servo_duration_valid(self, mock_update, mock_publish, client):
+    def test_set_config_setting_servo_duration_valid(self, mock_update, mock_sync, client):
         """Test updating servo duration with valid value."""
         mock_update.return_value = {
             'config_key': 'SERVO_OPEN_HOLD_DURATION_MS',
             'value': 2500
         }
-        mock_publish.return_value = True
+        mock_sync.return_value = {'version': 1, 'delta': {'SERVO_OPEN_HOLD_DURATION_MS': 2500}, 'published': True}
 
         response = client.put(
             "/api/v1/config/SERVO_OPEN_HOLD_DURATION_MS",
@@ -144,15 +153,15 @@ class TestConfigRoutes:
         assert response.status_code == 400
         assert "valid integer" in response.json()['detail']
 
-    @patch('app.api.v1.routes.config.publish_config_update')
+    @patch('app.api.v1.routes.config.sync_device_config')
     @patch('app.api.v1.routes.config.update_config_setting')
-    def test_set_config_setting_weight_threshold_valid(self, mock_update, mock_publish, client):
+    def test_set_config_setting_weight_threshold_valid(self, mock_update, mock_sync, client):
         """Test updating weight threshold with valid value."""
         mock_update.return_value = {
             'config_key': 'WEIGHT_THRESHOLD_G',
             'value': 500
         }
-        mock_publish.return_value = True
+        mock_sync.return_value = {'version': 1, 'delta': {'WEIGHT_THRESHOLD_G': 500}, 'published': True}
 
         response = client.put(
             "/api/v1/config/WEIGHT_THRESHOLD_G",
@@ -201,6 +210,58 @@ class TestConfigRoutes:
 
         assert response.status_code == 200
 
+    @patch('app.api.v1.routes.config.update_config_setting')
+    def test_set_config_rejects_machine_clients(self, mock_update, client):
+        """Test machine client records cannot be written through the config API."""
+        response = client.put(
+            "/api/v1/config/machine_client%23feeder-bot",
+            json={"value": {"secret": "mine", "scopes": ["feed:write"]}}
+        )
+
+        assert response.status_code == 400
+        mock_update.assert_not_called()
+
+    @patch('app.api.v1.routes.config.update_config_setting')
+    def test_set_config_rejects_config_version(self, mock_update, client):
+        """Test the cache version counter cannot be overwritten."""
+        response = client.put("/api/v1/config/config_version", json={"value": 0})
+
+        assert response.status_code == 400
+        mock_update.assert_not_called()
+
+    @patch('app.api.v1.routes.config.update_config_setting')
+    def test_set_config_rejects_desired_config(self, mock_update, client):
+        """Test the desired device config document cannot be written as a setting."""
+        response = client.put("/api/v1/config/DESIRED_CONFIG", json={"value": {}})
+
+        assert response.status_code == 400
+        mock_update.assert_not_called()
+
+    @patch('app.services.config_sync.publish_desired_config', new_callable=AsyncMock)
+    @patch('app.services.config_sync.merge_desired_config', new_callable=AsyncMock)
+    @patch('app.api.v1.routes.config.update_config_setting', new_callable=AsyncMock)
+    def test_set_config_unchanged_value_not_published(self, mock_update, mock_merge, mock_publish, client):
+        """Test re-writing the desired value keeps the version and makes no publish call."""
+        mock_update.return_value = {'config_key': 'WEIGHT_THRESHOLD_G', 'value': 450}
+        mock_merge.return_value = {'version': 2, 'values': {'WEIGHT_THRESHOLD_G': 450}, 'updated_at': None, 'changed': {}}
+
+        response = client.put("/api/v1/config/WEIGHT_THRESHOLD_G", json={"value": 450})
+
+        assert response.status_code == 200
+        mock_merge.assert_called_once_with({'WEIGHT_THRESHOLD_G': 450})
+        mock_publish.assert_not_called()
+
+    @patch('app.api.v1.routes.config.sync_device_config', new_callable=AsyncMock)
+    @patch('app.api.v1.routes.config.update_config_setting', new_callable=AsyncMock)
+    def test_set_config_desired_config_failure(self, mock_update, mock_sync, client):
+        """Test the setting is still saved if the desired config cannot be recorded."""
+        mock_update.return_value = {'config_key': 'WEIGHT_THRESHOLD_G', 'value': 500}
+        mock_sync.side_effect = ClientError({'Error': {'Code': '500', 'Message': 'Test error'}}, 'PutItem')
+
+        response = client.put("/api/v1/config/WEIGHT_THRESHOLD_G", json={"value": 500})
+
+        assert response.status_code == 200
+
     @patch('app.api.v1.routes.config.update_config_setting')
     def test_set_config_setting_generic_key(self, mock_update, client):
         """Test updating a generic config key."""
@@ -219,12 +280,12 @@ class TestConfigRoutes:
     def test_set_config_mqtt_publish_failure(self, client):
         """Test that config is still updated even if MQTT publish fails."""
         with patch('app.api.v1.routes.config.update_config_setting', new_callable=AsyncMock) as mock_update, \
-             patch('app.api.v1.routes.config.publish_config_update', new_callable=AsyncMock) as mock_publish:
+             patch('app.api.v1.routes.config.sync_device_config', new_callable=AsyncMock) as mock_sync:
             mock_update.return_value = {
                 'config_key': 'SERVO_OPEN_HOLD_DURATION_MS',
                 'value': 2500
             }
-            mock_publish.return_value = False
+            mock_sync.return_value = {'version': 1, 'delta': {'SERVO_OPEN_HOLD_DURATION_MS': 2500}, 'published': False}
 
             response = client.put(
                 "/api/v1/config/SERVO_OPEN_HOLD_DURATION_MS",
@@ -236,12 +297,12 @@ class TestConfigRoutes:
     def test_set_config_weight_threshold_mqtt_failure(self, client):
         """Test weight threshold config update when MQTT publish fails."""
         with patch('app.api.v1.routes.config.update_config_setting', new_callable=AsyncMock) as mock_update, \
-             patch('app.api.v1.routes.config.publish_config_update', new_callable=AsyncMock) as mock_publish:
+             patch('app.api.v1.routes.config.sync_device_config', new_callable=AsyncMock) as mock_sync:
             mock_update.return_value = {
                 'config_key': 'WEIGHT_THRESHOLD_G',
                 'value': 500
             }
-            mock_publish.return_value = False
+            mock_sync.return_value = {'version': 1, 'delta': {'WEIGHT_THRESHOLD_G': 500}, 'published': False}
 
             response = client.put(
                 "/api/v1/config/WEIGHT_THRESHOLD_G",
@@ -273,3 +334,101 @@ class TestConfigRoutes:
         assert response.status_code == 200
         data = response.json()
         assert data['value'] == 3000
+
+
+class TestBulkConfigRoutes:
+    """Test cases for the bulk configuration routes."""
+
+    @pytest.fixture
+    def client(self):
+        """Create test client."""
+        from app.main import app
+        return TestClient(app)
+
+    @patch('app.api.v1.routes.config.fetch_config_settings')
+    def test_get_all_keys_by_default(self, mock_fetch, client):
+        """Test every supported key is returned, with defaults for unset keys."""
+        mock_fetch.return_value = {
+            'WEIGHT_THRESHOLD_G': {'config_key': 'WEIGHT_THRESHOLD_G', 'value': Decimal('500')}
+        }
+
+        response = client.get("/api/v1/config")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert {item['config_key']: item['value'] for item in data['items']} == {
+            'SERVO_OPEN_HOLD_DURATION_MS': 3000,
+            'WEIGHT_THRESHOLD_G': 500,
+            'EMAIL_NOTIFICATIONS': (
+                '{"email":"","enabled":false,"subscription_arn":"",'
+                '"preferences":{"pet_ate":false,"feedings":true,"failures":true}}'
+            ),
+        }
+        assert data['missing'] == []
+        mock_fetch.assert_called_once_with(['SERVO_OPEN_HOLD_DURATION_MS', 'WEIGHT_THRESHOLD_G', 'EMAIL_NOTIFICATIONS'])
+
+    @patch('app.api.v1.routes.config.fetch_config_settings')
+    def test_get_selected_keys(self, mock_fetch, client):
+        """Test requested keys are normalized, de-duplicated and reserved keys never read."""
+        mock_fetch.return_value = {'CUSTOM_KEY': {'config_key': 'CUSTOM_KEY', 'value': 'x'}}
+
+        response = client.get("/api/v1/config?keys=custom_key, weight_threshold_g,CUSTOM_KEY,unknown,config_version")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['items'] == [
+            {'config_key': 'CUSTOM_KEY', 'value': 'x'},
+            {'config_key': 'WEIGHT_THRESHOLD_G', 'value': 450},
+        ]
+        assert data['missing'] == ['UNKNOWN', 'CONFIG_VERSION']
+        mock_fetch.assert_called_once_with(['CUSTOM_KEY', 'WEIGHT_THRESHOLD_G', 'UNKNOWN'])
+
+    @patch('app.api.v1.routes.config.fetch_config_settings')
+    def test_get_rejects_too_many_keys(self, mock_fetch, client):
+        """Test the number of keys per request is bounded."""
+        keys = ",".join(f"KEY_{i}" for i in range(101))
+
+        response = client.get(f"/api/v1/config?keys={keys}")
+
+        assert response.status_code == 400
+        mock_fetch.assert_not_called()
+
+    @patch('app.api.v1.routes.config.sync_device_config', new_callable=AsyncMock)
+    @patch('app.api.v1.routes.config.update_config_settings')
+    def test_put_writes_all_keys_and_publishes_device_settings(self, mock_update, mock_sync, client):
+        """Test a bulk write stores every value once and publishes only device keys."""
+        mock_update.return_value = [
+            {'config_key': 'SERVO_OPEN_HOLD_DURATION_MS', 'value': 2000},
+            {'config_key': 'EMAIL_NOTIFICATIONS', 'value': '{}'},
+        ]
+        mock_sync.return_value = {'version': 1, 'delta': {'SERVO_OPEN_HOLD_DURATION_MS': 2000}, 'published': True}
+
+        response = client.put(
+            "/api/v1/config",
+            json={"values": {"servo_open_hold_duration_ms": "2000", "EMAIL_NOTIFICATIONS": "{}"}}
+        )
+
+        assert response.status_code == 200
+        assert len(response.json()['items']) == 2
+        mock_update.assert_called_once_with({'SERVO_OPEN_HOLD_DURATION_MS': 2000, 'EMAIL_NOTIFICATIONS': '{}'})
+        mock_sync.assert_called_once_with({'SERVO_OPEN_HOLD_DURATION_MS': 2000})
+
+    @patch('app.api.v1.routes.config.update_config_settings')
+    def test_put_validates_every_value_before_writing(self, mock_update, client):
+        """Test one invalid value rejects the whole request."""
+        response = client.put(
+            "/api/v1/config",
+            json={"values": {"SERVO_OPEN_HOLD_DURATION_MS": 2000, "WEIGHT_THRESHOLD_G": "heavy"}}
+        )
+
+        assert response.status_code == 400
+        assert response.json()['detail'] == "Value must be a valid integer."
+        mock_update.assert_not_called()
+
+    @patch('app.api.v1.routes.config.update_config_settings')
+    def test_put_rejects_too_many_keys(self, mock_update, client):
+        """Test the number of keys per write is bounded."""
+        response = client.put("/api/v1/config", json={"values": {f"KEY_{i}": i for i in range(101)}})
+
+        assert response.status_code == 400
+        mock_update.assert_not_called()
@@ -0,0 +1,150 @@
+"""
+Tests for desired/reported device config sync.
+"""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+
+class TestConfigDelta:
+    """Test cases for config_delta."""
+
+    def test_numbers_compare_by_value(self):
+        """Test an int setting matches the float the device reports."""
+        from app.services.config_sync import config_delta
+
+        assert config_delta({'WEIGHT_THRESHOLD_G': 450}, {'WEIGHT_THRESHOLD_G': 450.0}) == {}
+
+    def test_missing_and_different_keys_are_pending(self):
+        """Test keys the device lacks or reports differently are in the delta."""
+        from app.services.config_sync import config_delta
+
+        delta = config_delta(
+            {'SERVO_OPEN_HOLD_DURATION_MS': 2000, 'WEIGHT_THRESHOLD_G': 500, 'MODE': 'eco'},
+            {'SERVO_OPEN_HOLD_DURATION_MS': 2000, 'WEIGHT_THRESHOLD_G': 450.0, 'MODE': 'eco'}
+        )
+
+        assert delta == {'WEIGHT_THRESHOLD_G': 500}
+        assert config_delta({'MODE': 'eco'}, {}) == {'MODE': 'eco'}
+
+
+class TestSyncDeviceConfig:
+    """Test cases for sync_device_config."""
+
+    @patch('app.services.config_sync.publish_desired_config', new_callable=AsyncMock)
+    @patch('app.services.config_sync.merge_desired_config', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_publishes_only_changed_keys(self, mock_merge, mock_publish):
+        """Test only the values this write changed go out, with the new version."""
+        mock_merge.return_value = {
+            'version': 5, 'values': {'SERVO_OPEN_HOLD_DURATION_MS': 2000, 'WEIGHT_THRESHOLD_G': 500},
+            'updated_at': None, 'changed': {'WEIGHT_THRESHOLD_G': 500}
+        }
+        mock_publish.return_value = True
+
+        from app.services.config_sync import sync_device_config
+        result = await sync_device_config({'WEIGHT_THRESHOLD_G': 500})
+
+        assert result == {'version': 5, 'delta': {'WEIGHT_THRESHOLD_G': 500}, 'published': True}
+        mock_merge.assert_called_once_with({'WEIGHT_THRESHOLD_G': 500})
+        mock_publish.assert_called_once_with({'WEIGHT_THRESHOLD_G': 500}, 5)
+
+    @patch('app.services.config_sync.publish_desired_config', new_callable=AsyncMock)
+    @patch('app.services.config_sync.merge_desired_config', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_unchanged_write_not_published(self, mock_merge, mock_publish):
+        """Test a write that leaves the version unchanged publishes nothing."""
+        mock_merge.return_value = {'version': 4, 'values': {'WEIGHT_THRESHOLD_G': 500}, 'updated_at': None, 'changed': {}}
+
+        from app.services.config_sync import sync_device_config
+        result = await sync_device_config({'WEIGHT_THRESHOLD_G': 500})
+
+        assert result == {'version': 4, 'delta': {}, 'published': False}
+        mock_publish.assert_not_called()
+
+    @patch('app.services.config_sync.publish_desired_config', new_callable=AsyncMock)
+    @patch('app.services.config_sync.fetch_desired_config', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_nothing_published_without_device_settings(self, mock_fetch, mock_publish):
+        """Test no message is sent before any device setting has been written."""
+        mock_fetch.return_value = {'version': 0, 'values': {}, 'updated_at': None}
+
+        from app.services.config_sync import sync_device_config
+        result = await sync_device_config()
+
+        assert result == {'version': 0, 'delta': {}, 'published': False}
+        mock_publish.assert_not_called()
+
+    @patch('app.services.config_sync.publish_desired_config', new_callable=AsyncMock)
+    @patch('app.services.config_sync.fetch_desired_config', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_resend_reports_failed_publish(self, mock_fetch, mock_publish):
+        """Test re-sending the desired config reports a publish that did not go through."""
+        mock_fetch.return_value = {'version': 3, 'values': {'WEIGHT_THRESHOLD_G': 500}, 'updated_at': None}
+        mock_publish.return_value = False
+
+        from app.services.config_sync import sync_device_config
+        result = await sync_device_config()
+
+        assert result == {'version': 3, 'delta': {'WEIGHT_THRESHOLD_G': 500}, 'published': False}
+
+
+class TestConfigSyncStatus:
+    """Test cases for get_config_sync_status."""
+
+    @patch('app.services.config_sync.get_latest_device_status', new_callable=AsyncMock)
+    @patch('app.services.config_sync.fetch_desired_config', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_reports_pending_keys(self, mock_fetch, mock_status):
+        """Test versions and pending keys are reported."""
+        mock_fetch.return_value = {
+            'version': 4, 'values': {'SERVO_OPEN_HOLD_DURATION_MS': 2000, 'WEIGHT_THRESHOLD_G': 500},
+            'updated_at': '2025-12-14T10:30:00Z'
+        }
+        mock_status.return_value = {
+            'reported_config': {'SERVO_OPEN_HOLD_DURATION_MS': 2000, 'WEIGHT_THRESHOLD_G': 450.0},
+            'reported_config_version': 3,
+            'reported_config_at': '2025-12-14T10:29:45Z'
+        }
+
+        from app.services.config_sync import get_config_sync_status
+        status = await get_config_sync_status()
+
+        assert status == {
+            'desired_version': 4,
+            'reported_version': 3,
+            'in_sync': False,
+            'pending': {'WEIGHT_THRESHOLD_G': {'desired': 500, 'reported': 450.0}},
+            'desired_updated_at': '2025-12-14T10:30:00Z',
+            'reported_at': '2025-12-14T10:29:45Z'
+        }
+
+    @patch('app.services.config_sync.get_latest_device_status', new_callable=AsyncMock)
+    @patch('app.services.config_sync.fetch_desired_config', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_device_that_never_reported(self, mock_fetch, mock_status):
+        """Test a device with no status is only in sync when nothing is desired."""
+        mock_fetch.return_value = {'version': 0, 'values': {}, 'updated_at': None}
+        mock_status.return_value = None
+
+        from app.services.config_sync import get_config_sync_status
+        status = await get_config_sync_status('feeder-2')
+
+        assert status['in_sync'] is True
+        assert status['reported_version'] is None
+        mock_status.assert_awaited_once_with('feeder-2')
+
+    @patch('app.services.config_sync.get_latest_device_status', new_callable=AsyncMock)
+    @patch('app.services.config_sync.fetch_desired_config', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_unreadable_status_counts_every_key_as_pending(self, mock_fetch, mock_status):
+        """Test every desired key is pending if the reported config cannot be read."""
+        mock_fetch.return_value = {'version': 3, 'values': {'WEIGHT_THRESHOLD_G': 500}, 'updated_at': None}
+        mock_status.side_effect = ClientError({'Error': {'Code': '500', 'Message': 'Test error'}}, 'GetItem')
+
+        from app.services.config_sync import get_config_sync_status
+        status = await get_config_sync_status()
+
+        assert status['in_sync'] is False
+        assert status['pending'] == {'WEIGHT_THRESHOLD_G': {'desired': 500, 'reported': None}}
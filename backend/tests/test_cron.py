@@ -0,0 +1,120 @@
+"""
+Tests for the cron expression engine.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.cron import CronSchedule, compile_cron
+
+
+def _matches(cron: CronSchedule, moment: datetime) -> bool:
+    """Reference check of a single minute against the compiled fields."""
+    return bool(
+        cron.minutes >> moment.minute & 1
+        and cron.hours >> moment.hour & 1
+        and cron.months >> moment.month & 1
+        and cron.day_mask(moment.year, moment.month) >> moment.day & 1
+    )
+
+
+class TestCronParsing:
+    """Test cases for parsing cron expressions."""
+
+    def test_parses_lists_ranges_steps_and_names(self):
+        """Test the supported field syntax."""
+        cron = compile_cron("*/15 8,18 1-5 JAN-MAR mon-fri")
+
+        assert cron.minutes == (1 << 0) | (1 << 15) | (1 << 30) | (1 << 45)
+        assert cron.hours == (1 << 8) | (1 << 18)
+        assert cron.days == 0b111110
+        assert cron.months == 0b1110
+        assert cron.weekdays == 0b111110
+
+    def test_sunday_as_seven_and_stepped_start(self):
+        """Test that 7 means Sunday and 'N/step' runs to the end of the range."""
+        cron = compile_cron("50/5 0 * * 7")
+
+        assert cron.minutes == (1 << 50) | (1 << 55)
+        assert cron.weekdays == 1
+
+    def test_compiled_expressions_are_reused(self):
+        """Test that an expression is compiled once, ignoring extra whitespace."""
+        assert compile_cron("0 8 * * *") is compile_cron("0 8 * * *")
+        assert compile_cron("0  8 * *  *").expression == "0 8 * * *"
+
+    @pytest.mark.parametrize("expression", [
+        "0 8 * *",
+        "60 8 * * *",
+        "0 8 * * FOO",
+        "0 8 5-1 * *",
+        "*/0 8 * * *",
+        "0 8,, * * *",
+    ])
+    def test_invalid_expressions_are_rejected(self, expression):
+        """Test that malformed expressions raise ValueError."""
+        with pytest.raises(ValueError, match="Invalid cron expression"):
+            CronSchedule(expression)
+
+
+class TestCronOccurrences:
+    """Test cases for next/previous occurrence lookups."""
+
+    def test_next_after_same_day_and_next_day(self):
+        """Test twice-daily schedules roll over to the next day."""
+        cron = compile_cron("0 8,18 * * *")
+
+        assert cron.next_after(datetime(2025, 12, 13, 9, 30)) == datetime(2025, 12, 13, 18, 0)
+        assert cron.next_after(datetime(2025, 12, 13, 18, 0)) == datetime(2025, 12, 14, 8, 0)
+        assert cron.next_after(datetime(2025, 12, 31, 18, 0, 30)) == datetime(2026, 1, 1, 8, 0)
+
+    def test_weekdays_and_leap_days(self):
+        """Test day-of-week matching and sparse day-of-month expressions."""
+        assert compile_cron("0 12 * * 1-5").next_after(datetime(2025, 12, 13)) == datetime(2025, 12, 15, 12, 0)
+        assert compile_cron("30 2 29 2 *").next_after(datetime(2025, 3, 1)) == datetime(2028, 2, 29, 2, 30)
+
+    def test_day_of_month_or_day_of_week(self):
+        """Test that restricting both day fields matches either one."""
+        cron = compile_cron("0 0 1 * MON")
+
+        assert cron.next_after(datetime(2025, 12, 1)) == datetime(2025, 12, 8, 0, 0)
+        assert cron.next_after(datetime(2025, 12, 29)) == datetime(2026, 1, 1, 0, 0)
+
+    def test_previous_at_or_before(self):
+        """Test backwards lookups, including an exact match."""
+        cron = compile_cron("0 8,18 * * *")
+
+        assert cron.previous_at_or_before(datetime(2025, 12, 13, 18, 0)) == datetime(2025, 12, 13, 18, 0)
+        assert cron.previous_at_or_before(datetime(2025, 12, 13, 7, 59)) == datetime(2025, 12, 12, 18, 0)
+        assert cron.previous_at_or_before(datetime(2026, 1, 1, 0, 0)) == datetime(2025, 12, 31, 18, 0)
+        assert compile_cron("30 * * * *").previous_at_or_before(datetime(2025, 12, 13, 18, 10)) == datetime(
+            2025, 12, 13, 17, 30
+        )
+
+    def test_impossible_expression_has_no_occurrence(self):
+        """Test that an expression that never fires returns None."""
+        cron = compile_cron("0 0 30 2 *")
+
+        assert cron.next_after(datetime(2025, 1, 1)) is None
+        assert cron.previous_at_or_before(datetime(2025, 1, 1)) is None
+
+    @pytest.mark.parametrize("expression", [
+        "*/7 */5 * * *",
+        "5-10/2 */3 * JAN,DEC SUN",
+        "59 23 31 * *",
+        "0 0 */2 * 3",
+    ])
+    def test_matches_minute_by_minute_reference(self, expression):
+        """Test lookups against a brute-force walk over every minute."""
+        cron = compile_cron(expression)
+        start = datetime(2025, 11, 20, 13, 7, 42)
+
+        expected_next = start.replace(second=0) + timedelta(minutes=1)
+        while not _matches(cron, expected_next):
+            expected_next += timedelta(minutes=1)
+        expected_prev = start.replace(second=0)
+        while not _matches(cron, expected_prev):
+            expected_prev -= timedelta(minutes=1)
+
+        assert cron.next_after(start) == expected_next
+        assert cron.previous_at_or_before(start) == expected_prev
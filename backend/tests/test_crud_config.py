@@ -26,7 +26,52 @@ class TestConfigCrud:
         assert result is not None
         assert result['config_key'] == 'TEST_KEY'
         assert result['value'] == 'test_value'
-        mock_table.get_item.assert_called_once()
+        mock_table.get_item.assert_any_call(Key={'config_key': 'TEST_KEY'})
+
+    @patch('app.crud.config.get_config_table')
+    @pytest.mark.asyncio
+    async def test_fetch_config_setting_served_from_cache(self, mock_get_table):
+        """Test repeated reads, including of missing keys, hit DynamoDB once."""
+        mock_table = MagicMock()
+        mock_table.get_item.side_effect = lambda **kwargs: (
+            {'Item': {'config_key': 'TEST_KEY', 'value': 5}} if kwargs['Key']['config_key'] == 'TEST_KEY' else {}
+        )
+        mock_get_table.return_value = mock_table
+
+        from app.crud.config import fetch_config_setting
+        first = await fetch_config_setting('TEST_KEY')
+        first['value'] = 'mutated'
+        assert (await fetch_config_setting('TEST_KEY'))['value'] == 5
+        assert await fetch_config_setting('MISSING_KEY') is None
+        assert await fetch_config_setting('MISSING_KEY') is None
+
+        keys = [call.kwargs['Key']['config_key'] for call in mock_table.get_item.call_args_list]
+        assert keys.count('TEST_KEY') == 1
+        assert keys.count('MISSING_KEY') == 1
+
+    @patch('app.crud.config.get_config_table')
+    @pytest.mark.asyncio
+    async def test_update_config_setting_invalidates_cache(self, mock_get_table):
+        """Test a write bumps the shared version and the next read goes to DynamoDB."""
+        mock_table = MagicMock()
+        mock_table.get_item.return_value = {'Item': {'config_key': 'TEST_KEY', 'value': 'old'}}
+        mock_table.update_item.return_value = {'Attributes': {'value': 2}}
+        mock_get_table.return_value = mock_table
+
+        from app.crud.config import (
+            config_cache,
+            fetch_config_setting,
+            update_config_setting,
+        )
+        assert (await fetch_config_setting('TEST_KEY'))['value'] == 'old'
+        await update_config_setting('TEST_KEY', 'new')
+        mock_table.get_item.return_value = {'Item': {'config_key': 'TEST_KEY', 'value': 'new'}}
+
+        assert (await fetch_config_setting('TEST_KEY'))['value'] == 'new'
+        assert config_cache.stats()['version'] == 2
+        update_kwargs = mock_table.update_item.call_args.kwargs
+        assert update_kwargs['Key'] == {'config_key': 'CONFIG_VERSION'}
+        assert update_kwargs['UpdateExpression'] == 'ADD #value :one'
 
     @patch('app.crud.config.get_config_table')
     @pytest.mark.asyncio
@@ -62,6 +107,7 @@ class TestConfigCrud:
         """Test updating config setting."""
         mock_table = MagicMock()
         mock_table.put_item.return_value = {}
+        mock_table.update_item.return_value = {'Attributes': {'value': 1}}
         mock_get_table.return_value = mock_table
 
         from app.crud.config import update_config_setting
@@ -86,3 +132,213 @@ class TestConfigCrud:
         from app.crud.config import update_config_setting
         with pytest.raises(ClientError):
             await update_config_setting('TEST_KEY', 'value')
+
+
+class TestConfigCrudBatch:
+    """Test cases for the bulk config CRUD operations."""
+
+    @staticmethod
+    def _table():
+        table = MagicMock()
+        table.name = 'test-feed-config'
+        table.get_item.return_value = {}
+        return table
+
+    @patch('app.db.client.get_dynamodb_resource')
+    @patch('app.crud.config.get_config_table')
+    def test_batch_get_chunks_and_retries_unprocessed_keys(self, mock_get_table, mock_get_resource):
+        """Test keys are requested 100 at a time and unprocessed keys are retried."""
+        table = self._table()
+        mock_get_table.return_value = table
+        dynamodb = mock_get_resource.return_value
+        unprocessed = {'test-feed-config': {'Keys': [{'config_key': 'K5'}]}}
+        dynamodb.batch_get_item.side_effect = [
+            {'Responses': {'test-feed-config': [{'config_key': 'K1', 'value': 1}]}, 'UnprocessedKeys': unprocessed},
+            {'Responses': {'test-feed-config': [{'config_key': 'K5', 'value': 5}]}, 'UnprocessedKeys': {}},
+            {'Responses': {'test-feed-config': [{'config_key': 'K100', 'value': 100}]}},
+        ]
+
+        from app.crud.config import batch_get_config_items
+        items = batch_get_config_items([f'K{i}' for i in range(101)])
+
+        assert [item['config_key'] for item in items] == ['K1', 'K5', 'K100']
+        first_request = dynamodb.batch_get_item.call_args_list[0].kwargs['RequestItems']
+        assert len(first_request['test-feed-config']['Keys']) == 100
+        assert dynamodb.batch_get_item.call_args_list[1].kwargs['RequestItems'] == unprocessed
+        table.get_item.assert_not_called()
+
+    @patch('app.db.client.get_dynamodb_resource')
+    @patch('app.crud.config.get_config_table')
+    def test_batch_get_reads_persistently_unprocessed_keys_one_by_one(self, mock_get_table, mock_get_resource):
+        """Test keys still unprocessed after every retry are read with GetItem."""
+        table = self._table()
+        table.get_item.side_effect = lambda **kwargs: (
+            {'Item': {'config_key': 'A', 'value': 1}} if kwargs['Key']['config_key'] == 'A' else {}
+        )
+        mock_get_table.return_value = table
+        unprocessed = {'test-feed-config': {'Keys': [{'config_key': 'A'}, {'config_key': 'B'}]}}
+        mock_get_resource.return_value.batch_get_item.return_value = {'Responses': {}, 'UnprocessedKeys': unprocessed}
+
+        from app.crud.config import batch_get_config_items
+        from app.db.client import BATCH_GET_MAX_ATTEMPTS
+        items = batch_get_config_items(['A', 'B'])
+
+        assert items == [{'config_key': 'A', 'value': 1}]
+        assert mock_get_resource.return_value.batch_get_item.call_count == BATCH_GET_MAX_ATTEMPTS
+        assert table.get_item.call_count == 2
+
+    @patch('app.crud.config.batch_get_config_items')
+    @patch('app.crud.config.get_config_table')
+    @pytest.mark.asyncio
+    async def test_fetch_config_settings_uses_one_batch(self, mock_get_table, mock_batch_get):
+        """Test uncached keys are resolved with one batch read and missing keys are left out."""
+        mock_get_table.return_value = self._table()
+        mock_batch_get.return_value = [{'config_key': 'A', 'value': 1}]
+
+        from app.crud.config import fetch_config_settings
+        result = await fetch_config_settings(['A', 'B'])
+
+        assert result == {'A': {'config_key': 'A', 'value': 1}}
+        mock_batch_get.assert_called_once_with(['A', 'B'])
+
+    @patch('app.crud.config.batch_get_config_items')
+    @patch('app.crud.config.get_config_table')
+    @pytest.mark.asyncio
+    async def test_fetch_config_settings_error(self, mock_get_table, mock_batch_get):
+        """Test DynamoDB errors are re-raised."""
+        mock_get_table.return_value = self._table()
+        mock_batch_get.side_effect = ClientError({'Error': {'Code': '500', 'Message': 'Test error'}}, 'BatchGetItem')
+
+        from app.crud.config import fetch_config_settings
+        with pytest.raises(ClientError):
+            await fetch_config_settings(['A'])
+
+    @patch('app.crud.config.get_config_table')
+    @pytest.mark.asyncio
+    async def test_update_config_settings_success(self, mock_get_table):
+        """Test several keys are written in one batch and the version is bumped once."""
+        table = self._table()
+        table.update_item.return_value = {'Attributes': {'value': 3}}
+        mock_get_table.return_value = table
+        batch = table.batch_writer.return_value.__enter__.return_value
+
+        from app.crud.config import update_config_settings
+        result = await update_config_settings({'A': 1, 'B': 'two'})
+
+        assert result == [{'config_key': 'A', 'value': 1}, {'config_key': 'B', 'value': 'two'}]
+        assert batch.put_item.call_count == 2
+        table.update_item.assert_called_once()
+
+    @patch('app.crud.config.get_config_table')
+    @pytest.mark.asyncio
+    async def test_update_config_settings_error(self, mock_get_table):
+        """Test batch write errors are re-raised without bumping the version."""
+        table = self._table()
+        table.batch_writer.return_value.__enter__.return_value.put_item.side_effect = ClientError(
+            {'Error': {'Code': '500', 'Message': 'Test error'}}, 'BatchWriteItem'
+        )
+        mock_get_table.return_value = table
+
+        from app.crud.config import update_config_settings
+        with pytest.raises(ClientError):
+            await update_config_settings({'A': 1})
+        table.update_item.assert_not_called()
+
+
+class TestDesiredConfigCrud:
+    """Test cases for the desired device config document."""
+
+    @patch('app.crud.config.get_config_table')
+    @pytest.mark.asyncio
+    async def test_fetch_desired_config_defaults(self, mock_get_table):
+        """Test an unwritten document reads as version 0 with no values."""
+        mock_get_table.return_value.get_item.return_value = {}
+
+        from app.crud.config import fetch_desired_config
+        desired = await fetch_desired_config()
+
+        assert desired == {'version': 0, 'values': {}, 'updated_at': None}
+        assert mock_get_table.return_value.get_item.call_args.kwargs['ConsistentRead'] is True
+
+    @patch('app.crud.config.get_config_table')
+    @pytest.mark.asyncio
+    async def test_fetch_desired_config_error(self, mock_get_table):
+        """Test DynamoDB errors are re-raised."""
+        mock_get_table.return_value.get_item.side_effect = ClientError(
+            {'Error': {'Code': '500', 'Message': 'Test error'}}, 'GetItem'
+        )
+
+        from app.crud.config import fetch_desired_config
+        with pytest.raises(ClientError):
+            await fetch_desired_config()
+
+    @patch('app.crud.config.get_config_table')
+    @pytest.mark.asyncio
+    async def test_merge_bumps_version_on_change(self, mock_get_table):
+        """Test changed values are merged and written conditionally on the read version."""
+        from decimal import Decimal
+        table = mock_get_table.return_value
+        table.get_item.return_value = {'Item': {
+            'config_key': 'DESIRED_CONFIG', 'version': Decimal('2'),
+            'values': {'SERVO_OPEN_HOLD_DURATION_MS': Decimal('3000')}
+        }}
+
+        from app.crud.config import merge_desired_config
+        desired = await merge_desired_config({'WEIGHT_THRESHOLD_G': 500})
+
+        assert desired['version'] == 3
+        assert desired['values'] == {'SERVO_OPEN_HOLD_DURATION_MS': 3000, 'WEIGHT_THRESHOLD_G': 500}
+        assert desired['changed'] == {'WEIGHT_THRESHOLD_G': 500}
+        put_kwargs = table.put_item.call_args.kwargs
+        assert put_kwargs['Item']['config_key'] == 'DESIRED_CONFIG'
+        assert 'changed' not in put_kwargs['Item']
+        assert put_kwargs['ExpressionAttributeValues'] == {':expected': 2}
+
+    @patch('app.crud.config.get_config_table')
+    @pytest.mark.asyncio
+    async def test_merge_without_change_keeps_version(self, mock_get_table):
+        """Test re-writing the same values neither writes nor bumps the version."""
+        table = mock_get_table.return_value
+        table.get_item.return_value = {'Item': {'version': 2, 'values': {'WEIGHT_THRESHOLD_G': 500}}}
+
+        from app.crud.config import merge_desired_config
+        desired = await merge_desired_config({'WEIGHT_THRESHOLD_G': 500})
+
+        assert desired['version'] == 2
+        assert desired['changed'] == {}
+        table.put_item.assert_not_called()
+
+    @patch('app.crud.config.get_config_table')
+    @pytest.mark.asyncio
+    async def test_merge_retries_after_concurrent_write(self, mock_get_table):
+        """Test a conflicting writer causes a re-read and the other writer's keys are kept."""
+        table = mock_get_table.return_value
+        table.get_item.side_effect = [
+            {'Item': {'version': 1, 'values': {}}},
+            {'Item': {'version': 2, 'values': {'SERVO_OPEN_HOLD_DURATION_MS': 2000}}},
+        ]
+        table.put_item.side_effect = [
+            ClientError({'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'conflict'}}, 'PutItem'),
+            {},
+        ]
+
+        from app.crud.config import merge_desired_config
+        desired = await merge_desired_config({'WEIGHT_THRESHOLD_G': 500})
+
+        assert desired['version'] == 3
+        assert desired['values'] == {'SERVO_OPEN_HOLD_DURATION_MS': 2000, 'WEIGHT_THRESHOLD_G': 500}
+
+    @patch('app.crud.config.get_config_table')
+    @pytest.mark.asyncio
+    async def test_merge_gives_up_after_repeated_conflicts(self, mock_get_table):
+        """Test the conflict is raised once every attempt lost the race."""
+        table = mock_get_table.return_value
+        table.get_item.return_value = {'Item': {'version': 1, 'values': {}}}
+        table.put_item.side_effect = ClientError(
+            {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'conflict'}}, 'PutItem'
+        )
+
+        from app.crud.config import DESIRED_CONFIG_MAX_ATTEMPTS, merge_desired_config
+        with pytest.raises(ClientError):
+            await merge_desired_config({'WEIGHT_THRESHOLD_G': 500})
+        assert table.put_item.call_count == DESIRED_CONFIG_MAX_ATTEMPTS
@@ -172,6 +172,72 @@ class TestFeedCrud:
         assert result['thing_id'] == 'test-thing'
         assert result['current_weight_g'] == 350
 
+    @patch('app.crud.feed.get_device_status_table')
+    @pytest.mark.asyncio
+    async def test_get_latest_device_status_for_other_device(self, mock_get_table):
+        """Test the status of a named device is read by its thing_id."""
+        mock_get_table.return_value.get_item.return_value = {'Item': {'thing_id': 'feeder-2'}}
+
+        from app.crud.feed import get_latest_device_status
+        result = await get_latest_device_status('feeder-2', consistent_read=True)
+
+        assert result['thing_id'] == 'feeder-2'
+        mock_get_table.return_value.get_item.assert_called_once_with(Key={'thing_id': 'feeder-2'}, ConsistentRead=True)
+
+    @patch('app.db.client.get_dynamodb_resource')
+    @patch('app.crud.feed.get_device_status_table')
+    @pytest.mark.asyncio
+    async def test_get_device_statuses_batches_and_retries(self, mock_get_table, mock_resource):
+        """Test statuses are read in chunks and unprocessed keys fall back to GetItem."""
+        mock_table = mock_get_table.return_value
+        mock_table.name = 'status'
+        mock_table.get_item.return_value = {'Item': {'thing_id': 'feeder-0', 'current_weight_g': Decimal('10')}}
+        stuck = {'status': {'Keys': [{'thing_id': 'feeder-0'}]}}
+        mock_resource.return_value.batch_get_item.side_effect = [
+            {'Responses': {'status': [{'thing_id': 'feeder-1', 'current_weight_g': Decimal('20.5')}]}, 'UnprocessedKeys': stuck},
+            {'UnprocessedKeys': stuck},
+            {'UnprocessedKeys': stuck},
+            {'Responses': {'status': [{'thing_id': 'feeder-100'}]}}
+        ]
+        thing_ids = [f'feeder-{i}' for i in range(101)]
+
+        from app.crud.feed import get_device_statuses
+        result = await get_device_statuses(thing_ids)
+
+        assert result == {
+            'feeder-0': {'thing_id': 'feeder-0', 'current_weight_g': 10},
+            'feeder-1': {'thing_id': 'feeder-1', 'current_weight_g': 20.5},
+            'feeder-100': {'thing_id': 'feeder-100'}
+        }
+        first_request = mock_resource.return_value.batch_get_item.call_args_list[0].kwargs['RequestItems']
+        assert len(first_request['status']['Keys']) == 100
+
+    @patch('app.db.client.get_dynamodb_resource')
+    @patch('app.crud.feed.get_device_status_table')
+    @pytest.mark.asyncio
+    async def test_get_device_statuses_skips_missing_fallback(self, mock_get_table, mock_resource):
+        """Test a device still unprocessed and then missing is left out."""
+        mock_get_table.return_value.name = 'status'
+        mock_get_table.return_value.get_item.return_value = {}
+        mock_resource.return_value.batch_get_item.return_value = {'UnprocessedKeys': {'status': {'Keys': [{'thing_id': 'gone'}]}}}
+
+        from app.crud.feed import get_device_statuses
+        assert await get_device_statuses(['gone']) == {}
+
+    @patch('app.db.client.get_dynamodb_resource')
+    @patch('app.crud.feed.get_device_status_table')
+    @pytest.mark.asyncio
+    async def test_get_device_statuses_client_error(self, mock_get_table, mock_resource):
+        """Test BatchGetItem errors are re-raised."""
+        mock_resource.return_value.batch_get_item.side_effect = ClientError(
+            {'Error': {'Code': '500', 'Message': 'Test error'}},
+            'BatchGetItem'
+        )
+
+        from app.crud.feed import get_device_statuses
+        with pytest.raises(ClientError):
+            await get_device_statuses(['feeder-1'])
+
     @patch('app.core.config.settings')
     @patch('app.crud.feed.get_device_status_table')
     @pytest.mark.asyncio
@@ -218,6 +284,42 @@ class TestFeedCrud:
         with pytest.raises(Exception, match="Unexpected error"):
             await get_latest_device_status()
 
+    @patch('app.crud.feed.get_feed_history_table')
+    @pytest.mark.asyncio
+    async def test_get_feed_event_found(self, mock_get_table):
+        """Test a feed event is read by feed_id with Decimals converted."""
+        mock_get_table.return_value.get_item.return_value = {
+            'Item': {'feed_id': 'feed-1', 'status': 'completed', 'weight_delta_g': Decimal('47.5')}
+        }
+
+        from app.crud.feed import get_feed_event
+        result = await get_feed_event('feed-1', consistent_read=True)
+
+        assert result == {'feed_id': 'feed-1', 'status': 'completed', 'weight_delta_g': 47.5}
+        mock_get_table.return_value.get_item.assert_called_once_with(Key={'feed_id': 'feed-1'}, ConsistentRead=True)
+
+    @patch('app.crud.feed.get_feed_history_table')
+    @pytest.mark.asyncio
+    async def test_get_feed_event_not_found(self, mock_get_table):
+        """Test a feed the device has not logged yet returns None."""
+        mock_get_table.return_value.get_item.return_value = {}
+
+        from app.crud.feed import get_feed_event
+        assert await get_feed_event('feed-1') is None
+
+    @patch('app.crud.feed.get_feed_history_table')
+    @pytest.mark.asyncio
+    async def test_get_feed_event_client_error(self, mock_get_table):
+        """Test DynamoDB errors are raised to the caller."""
+        mock_get_table.return_value.get_item.side_effect = ClientError(
+            {'Error': {'Code': 'ResourceNotFoundException', 'Message': 'Table not found'}},
+            'GetItem'
+        )
+
+        from app.crud.feed import get_feed_event
+        with pytest.raises(ClientError):
+            await get_feed_event('feed-1')
+
     @patch('app.crud.feed.get_feed_history_table')
     @pytest.mark.asyncio
     async def test_delete_all_feed_events_success(self, mock_get_table):
@@ -66,8 +66,23 @@ class TestScheduleCrud:
         assert result['requested_by'] == 'test_user'
         assert result['scheduled_time'] == '2025-10-18T14:30:00Z'
         assert result['recurrence'] == 'daily'
+        assert 'thing_id' not in result
         mock_table.put_item.assert_called_once()
 
+    @patch('app.crud.schedule.get_feed_schedule_table')
+    def test_create_schedule_for_device(self, mock_get_table):
+        """Test a schedule created for a device stores its thing_id."""
+        from app.crud.schedule import create_schedule
+        request = ScheduleRequest(
+            requested_by='test_user',
+            scheduled_time='2025-10-18T14:30:00Z',
+            thing_id='feeder-3'
+        )
+        result = create_schedule(request)
+
+        assert result['thing_id'] == 'feeder-3'
+        assert mock_get_table.return_value.put_item.call_args.kwargs['Item']['thing_id'] == 'feeder-3'
+
     @patch('app.crud.schedule.get_feed_schedule_table')
     def test_create_schedule_error(self, mock_get_table):
         """Test error handling when creating schedule."""
@@ -235,10 +250,18 @@ class TestScheduleCrud:
     def test_update_schedule_with_timezone(self, mock_get_table):
         """Test updating schedule with timezone."""
         mock_table = MagicMock()
+        mock_table.get_item.return_value = {
+            'Item': {
+                'schedule_id': 'test-123',
+                'scheduled_time': '2025-10-18T08:00:00Z',
+                'timezone': 'UTC',
+                'wall_clock_time': '2025-10-18T08:00:00'
+            }
+        }
         mock_table.update_item.return_value = {
             'Attributes': {
                 'schedule_id': 'test-123',
-                'scheduled_time': '09:00',
+                'scheduled_time': '2025-10-18T12:00:00Z',
                 'timezone': 'America/New_York'
             }
         }
@@ -249,8 +272,34 @@ class TestScheduleCrud:
         result = update_schedule('test-123', update)
 
         assert result['timezone'] == 'America/New_York'
-        call_args = mock_table.update_item.call_args
-        assert ':tz' in call_args[1]['ExpressionAttributeValues']
+        values = mock_table.update_item.call_args[1]['ExpressionAttributeValues']
+        assert values[':tz'] == 'America/New_York'
+        # 08:00 stays 08:00 local, now read in New York (EDT, UTC-4)
+        assert values[':st'] == '2025-10-18T12:00:00Z'
+        assert values[':wct'] == '2025-10-18T08:00:00'
+
+    @patch('app.crud.schedule.get_feed_schedule_table')
+    def test_update_timezone_without_wall_clock_time(self, mock_get_table):
+        """Test a timezone change on an item without wall_clock_time keeps its local time."""
+        mock_table = MagicMock()
+        mock_table.get_item.return_value = {
+            'Item': {
+                'schedule_id': 'test-123',
+                'scheduled_time': '2025-12-13T13:00:00Z',
+                'timezone': 'America/New_York',
+                'recurrence': 'cron',
+                'cron_expression': '0 8 * * *'
+            }
+        }
+        mock_table.update_item.return_value = {'Attributes': {'schedule_id': 'test-123'}}
+        mock_get_table.return_value = mock_table
+
+        from app.crud.schedule import update_schedule
+        update_schedule('test-123', ScheduleUpdate(timezone='Europe/London'))
+
+        values = mock_table.update_item.call_args[1]['ExpressionAttributeValues']
+        assert values[':st'] == '2025-12-13T08:00:00Z'
+        assert values[':wct'] == '2025-12-13T08:00:00'
 
     @patch('app.crud.schedule.get_feed_schedule_table')
     def test_update_schedule_all_fields(self, mock_get_table):
@@ -418,3 +467,110 @@ class TestScheduleCrud:
         from app.crud.schedule import toggle_schedule
         with pytest.raises(ClientError):
             toggle_schedule('test-123', True)
+
+
+class TestCronScheduleCrud:
+    """Test cases for cron schedules in the CRUD layer."""
+
+    def test_align_to_cron(self):
+        """Test that a start time moves to the first matching slot at or after it."""
+        from app.crud.schedule import align_to_cron
+
+        assert align_to_cron('2025-12-13T08:00:00Z', '0 8,18 * * *') == '2025-12-13T08:00:00Z'
+        assert align_to_cron('2025-12-13T08:00:30Z', '0 8,18 * * *') == '2025-12-13T18:00:00Z'
+
+    @patch('app.crud.schedule.get_feed_schedule_table')
+    def test_create_cron_schedule(self, mock_get_table):
+        """Test that cron schedules store the expression and their first slot."""
+        mock_table = MagicMock()
+        mock_get_table.return_value = mock_table
+
+        from app.crud.schedule import create_schedule
+        request = ScheduleRequest(
+            requested_by='test_user',
+            scheduled_time='2025-10-18T09:30:00Z',
+            recurrence='cron',
+            cron_expression='0 8,18 * * *'
+        )
+        result = create_schedule(request)
+
+        assert result['scheduled_time'] == '2025-10-18T18:00:00Z'
+        assert result['cron_expression'] == '0 8,18 * * *'
+
+    @patch('app.crud.schedule.datetime')
+    @patch('app.crud.schedule.get_feed_schedule_table')
+    def test_update_cron_expression_realigns_from_now(self, mock_get_table, mock_datetime):
+        """Test that changing the cron rule moves scheduled_time to the next new slot."""
+        from datetime import UTC, datetime
+
+        mock_datetime.now.return_value = datetime(2025, 12, 13, 12, 0, tzinfo=UTC)
+        mock_datetime.utcnow.return_value = datetime(2025, 12, 13, 12, 0)
+        mock_datetime.fromisoformat = datetime.fromisoformat
+        mock_table = MagicMock()
+        mock_table.get_item.return_value = {
+            'Item': {'schedule_id': 'test-123', 'recurrence': 'cron', 'cron_expression': '0 8 * * *'}
+        }
+        mock_table.update_item.return_value = {'Attributes': {'schedule_id': 'test-123'}}
+        mock_get_table.return_value = mock_table
+
+        from app.crud.schedule import update_schedule
+        update_schedule('test-123', ScheduleUpdate(cron_expression='30 20 * * *'))
+
+        kwargs = mock_table.update_item.call_args[1]
+        assert kwargs['ExpressionAttributeValues'][':st'] == '2025-12-13T20:30:00Z'
+        assert kwargs['ExpressionAttributeValues'][':cron'] == '30 20 * * *'
+        assert 'REMOVE last_executed_at' in kwargs['UpdateExpression']
+
+    @patch('app.crud.schedule.datetime')
+    @patch('app.crud.schedule.get_feed_schedule_table')
+    def test_update_to_cron_uses_stored_expression(self, mock_get_table, mock_datetime):
+        """Test that recurrence='cron' without an expression is accepted when the schedule has one."""
+        from datetime import UTC, datetime
+
+        mock_datetime.now.return_value = datetime(2025, 12, 13, 12, 0, tzinfo=UTC)
+        mock_datetime.utcnow.return_value = datetime(2025, 12, 13, 12, 0)
+        mock_datetime.fromisoformat = datetime.fromisoformat
+        mock_table = MagicMock()
+        mock_table.get_item.return_value = {
+            'Item': {'schedule_id': 'test-123', 'recurrence': 'cron', 'cron_expression': '0 8 * * *'}
+        }
+        mock_table.update_item.return_value = {'Attributes': {'schedule_id': 'test-123'}}
+        mock_get_table.return_value = mock_table
+
+        from app.crud.schedule import update_schedule
+        update_schedule('test-123', ScheduleUpdate(recurrence='cron', feed_cycles=2))
+
+        kwargs = mock_table.update_item.call_args[1]
+        assert kwargs['ExpressionAttributeValues'][':rec'] == 'cron'
+        assert kwargs['ExpressionAttributeValues'][':st'] == '2025-12-14T08:00:00Z'
+        assert ':cron' not in kwargs['ExpressionAttributeValues']
+        assert 'cron_expression' not in kwargs['UpdateExpression']
+
+    @patch('app.crud.schedule.get_feed_schedule_table')
+    def test_update_away_from_cron_clears_expression(self, mock_get_table):
+        """Test that leaving cron recurrence removes the stored expression."""
+        mock_table = MagicMock()
+        mock_table.get_item.return_value = {
+            'Item': {'schedule_id': 'test-123', 'recurrence': 'cron', 'cron_expression': '0 8 * * *'}
+        }
+        mock_table.update_item.return_value = {'Attributes': {'schedule_id': 'test-123'}}
+        mock_get_table.return_value = mock_table
+
+        from app.crud.schedule import update_schedule
+        update_schedule('test-123', ScheduleUpdate(recurrence='daily', cron_expression='0 9 * * *'))
+
+        kwargs = mock_table.update_item.call_args[1]
+        assert kwargs['ExpressionAttributeValues'][':rec'] == 'daily'
+        assert ':cron' not in kwargs['ExpressionAttributeValues']
+        assert kwargs['UpdateExpression'].endswith(' REMOVE cron_expression')
+
+    @patch('app.crud.schedule.get_feed_schedule_table')
+    def test_update_to_cron_requires_expression(self, mock_get_table):
+        """Test that switching to cron without any stored expression fails."""
+        mock_table = MagicMock()
+        mock_table.get_item.return_value = {'Item': {'schedule_id': 'test-123', 'recurrence': 'cron'}}
+        mock_get_table.return_value = mock_table
+
+        from app.crud.schedule import update_schedule
+        with pytest.raises(ValueError, match="cron_expression is required"):
+            update_schedule('test-123', ScheduleUpdate(feed_cycles=2))
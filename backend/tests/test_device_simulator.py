@@ -0,0 +1,211 @@
+"""
+Tests for the device fleet simulator.
+"""
+import asyncio
+import json
+import random
+from datetime import datetime, timedelta
+
+
+def make_broker():
+    """Event queue and broker whose rules record every status and feed event a device publishes, decoded."""
+    from app.core.iot_codec import decode_device_message
+    from device_simulator import EventQueue, LocalBroker
+    from schedule_simulator import FakeClock
+
+    broker = LocalBroker(EventQueue(FakeClock(datetime(2025, 1, 1))))
+    messages = []
+    for topic_filter in ("petfeeder/+/status", "petfeeder/+/feed_event"):
+        broker.add_rule(topic_filter, lambda event, published_at: messages.append(decode_device_message(event)))
+    return broker, messages
+
+
+class TestLocalBroker:
+    """Test cases for the IoT Core stand-in."""
+
+    def test_topic_filters(self):
+        """Test '+' matches exactly one level and '#' the rest."""
+        from device_simulator import topic_matches
+
+        assert topic_matches("petfeeder/+/status", "petfeeder/feeder-1/status")
+        assert not topic_matches("petfeeder/+/status", "petfeeder/feeder-1/feed_event")
+        assert not topic_matches("petfeeder/+/status", "petfeeder/status")
+        assert not topic_matches("petfeeder/+", "petfeeder/feeder-1/status")
+        assert topic_matches("petfeeder/#", "petfeeder/feeder-1/status")
+
+    def test_rules_get_thing_id_from_topic(self):
+        """Test rule actions see the payload plus the device's thing name, after the delays."""
+        broker, messages = make_broker()
+        received = []
+        broker.subscribe("petfeeder/feeder-1/commands", lambda topic, payload: received.append(payload))
+
+        broker.publish("petfeeder/feeder-1/status", 0, json.dumps({"message": "Ready"}))
+        broker.publish("petfeeder/feeder-1/commands", 1, b"GET_STATUS")
+        asyncio.run(broker.events.run())
+
+        assert {"message": "Ready", "thing_id": "feeder-1"} in messages
+        assert received == ["GET_STATUS"]
+        assert broker.events.clock.now() == datetime(2025, 1, 1) + timedelta(seconds=0.08)
+
+    def test_compact_payloads_reach_devices_as_bytes(self):
+        """Test compact commands are delivered undecoded and every payload's bytes are counted."""
+        from app.core.iot_codec import encode_feed_command
+        from device_simulator import EventQueue, LocalBroker
+        from schedule_simulator import FakeClock
+
+        broker = LocalBroker(EventQueue(FakeClock(datetime(2025, 1, 1))))
+        received = []
+        broker.subscribe("petfeeder/feeder-1/commands", lambda topic, payload: received.append(payload))
+        command = encode_feed_command("api_user", "api")
+
+        broker.publish("petfeeder/feeder-1/commands", 1, command)
+        broker.publish("petfeeder/feeder-1/commands", 1, "GET_STATUS")
+        asyncio.run(broker.events.run())
+
+        assert received == [command, "GET_STATUS"]
+        assert broker.bytes_published == len(command) + len("GET_STATUS")
+
+
+class TestVirtualFeeder:
+    """Test cases for the firmware's MQTT behaviour."""
+
+    def test_feed_now_uses_requested_feed_id(self):
+        """Test a feed is logged under the API's feed_id and adds food to the bowl."""
+        from device_simulator import VirtualFeeder
+
+        broker, messages = make_broker()
+        feeder = VirtualFeeder("feeder-1", broker, random.Random(0), weight_g=100.0)
+        feeder.connect(broker.events.clock.now())
+        broker.publish(feeder.command_topic, 1, json.dumps({
+            "command": "FEED_NOW", "mode": "api", "requested_by": "user@example.com", "feed_cycles": 2, "feed_id": "feed-1"
+        }))
+        asyncio.run(broker.events.run())
+
+        feed_events = [m for m in messages if "feed_id" in m]
+        assert [m["status"] for m in feed_events] == ["initiated", "completed"]
+        assert all(m["feed_id"] == "feed-1" and m["requested_by"] == "user@example.com" for m in feed_events)
+        assert feed_events[0]["weight_before_g"] == 100.0
+        assert feed_events[1]["weight_after_g"] > 100.0
+        assert feed_events[1]["cycles"] == 2
+        assert [m.get("message") for m in messages].count("Multi-cycle feeding") == 1
+
+    def test_busy_and_full_feeders_fail_the_request(self):
+        """Test a feed that cannot start fails under its own feed_id."""
+        from device_simulator import VirtualFeeder
+
+        broker, messages = make_broker()
+        feeder = VirtualFeeder("feeder-1", broker, random.Random(0), weight_g=100.0)
+        feeder.connect(broker.events.clock.now())
+        for feed_id in ("feed-1", "feed-2"):
+            broker.publish(feeder.command_topic, 1, json.dumps({"command": "FEED_NOW", "feed_id": feed_id}))
+        asyncio.run(broker.events.run())
+        feeder.weight_g = 400.0
+        broker.publish(feeder.command_topic, 1, json.dumps({"command": "FEED_NOW", "feed_id": "feed-3"}))
+        asyncio.run(broker.events.run())
+
+        outcomes = [(m["feed_id"], m["status"]) for m in messages if "feed_id" in m]
+        assert outcomes == [("feed-1", "initiated"), ("feed-2", "failed"), ("feed-1", "completed"), ("feed-3", "failed")]
+        statuses = [m["message"] for m in messages if "message" in m]
+        assert "Feeder busy" in statuses
+        assert "Feed denied - threshold exceeded" in statuses
+
+    def test_compact_feeder_speaks_compact(self):
+        """Test a compact feeder answers a compact FEED_NOW with compact status and feed events."""
+        from app.core.iot_codec import PAYLOAD_FORMAT_COMPACT, encode_feed_command
+        from device_simulator import VirtualFeeder
+
+        broker, messages = make_broker()
+        feeder = VirtualFeeder("feeder-1", broker, random.Random(0), weight_g=100.0, compact=True)
+        feeder.connect(broker.events.clock.now())
+        feed_id = "0b9e6f4e-2a1c-4d3b-9f8e-7a6b5c4d3e2f"
+        broker.publish(feeder.command_topic, 1, encode_feed_command("user@example.com", "api", feed_id=feed_id))
+        asyncio.run(broker.events.run())
+
+        feed_events = [m for m in messages if "feed_id" in m]
+        assert [m["status"] for m in feed_events] == ["initiated", "completed"]
+        assert all(m["feed_id"] == feed_id and m["requested_by"] == "user@example.com" for m in feed_events)
+        assert all(m["payload_format"] == PAYLOAD_FORMAT_COMPACT for m in messages)
+
+    def test_config_is_validated_and_acknowledged(self):
+        """Test out-of-range config values are ignored and the applied version is reported."""
+        from device_simulator import VirtualFeeder
+
+        broker, messages = make_broker()
+        feeder = VirtualFeeder("feeder-1", broker, random.Random(0))
+        feeder.connect(broker.events.clock.now())
+        broker.publish("petfeeder/config", 1, json.dumps({
+            "version": 3, "SERVO_OPEN_HOLD_DURATION_MS": 500, "WEIGHT_THRESHOLD_G": 200
+        }))
+        asyncio.run(broker.events.run())
+
+        ack = messages[-1]
+        assert ack["message"] == "Config applied"
+        assert ack["config"] == {"version": 3, "SERVO_OPEN_HOLD_DURATION_MS": 3000, "WEIGHT_THRESHOLD_G": 200.0}
+
+    def test_status_request_echoes_request_id(self):
+        """Test GET_STATUS answers with the request_id, and the plain command without one."""
+        from device_simulator import VirtualFeeder
+
+        broker, messages = make_broker()
+        feeder = VirtualFeeder("feeder-1", broker, random.Random(0))
+        feeder.connect(broker.events.clock.now())
+        broker.publish(feeder.command_topic, 0, json.dumps({"command": "GET_STATUS", "request_id": "abc"}))
+        broker.publish(feeder.command_topic, 0, "GET_STATUS")
+        asyncio.run(broker.events.run())
+
+        replies = [m for m in messages if m.get("message") == "Status requested"]
+        assert [m.get("request_id") for m in replies] == ["abc", None]
+
+
+class TestDeviceSimulation:
+    """Test cases for end-to-end fleet simulations."""
+
+    def test_every_feed_reaches_history_and_notifier(self):
+        """Test the real handlers log, finish and notify every feed the API sent."""
+        from device_simulator import run_simulation
+
+        report = run_simulation(
+            feeders=40, minutes=5, feeds_per_hour=30, status_requests_per_hour=12, meals_per_hour=6, refills_per_hour=3
+        )
+
+        feeds = report["feeds"]
+        assert feeds["outcomes"]["sent"] > 0
+        assert feeds["lost"] == 0
+        assert feeds["completed"] + feeds["failed"] == feeds["outcomes"]["sent"]
+        assert feeds["notified"] == feeds["outcomes"]["sent"]
+        assert all(handler["errors"] == 0 for handler in report["handlers"].values())
+        assert report["handlers"]["feed_notifier"]["invocations"] > 0
+        assert report["status_requests"]["answered"] == report["status_requests"]["sent"] > 0
+        assert report["config_rollout"]["devices_applied"] == 40
+        # A single-cycle feed holds the servo open for 3s before the completed event
+        assert report["latency_seconds"]["command_to_final_feed_row"]["p50"] >= 3.0
+        assert report["latency_seconds"]["status_request_round_trip"]["max"] < 1.0
+
+    def test_simulation_leaves_api_state_alone(self):
+        """Test the stand-ins are only patched in for the run."""
+        from app.core import hardware_adapter, iot
+        from app.crud import config as crud_config
+        from device_simulator import run_simulation
+
+        config_cache = crud_config.config_cache
+        run_simulation(feeders=2, minutes=1, feeds_per_hour=60)
+
+        assert iot._iot_client is None
+        assert hardware_adapter._adapter is None
+        assert crud_config.config_cache is config_cache
+
+    def test_compact_fleet_publishes_fewer_bytes(self):
+        """Test a compact fleet gets compact commands and finishes every feed in far fewer bytes."""
+        from device_simulator import run_simulation
+
+        json_report = run_simulation(feeders=10, minutes=5, feeds_per_hour=30, status_requests_per_hour=12)
+        compact_report = run_simulation(
+            feeders=10, minutes=5, feeds_per_hour=30, status_requests_per_hour=12, compact_fraction=1.0
+        )
+
+        assert compact_report["compact_feeders"] == 10
+        assert compact_report["feeds"]["lost"] == 0
+        assert compact_report["feeds"]["completed"] == json_report["feeds"]["completed"] > 0
+        assert compact_report["status_requests"]["answered"] == compact_report["status_requests"]["sent"]
+        assert all(handler["errors"] == 0 for handler in compact_report["handlers"].values())
+        assert compact_report["messages"]["bytes_per_message"] < json_report["messages"]["bytes_per_message"] / 3
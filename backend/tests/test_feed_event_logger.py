@@ -27,6 +27,21 @@ class TestFeedEventLogger:
         assert item['feed_id'] == 'test-feed-123'
         assert item['status'] == 'initiated'
         assert item['mode'] == 'manual'
+        assert 'thing_id' not in item
+
+    @patch('feed_event_logger.table')
+    def test_handler_records_thing_id_from_rule(
+        self, mock_table, sample_feed_event, sample_feed_event_completed, mock_lambda_context
+    ):
+        """Test new events keep the device the IoT rule took from the topic."""
+        from feed_event_logger import handler
+
+        mock_table.get_item.return_value = {}
+        handler({**sample_feed_event, 'thing_id': 'feeder-7'}, mock_lambda_context)
+        handler({**sample_feed_event_completed, 'thing_id': 'feeder-7'}, mock_lambda_context)
+
+        items = [c[1]['Item'] for c in mock_table.put_item.call_args_list]
+        assert [item['thing_id'] for item in items] == ['feeder-7', 'feeder-7']
 
     @patch('feed_event_logger.table')
     def test_handler_updates_existing_event_on_completed(
@@ -116,6 +131,41 @@ class TestFeedEventLogger:
         assert result['statusCode'] == 400
         assert 'Invalid JSON' in result['body']
 
+    @patch('feed_event_logger.table')
+    def test_handler_decodes_compact_payload(
+        self, mock_table, sample_feed_event, mock_lambda_context
+    ):
+        """Test a base64 compact feed event from the rule is logged like its JSON form."""
+        import base64
+
+        from app.core.iot_codec import encode_feed_event
+        from feed_event_logger import handler
+
+        feed_id = '0b9e6f4e-2a1c-4d3b-9f8e-7a6b5c4d3e2f'
+        data = encode_feed_event({**sample_feed_event, 'feed_id': feed_id, 'weight_before_g': 80.5})
+
+        result = handler({'raw': base64.b64encode(data).decode(), 'thing_id': 'feeder-1'}, mock_lambda_context)
+
+        assert result['statusCode'] == 200
+        item = mock_table.put_item.call_args[1]['Item']
+        assert item['feed_id'] == feed_id
+        assert item['thing_id'] == 'feeder-1'
+        assert item['status'] == sample_feed_event['status']
+        assert item['mode'] == sample_feed_event['mode']
+        assert item['weight_before_g'] == Decimal('80.5')
+
+    def test_handler_returns_400_on_undecodable_payload(self, mock_lambda_context):
+        """Test that handler returns 400 for payloads that are not objects or cannot be decoded."""
+        import base64
+
+        from feed_event_logger import handler
+
+        for event in (12345, {'raw': base64.b64encode(b'\xa5\x01\x03').decode()}):
+            result = handler(event, mock_lambda_context)
+
+            assert result['statusCode'] == 400
+            assert 'Invalid payload' in result['body']
+
     @patch('feed_event_logger.table')
     def test_handler_handles_string_event(
         self, mock_table, sample_feed_event, mock_lambda_context
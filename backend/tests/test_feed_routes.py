@@ -8,6 +8,8 @@ from unittest.mock import patch
 import pytest
 from fastapi.testclient import TestClient
 
+from app.core.auth import Principal
+
 
 def create_test_token(email: str) -> str:
     """Create a test JWT token with email claim."""
@@ -188,12 +190,9 @@ class TestFeedRoutesWithRedaction:
         return TestClient(app)
 
     @patch('app.api.v1.routes.feed.redact_feed_history')
-    @patch('app.api.v1.routes.feed.is_admin')
-    @patch('app.api.v1.routes.feed.extract_email_from_token')
+    @patch('app.core.auth.resolve_principal')
     @patch('app.api.v1.routes.feed.get_feed_history')
-    def test_feed_history_applies_redaction(
-        self, mock_history, mock_extract, mock_is_admin, mock_redact, client
-    ):
+    def test_feed_history_applies_redaction(self, mock_history, mock_principal, mock_redact, client):
         """Test that feed history applies redaction."""
         mock_history.return_value = {
             'items': [{'requested_by': 'other@example.com'}],
@@ -202,8 +201,7 @@ class TestFeedRoutesWithRedaction:
             'limit': 10,
             'total_pages': 1
         }
-        mock_extract.return_value = 'user@example.com'
-        mock_is_admin.return_value = False
+        mock_principal.return_value = Principal(email='user@example.com')
         mock_redact.return_value = {
             'items': [{'requested_by': 'o***@e***.com'}],
             'total_items': 1,
@@ -215,7 +213,22 @@ class TestFeedRoutesWithRedaction:
         response = client.get("/api/v1/feed-events")
 
         assert response.status_code == 200
-        mock_redact.assert_called_once()
+        mock_redact.assert_called_once_with(mock_history.return_value, 'user@example.com', False)
+
+    @patch('app.core.auth.resolve_principal')
+    @patch('app.api.v1.routes.feed.process_feed')
+    def test_on_demand_requires_feed_scope_for_machines(self, mock_process, mock_principal, client):
+        """Test machine clients need the feed:write scope to trigger feeds."""
+        mock_principal.return_value = Principal(email='machine:bot', client_id='bot', scopes=('status:read',))
+
+        response = client.post(
+            "/api/v1/feeds",
+            json={"requested_by": "bot", "mode": "manual"},
+            headers={"Authorization": "Bearer pfm1.bot.1.status:read.sig"}
+        )
+
+        assert response.status_code == 403
+        mock_process.assert_not_called()
 
     @patch('app.api.v1.routes.feed.process_feed')
     def test_on_demand_error(self, mock_process, client):
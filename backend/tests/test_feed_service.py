@@ -340,3 +340,185 @@ class TestFeedService:
         result = await get_feed_history(page=1, limit=10)
 
         assert result['items'][0]['weight_g'] == 350.5
+
+
+class TestFleetFeeds:
+    """Test cases for feeding a named device or a device group."""
+
+    @patch('app.services.feed_service.get_hardware_adapter')
+    @patch('app.services.feed_service.fetch_config_setting')
+    @pytest.mark.asyncio
+    async def test_process_feed_targets_named_device(self, mock_fetch_config, mock_get_adapter):
+        """Test the weight check and the command both use the requested device, in its payload format."""
+        mock_adapter = mock_get_adapter.return_value
+        mock_adapter.get_device_status = AsyncMock(return_value={'current_weight_g': 10.0, 'payload_format': 'compact-v1'})
+        mock_adapter.trigger_feed = AsyncMock(return_value={'status': 'sent'})
+        mock_fetch_config.return_value = None
+
+        from app.services.feed_service import process_feed
+        result = await process_feed(FeedRequest(requested_by='test_user', thing_id='feeder-4'))
+
+        assert result.thing_id == 'feeder-4'
+        mock_adapter.get_device_status.assert_awaited_once_with('feeder-4')
+        assert mock_adapter.trigger_feed.await_args.kwargs['thing_id'] == 'feeder-4'
+        assert mock_adapter.trigger_feed.await_args.kwargs['payload_format'] == 'compact-v1'
+
+    @patch('app.services.feed_service.list_thing_group_members')
+    @patch('app.services.feed_service.get_device_statuses')
+    @patch('app.services.feed_service.get_hardware_adapter')
+    @patch('app.services.feed_service.fetch_config_setting')
+    @pytest.mark.asyncio
+    async def test_group_feed_skips_full_bowls(self, mock_fetch_config, mock_get_adapter, mock_statuses, mock_members):
+        """Test full bowls are denied and the rest of the group is fed in one fan-out."""
+        mock_members.return_value = ['feeder-1', 'feeder-2', 'feeder-3']
+        mock_statuses.return_value = {
+            'feeder-1': {'current_weight_g': 500.0},
+            'feeder-2': {'current_weight_g': 20.0, 'payload_format': 'compact-v1'}
+        }
+        mock_fetch_config.return_value = {'value': Decimal('450')}
+        mock_adapter = mock_get_adapter.return_value
+        mock_adapter.trigger_group_feed = AsyncMock(return_value={
+            'feeder-2': {'status': 'sent'},
+            'feeder-3': {'status': 'failed'}
+        })
+
+        from app.services.feed_service import process_group_feed
+        result = await process_group_feed('kennel-a', FeedRequest(requested_by='ops@example.com', mode='scheduled'))
+
+        assert (result.requested, result.sent, result.failed, result.denied) == (3, 1, 1, 1)
+        assert [(f.thing_id, f.status) for f in result.feeds] == [
+            ('feeder-1', 'denied_weight_exceeded'),
+            ('feeder-2', 'sent'),
+            ('feeder-3', 'failed')
+        ]
+        assert all(f.event_type == 'scheduled_feed' for f in result.feeds)
+        assert mock_adapter.trigger_group_feed.await_args.args[0] == ['feeder-2', 'feeder-3']
+        assert mock_adapter.trigger_group_feed.await_args.kwargs['payload_formats']['feeder-2'] == 'compact-v1'
+        # The feed_ids returned are the ones sent to the devices
+        sent_feed_ids = mock_adapter.trigger_group_feed.await_args.kwargs['feed_ids']
+        assert list(sent_feed_ids) == ['feeder-2', 'feeder-3']
+        assert {f.thing_id: f.feed_id for f in result.feeds if f.thing_id in sent_feed_ids} == sent_feed_ids
+        assert len({f.feed_id for f in result.feeds}) == 3
+
+    @patch('app.services.feed_service.list_thing_group_members')
+    @patch('app.services.feed_service.get_device_statuses')
+    @patch('app.services.feed_service.get_hardware_adapter')
+    @pytest.mark.asyncio
+    async def test_group_feed_proceeds_without_statuses(self, mock_get_adapter, mock_statuses, mock_members):
+        """Test a failed status read does not block the group feed."""
+        mock_members.return_value = ['feeder-1']
+        mock_statuses.side_effect = Exception("DynamoDB down")
+        mock_get_adapter.return_value.trigger_group_feed = AsyncMock(return_value={'feeder-1': {'status': 'sent'}})
+
+        from app.services.feed_service import process_group_feed
+        result = await process_group_feed('kennel-a', FeedRequest(requested_by='ops@example.com'))
+
+        assert result.sent == 1
+
+    @patch('app.services.feed_service.list_thing_group_members')
+    @patch('app.services.feed_service.get_device_statuses')
+    @patch('app.services.feed_service.get_hardware_adapter')
+    @patch('app.services.feed_service.fetch_config_setting')
+    @pytest.mark.asyncio
+    async def test_group_feed_all_denied_sends_nothing(self, mock_fetch_config, mock_get_adapter, mock_statuses, mock_members):
+        """Test nothing is published when every bowl is full."""
+        mock_members.return_value = ['feeder-1']
+        mock_statuses.return_value = {'feeder-1': {'current_weight_g': 900.0}}
+        mock_fetch_config.return_value = None
+        mock_get_adapter.return_value.trigger_group_feed = AsyncMock()
+
+        from app.services.feed_service import process_group_feed
+        result = await process_group_feed('kennel-a', FeedRequest(requested_by='ops@example.com'))
+
+        assert result.denied == 1
+        mock_get_adapter.return_value.trigger_group_feed.assert_not_awaited()
+
+    @patch('app.services.feed_service.list_thing_group_members')
+    @patch('app.services.feed_service.get_hardware_adapter')
+    @pytest.mark.asyncio
+    async def test_empty_group_raises(self, mock_get_adapter, mock_members):
+        """Test a group without devices is reported as not found."""
+        mock_members.return_value = []
+
+        from app.services.feed_service import process_group_feed
+        with pytest.raises(LookupError):
+            await process_group_feed('empty', FeedRequest(requested_by='ops@example.com'))
+
+
+class TestWaitForFeed:
+    """Test cases for waiting on the device's result of a feed."""
+
+    @staticmethod
+    def sending_adapter(mock_get_adapter):
+        mock_adapter = mock_get_adapter.return_value
+        mock_adapter.get_device_status = AsyncMock(return_value=None)
+        mock_adapter.trigger_feed = AsyncMock(return_value={'status': 'sent'})
+        return mock_adapter
+
+    @patch('app.core.polling.asyncio.sleep', new_callable=AsyncMock)
+    @patch('app.services.feed_service.get_feed_event')
+    @patch('app.services.feed_service.get_hardware_adapter')
+    @pytest.mark.asyncio
+    async def test_waits_for_completed_event(self, mock_get_adapter, mock_get_event, mock_sleep):
+        """Test the final status and weights of the feed's own event are returned."""
+        mock_adapter = self.sending_adapter(mock_get_adapter)
+        mock_get_event.side_effect = [
+            None,
+            {'status': 'initiated', 'weight_before_g': 120.5},
+            {'status': 'completed', 'weight_before_g': 120.5, 'weight_after_g': 168.0, 'weight_delta_g': 47.5},
+        ]
+
+        from app.services.feed_service import process_feed
+        result = await process_feed(FeedRequest(requested_by='test_user'), wait_timeout=10)
+
+        feed_id = mock_adapter.trigger_feed.await_args.kwargs['feed_id']
+        assert result.feed_id == feed_id
+        assert result.status == 'completed'
+        assert (result.weight_before_g, result.weight_after_g, result.weight_delta_g) == (120.5, 168.0, 47.5)
+        assert result.waited_ms is not None
+        assert all(c.args == (feed_id,) and c.kwargs == {'consistent_read': True} for c in mock_get_event.await_args_list)
+
+    @patch('app.core.polling.asyncio.sleep', new_callable=AsyncMock)
+    @patch('app.services.feed_service.get_feed_event')
+    @patch('app.services.feed_service.get_hardware_adapter')
+    @pytest.mark.asyncio
+    async def test_reports_failed_event(self, mock_get_adapter, mock_get_event, mock_sleep):
+        """Test a feed the device could not run comes back as failed."""
+        self.sending_adapter(mock_get_adapter)
+        mock_get_event.return_value = {'status': 'failed'}
+
+        from app.services.feed_service import process_feed
+        result = await process_feed(FeedRequest(requested_by='test_user'), wait_timeout=10)
+
+        assert result.status == 'failed'
+        assert result.weight_after_g is None
+
+    @patch('app.services.feed_service.get_feed_event')
+    @patch('app.services.feed_service.get_hardware_adapter')
+    @pytest.mark.asyncio
+    async def test_timeout_keeps_sent(self, mock_get_adapter, mock_get_event):
+        """Test a device that does not finish in time leaves the feed as sent."""
+        self.sending_adapter(mock_get_adapter)
+        mock_get_event.return_value = {'status': 'initiated'}
+
+        from app.services.feed_service import process_feed
+        result = await process_feed(FeedRequest(requested_by='test_user'), wait_timeout=0)
+
+        assert result.status == 'sent'
+        assert result.waited_ms is not None
+        mock_get_event.assert_awaited_once()
+
+    @patch('app.services.feed_service.get_feed_event')
+    @patch('app.services.feed_service.get_hardware_adapter')
+    @pytest.mark.asyncio
+    async def test_failed_publish_does_not_wait(self, mock_get_adapter, mock_get_event):
+        """Test nothing is awaited for a command that never reached the broker."""
+        mock_adapter = self.sending_adapter(mock_get_adapter)
+        mock_adapter.trigger_feed.return_value = {'status': 'failed'}
+
+        from app.services.feed_service import process_feed
+        result = await process_feed(FeedRequest(requested_by='test_user'), wait_timeout=10)
+
+        assert result.status == 'failed'
+        assert result.waited_ms is None
+        mock_get_event.assert_not_awaited()
@@ -2,7 +2,7 @@
 Tests for hardware adapter.
 """
 import os
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -12,30 +12,28 @@ class TestProductionHardwareAdapter:
 
     @patch.dict(os.environ, {
         'IOT_ENDPOINT': 'test-endpoint.iot.aws',
-        'IOT_THING_ID': 'test-thing',
-        'IOT_PUBLISH_TOPIC': 'petfeeder/commands'
+        'IOT_THING_ID': 'test-thing'
     })
-    @patch('app.core.hardware_adapter.boto3')
-    def test_init(self, mock_boto3):
+    @patch('app.core.iot.get_iot_data_client')
+    def test_init(self, mock_get_client):
         """Test ProductionHardwareAdapter initialization."""
         from app.core.hardware_adapter import ProductionHardwareAdapter
         adapter = ProductionHardwareAdapter()
 
         assert adapter.iot_endpoint == 'test-endpoint.iot.aws'
         assert adapter.thing_id == 'test-thing'
-        mock_boto3.client.assert_called_with('iot-data')
+        assert adapter.iot_client is mock_get_client.return_value
 
     @patch.dict(os.environ, {
         'IOT_ENDPOINT': 'test-endpoint.iot.aws',
-        'IOT_THING_ID': 'test-thing',
-        'IOT_PUBLISH_TOPIC': 'petfeeder/commands'
+        'IOT_THING_ID': 'test-thing'
     })
-    @patch('app.core.hardware_adapter.boto3')
+    @patch('app.core.iot.get_iot_data_client')
     @pytest.mark.asyncio
-    async def test_trigger_feed(self, mock_boto3):
+    async def test_trigger_feed(self, mock_get_client):
         """Test trigger_feed publishes MQTT command."""
         mock_client = MagicMock()
-        mock_boto3.client.return_value = mock_client
+        mock_get_client.return_value = mock_client
 
         from app.core.hardware_adapter import ProductionHardwareAdapter
         adapter = ProductionHardwareAdapter()
@@ -43,18 +41,92 @@ class TestProductionHardwareAdapter:
 
         assert result['status'] == 'sent'
         mock_client.publish.assert_called_once()
+        assert mock_client.publish.call_args.kwargs['topic'] == 'petfeeder/test-thing/commands'
 
     @patch.dict(os.environ, {
         'IOT_ENDPOINT': 'test-endpoint.iot.aws',
-        'IOT_THING_ID': 'test-thing',
-        'IOT_PUBLISH_TOPIC': 'petfeeder/commands'
+        'IOT_THING_ID': 'test-thing'
+    })
+    @patch('app.core.iot.get_iot_data_client')
+    @pytest.mark.asyncio
+    async def test_trigger_feed_on_other_device(self, mock_get_client):
+        """Test trigger_feed publishes to the named device's command topic."""
+        from app.core.hardware_adapter import ProductionHardwareAdapter
+        adapter = ProductionHardwareAdapter()
+        result = await adapter.trigger_feed('test_user', 'api', thing_id='feeder-9')
+
+        assert result['status'] == 'sent'
+        assert mock_get_client.return_value.publish.call_args.kwargs['topic'] == 'petfeeder/feeder-9/commands'
+
+    @patch.dict(os.environ, {
+        'IOT_ENDPOINT': 'test-endpoint.iot.aws',
+        'IOT_THING_ID': 'test-thing'
     })
-    @patch('app.core.hardware_adapter.boto3')
+    @patch('app.core.iot.get_iot_data_client')
     @pytest.mark.asyncio
-    async def test_trigger_feed_with_cycles(self, mock_boto3):
+    async def test_trigger_group_feed(self, mock_get_client):
+        """Test a group feed sends one command per device and reports each outcome."""
+        import json
+
+        def publish(topic, qos, payload):
+            if topic == 'petfeeder/feeder-2/commands':
+                raise Exception("throttled")
+
+        mock_get_client.return_value.publish.side_effect = publish
+
+        from app.core.hardware_adapter import ProductionHardwareAdapter
+        adapter = ProductionHardwareAdapter()
+        with patch('app.core.hardware_adapter.asyncio.sleep', new_callable=AsyncMock):
+            results = await adapter.trigger_group_feed(
+                ['feeder-1', 'feeder-2'], 'ops@example.com', 'api', feed_cycles=2,
+                feed_ids={'feeder-1': 'feed-1', 'feeder-2': 'feed-2'}
+            )
+
+        assert results['feeder-1']['status'] == 'sent'
+        assert results['feeder-2']['status'] == 'failed'
+        payloads = {
+            c.kwargs['topic']: json.loads(c.kwargs['payload']) for c in mock_get_client.return_value.publish.call_args_list
+        }
+        assert all(p['feed_cycles'] == 2 and p['requested_by'] == 'ops@example.com' for p in payloads.values())
+        assert payloads['petfeeder/feeder-1/commands']['feed_id'] == 'feed-1'
+        assert payloads['petfeeder/feeder-2/commands']['feed_id'] == 'feed-2'
+
+    @patch.dict(os.environ, {
+        'IOT_ENDPOINT': 'test-endpoint.iot.aws',
+        'IOT_THING_ID': 'test-thing'
+    })
+    @patch('app.core.iot.get_iot_data_client')
+    @pytest.mark.asyncio
+    async def test_feed_commands_follow_each_device_payload_format(self, mock_get_client):
+        """Test devices that report compact payloads get compact commands and the rest JSON."""
+        import json
+
+        from app.core.hardware_adapter import ProductionHardwareAdapter
+        from app.core.iot_codec import decode
+        adapter = ProductionHardwareAdapter()
+        feed_id = '0b9e6f4e-2a1c-4d3b-9f8e-7a6b5c4d3e2f'
+        await adapter.trigger_feed('test_user', 'api', thing_id='feeder-1', feed_id=feed_id, payload_format='compact-v1')
+        await adapter.trigger_group_feed(
+            ['feeder-1', 'feeder-2', 'feeder-3'], 'ops@example.com', 'api',
+            payload_formats={'feeder-1': 'compact-v1', 'feeder-2': 'json'}
+        )
+
+        payloads = [c.kwargs['payload'] for c in mock_get_client.return_value.publish.call_args_list]
+        single, *group = payloads
+        assert decode(single)['feed_id'] == feed_id
+        assert decode(group[0])['requested_by'] == 'ops@example.com'
+        assert [json.loads(p)['command'] for p in group[1:]] == ['FEED_NOW', 'FEED_NOW']
+
+    @patch.dict(os.environ, {
+        'IOT_ENDPOINT': 'test-endpoint.iot.aws',
+        'IOT_THING_ID': 'test-thing'
+    })
+    @patch('app.core.iot.get_iot_data_client')
+    @pytest.mark.asyncio
+    async def test_trigger_feed_with_cycles(self, mock_get_client):
         """Test trigger_feed with feed_cycles parameter."""
         mock_client = MagicMock()
-        mock_boto3.client.return_value = mock_client
+        mock_get_client.return_value = mock_client
 
         from app.core.hardware_adapter import ProductionHardwareAdapter
         adapter = ProductionHardwareAdapter()
@@ -69,15 +141,32 @@ class TestProductionHardwareAdapter:
         payload = json.loads(call_args[1]['payload'])
         assert payload['feed_cycles'] == 3
         assert payload['mode'] == 'scheduled'
+        assert 'feed_id' not in payload
+
+    @patch.dict(os.environ, {
+        'IOT_ENDPOINT': 'test-endpoint.iot.us-east-1.amazonaws.com',
+        'IOT_THING_ID': 'test-thing'
+    })
+    @patch('app.core.iot.get_iot_data_client')
+    @pytest.mark.asyncio
+    async def test_trigger_feed_sends_feed_id(self, mock_get_client):
+        """Test the API's feed_id is passed to the device in the command."""
+        from app.core.hardware_adapter import ProductionHardwareAdapter
+        adapter = ProductionHardwareAdapter()
+        await adapter.trigger_feed('test_user', 'api', feed_id='feed-1')
+
+        import json
+        payload = json.loads(mock_get_client.return_value.publish.call_args[1]['payload'])
+        assert payload['feed_id'] == 'feed-1'
 
     @patch.dict(os.environ, {
         'IOT_ENDPOINT': 'test-endpoint.iot.aws',
         'IOT_THING_ID': 'test-thing'
     })
-    @patch('app.core.hardware_adapter.boto3')
+    @patch('app.core.iot.get_iot_data_client')
     @patch('app.crud.feed.get_latest_device_status')
     @pytest.mark.asyncio
-    async def test_get_device_status(self, mock_get_status, mock_boto3):
+    async def test_get_device_status(self, mock_get_status, mock_get_client):
         """Test get_device_status retrieves from DynamoDB."""
         mock_get_status.return_value = {
             'thing_id': 'test-thing',
@@ -89,16 +178,19 @@ class TestProductionHardwareAdapter:
         result = await adapter.get_device_status()
 
         assert result['thing_id'] == 'test-thing'
-        mock_get_status.assert_called_once()
+        mock_get_status.assert_called_once_with('test-thing', False)
+
+        await adapter.get_device_status('feeder-2', consistent_read=True)
+        mock_get_status.assert_called_with('feeder-2', True)
 
     @patch.dict(os.environ, {
         'IOT_ENDPOINT': 'test-endpoint.iot.aws',
         'IOT_THING_ID': 'test-thing'
     })
-    @patch('app.core.hardware_adapter.boto3')
+    @patch('app.core.iot.get_iot_data_client')
     @patch('app.core.iot.request_device_status')
     @pytest.mark.asyncio
-    async def test_request_status_update(self, mock_request_status, mock_boto3):
+    async def test_request_status_update(self, mock_request_status, mock_get_client):
         """Test request_status_update calls IoT function."""
         mock_request_status.return_value = True
 
@@ -107,34 +199,188 @@ class TestProductionHardwareAdapter:
         result = await adapter.request_status_update()
 
         assert result is True
-        mock_request_status.assert_called_once()
+        mock_request_status.assert_called_once_with('test-thing', None)
+
+        await adapter.request_status_update('feeder-2', 'abc123')
+        mock_request_status.assert_called_with('feeder-2', 'abc123')
 
     @patch.dict(os.environ, {
         'IOT_ENDPOINT': 'test-endpoint.iot.aws',
-        'IOT_THING_ID': 'test-thing',
-        'IOT_CONFIG_TOPIC': 'petfeeder/config'
+        'IOT_THING_ID': 'test-thing'
     })
-    @patch('app.core.hardware_adapter.boto3')
+    @patch('app.core.iot.get_iot_data_client')
     @pytest.mark.asyncio
-    async def test_update_config(self, mock_boto3):
-        """Test update_config publishes to config topic."""
-        mock_client = MagicMock()
-        mock_boto3.client.return_value = mock_client
+    async def test_concurrent_feeds_overlap_publish_latency(self, mock_get_client):
+        """Test publishes run off the event loop, so concurrent feeds wait on IoT together."""
+        import asyncio
+        import threading
+
+        # Each publish only returns once both are in flight at the same time
+        both_publishing = threading.Barrier(2, timeout=5)
+        mock_get_client.return_value.publish.side_effect = lambda **kwargs: both_publishing.wait()
 
         from app.core.hardware_adapter import ProductionHardwareAdapter
         adapter = ProductionHardwareAdapter()
-        result = await adapter.update_config('SERVO_OPEN_HOLD_DURATION_MS', 3000)
+        results = await asyncio.gather(adapter.trigger_feed('a'), adapter.trigger_feed('b'))
 
-        assert result is True
-        mock_client.publish.assert_called_once()
+        assert [r['status'] for r in results] == ['sent', 'sent']
+        assert mock_get_client.return_value.publish.call_count == 2
+
+
+    @patch.dict(os.environ, {
+        'IOT_ENDPOINT': 'test-endpoint.iot.aws',
+        'IOT_THING_ID': 'test-thing'
+    })
+    @patch('app.core.iot.get_iot_data_client')
+    @pytest.mark.asyncio
+    async def test_trigger_feed_reports_failed_publish(self, mock_get_client):
+        """Test a publish that keeps failing returns a failed result instead of raising."""
+        mock_get_client.return_value.publish.side_effect = unavailable("endpoint unreachable")
+
+        from app.core.hardware_adapter import ProductionHardwareAdapter
+        adapter = ProductionHardwareAdapter()
+        # Full jitter picks a delay up to the doubling ceiling; take the ceiling
+        with patch('app.core.hardware_adapter.asyncio.sleep', new_callable=AsyncMock) as mock_sleep, \
+             patch('app.core.publish_policy.random.uniform', side_effect=lambda low, high: high):
+            feed = await adapter.trigger_feed('test_user')
+
+        assert mock_get_client.return_value.publish.call_count == 3
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [0.2, 0.4]
+        assert feed['status'] == 'failed'
+        assert 'endpoint unreachable' in feed['message']
+
+
+def throttled():
+    """The error IoT Core raises when the account's publish rate is exceeded."""
+    from botocore.exceptions import ClientError
+    return ClientError(
+        {'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}, 'ResponseMetadata': {'HTTPStatusCode': 429}},
+        'Publish'
+    )
+
+
+def unavailable(message):
+    """A 5xx from the IoT endpoint."""
+    from botocore.exceptions import ClientError
+    return ClientError(
+        {'Error': {'Code': 'ServiceUnavailableException', 'Message': message}, 'ResponseMetadata': {'HTTPStatusCode': 503}},
+        'Publish'
+    )
+
+
+class TestPublishMany:
+    """Test cases for ProductionHardwareAdapter.publish_many."""
+
+    @pytest.fixture
+    def adapter(self):
+        """Adapter with a mocked IoT client."""
+        with patch.dict(os.environ, {'IOT_ENDPOINT': 'test-endpoint.iot.aws', 'IOT_THING_ID': 'test-thing'}), \
+             patch('app.core.iot.get_iot_data_client'):
+            from app.core.hardware_adapter import ProductionHardwareAdapter
+            yield ProductionHardwareAdapter()
+
+    @pytest.mark.asyncio
+    async def test_results_follow_message_order(self, adapter):
+        """Test every message is published once and results keep the input order."""
+        messages = [(f'petfeeder/{i}/commands', f'{{"n": {i}}}', 1) for i in range(5)]
+
+        results = await adapter.publish_many(messages)
+
+        assert [r.topic for r in results] == [m[0] for m in messages]
+        assert all(r.success and r.attempts == 1 for r in results)
+        assert adapter.iot_client.publish.call_count == 5
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_limited(self, adapter):
+        """Test no more than `concurrency` publishes are in flight at once."""
+        import threading
+        import time
+        lock = threading.Lock()
+        in_flight = {'now': 0, 'max': 0}
+
+        def publish(**kwargs):
+            with lock:
+                in_flight['now'] += 1
+                in_flight['max'] = max(in_flight['max'], in_flight['now'])
+            time.sleep(0.02)
+            with lock:
+                in_flight['now'] -= 1
+
+        adapter.iot_client.publish.side_effect = publish
+        results = await adapter.publish_many([('t', 'p', 0)] * 8, concurrency=2)
+
+        assert all(r.success for r in results)
+        assert in_flight['max'] == 2
+
+    @pytest.mark.asyncio
+    async def test_only_failures_are_retried(self, adapter):
+        """Test a message that failed once is re-sent and the others are not."""
+        calls = []
+
+        def publish(topic, qos, payload):
+            calls.append(topic)
+            if topic == 'flaky' and calls.count('flaky') == 1:
+                raise throttled()
+
+        adapter.iot_client.publish.side_effect = publish
+        results = await adapter.publish_many([('ok', 'p', 1), ('flaky', 'p', 1)], retry_delay=0)
+
+        assert sorted(calls) == ['flaky', 'flaky', 'ok']
+        assert results[0].attempts == 1
+        assert results[1].success and results[1].attempts == 2
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self, adapter):
+        """Test a message that never goes through is reported with its last error."""
+        def publish(topic, qos, payload):
+            if topic == 'down':
+                raise unavailable("unreachable")
+
+        adapter.iot_client.publish.side_effect = publish
+        results = await adapter.publish_many([('down', 'p', 1), ('up', 'p', 1)], max_attempts=2, retry_delay=0)
+
+        assert results[0].success is False
+        assert results[0].attempts == 2
+        assert results[0].error.endswith("unreachable")
+        assert results[1].success is True
+
+    @pytest.mark.asyncio
+    async def test_rejected_messages_are_not_retried(self, adapter):
+        """Test errors that would fail again (bad request, bugs) end the message at once."""
+        from botocore.exceptions import ClientError
+        adapter.iot_client.publish.side_effect = ClientError(
+            {'Error': {'Code': 'InvalidRequestException', 'Message': 'bad topic'}, 'ResponseMetadata': {'HTTPStatusCode': 400}},
+            'Publish'
+        )
+
+        results = await adapter.publish_many([('bad', 'p', 1)], retry_delay=0)
+
+        assert results[0].attempts == 1
+        assert adapter.iot_client.publish.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self, adapter):
+        """Test once the endpoint keeps failing, later messages fail without a call."""
+        from app.core.iot import publish_policy
+        adapter.iot_client.publish.side_effect = unavailable("down")
+
+        first = await adapter.publish_many([(f't{i}', 'p', 1) for i in range(5)], max_attempts=1)
+        calls = adapter.iot_client.publish.call_count
+        [second] = await adapter.publish_many([('t', 'p', 1)], retry_delay=0)
+
+        assert not any(r.success for r in first)
+        assert publish_policy.breaker.state == 'open'
+        assert adapter.iot_client.publish.call_count == calls
+        assert (second.success, second.attempts) == (False, 1)
+        assert 'failing fast' in second.error
 
 
 class TestGetHardwareAdapter:
     """Test cases for get_hardware_adapter factory function."""
 
     @patch.dict(os.environ, {'ENVIRONMENT': 'prd'})
-    @patch('app.core.hardware_adapter.boto3')
-    def test_returns_production_adapter(self, mock_boto3):
+    @patch('app.core.iot.get_iot_data_client')
+    def test_returns_production_adapter(self, mock_get_client):
         """Test returns ProductionHardwareAdapter in production."""
         os.environ['IOT_ENDPOINT'] = 'test-endpoint'
         os.environ['IOT_THING_ID'] = 'test-thing'
@@ -145,8 +391,8 @@ class TestGetHardwareAdapter:
         assert isinstance(adapter, ProductionHardwareAdapter)
 
     @patch.dict(os.environ, {}, clear=True)
-    @patch('app.core.hardware_adapter.boto3')
-    def test_defaults_to_production(self, mock_boto3):
+    @patch('app.core.iot.get_iot_data_client')
+    def test_defaults_to_production(self, mock_get_client):
         """Test defaults to production when ENVIRONMENT not set."""
         os.environ['IOT_ENDPOINT'] = 'test-endpoint'
         os.environ['IOT_THING_ID'] = 'test-thing'
@@ -155,3 +401,18 @@ class TestGetHardwareAdapter:
         adapter = get_hardware_adapter()
 
         assert isinstance(adapter, ProductionHardwareAdapter)
+
+    @patch('app.core.iot.get_iot_data_client')
+    def test_adapter_is_built_once_per_process(self, mock_get_client):
+        """Test every call shares one adapter until it is reset."""
+        from app.core.hardware_adapter import (
+            get_hardware_adapter,
+            reset_hardware_adapter,
+        )
+
+        first = get_hardware_adapter()
+        assert get_hardware_adapter() is first
+        mock_get_client.assert_called_once()
+
+        reset_hardware_adapter()
+        assert get_hardware_adapter() is not first
@@ -1,6 +1,7 @@
 """
 Tests for IoT operations.
 """
+import json
 from unittest.mock import patch
 
 import pytest
@@ -10,20 +11,37 @@ from botocore.exceptions import ClientError
 class TestIotOperations:
     """Test cases for IoT operations."""
 
-    @patch('app.core.iot.iot_client')
+    @patch('app.core.iot.get_iot_data_client')
     @patch('app.core.iot.settings')
     @pytest.mark.asyncio
     async def test_publish_feed_command_success(self, mock_settings, mock_client):
         """Test successful feed command publish."""
         mock_settings.IOT_ENDPOINT = 'test-endpoint.iot.aws'
-        mock_settings.IOT_TOPIC_FEED = 'petfeeder/commands'
-        mock_client.publish.return_value = {}
+        mock_settings.IOT_TOPIC_PREFIX = 'petfeeder'
+        mock_settings.IOT_THING_ID = 'test-thing'
+        mock_client.return_value.publish.return_value = {}
 
         from app.core.iot import publish_feed_command
         result = await publish_feed_command('FEED_NOW')
 
         assert result is True
-        mock_client.publish.assert_called_once()
+        mock_client.return_value.publish.assert_called_once()
+        assert mock_client.return_value.publish.call_args.kwargs['topic'] == 'petfeeder/test-thing/commands'
+
+    @patch('app.core.iot.get_iot_data_client')
+    @patch('app.core.iot.settings')
+    @pytest.mark.asyncio
+    async def test_publish_feed_command_to_other_device(self, mock_settings, mock_client):
+        """Test the command goes to the named device's own topic."""
+        mock_settings.IOT_ENDPOINT = 'test-endpoint.iot.aws'
+        mock_settings.IOT_TOPIC_PREFIX = 'petfeeder'
+        mock_settings.IOT_THING_ID = 'test-thing'
+
+        from app.core.iot import publish_feed_command
+        result = await publish_feed_command('FEED_NOW', thing_id='feeder-7')
+
+        assert result is True
+        assert mock_client.return_value.publish.call_args.kwargs['topic'] == 'petfeeder/feeder-7/commands'
 
     @patch('app.core.iot.settings')
     @pytest.mark.asyncio
@@ -36,14 +54,15 @@ class TestIotOperations:
 
         assert result is False
 
-    @patch('app.core.iot.iot_client')
+    @patch('app.core.iot.get_iot_data_client')
     @patch('app.core.iot.settings')
     @pytest.mark.asyncio
     async def test_publish_feed_command_client_error(self, mock_settings, mock_client):
         """Test feed command with client error."""
         mock_settings.IOT_ENDPOINT = 'test-endpoint.iot.aws'
-        mock_settings.IOT_TOPIC_FEED = 'petfeeder/commands'
-        mock_client.publish.side_effect = ClientError(
+        mock_settings.IOT_TOPIC_PREFIX = 'petfeeder'
+        mock_settings.IOT_THING_ID = 'test-thing'
+        mock_client.return_value.publish.side_effect = ClientError(
             {'Error': {'Code': '500', 'Message': 'Test error'}},
             'Publish'
         )
@@ -53,36 +72,56 @@ class TestIotOperations:
 
         assert result is False
 
-    @patch('app.core.iot.iot_client')
+    @patch('app.core.iot.get_iot_data_client')
     @patch('app.core.iot.settings')
     @pytest.mark.asyncio
     async def test_publish_feed_command_unexpected_error(self, mock_settings, mock_client):
         """Test feed command with unexpected error."""
         mock_settings.IOT_ENDPOINT = 'test-endpoint.iot.aws'
-        mock_settings.IOT_TOPIC_FEED = 'petfeeder/commands'
-        mock_client.publish.side_effect = Exception("Unexpected error")
+        mock_settings.IOT_TOPIC_PREFIX = 'petfeeder'
+        mock_settings.IOT_THING_ID = 'test-thing'
+        mock_client.return_value.publish.side_effect = Exception("Unexpected error")
 
         from app.core.iot import publish_feed_command
         result = await publish_feed_command('FEED_NOW')
 
         assert result is False
 
-    @patch('app.core.iot.iot_client')
+    @patch('app.core.iot.get_iot_data_client')
     @patch('app.core.iot.settings')
     @pytest.mark.asyncio
     async def test_request_device_status_success(self, mock_settings, mock_client):
         """Test successful status request."""
         mock_settings.IOT_ENDPOINT = 'test-endpoint.iot.aws'
-        mock_settings.IOT_TOPIC_FEED = 'petfeeder/commands'
-        mock_client.publish.return_value = {}
+        mock_settings.IOT_TOPIC_PREFIX = 'petfeeder'
+        mock_settings.IOT_THING_ID = 'test-thing'
+        mock_client.return_value.publish.return_value = {}
 
         from app.core.iot import request_device_status
         result = await request_device_status()
 
         assert result is True
-        mock_client.publish.assert_called_once()
-        call_args = mock_client.publish.call_args
+        mock_client.return_value.publish.assert_called_once()
+        call_args = mock_client.return_value.publish.call_args
         assert call_args[1]['payload'] == 'GET_STATUS'
+        assert call_args[1]['topic'] == 'petfeeder/test-thing/commands'
+
+    @patch('app.core.iot.get_iot_data_client')
+    @patch('app.core.iot.settings')
+    @pytest.mark.asyncio
+    async def test_request_device_status_with_request_id(self, mock_settings, mock_client):
+        """Test a correlated status request carries its request id for the device to echo."""
+        mock_settings.IOT_ENDPOINT = 'test-endpoint.iot.aws'
+        mock_settings.IOT_TOPIC_PREFIX = 'petfeeder'
+        mock_settings.IOT_THING_ID = 'test-thing'
+
+        from app.core.iot import request_device_status
+        result = await request_device_status('feeder-2', request_id='abc123')
+
+        assert result is True
+        call_args = mock_client.return_value.publish.call_args
+        assert json.loads(call_args[1]['payload']) == {'command': 'GET_STATUS', 'request_id': 'abc123'}
+        assert call_args[1]['topic'] == 'petfeeder/feeder-2/commands'
 
     @patch('app.core.iot.settings')
     @pytest.mark.asyncio
@@ -95,14 +134,15 @@ class TestIotOperations:
 
         assert result is False
 
-    @patch('app.core.iot.iot_client')
+    @patch('app.core.iot.get_iot_data_client')
     @patch('app.core.iot.settings')
     @pytest.mark.asyncio
     async def test_request_device_status_client_error(self, mock_settings, mock_client):
         """Test status request with client error."""
         mock_settings.IOT_ENDPOINT = 'test-endpoint.iot.aws'
-        mock_settings.IOT_TOPIC_FEED = 'petfeeder/commands'
-        mock_client.publish.side_effect = ClientError(
+        mock_settings.IOT_TOPIC_PREFIX = 'petfeeder'
+        mock_settings.IOT_THING_ID = 'test-thing'
+        mock_client.return_value.publish.side_effect = ClientError(
             {'Error': {'Code': '500', 'Message': 'Test error'}},
             'Publish'
         )
@@ -112,75 +152,206 @@ class TestIotOperations:
 
         assert result is False
 
-    @patch('app.core.iot.iot_client')
+    @patch('app.core.iot.get_iot_data_client')
     @patch('app.core.iot.settings')
     @pytest.mark.asyncio
     async def test_request_device_status_unexpected_error(self, mock_settings, mock_client):
         """Test status request with unexpected error."""
         mock_settings.IOT_ENDPOINT = 'test-endpoint.iot.aws'
-        mock_settings.IOT_TOPIC_FEED = 'petfeeder/commands'
-        mock_client.publish.side_effect = Exception("Unexpected error")
+        mock_settings.IOT_TOPIC_PREFIX = 'petfeeder'
+        mock_settings.IOT_THING_ID = 'test-thing'
+        mock_client.return_value.publish.side_effect = Exception("Unexpected error")
 
         from app.core.iot import request_device_status
         result = await request_device_status()
 
         assert result is False
 
-    @patch('app.core.iot.iot_client')
+    @patch('app.core.iot.get_iot_data_client')
     @patch('app.core.iot.settings')
     @pytest.mark.asyncio
-    async def test_publish_config_update_success(self, mock_settings, mock_client):
+    async def test_publish_desired_config_success(self, mock_settings, mock_client):
         """Test successful config update publish."""
         mock_settings.IOT_ENDPOINT = 'test-endpoint.iot.aws'
         mock_settings.IOT_TOPIC_CONFIG = 'petfeeder/config'
-        mock_client.publish.return_value = {}
+        mock_client.return_value.publish.return_value = {}
 
-        from app.core.iot import publish_config_update
-        result = await publish_config_update('SERVO_OPEN_HOLD_DURATION_MS', 3000)
+        from app.core.iot import publish_desired_config
+        result = await publish_desired_config({'SERVO_OPEN_HOLD_DURATION_MS': 3000}, 4)
 
         assert result is True
-        mock_client.publish.assert_called_once()
-        call_args = mock_client.publish.call_args
+        mock_client.return_value.publish.assert_called_once()
+        call_args = mock_client.return_value.publish.call_args
         assert call_args[1]['qos'] == 1
+        assert json.loads(call_args[1]['payload']) == {'version': 4, 'SERVO_OPEN_HOLD_DURATION_MS': 3000}
 
     @patch('app.core.iot.settings')
     @pytest.mark.asyncio
-    async def test_publish_config_update_no_endpoint(self, mock_settings):
+    async def test_publish_desired_config_no_endpoint(self, mock_settings):
         """Test config update when endpoint not configured."""
         mock_settings.IOT_ENDPOINT = None
 
-        from app.core.iot import publish_config_update
-        result = await publish_config_update('SERVO_OPEN_HOLD_DURATION_MS', 3000)
+        from app.core.iot import publish_desired_config
+        result = await publish_desired_config({'SERVO_OPEN_HOLD_DURATION_MS': 3000}, 4)
 
         assert result is False
 
-    @patch('app.core.iot.iot_client')
+    @patch('app.core.iot.get_iot_data_client')
     @patch('app.core.iot.settings')
     @pytest.mark.asyncio
-    async def test_publish_config_update_client_error(self, mock_settings, mock_client):
+    async def test_publish_desired_config_client_error(self, mock_settings, mock_client):
         """Test config update with client error."""
         mock_settings.IOT_ENDPOINT = 'test-endpoint.iot.aws'
         mock_settings.IOT_TOPIC_CONFIG = 'petfeeder/config'
-        mock_client.publish.side_effect = ClientError(
+        mock_client.return_value.publish.side_effect = ClientError(
             {'Error': {'Code': '500', 'Message': 'Test error'}},
             'Publish'
         )
 
-        from app.core.iot import publish_config_update
-        result = await publish_config_update('SERVO_OPEN_HOLD_DURATION_MS', 3000)
+        from app.core.iot import publish_desired_config
+        result = await publish_desired_config({'SERVO_OPEN_HOLD_DURATION_MS': 3000}, 4)
 
         assert result is False
 
-    @patch('app.core.iot.iot_client')
+    @patch('app.core.iot.get_iot_data_client')
     @patch('app.core.iot.settings')
     @pytest.mark.asyncio
-    async def test_publish_config_update_unexpected_error(self, mock_settings, mock_client):
+    async def test_publish_desired_config_unexpected_error(self, mock_settings, mock_client):
         """Test config update with unexpected error."""
         mock_settings.IOT_ENDPOINT = 'test-endpoint.iot.aws'
         mock_settings.IOT_TOPIC_CONFIG = 'petfeeder/config'
-        mock_client.publish.side_effect = Exception("Unexpected error")
+        mock_client.return_value.publish.side_effect = Exception("Unexpected error")
 
-        from app.core.iot import publish_config_update
-        result = await publish_config_update('SERVO_OPEN_HOLD_DURATION_MS', 3000)
+        from app.core.iot import publish_desired_config
+        result = await publish_desired_config({'SERVO_OPEN_HOLD_DURATION_MS': 3000}, 4)
 
         assert result is False
+
+
+class TestPublishPolicy:
+    """Test cases for retries and the circuit breaker around IoT publishes."""
+
+    @patch('app.core.iot.get_iot_data_client')
+    @pytest.mark.asyncio
+    async def test_throttled_publish_is_retried(self, mock_client):
+        """Test a brief throttle no longer fails the feed command."""
+        from unittest.mock import AsyncMock
+        throttled = ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}}, 'Publish')
+        mock_client.return_value.publish.side_effect = [throttled, {}]
+
+        from app.core.iot import publish_feed_command, publish_policy
+        with patch('app.core.publish_policy.asyncio.sleep', new_callable=AsyncMock):
+            result = await publish_feed_command('FEED_NOW')
+
+        assert result is True
+        assert mock_client.return_value.publish.call_count == 2
+        assert publish_policy.metrics()['retries'] == 1
+
+    @patch('app.core.iot.get_iot_data_client')
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self, mock_client):
+        """Test every publish returns False without calling the endpoint while the circuit is open."""
+        from app.core.iot import (
+            publish_desired_config,
+            publish_feed_command,
+            publish_policy,
+            request_device_status,
+        )
+        for _ in range(publish_policy.breaker.failure_threshold):
+            publish_policy.breaker.record_failure()
+
+        results = [
+            await publish_feed_command('FEED_NOW'),
+            await request_device_status(),
+            await publish_desired_config({'WEIGHT_THRESHOLD_G': 400}, 2),
+        ]
+
+        assert results == [False, False, False]
+        mock_client.return_value.publish.assert_not_called()
+        assert publish_policy.metrics()['rejected'] == 3
+
+    def test_state_changes_are_logged_as_metrics(self, capsys):
+        """Test each breaker transition prints a CloudWatch embedded metric record."""
+        from app.core.iot import publish_policy
+        for _ in range(publish_policy.breaker.failure_threshold):
+            publish_policy.breaker.record_failure()
+
+        record = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+
+        assert record['PublishCircuitState'] == 2
+        assert (record['previous_state'], record['state']) == ('closed', 'open')
+        assert record['_aws']['CloudWatchMetrics'][0]['Metrics'] == [{'Name': 'PublishCircuitState', 'Unit': 'None'}]
+
+
+class TestIotDataClient:
+    """Test cases for the shared IoT data client."""
+
+    @patch('app.core.iot.boto3')
+    def test_client_is_built_once_with_pool_settings(self, mock_boto3):
+        """Test the client is built lazily, once, with a tuned connection pool."""
+        from app.core import iot
+        from app.core.config import settings
+
+        client = iot.get_iot_data_client()
+
+        assert iot.get_iot_data_client() is client
+        mock_boto3.client.assert_called_once()
+        kwargs = mock_boto3.client.call_args.kwargs
+        assert mock_boto3.client.call_args.args == ('iot-data',)
+        assert kwargs['endpoint_url'] == f"https://{settings.IOT_ENDPOINT}"
+        assert kwargs['config'].max_pool_connections == settings.IOT_MAX_POOL_CONNECTIONS
+        # Retries belong to the publish policy, which must see every failure
+        assert kwargs['config'].retries['max_attempts'] == 1
+
+    @patch('app.core.iot.settings')
+    @patch('app.core.iot.boto3')
+    def test_client_without_endpoint_uses_default(self, mock_boto3, mock_settings):
+        """Test no endpoint override is passed when IOT_ENDPOINT is not set."""
+        mock_settings.IOT_ENDPOINT = None
+        mock_settings.IOT_MAX_POOL_CONNECTIONS = 10
+
+        from app.core import iot
+        iot.get_iot_data_client()
+
+        assert mock_boto3.client.call_args.kwargs['endpoint_url'] is None
+
+
+class TestDeviceTopics:
+    """Test cases for per-device topics and thing group lookup."""
+
+    def test_device_topic_defaults_to_deployment_device(self):
+        """Test topics are built per device, falling back to IOT_THING_ID."""
+        from app.core.config import settings
+        from app.core.iot import device_topic
+
+        assert device_topic('feeder-1', 'commands') == 'petfeeder/feeder-1/commands'
+        assert device_topic(None, 'commands') == f'petfeeder/{settings.IOT_THING_ID}/commands'
+
+    @patch('app.core.iot.boto3')
+    def test_control_client_is_built_once(self, mock_boto3):
+        """Test the registry client is built lazily and reused."""
+        from app.core import iot
+
+        client = iot.get_iot_control_client()
+
+        assert iot.get_iot_control_client() is client
+        mock_boto3.client.assert_called_once()
+        assert mock_boto3.client.call_args.args == ('iot',)
+
+    @patch('app.core.iot.get_iot_control_client')
+    def test_group_members_are_paginated_and_cached(self, mock_client):
+        """Test members from every page are returned sorted and the lookup is cached."""
+        paginator = mock_client.return_value.get_paginator.return_value
+        paginator.paginate.return_value = [
+            {'things': ['feeder-3', 'feeder-1']},
+            {'things': ['feeder-2', 'feeder-1']},
+            {}
+        ]
+
+        from app.core.iot import list_thing_group_members
+        members = list_thing_group_members('kennel-a')
+        members.append('mutated')
+
+        assert list_thing_group_members('kennel-a') == ['feeder-1', 'feeder-2', 'feeder-3']
+        mock_client.return_value.get_paginator.assert_called_once_with('list_things_in_thing_group')
+        paginator.paginate.assert_called_once_with(thingGroupName='kennel-a', recursive=True)
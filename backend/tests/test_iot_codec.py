@@ -0,0 +1,248 @@
+"""
+Tests for the compact device payload format.
+"""
+import base64
+import json
+
+import pytest
+
+FEED_ID = "0b9e6f4e-2a1c-4d3b-9f8e-7a6b5c4d3e2f"
+REQUEST_ID = "5f0c6d1e9a8b4c2d8e7f6a5b4c3d2e1f"
+
+STATUS = {
+    "current_weight_g": 123.4,
+    "feeder_state": "CLOSED",
+    "network_status": "ONLINE",
+    "message": "Status requested",
+    "trigger_method": "system",
+    "request_id": REQUEST_ID,
+    "config": {"version": 7, "SERVO_OPEN_HOLD_DURATION_MS": 2500, "WEIGHT_THRESHOLD_G": 350.0},
+}
+
+FEED_EVENT = {
+    "feed_id": FEED_ID,
+    "mode": "api",
+    "requested_by": "user@example.com",
+    "event_type": "manual_feed",
+    "status": "initiated",
+    "trigger_method": "api",
+    "weight_before_g": 80.5,
+    "cycles": 2,
+}
+
+
+class TestEncodeDecode:
+    """Test cases for round trips through the compact format."""
+
+    def test_feed_command_round_trip(self):
+        """Test a FEED_NOW command decodes to the JSON command it replaces."""
+        from app.core.iot_codec import (
+            PAYLOAD_FORMAT_COMPACT,
+            decode,
+            encode_feed_command,
+        )
+
+        data = encode_feed_command("user@example.com", "scheduled", feed_cycles=3, feed_id=FEED_ID, timestamp=1700000000)
+
+        assert decode(data) == {
+            "command": "FEED_NOW",
+            "requested_by": "user@example.com",
+            "mode": "scheduled",
+            "feed_cycles": 3,
+            "feed_id": FEED_ID,
+            "timestamp": 1700000000,
+            "payload_format": PAYLOAD_FORMAT_COMPACT,
+        }
+
+    def test_feed_command_without_optional_fields(self):
+        """Test default cycles and a missing feed_id are left out, as is an unset clock."""
+        from app.core.iot_codec import decode, encode_feed_command
+
+        message = decode(encode_feed_command("api_user", "api", timestamp=0))
+
+        assert "feed_cycles" not in message
+        assert "feed_id" not in message
+        assert "timestamp" not in message
+
+    def test_status_round_trip(self):
+        """Test a status keeps its fields, config and request_id, in far fewer bytes than JSON."""
+        from app.core.iot_codec import decode, encode_status
+
+        data = encode_status(STATUS, timestamp=1700000000)
+        message = decode(data)
+
+        assert {key: message[key] for key in STATUS} == STATUS
+        assert message["timestamp"] == 1700000000
+        assert len(data) < len(json.dumps(STATUS)) / 4
+
+    def test_status_without_request_id_or_known_message(self):
+        """Test messages and triggers outside their tables decode to no message and 'unknown'."""
+        from app.core.iot_codec import decode, encode_status
+
+        message = decode(encode_status({
+            "message": "Something new", "trigger_method": "firmware_update",
+            "feeder_state": "IDLE", "network_status": "ONLINE",
+        }))
+
+        assert "message" not in message
+        assert "request_id" not in message
+        assert message["feeder_state"] == "IDLE"
+        assert message["trigger_method"] == "unknown"
+        # No config block was sent, so none is reported (not a config version 0)
+        assert "config" not in message
+
+    @pytest.mark.parametrize("field, value", [("feeder_state", "JAMMED"), ("network_status", None)])
+    def test_status_with_unknown_state_is_rejected(self, field, value):
+        """Test a state its table has no code for is rejected rather than sent as another state."""
+        from app.core.iot_codec import encode_status
+
+        with pytest.raises(ValueError, match="No code for"):
+            encode_status({**STATUS, field: value})
+
+    def test_feed_event_round_trip(self):
+        """Test a feed event keeps its fields, weights and cycles."""
+        from app.core.iot_codec import decode, encode_feed_event
+
+        message = decode(encode_feed_event(FEED_EVENT))
+
+        assert {key: message[key] for key in FEED_EVENT} == FEED_EVENT
+        assert "weight_after_g" not in message
+
+    def test_feed_event_without_weight_before(self):
+        """Test a completed event carries only the weight after and no cycles for a single cycle."""
+        from app.core.iot_codec import decode, encode_feed_event
+
+        message = decode(encode_feed_event({
+            "feed_id": FEED_ID, "status": "completed", "event_type": "manual_feed", "weight_after_g": 95.0
+        }))
+
+        assert message["weight_after_g"] == 95.0
+        assert "weight_before_g" not in message
+        assert "cycles" not in message
+        assert message["requested_by"] == ""
+
+    def test_long_text_is_truncated(self):
+        """Test requested_by is cut to the 255 bytes its length byte can describe."""
+        from app.core.iot_codec import decode, encode_feed_command
+
+        assert decode(encode_feed_command("x" * 300, "api"))["requested_by"] == "x" * 255
+
+    def test_long_text_is_truncated_on_a_character_boundary(self):
+        """Test a cut that would split a multi-byte character drops the whole character."""
+        from app.core.iot_codec import decode, encode_feed_command
+
+        # 127 two-byte characters fill 254 bytes; the next one would end at byte 256
+        assert decode(encode_feed_command("é" * 200, "api"))["requested_by"] == "é" * 127
+
+    def test_is_compact(self):
+        """Test only bytes starting with the magic byte are compact."""
+        from app.core.iot_codec import encode_status, is_compact
+
+        assert is_compact(encode_status(STATUS))
+        assert not is_compact(b'{"command": "FEED_NOW"}')
+        assert not is_compact(b"")
+        assert not is_compact("\xa5")
+
+
+class TestDecodeErrors:
+    """Test cases for payloads the decoder rejects."""
+
+    @pytest.mark.parametrize("data", [b'{"a": 1}', b"\xa5\x01"])
+    def test_not_compact(self, data):
+        """Test JSON and payloads shorter than the header are rejected."""
+        from app.core.iot_codec import decode
+
+        with pytest.raises(ValueError, match="Not a compact payload"):
+            decode(data)
+
+    def test_unknown_version(self):
+        """Test a newer format version is rejected rather than misread."""
+        from app.core.iot_codec import decode, encode_status
+
+        data = bytearray(encode_status(STATUS))
+        data[1] = 2
+
+        with pytest.raises(ValueError, match="version 2"):
+            decode(bytes(data))
+
+    def test_unknown_message_type(self):
+        """Test an unknown message type is rejected."""
+        from app.core.iot_codec import decode, encode_status
+
+        data = bytearray(encode_status(STATUS))
+        data[2] = 9
+
+        with pytest.raises(ValueError, match="message type 9"):
+            decode(bytes(data))
+
+    def test_unknown_code(self):
+        """Test a code past the end of its table is rejected."""
+        from app.core.iot_codec import HEADER, decode, encode_feed_event
+
+        data = bytearray(encode_feed_event(FEED_EVENT))
+        data[HEADER.size + 16] = 200
+
+        with pytest.raises(ValueError, match="Unknown code 200"):
+            decode(bytes(data))
+
+    @pytest.mark.parametrize("cut", [10, 33, 40])
+    def test_truncated_status(self, cut):
+        """Test a status cut in its fixed fields or its request_id is rejected."""
+        from app.core.iot_codec import decode, encode_status
+
+        with pytest.raises(ValueError, match="Truncated"):
+            decode(encode_status(STATUS)[:cut])
+
+    @pytest.mark.parametrize("cut", [37, 40])
+    def test_truncated_text(self, cut):
+        """Test a feed event cut before or inside requested_by is rejected."""
+        from app.core.iot_codec import decode, encode_feed_event
+
+        with pytest.raises(ValueError, match="Truncated"):
+            decode(encode_feed_event(FEED_EVENT)[:cut])
+
+
+class TestDecodeDeviceMessage:
+    """Test cases for reading device messages from IoT rule events."""
+
+    def test_raw_compact_payload(self):
+        """Test a base64 compact payload is decoded and the rule's fields are kept."""
+        from app.core.iot_codec import (
+            PAYLOAD_FORMAT_COMPACT,
+            decode_device_message,
+            encode_status,
+        )
+
+        event = {"raw": base64.b64encode(encode_status(STATUS)).decode(), "thing_id": "feeder-1"}
+        message = decode_device_message(event)
+
+        assert message["thing_id"] == "feeder-1"
+        assert message["request_id"] == REQUEST_ID
+        assert message["payload_format"] == PAYLOAD_FORMAT_COMPACT
+        assert "raw" not in message
+
+    def test_raw_json_payload(self):
+        """Test a base64 JSON payload is parsed as before."""
+        from app.core.iot_codec import decode_device_message
+
+        event = {"raw": base64.b64encode(json.dumps({"message": "Ready"}).encode()).decode(), "thing_id": "feeder-1"}
+
+        assert decode_device_message(event) == {"message": "Ready", "thing_id": "feeder-1"}
+
+    def test_selected_fields_and_strings_pass_through(self):
+        """Test events from rules that select the JSON fields, and JSON strings, are used as they are."""
+        from app.core.iot_codec import decode_device_message
+
+        assert decode_device_message({"message": "Ready", "thing_id": "feeder-1"}) == {"message": "Ready", "thing_id": "feeder-1"}
+        assert decode_device_message('{"message": "Ready"}') == {"message": "Ready"}
+
+    @pytest.mark.parametrize("event", [
+        ["not", "a", "dict"],
+        {"raw": base64.b64encode(b"[1, 2]").decode()},
+    ])
+    def test_non_object_payloads(self, event):
+        """Test events and payloads that are not objects are rejected."""
+        from app.core.iot_codec import decode_device_message
+
+        with pytest.raises(TypeError):
+            decode_device_message(event)
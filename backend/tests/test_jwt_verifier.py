@@ -1,10 +1,13 @@
 """Tests for JWT signature verification."""
 
 import json
+import threading
 import time
 from unittest.mock import MagicMock, patch
 
 import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
 from jwt.exceptions import (
     DecodeError,
     ExpiredSignatureError,
@@ -50,8 +53,8 @@ class TestGetJWKS:
         mock_urlopen.assert_not_called()
 
     @patch('app.core.jwt_verifier.urlopen')
-    def test_refetches_jwks_after_ttl_expires(self, mock_urlopen):
-        """Should refetch JWKS after TTL expires."""
+    def test_serves_stale_jwks_while_refreshing(self, mock_urlopen):
+        """Should return the cached JWKS after expiry and refresh it in the background."""
         jwt_verifier._jwks_cache = {'keys': [{'kid': 'old-kid'}]}
         jwt_verifier._jwks_cache_timestamp = time.time() - 3700  # Expired
 
@@ -61,23 +64,62 @@ class TestGetJWKS:
         mock_urlopen.return_value = mock_response
 
         result = jwt_verifier._get_jwks()
+        jwt_verifier._jwks_refresh.result(timeout=5)
 
-        assert result == {'keys': [{'kid': 'new-kid'}]}
+        assert result == {'keys': [{'kid': 'old-kid'}]}
+        assert jwt_verifier._jwks_cache == {'keys': [{'kid': 'new-kid'}]}
         mock_urlopen.assert_called_once()
 
+    @patch('app.core.jwt_verifier._start_jwks_refresh')
+    def test_refreshes_ahead_of_expiry(self, mock_refresh):
+        """Should start a background refresh shortly before the cache expires."""
+        jwt_verifier._jwks_cache = {'keys': [{'kid': 'cached-kid'}]}
+        jwt_verifier._jwks_cache_timestamp = time.time() - jwt_verifier.JWKS_CACHE_TTL + 60
+
+        assert jwt_verifier._get_jwks() == {'keys': [{'kid': 'cached-kid'}]}
+        mock_refresh.assert_called_once_with()
+
+    @patch('app.core.jwt_verifier._start_jwks_refresh')
+    def test_waits_between_failed_background_refreshes(self, mock_refresh):
+        """Should not start another background refresh within the retry interval."""
+        jwt_verifier._jwks_cache = {'keys': [{'kid': 'cached-kid'}]}
+        jwt_verifier._jwks_cache_timestamp = time.time() - 3700
+        jwt_verifier._jwks_last_attempt = time.time() - 10
+
+        jwt_verifier._get_jwks()
+
+        mock_refresh.assert_not_called()
+
     @patch('app.core.jwt_verifier.urlopen')
     def test_uses_stale_cache_on_fetch_failure(self, mock_urlopen):
-        """Should use stale cache if fetch fails."""
+        """Should use stale cache if a forced fetch fails."""
         cached_jwks = {'keys': [{'kid': 'stale-kid'}]}
         jwt_verifier._jwks_cache = cached_jwks
         jwt_verifier._jwks_cache_timestamp = time.time() - 3700  # Expired
 
         mock_urlopen.side_effect = Exception("Network error")
 
-        result = jwt_verifier._get_jwks()
+        result = jwt_verifier._get_jwks(wait=True)
 
         assert result == cached_jwks
 
+    def test_concurrent_callers_share_one_fetch(self):
+        """Should run a single fetch for callers arriving while one is in flight."""
+        release = threading.Event()
+
+        def slow_fetch():
+            release.wait(timeout=5)
+            return {'keys': []}
+
+        with patch('app.core.jwt_verifier._fetch_jwks', side_effect=slow_fetch) as mock_fetch:
+            first = jwt_verifier._start_jwks_refresh()
+            second = jwt_verifier._start_jwks_refresh()
+            release.set()
+            first.result(timeout=5)
+
+        assert first is second
+        mock_fetch.assert_called_once()
+
     @patch('app.core.jwt_verifier.urlopen')
     def test_raises_error_if_no_cache_and_fetch_fails(self, mock_urlopen):
         """Should raise error if no cache and fetch fails."""
@@ -145,6 +187,103 @@ class TestGetPublicKey:
             jwt_verifier._get_public_key('test.token.here')
 
 
+def _rsa_jwk(kid: str) -> dict:
+    """Real RSA public JWK for key-parsing tests."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk['kid'] = kid
+    return jwk
+
+
+class TestPublicKeyCache:
+    """Tests for the parsed public key cache and unknown-kid refresh."""
+
+    @patch('app.core.jwt_verifier._get_jwks')
+    @patch('app.core.jwt_verifier.jwt.get_unverified_header')
+    def test_keys_are_parsed_once_per_jwks(self, mock_get_header, mock_get_jwks):
+        """Should reuse parsed key objects while the JWKS is unchanged."""
+        mock_get_header.return_value = {'kid': 'kid-1'}
+        mock_get_jwks.return_value = {'keys': [_rsa_jwk('kid-1')]}
+
+        with patch('app.core.jwt_verifier.RSAAlgorithm.from_jwk', wraps=RSAAlgorithm.from_jwk) as mock_from_jwk:
+            first = jwt_verifier._get_public_key('token.one')
+            second = jwt_verifier._get_public_key('token.two')
+
+        assert first is second
+        assert isinstance(first, rsa.RSAPublicKey)
+        mock_from_jwk.assert_called_once()
+
+    def test_parse_skips_unusable_keys(self):
+        """Should skip keys without a kid or that are not RSA."""
+        keys = jwt_verifier._parse_public_keys({'keys': [
+            _rsa_jwk('good'),
+            {'kty': 'RSA', 'n': 'abc', 'e': 'AQAB'},
+            {'kid': 'ec-key', 'kty': 'EC'},
+        ]})
+
+        assert list(keys) == ['good']
+
+    @patch('app.core.jwt_verifier._get_jwks')
+    @patch('app.core.jwt_verifier.jwt.get_unverified_header')
+    def test_unknown_kid_triggers_one_refresh(self, mock_get_header, mock_get_jwks):
+        """Should refresh the JWKS once to pick up a rotated key."""
+        old_jwks = {'keys': [_rsa_jwk('old-kid')]}
+        new_jwks = {'keys': [_rsa_jwk('old-kid'), _rsa_jwk('new-kid')]}
+        mock_get_header.return_value = {'kid': 'new-kid'}
+        mock_get_jwks.side_effect = [old_jwks, new_jwks]
+
+        assert jwt_verifier._get_public_key('rotated.token') is not None
+        assert mock_get_jwks.call_args_list[-1].kwargs == {'wait': True}
+        assert mock_get_jwks.call_count == 2
+
+    @patch('app.core.jwt_verifier._get_jwks')
+    @patch('app.core.jwt_verifier.jwt.get_unverified_header')
+    def test_unknown_kid_refresh_has_cooldown(self, mock_get_header, mock_get_jwks):
+        """Should not refresh again for unknown kids within the cooldown."""
+        mock_get_header.return_value = {'kid': 'forged-kid'}
+        mock_get_jwks.return_value = {'keys': [_rsa_jwk('real-kid')]}
+
+        for _ in range(3):
+            with pytest.raises(InvalidKeyError):
+                jwt_verifier._get_public_key('forged.token')
+
+        # One normal lookup per call plus a single forced refresh
+        assert mock_get_jwks.call_count == 4
+
+        jwt_verifier._last_unknown_kid_refresh = time.time() - jwt_verifier.JWKS_REFRESH_COOLDOWN
+        with pytest.raises(InvalidKeyError):
+            jwt_verifier._get_public_key('forged.token')
+        assert mock_get_jwks.call_count == 6
+
+
+class TestPreloadPublicKeys:
+    """Tests for preload_public_keys function."""
+
+    @patch('app.core.jwt_verifier._get_public_keys')
+    def test_preloads_when_configured(self, mock_get_keys):
+        """Should fetch and parse keys when verification is configured."""
+        with patch.dict('os.environ', {'COGNITO_APP_CLIENT_ID': 'test-client-id'}):
+            jwt_verifier.preload_public_keys()
+
+        mock_get_keys.assert_called_once_with()
+
+    @patch('app.core.jwt_verifier._get_public_keys')
+    def test_skips_without_configuration(self, mock_get_keys):
+        """Should not fetch keys when verification is not configured."""
+        with patch.dict('os.environ', {'COGNITO_APP_CLIENT_ID': ''}):
+            jwt_verifier.preload_public_keys()
+
+        mock_get_keys.assert_not_called()
+
+    @patch('app.core.jwt_verifier._get_public_keys')
+    def test_preload_failure_is_not_fatal(self, mock_get_keys):
+        """Should swallow fetch errors so a cold start never fails on JWKS."""
+        mock_get_keys.side_effect = Exception("Network error")
+
+        with patch.dict('os.environ', {'COGNITO_APP_CLIENT_ID': 'test-client-id'}):
+            jwt_verifier.preload_public_keys()
+
+
 class TestVerifyJWTToken:
     """Tests for verify_jwt_token function."""
 
@@ -313,3 +452,66 @@ class TestVerifyJWTToken:
 
         with pytest.raises(Exception, match="Header extraction failed"):
             jwt_verifier._get_public_key('test.token.here')
+
+
+class TestVerifiedTokenCache:
+    """Tests for the verified-token payload cache."""
+
+    ENV = {
+        'COGNITO_USER_POOL_ID': 'us-east-2_test',
+        'COGNITO_APP_CLIENT_ID': 'test-client-id',
+        'AWS_REGION': 'us-east-2'
+    }
+
+    @patch('app.core.jwt_verifier._get_public_key')
+    @patch('app.core.jwt_verifier.jwt.decode')
+    def test_repeat_token_skips_verification(self, mock_decode, mock_get_key):
+        """Should verify a token once and serve repeats from the cache."""
+        mock_decode.return_value = {'email': 'test@example.com', 'exp': time.time() + 3600}
+
+        with patch.dict('os.environ', self.ENV):
+            first = jwt_verifier.verify_jwt_token('repeat.jwt.token')
+            second = jwt_verifier.verify_jwt_token('repeat.jwt.token')
+
+        assert first == second
+        mock_decode.assert_called_once()
+        mock_get_key.assert_called_once()
+        stats = jwt_verifier.get_token_cache_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['size'] == 1
+
+    @patch('app.core.jwt_verifier._get_public_key')
+    @patch('app.core.jwt_verifier.jwt.decode')
+    def test_entry_expires_with_token(self, mock_decode, mock_get_key):
+        """Should re-verify once the cached token's exp has passed."""
+        mock_decode.return_value = {'email': 'test@example.com', 'exp': 1000}
+
+        with patch.dict('os.environ', self.ENV), patch('app.core.cache.time.time', return_value=999):
+            jwt_verifier.verify_jwt_token('short.jwt.token')
+            jwt_verifier.verify_jwt_token('short.jwt.token')
+        with patch.dict('os.environ', self.ENV), patch('app.core.cache.time.time', return_value=1000):
+            jwt_verifier.verify_jwt_token('short.jwt.token')
+
+        assert mock_decode.call_count == 2
+
+    @patch('app.core.jwt_verifier._get_public_key')
+    @patch('app.core.jwt_verifier.jwt.decode')
+    def test_failed_verification_is_not_cached(self, mock_decode, mock_get_key):
+        """Should not cache tokens that fail verification."""
+        mock_decode.side_effect = InvalidSignatureError("bad signature")
+
+        with patch.dict('os.environ', self.ENV):
+            for _ in range(2):
+                with pytest.raises(InvalidSignatureError):
+                    jwt_verifier.verify_jwt_token('forged.jwt.token')
+
+        assert mock_decode.call_count == 2
+        assert jwt_verifier.get_token_cache_stats()['size'] == 0
+
+    def test_cache_is_keyed_by_digest(self):
+        """Should never hold the raw token as a cache key."""
+        digest = jwt_verifier._token_digest('raw.jwt.token')
+
+        assert 'raw.jwt.token' not in digest
+        assert len(digest) == 64
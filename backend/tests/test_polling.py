@@ -0,0 +1,46 @@
+"""
+Tests for adaptive polling.
+"""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+
+class TestPollUntil:
+    """Test cases for poll_until."""
+
+    @pytest.mark.asyncio
+    async def test_returns_first_matching_result_without_waiting(self):
+        """Test a result that is already there costs one read and no sleep."""
+        from app.core.polling import poll_until
+        fetch = AsyncMock(return_value={'ready': True})
+
+        with patch('app.core.polling.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            result, matched = await poll_until(fetch, lambda r: r['ready'], timeout=5)
+
+        assert (result, matched) == ({'ready': True}, True)
+        fetch.assert_awaited_once()
+        mock_sleep.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_interval_backs_off_up_to_the_maximum(self):
+        """Test the wait between reads doubles and is capped."""
+        from app.core.polling import poll_until
+        fetch = AsyncMock(side_effect=[1, 2, 3, 4, 5])
+
+        with patch('app.core.polling.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            result, matched = await poll_until(fetch, lambda r: r == 5, timeout=60, initial_interval=0.1, max_interval=0.3)
+
+        assert (result, matched) == (5, True)
+        assert [c.args[0] for c in mock_sleep.await_args_list] == [0.1, 0.2, 0.3, 0.3]
+
+    @pytest.mark.asyncio
+    async def test_gives_up_at_the_deadline(self):
+        """Test the last result is returned unmatched once the timeout passes."""
+        from app.core.polling import poll_until
+        fetch = AsyncMock(return_value=None)
+
+        result, matched = await poll_until(fetch, lambda r: r is not None, timeout=0.05, initial_interval=0.01)
+
+        assert (result, matched) == (None, False)
+        assert fetch.await_count >= 2
@@ -0,0 +1,233 @@
+"""
+Tests for the IoT publish retry and circuit breaker policy.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError, ReadTimeoutError
+
+
+def client_error(code, status):
+    """A boto3 ClientError with the given error code and HTTP status."""
+    return ClientError({'Error': {'Code': code, 'Message': code}, 'ResponseMetadata': {'HTTPStatusCode': status}}, 'Publish')
+
+
+class FakeClock:
+    """Monotonic clock the test moves by hand."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestErrorClassification:
+    """Test cases for sorting publish errors."""
+
+    @pytest.mark.parametrize("error", [
+        client_error('ThrottlingException', 400),
+        client_error('SomethingElse', 429),
+    ])
+    def test_throttling(self, error):
+        """Test throttling is retryable but not a sign of an unhealthy endpoint."""
+        from app.core.publish_policy import is_retryable, is_throttling, is_unavailable
+
+        assert is_throttling(error) and is_retryable(error)
+        assert not is_unavailable(error)
+
+    @pytest.mark.parametrize("error", [
+        client_error('ServiceUnavailableException', 503),
+        client_error('InternalFailureException', 0),
+        client_error('SomethingElse', 502),
+        EndpointConnectionError(endpoint_url='https://iot.example'),
+        ReadTimeoutError(endpoint_url='https://iot.example'),
+        TimeoutError(),
+    ])
+    def test_unavailable(self, error):
+        """Test 5xx, connection errors and timeouts count against the endpoint."""
+        from app.core.publish_policy import is_retryable, is_unavailable
+
+        assert is_unavailable(error) and is_retryable(error)
+
+    @pytest.mark.parametrize("error", [
+        client_error('InvalidRequestException', 400),
+        client_error('UnauthorizedException', 401),
+        ValueError("bug"),
+    ])
+    def test_rejected(self, error):
+        """Test errors that would only fail again are not retried."""
+        from app.core.publish_policy import is_retryable, is_throttling, is_unavailable
+
+        assert not (is_retryable(error) or is_throttling(error) or is_unavailable(error))
+
+
+class TestCircuitBreaker:
+    """Test cases for the closed / open / half-open breaker."""
+
+    def test_opens_after_consecutive_failures(self):
+        """Test only an unbroken run of failures opens the breaker, which then rejects calls."""
+        from app.core.publish_policy import CircuitBreaker
+
+        breaker = CircuitBreaker(failure_threshold=3, clock=FakeClock())
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == 'closed' and breaker.allow()
+
+        breaker.record_failure()
+
+        assert breaker.state == 'open'
+        assert not breaker.allow()
+        assert breaker.metrics()['rejected'] == 1
+
+    def test_half_opens_for_one_trial_call(self):
+        """Test after the reset timeout one call goes through, and its success closes the breaker."""
+        from app.core.publish_policy import CircuitBreaker
+
+        clock = FakeClock()
+        transitions = []
+        breaker = CircuitBreaker(
+            failure_threshold=1, reset_timeout=30, clock=clock, on_state_change=lambda *t: transitions.append(t)
+        )
+        breaker.record_failure()
+        clock.now += 29.9
+        assert not breaker.allow()
+
+        clock.now += 0.1
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+
+        assert breaker.state == 'closed'
+        assert transitions == [('closed', 'open'), ('open', 'half_open'), ('half_open', 'closed')]
+
+    def test_failed_trial_reopens(self):
+        """Test a failed trial call opens the breaker for another full timeout."""
+        from app.core.publish_policy import CircuitBreaker
+
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now += 30
+        assert breaker.allow()
+
+        breaker.record_failure()
+        clock.now += 10
+
+        assert breaker.state == 'open'
+        metrics = breaker.metrics()
+        assert (metrics['times_opened'], metrics['state_code'], metrics['seconds_in_state']) == (2, 2, 10.0)
+
+    def test_release_frees_the_trial_slot(self):
+        """Test a trial call that ended without a verdict lets another one through."""
+        from app.core.publish_policy import CircuitBreaker
+
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=1, clock=clock)
+        breaker.record_failure()
+        clock.now += 1
+        assert breaker.allow()
+
+        breaker.release()
+
+        assert breaker.allow()
+
+    def test_reset(self):
+        """Test reset closes the breaker and zeroes the counters."""
+        from app.core.publish_policy import CircuitBreaker
+
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_failure()
+
+        breaker.reset()
+
+        assert breaker.metrics()['state'] == 'closed'
+        assert breaker.metrics()['failures'] == 0
+
+
+class TestPublishPolicy:
+    """Test cases for retries behind the breaker."""
+
+    @pytest.fixture
+    def policy(self):
+        """Policy with a 2-failure breaker on a hand-moved clock."""
+        from app.core.publish_policy import CircuitBreaker, PublishPolicy
+        return PublishPolicy(CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=FakeClock()), max_attempts=3)
+
+    def test_backoff_is_jittered_and_capped(self, policy):
+        """Test each delay is drawn up to a doubling ceiling that stops at max_delay."""
+        with patch('app.core.publish_policy.random.uniform', side_effect=lambda low, high: (low, high)):
+            ceilings = [policy.backoff(retry) for retry in range(1, 6)]
+
+        assert ceilings == [(0, 0.2), (0, 0.4), (0, 0.8), (0, 1.6), (0, 2.0)]
+        assert 0 <= policy.backoff(1, base_delay=1.0) <= 1.0
+
+    @pytest.mark.asyncio
+    async def test_throttling_is_retried(self, policy):
+        """Test a throttled publish is retried after a backoff and its result returned."""
+        operation = AsyncMock(side_effect=[client_error('ThrottlingException', 429), {'ok': True}])
+
+        with patch('app.core.publish_policy.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            result = await policy.run(operation)
+
+        assert result == {'ok': True}
+        assert operation.await_count == 2
+        mock_sleep.assert_awaited_once()
+        assert policy.metrics()['retries'] == 1
+
+    @pytest.mark.asyncio
+    async def test_rejected_errors_are_raised_at_once(self, policy):
+        """Test an error that would fail again is not retried and keeps the breaker closed."""
+        operation = AsyncMock(side_effect=client_error('InvalidRequestException', 400))
+
+        with pytest.raises(ClientError):
+            await policy.run(operation)
+
+        assert operation.await_count == 1
+        assert policy.breaker.metrics()['successes'] == 1
+
+    @pytest.mark.asyncio
+    async def test_outage_opens_the_circuit_and_fails_fast(self, policy):
+        """Test repeated 5xx open the breaker mid-retry and later calls never reach the endpoint."""
+        from app.core.publish_policy import CircuitOpenError
+        operation = AsyncMock(side_effect=client_error('ServiceUnavailableException', 503))
+
+        with patch('app.core.publish_policy.asyncio.sleep', new_callable=AsyncMock):
+            with pytest.raises(CircuitOpenError):
+                await policy.run(operation)
+            with pytest.raises(CircuitOpenError):
+                await policy.run(operation)
+
+        assert operation.await_count == 2
+        assert policy.metrics()['state'] == 'open'
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self, policy):
+        """Test the last error is raised once attempts run out."""
+        policy.breaker.failure_threshold = 10
+        operation = AsyncMock(side_effect=client_error('ThrottlingException', 429))
+
+        with patch('app.core.publish_policy.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            with pytest.raises(ClientError):
+                await policy.run(operation)
+
+        assert operation.await_count == 3
+        assert mock_sleep.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_trial_is_released(self, policy):
+        """Test a half-open trial that is cancelled does not block the next trial."""
+        policy.breaker.failure_threshold = 1
+        policy.breaker.record_failure()
+        policy.breaker._clock.now += 30
+        operation = MagicMock(side_effect=asyncio.CancelledError())
+
+        with pytest.raises(asyncio.CancelledError):
+            await policy.call(operation)
+
+        assert await policy.call(AsyncMock(return_value='sent')) == 'sent'
+        assert policy.breaker.state == 'closed'
@@ -1,10 +1,13 @@
 """
 Tests for schedule_executor Lambda handler.
 """
+import asyncio
 import json
-from datetime import datetime, timedelta
+from datetime import UTC, datetime, timedelta
 from decimal import Decimal
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
 
 
 class TestScheduleExecutor:
@@ -91,7 +94,7 @@ class TestScheduleExecutor:
         assert result['nested']['value'] == 100
 
     @patch('schedule_executor.schedule_table')
-    @patch('schedule_executor.trigger_scheduled_feed')
+    @patch('schedule_executor.trigger_scheduled_feed_async')
     @patch('schedule_executor.update_schedule_after_execution')
     def test_handler_executes_due_schedules(
         self, mock_update, mock_trigger, mock_table, sample_schedule, mock_lambda_context
@@ -99,7 +102,7 @@ class TestScheduleExecutor:
         """Test that handler executes schedules that are due."""
         from schedule_executor import handler
 
-        now = datetime.utcnow()
+        now = datetime.now(UTC)
         sample_schedule['scheduled_time'] = now.strftime("%Y-%m-%dT%H:%M:%SZ")
 
         mock_table.scan = MagicMock(return_value={'Items': [sample_schedule]})
@@ -118,7 +121,7 @@ class TestScheduleExecutor:
         """Test that handler skips schedules that are not due."""
         from schedule_executor import handler
 
-        future_time = (datetime.utcnow() + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        future_time = (datetime.now(UTC) + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
         sample_schedule['scheduled_time'] = future_time
 
         mock_table.scan = MagicMock(return_value={'Items': [sample_schedule]})
@@ -141,3 +144,507 @@ class TestScheduleExecutor:
         assert result['statusCode'] == 200
         body = json.loads(result['body'])
         assert body['total_schedules'] == 0
+
+
+class TestLookaheadDispatch:
+    """Test cases for lookahead (sub-minute precision) dispatch."""
+
+    def test_is_schedule_due_within_lookahead_window(self):
+        """Test that schedules due within the lookahead window are treated as due."""
+        from schedule_executor import is_schedule_due
+
+        current_time = datetime(2025, 12, 13, 14, 0, 0)
+
+        assert is_schedule_due("2025-12-13T14:00:45Z", current_time, lookahead_seconds=60) is True
+        assert is_schedule_due("2025-12-13T14:00:45Z", current_time) is False
+
+    def test_is_schedule_due_lookahead_window_is_half_open(self):
+        """Test that a schedule exactly at the end of the window belongs to the next tick."""
+        from schedule_executor import is_schedule_due
+
+        current_time = datetime(2025, 12, 13, 14, 0, 0)
+
+        assert is_schedule_due("2025-12-13T14:01:00Z", current_time, lookahead_seconds=60) is False
+
+    @patch('schedule_executor.schedule_table')
+    def test_claim_execution_success(self, mock_table):
+        """Test that claim_execution issues a conditional update keyed on scheduled_time."""
+        from schedule_executor import claim_execution
+
+        assert claim_execution('sched-1', '2025-12-13T14:00:30Z', lease_seconds=90) is True
+
+        kwargs = mock_table.update_item.call_args[1]
+        assert kwargs['Key'] == {'schedule_id': 'sched-1'}
+        assert 'scheduled_time = :st' in kwargs['ConditionExpression']
+        assert kwargs['ExpressionAttributeValues'][':st'] == '2025-12-13T14:00:30Z'
+
+    @patch('schedule_executor.schedule_table')
+    def test_claim_execution_already_reserved(self, mock_table):
+        """Test that claim_execution returns False when another invocation holds the occurrence."""
+        from botocore.exceptions import ClientError
+
+        from schedule_executor import claim_execution
+
+        mock_table.update_item.side_effect = ClientError(
+            {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'conflict'}},
+            'UpdateItem'
+        )
+
+        assert claim_execution('sched-1', '2025-12-13T14:00:30Z') is False
+
+    @patch('schedule_executor.execution_history_table')
+    def test_log_execution_history_records_lateness(self, mock_history):
+        """Test that lateness is stored as a Decimal on the execution record."""
+        from schedule_executor import log_execution_history
+
+        log_execution_history(
+            schedule_id='sched-1',
+            scheduled_time='2025-12-13T14:00:30Z',
+            status='success',
+            feed_cycles=1,
+            recurrence='daily',
+            requested_by='test@example.com',
+            lateness_seconds=0.1234
+        )
+
+        item = mock_history.put_item.call_args[1]['Item']
+        assert item['lateness_seconds'] == Decimal('0.123')
+
+    @patch('schedule_executor._sleep_until')
+    @patch('schedule_executor.claim_execution')
+    @patch('schedule_executor.schedule_table')
+    @patch('schedule_executor.trigger_scheduled_feed_async')
+    @patch('schedule_executor.update_schedule_after_execution')
+    def test_handler_lookahead_dispatches_upcoming_schedules(
+        self, mock_update, mock_trigger, mock_table, mock_claim, mock_sleep, sample_schedule, mock_lambda_context
+    ):
+        """Test that lookahead mode reserves and dispatches schedules due within the window."""
+        from schedule_executor import handler
+
+        upcoming = (datetime.now(UTC) + timedelta(seconds=30)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        sample_schedule['scheduled_time'] = upcoming
+
+        mock_table.scan = MagicMock(return_value={'Items': [sample_schedule]})
+        mock_claim.return_value = True
+        mock_trigger.return_value = True
+        mock_update.return_value = True
+
+        result = handler({'lookahead_seconds': 60}, mock_lambda_context)
+
+        body = json.loads(result['body'])
+        assert body['executed'] == 1
+        assert body['lookahead_seconds'] == 60
+        mock_claim.assert_called_once_with('test-schedule-123', upcoming)
+        mock_sleep.assert_awaited_once()
+
+    @patch('schedule_executor._sleep_until')
+    @patch('schedule_executor.claim_execution')
+    @patch('schedule_executor.schedule_table')
+    @patch('schedule_executor.trigger_scheduled_feed_async')
+    def test_handler_lookahead_skips_schedules_reserved_elsewhere(
+        self, mock_trigger, mock_table, mock_claim, mock_sleep, sample_schedule, mock_lambda_context
+    ):
+        """Test that a schedule reserved by an overlapping invocation is not dispatched."""
+        from schedule_executor import handler
+
+        sample_schedule['scheduled_time'] = (datetime.now(UTC) + timedelta(seconds=10)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        mock_table.scan = MagicMock(return_value={'Items': [sample_schedule]})
+        mock_claim.return_value = False
+
+        result = handler({'lookahead_seconds': 60}, mock_lambda_context)
+
+        body = json.loads(result['body'])
+        assert body['executed'] == 0
+        assert body['failed'] == 0
+        mock_trigger.assert_not_called()
+
+
+class TestShardedExecution:
+    """Test cases for partitioned executor workers and conditional claims."""
+
+    def test_shard_for_is_stable_and_in_range(self):
+        """Test that shard assignment is deterministic and within worker_count."""
+        from schedule_executor import shard_for
+
+        shards = [shard_for(f"sched-{i}", 4) for i in range(100)]
+
+        assert shards == [shard_for(f"sched-{i}", 4) for i in range(100)]
+        assert set(shards) == {0, 1, 2, 3}
+
+    @patch('schedule_executor.schedule_table')
+    def test_scan_uses_parallel_scan_segments(self, mock_table):
+        """Test that the segment strategy scans only this worker's segment."""
+        from schedule_executor import scan_enabled_schedules
+
+        mock_table.scan = MagicMock(return_value={'Items': [{'schedule_id': 'a'}]})
+
+        items = scan_enabled_schedules(worker_index=2, worker_count=3, strategy='segment')
+
+        assert items == [{'schedule_id': 'a'}]
+        kwargs = mock_table.scan.call_args[1]
+        assert kwargs['Segment'] == 2
+        assert kwargs['TotalSegments'] == 3
+
+    @patch('schedule_executor.schedule_table')
+    def test_scan_follows_pagination(self, mock_table):
+        """Test that all scan pages are read."""
+        from schedule_executor import scan_enabled_schedules
+
+        mock_table.scan = MagicMock(side_effect=[
+            {'Items': [{'schedule_id': 'a'}], 'LastEvaluatedKey': {'schedule_id': 'a'}},
+            {'Items': [{'schedule_id': 'b'}]}
+        ])
+
+        items = scan_enabled_schedules()
+
+        assert [item['schedule_id'] for item in items] == ['a', 'b']
+        assert mock_table.scan.call_args_list[1][1]['ExclusiveStartKey'] == {'schedule_id': 'a'}
+
+    @patch('schedule_executor.schedule_table')
+    def test_scan_hash_strategy_partitions_schedules(self, mock_table):
+        """Test that the hash strategy gives every schedule to exactly one worker."""
+        from schedule_executor import scan_enabled_schedules
+
+        items = [{'schedule_id': f'sched-{i}'} for i in range(50)]
+        mock_table.scan = MagicMock(return_value={'Items': items})
+
+        partitions = [scan_enabled_schedules(i, 3, strategy='hash') for i in range(3)]
+
+        assert sum(len(p) for p in partitions) == 50
+        assert 'Segment' not in mock_table.scan.call_args[1]
+
+    @pytest.mark.asyncio
+    @patch('schedule_executor.claim_execution', return_value=False)
+    @patch('schedule_executor.trigger_scheduled_feed_async')
+    async def test_execute_schedule_skips_when_claimed_elsewhere(self, mock_trigger, mock_claim, sample_schedule):
+        """Test that an occurrence claimed by another worker is not dispatched."""
+        from schedule_executor import execute_schedule
+
+        assert await execute_schedule(sample_schedule) is None
+        mock_trigger.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch('schedule_executor.schedule_table')
+    @patch('schedule_executor.trigger_scheduled_feed_async', return_value=True)
+    async def test_execute_schedule_feeds_the_schedule_device(self, mock_trigger, mock_table, sample_schedule):
+        """Test a schedule bound to a device feeds that device."""
+        from schedule_executor import execute_schedule
+
+        await execute_schedule({**sample_schedule, 'thing_id': 'feeder-3'})
+
+        assert mock_trigger.call_args.args[3] == 'feeder-3'
+
+    @pytest.mark.asyncio
+    @patch('schedule_executor.schedule_table')
+    @patch('schedule_executor.trigger_scheduled_feed_async', return_value=False)
+    async def test_execute_schedule_releases_claim_on_failure(self, mock_trigger, mock_table, sample_schedule):
+        """Test that a failed dispatch releases its claim so a later tick can retry."""
+        from schedule_executor import execute_schedule
+
+        success, _ = await execute_schedule(sample_schedule)
+
+        assert success is False
+        release_call = mock_table.update_item.call_args_list[-1][1]
+        assert release_call['UpdateExpression'] == 'REMOVE claimed_for, claim_expires_at'
+        assert release_call['ExpressionAttributeValues'] == {':st': sample_schedule['scheduled_time']}
+
+    @pytest.mark.asyncio
+    async def test_run_schedules_limits_concurrency(self, sample_schedule):
+        """Test that catch-up and lookahead run together but never more than `concurrency` at once."""
+        from schedule_executor import run_schedules
+
+        running = []
+        peak = 0
+
+        async def dispatch(schedule_id):
+            nonlocal peak
+            running.append(schedule_id)
+            peak = max(peak, len(running))
+            await asyncio.sleep(0)
+            running.remove(schedule_id)
+
+        async def execute(schedule_data, plan):
+            await dispatch(schedule_data['schedule_id'])
+            return True, 0.0
+
+        async def trigger(schedule_id, *args):
+            await dispatch(schedule_id)
+            return True
+
+        due = [({**sample_schedule, 'schedule_id': f'due-{i}'}, None) for i in range(4)]
+        upcoming = [{**sample_schedule, 'schedule_id': f'upcoming-{i}'} for i in range(3)]
+        with patch('schedule_executor.execute_schedule', side_effect=execute), \
+             patch('schedule_executor.claim_execution', return_value=True), \
+             patch('schedule_executor._sleep_until', new_callable=AsyncMock), \
+             patch('schedule_executor.trigger_scheduled_feed_async', side_effect=trigger), \
+             patch('schedule_executor.record_execution', return_value=True):
+            outcomes = await run_schedules(due, upcoming, concurrency=2)
+
+        assert outcomes[:4] == [(True, 0.0)] * 4
+        assert [success for success, _ in outcomes[4:]] == [True] * 3
+        assert peak == 2
+
+    @patch('schedule_executor.schedule_table')
+    @patch('schedule_executor.trigger_scheduled_feed_async')
+    @patch('schedule_executor.update_schedule_after_execution')
+    def test_handler_reports_worker_partition(
+        self, mock_update, mock_trigger, mock_table, sample_schedule, mock_lambda_context
+    ):
+        """Test that the handler reads its partition from the event."""
+        from schedule_executor import handler
+
+        mock_table.scan = MagicMock(return_value={'Items': []})
+
+        result = handler({'worker_index': 1, 'worker_count': 4}, mock_lambda_context)
+
+        body = json.loads(result['body'])
+        assert body['worker_index'] == 1
+        assert body['worker_count'] == 4
+        assert mock_table.scan.call_args[1]['TotalSegments'] == 4
+
+    @pytest.mark.parametrize("event", [
+        {'lookahead_seconds': 'soon'},
+        {'worker_count': None},
+        {'worker_index': 'first'},
+        {'catch_up_policy': 'eventually'},
+    ])
+    @patch('schedule_executor.schedule_table')
+    def test_handler_rejects_malformed_event(self, mock_table, event, mock_lambda_context):
+        """Test that a malformed event gets the normal error response without scanning."""
+        from schedule_executor import handler
+
+        result = handler(event, mock_lambda_context)
+
+        assert result['statusCode'] == 500
+        assert 'Internal server error' in json.loads(result['body'])
+        mock_table.scan.assert_not_called()
+
+
+class TestMissedOccurrenceCatchUp:
+    """Test cases for catching up on occurrences missed while the executor was down."""
+
+    def test_calculate_next_execution_monthly_clamps_day(self):
+        """Test that monthly recurrence clamps to the last day of a shorter month."""
+        from schedule_executor import calculate_next_execution
+
+        assert calculate_next_execution("2025-01-31T08:00:00Z", "monthly") == "2025-02-28T08:00:00Z"
+
+    def test_calculate_next_execution_invalid_time(self):
+        """Test that an unparseable time is returned unchanged."""
+        from schedule_executor import calculate_next_execution
+
+        assert calculate_next_execution("not-a-time", "daily") == "not-a-time"
+
+    @patch('schedule_executor._now')
+    @patch('schedule_executor.schedule_table')
+    @patch('schedule_executor.trigger_scheduled_feed_async')
+    @patch('schedule_executor.update_schedule_after_execution')
+    def test_handler_skip_policy_jumps_to_next_future_occurrence(
+        self, mock_update, mock_trigger, mock_table, mock_now, sample_schedule, mock_lambda_context
+    ):
+        """Test that a schedule days behind is moved to its next occurrence without firing."""
+        from schedule_executor import handler
+
+        mock_now.return_value = datetime(2025, 12, 13, 10, 0, 0)
+        sample_schedule['scheduled_time'] = "2025-12-01T08:00:00Z"
+        mock_table.scan = MagicMock(return_value={'Items': [sample_schedule]})
+        mock_update.return_value = True
+
+        with patch('schedule_executor.claim_execution', return_value=True):
+            result = handler({'catch_up_policy': 'skip'}, mock_lambda_context)
+
+        body = json.loads(result['body'])
+        mock_trigger.assert_not_called()
+        assert body['missed_skipped'] == 13
+        mock_update.assert_called_once_with(
+            'test-schedule-123', "2025-12-01T08:00:00Z", 'daily',
+            next_time="2025-12-14T08:00:00Z", executed=False, cron_expression=None, timezone='UTC',
+            wall_clock_anchor=None
+        )
+
+    @patch('schedule_executor._now')
+    @patch('schedule_executor.schedule_table')
+    @patch('schedule_executor.trigger_scheduled_feed_async')
+    @patch('schedule_executor.update_schedule_after_execution')
+    def test_handler_latest_policy_fires_once(
+        self, mock_update, mock_trigger, mock_table, mock_now, sample_schedule, mock_lambda_context
+    ):
+        """Test that the latest policy fires the most recent missed occurrence once."""
+        from schedule_executor import handler
+
+        mock_now.return_value = datetime(2025, 12, 13, 9, 0, 0)
+        sample_schedule['scheduled_time'] = "2025-12-10T08:00:00Z"
+        mock_table.scan = MagicMock(return_value={'Items': [sample_schedule]})
+        mock_trigger.return_value = True
+        mock_update.return_value = True
+
+        with patch('schedule_executor.claim_execution', return_value=True):
+            result = handler({'catch_up_policy': 'latest'}, mock_lambda_context)
+
+        body = json.loads(result['body'])
+        mock_trigger.assert_called_once()
+        assert body['executed'] == 1
+        assert body['missed_skipped'] == 3
+        assert body['max_lateness_seconds'] == 3600.0
+        assert mock_update.call_args[1]['next_time'] == "2025-12-14T08:00:00Z"
+
+    @patch('schedule_executor._now')
+    @patch('schedule_executor.log_execution_history')
+    @patch('schedule_executor.schedule_table')
+    @patch('schedule_executor.trigger_scheduled_feed_async')
+    @patch('schedule_executor.update_schedule_after_execution')
+    def test_handler_all_policy_fires_every_missed_occurrence(
+        self, mock_update, mock_trigger, mock_table, mock_history, mock_now,
+        sample_schedule, mock_lambda_context
+    ):
+        """Test that the all policy fires every missed occurrence and logs each one."""
+        from schedule_executor import handler
+
+        mock_now.return_value = datetime(2025, 12, 13, 9, 0, 0)
+        sample_schedule['scheduled_time'] = "2025-12-11T08:00:00Z"
+        mock_table.scan = MagicMock(return_value={'Items': [sample_schedule]})
+        mock_trigger.return_value = True
+        mock_update.return_value = True
+
+        with patch('schedule_executor.claim_execution', return_value=True):
+            result = handler({'catch_up_policy': 'all'}, mock_lambda_context)
+
+        body = json.loads(result['body'])
+        assert mock_trigger.call_count == 3
+        assert body['executed'] == 1
+        logged = [c[1]['scheduled_time'] for c in mock_history.call_args_list]
+        assert logged == ["2025-12-11T08:00:00Z", "2025-12-12T08:00:00Z", "2025-12-13T08:00:00Z"]
+
+    @patch('schedule_executor._now')
+    @patch('schedule_executor.schedule_table')
+    @patch('schedule_executor.trigger_scheduled_feed_async')
+    def test_handler_ignores_occurrences_already_executed(
+        self, mock_trigger, mock_table, mock_now, sample_schedule, mock_lambda_context
+    ):
+        """Test that occurrences at or before last_executed_at are not fired again."""
+        from schedule_executor import handler
+
+        mock_now.return_value = datetime(2025, 12, 13, 8, 0, 30)
+        sample_schedule['scheduled_time'] = "2025-12-13T08:00:00Z"
+        sample_schedule['last_executed_at'] = "2025-12-13T08:00:05"
+        mock_table.scan = MagicMock(return_value={'Items': [sample_schedule]})
+
+        result = handler({}, mock_lambda_context)
+
+        body = json.loads(result['body'])
+        mock_trigger.assert_not_called()
+        assert body['executed'] == 0
+
+    @patch('schedule_executor._now')
+    @patch('schedule_executor.schedule_table')
+    def test_handler_skips_unparseable_schedule(
+        self, mock_table, mock_now, sample_schedule, mock_lambda_context
+    ):
+        """Test that a schedule with an invalid time does not abort the run."""
+        from schedule_executor import handler
+
+        mock_now.return_value = datetime(2025, 12, 13, 8, 0, 0)
+        sample_schedule['scheduled_time'] = "garbage"
+        mock_table.scan = MagicMock(return_value={'Items': [sample_schedule]})
+
+        result = handler({}, mock_lambda_context)
+
+        assert result['statusCode'] == 200
+        assert json.loads(result['body'])['executed'] == 0
+
+    @patch('schedule_executor.schedule_table')
+    def test_update_schedule_after_skip_keeps_last_executed_at(self, mock_table):
+        """Test that advancing past skipped occurrences does not touch last_executed_at."""
+        from schedule_executor import update_schedule_after_execution
+
+        result = update_schedule_after_execution(
+            'abc', "2025-12-01T08:00:00Z", 'daily', next_time="2025-12-14T08:00:00Z", executed=False
+        )
+
+        assert result is True
+        kwargs = mock_table.update_item.call_args[1]
+        assert 'last_executed_at' not in kwargs['UpdateExpression']
+        assert kwargs['ExpressionAttributeValues'][':st'] == "2025-12-14T08:00:00Z"
+
+    @patch('schedule_executor._now')
+    @patch('schedule_executor.schedule_table')
+    @patch('schedule_executor.trigger_scheduled_feed_async')
+    @patch('schedule_executor.update_schedule_after_execution')
+    def test_handler_cron_schedule_advances_to_next_slot(
+        self, mock_update, mock_trigger, mock_table, mock_now, sample_schedule, mock_lambda_context
+    ):
+        """Test that a due cron schedule fires and moves to its next matching slot."""
+        from schedule_executor import handler
+
+        mock_now.return_value = datetime(2025, 12, 13, 8, 0, 20)
+        sample_schedule.update(
+            scheduled_time="2025-12-13T08:00:00Z", recurrence="cron", cron_expression="0 8,18 * * *"
+        )
+        mock_table.scan = MagicMock(return_value={'Items': [sample_schedule]})
+        mock_trigger.return_value = True
+        mock_update.return_value = True
+
+        with patch('schedule_executor.claim_execution', return_value=True):
+            handler({}, mock_lambda_context)
+
+        mock_trigger.assert_called_once()
+        assert mock_update.call_args[1]['next_time'] == "2025-12-13T18:00:00Z"
+        assert mock_update.call_args[1]['cron_expression'] == "0 8,18 * * *"
+
+    @patch('schedule_executor.schedule_table')
+    def test_update_schedule_after_execution_cron(self, mock_table):
+        """Test that a cron schedule without a planned time computes its next slot."""
+        from schedule_executor import update_schedule_after_execution
+
+        update_schedule_after_execution('abc', "2025-12-13T18:00:00Z", 'cron', cron_expression="0 8,18 * * *")
+
+        values = mock_table.update_item.call_args[1]['ExpressionAttributeValues']
+        assert values[':st'] == "2025-12-14T08:00:00Z"
+
+    @patch('schedule_executor._now')
+    @patch('schedule_executor.schedule_table')
+    @patch('schedule_executor.trigger_scheduled_feed_async')
+    @patch('schedule_executor.update_schedule_after_execution')
+    def test_handler_keeps_local_time_across_dst(
+        self, mock_update, mock_trigger, mock_table, mock_now, sample_schedule, mock_lambda_context
+    ):
+        """Test that a daily 08:00 New York schedule stays at 08:00 local after clocks change."""
+        from schedule_executor import handler
+
+        mock_now.return_value = datetime(2025, 3, 8, 13, 0, 10)  # 08:00 EST
+        sample_schedule.update(
+            scheduled_time="2025-03-08T13:00:00Z", timezone="America/New_York",
+            wall_clock_time="2025-03-01T08:00:00"
+        )
+        mock_table.scan = MagicMock(return_value={'Items': [sample_schedule]})
+        mock_trigger.return_value = True
+        mock_update.return_value = True
+
+        with patch('schedule_executor.claim_execution', return_value=True):
+            handler({}, mock_lambda_context)
+
+        mock_trigger.assert_called_once()
+        assert mock_update.call_args[1]['next_time'] == "2025-03-09T12:00:00Z"  # 08:00 EDT
+
+    def test_calculate_next_execution_in_timezone(self):
+        """Test that the fallback next-time calculation also steps in local time."""
+        from schedule_executor import calculate_next_execution
+
+        result = calculate_next_execution("2025-11-01T12:00:00Z", "daily", timezone="America/New_York")
+
+        assert result == "2025-11-02T13:00:00Z"
+
+    def test_calculate_next_execution_reanchors_after_gaps(self):
+        """Test that the fallback calculation returns to 02:30 after each spring-forward gap."""
+        from schedule_executor import calculate_next_execution
+
+        anchor = datetime(2025, 3, 1, 2, 30)
+        for gap_day, after_gap in (
+            ("2025-03-09T07:30:00Z", "2025-03-10T06:30:00Z"),
+            ("2026-03-08T07:30:00Z", "2026-03-09T06:30:00Z"),
+        ):
+            result = calculate_next_execution(
+                gap_day, "daily", timezone="America/New_York", wall_clock_anchor=anchor
+            )
+
+            assert result == after_gap
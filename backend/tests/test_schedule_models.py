@@ -1,6 +1,8 @@
 """
 Tests for schedule models including timezone validation.
 """
+from datetime import UTC, datetime
+
 import pytest
 from pydantic import ValidationError
 
@@ -104,3 +106,40 @@ class TestScheduleModels:
             created_at='2024-01-01T00:00:00Z'
         )
         assert response.timezone == 'UTC'
+
+    def test_schedule_response_next_execution(self):
+        """Test next_execution is the pending occurrence, or the next one once it is overdue."""
+        from app.models.schedule import ScheduleResponse
+        base = {
+            'schedule_id': 'test-123', 'requested_by': 'test@example.com', 'feed_cycles': 1,
+            'enabled': True, 'created_at': '2024-01-01T00:00:00Z', 'timezone': 'Asia/Tokyo'
+        }
+
+        pending = ScheduleResponse(**base, scheduled_time='2099-01-01T08:00:00Z', recurrence='daily')
+        overdue = ScheduleResponse(
+            **base, scheduled_time='2020-01-01T23:00:00Z', recurrence='cron',
+            cron_expression='0 8 * * 1', wall_clock_time='2020-01-02T08:00:00'
+        )
+
+        assert pending.next_execution == '2099-01-01T08:00:00Z'
+        next_time = datetime.fromisoformat(overdue.next_execution.replace('Z', ''))
+        assert datetime.now(UTC).replace(tzinfo=None) < next_time
+        assert (next_time.hour, next_time.weekday()) == (23, 6)  # Monday 08:00 in Tokyo
+
+    @pytest.mark.parametrize("fields", [
+        {'enabled': False},
+        {'scheduled_time': 'not-a-time'},
+        {'recurrence': 'cron', 'cron_expression': '0 0 30 2 *'},
+        {'next_execution': '2030-01-01T00:00:00Z'},
+    ])
+    def test_schedule_response_next_execution_left_as_is(self, fields):
+        """Test disabled, unparseable and never-firing schedules get no derived next_execution."""
+        from app.models.schedule import ScheduleResponse
+        data = {
+            'schedule_id': 'test-123', 'requested_by': 'test@example.com', 'scheduled_time': '2020-01-01T08:00:00Z',
+            'feed_cycles': 1, 'recurrence': 'daily', 'enabled': True, 'created_at': '2024-01-01T00:00:00Z'
+        }
+
+        response = ScheduleResponse(**{**data, **fields})
+
+        assert response.next_execution == fields.get('next_execution')
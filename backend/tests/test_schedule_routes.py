@@ -8,6 +8,8 @@ from unittest.mock import patch
 import pytest
 from fastapi.testclient import TestClient
 
+from app.core.auth import Principal
+
 
 def create_test_token(email: str) -> str:
     """Create a test JWT token with email claim."""
@@ -99,29 +101,23 @@ class TestScheduleHelpers:
         )
         assert is_admin('test@example.com') is False
 
-    @patch('app.api.v1.routes.schedule.is_admin')
-    def test_verify_schedule_ownership_admin(self, mock_is_admin):
+    def test_verify_schedule_ownership_admin(self):
         """Test admin can access any schedule."""
         from app.api.v1.routes.schedule import verify_schedule_ownership
-        mock_is_admin.return_value = True
         schedule = {'requested_by': 'other@example.com'}
-        assert verify_schedule_ownership(schedule, 'admin@example.com') is True
+        assert verify_schedule_ownership(schedule, Principal(email='admin@example.com', is_admin=True)) is True
 
-    @patch('app.api.v1.routes.schedule.is_admin')
-    def test_verify_schedule_ownership_owner(self, mock_is_admin):
+    def test_verify_schedule_ownership_owner(self):
         """Test owner can access their schedule."""
         from app.api.v1.routes.schedule import verify_schedule_ownership
-        mock_is_admin.return_value = False
         schedule = {'requested_by': 'user@example.com'}
-        assert verify_schedule_ownership(schedule, 'user@example.com') is True
+        assert verify_schedule_ownership(schedule, Principal(email='user@example.com')) is True
 
-    @patch('app.api.v1.routes.schedule.is_admin')
-    def test_verify_schedule_ownership_not_owner(self, mock_is_admin):
+    def test_verify_schedule_ownership_not_owner(self):
         """Test non-owner cannot access schedule."""
         from app.api.v1.routes.schedule import verify_schedule_ownership
-        mock_is_admin.return_value = False
         schedule = {'requested_by': 'other@example.com'}
-        assert verify_schedule_ownership(schedule, 'user@example.com') is False
+        assert verify_schedule_ownership(schedule, Principal(email='user@example.com')) is False
 
 
 class TestScheduleRoutes:
@@ -214,6 +210,17 @@ class TestScheduleRoutes:
         assert data['total'] == 1
         assert len(data['schedules']) == 1
 
+    @patch('app.core.auth.resolve_principal')
+    @patch('app.api.v1.routes.schedule.list_schedules_db')
+    def test_list_schedules_denies_machine_clients(self, mock_list, mock_principal, client):
+        """Test machine clients cannot use schedule routes, which grant no scope."""
+        mock_principal.return_value = Principal(email='machine:bot', client_id='bot', scopes=('feed:write',))
+
+        response = client.get("/api/v1/schedules", headers={"Authorization": "Bearer pfm1.bot.1.feed:write.sig"})
+
+        assert response.status_code == 403
+        mock_list.assert_not_called()
+
     @patch('app.api.v1.routes.schedule.list_schedules_db')
     def test_list_schedules_with_filter(self, mock_list, client):
         """Test listing schedules with user filter."""
@@ -331,6 +338,18 @@ class TestScheduleRoutes:
 
         assert response.status_code == 500
 
+    @patch('app.api.v1.routes.schedule.update_schedule_db')
+    @patch('app.api.v1.routes.schedule.get_schedule_db')
+    def test_update_schedule_invalid_merged_schedule(self, mock_get, mock_update, client):
+        """Test an update that leaves the stored schedule invalid is a 400."""
+        mock_get.return_value = {'schedule_id': 'test-123', 'recurrence': 'daily'}
+        mock_update.side_effect = ValueError("cron_expression is required when recurrence is 'cron'")
+
+        response = client.put("/api/v1/schedules/test-123", json={"recurrence": "cron"})
+
+        assert response.status_code == 400
+        assert response.json()['detail'] == "cron_expression is required when recurrence is 'cron'"
+
     @patch('app.api.v1.routes.schedule.delete_schedule_db')
     @patch('app.api.v1.routes.schedule.get_schedule_db')
     def test_delete_schedule_success(self, mock_get, mock_delete, client):
@@ -427,12 +446,12 @@ class TestScheduleRoutes:
         assert response.status_code == 500
 
     @patch('app.api.v1.routes.schedule.verify_schedule_ownership')
-    @patch('app.api.v1.routes.schedule.extract_email_from_token')
+    @patch('app.core.auth.resolve_principal')
     @patch('app.api.v1.routes.schedule.get_schedule_db')
-    def test_get_schedule_forbidden(self, mock_get, mock_extract, mock_verify, client):
+    def test_get_schedule_forbidden(self, mock_get, mock_principal, mock_verify, client):
         """Test getting schedule without ownership."""
         mock_get.return_value = {'schedule_id': 'test-123', 'requested_by': 'other@example.com'}
-        mock_extract.return_value = 'user@example.com'
+        mock_principal.return_value = Principal(email='user@example.com')
         mock_verify.return_value = False
 
         response = client.get("/api/v1/schedules/test-123")
@@ -440,12 +459,12 @@ class TestScheduleRoutes:
         assert response.status_code == 403
 
     @patch('app.api.v1.routes.schedule.verify_schedule_ownership')
-    @patch('app.api.v1.routes.schedule.extract_email_from_token')
+    @patch('app.core.auth.resolve_principal')
     @patch('app.api.v1.routes.schedule.get_schedule_db')
-    def test_update_schedule_forbidden(self, mock_get, mock_extract, mock_verify, client):
+    def test_update_schedule_forbidden(self, mock_get, mock_principal, mock_verify, client):
         """Test updating schedule without ownership."""
         mock_get.return_value = {'schedule_id': 'test-123', 'requested_by': 'other@example.com'}
-        mock_extract.return_value = 'user@example.com'
+        mock_principal.return_value = Principal(email='user@example.com')
         mock_verify.return_value = False
 
         response = client.put(
@@ -456,12 +475,12 @@ class TestScheduleRoutes:
         assert response.status_code == 403
 
     @patch('app.api.v1.routes.schedule.verify_schedule_ownership')
-    @patch('app.api.v1.routes.schedule.extract_email_from_token')
+    @patch('app.core.auth.resolve_principal')
     @patch('app.api.v1.routes.schedule.get_schedule_db')
-    def test_delete_schedule_forbidden(self, mock_get, mock_extract, mock_verify, client):
+    def test_delete_schedule_forbidden(self, mock_get, mock_principal, mock_verify, client):
         """Test deleting schedule without ownership."""
         mock_get.return_value = {'schedule_id': 'test-123', 'requested_by': 'other@example.com'}
-        mock_extract.return_value = 'user@example.com'
+        mock_principal.return_value = Principal(email='user@example.com')
         mock_verify.return_value = False
 
         response = client.delete("/api/v1/schedules/test-123")
@@ -469,25 +488,23 @@ class TestScheduleRoutes:
         assert response.status_code == 403
 
     @patch('app.api.v1.routes.schedule.verify_schedule_ownership')
-    @patch('app.api.v1.routes.schedule.extract_email_from_token')
+    @patch('app.core.auth.resolve_principal')
     @patch('app.api.v1.routes.schedule.get_schedule_db')
-    def test_toggle_schedule_forbidden(self, mock_get, mock_extract, mock_verify, client):
+    def test_toggle_schedule_forbidden(self, mock_get, mock_principal, mock_verify, client):
         """Test toggling schedule without ownership."""
         mock_get.return_value = {'schedule_id': 'test-123', 'requested_by': 'other@example.com'}
-        mock_extract.return_value = 'user@example.com'
+        mock_principal.return_value = Principal(email='user@example.com')
         mock_verify.return_value = False
 
         response = client.patch("/api/v1/schedules/test-123/toggle?enabled=true")
 
         assert response.status_code == 403
 
-    @patch('app.api.v1.routes.schedule.is_admin')
-    @patch('app.api.v1.routes.schedule.extract_email_from_token')
+    @patch('app.core.auth.resolve_principal')
     @patch('app.api.v1.routes.schedule.list_schedules_db')
-    def test_list_schedules_non_admin_filters(self, mock_list, mock_extract, mock_is_admin, client):
+    def test_list_schedules_non_admin_filters(self, mock_list, mock_principal, client):
         """Test non-admin users only see their own schedules."""
-        mock_extract.return_value = 'user@example.com'
-        mock_is_admin.return_value = False
+        mock_principal.return_value = Principal(email='user@example.com')
         mock_list.return_value = {
             'schedules': [],
             'total': 0,
@@ -501,15 +518,15 @@ class TestScheduleRoutes:
         assert response.status_code == 200
         mock_list.assert_called_once_with(page=1, page_size=20, requested_by='user@example.com')
 
-    @patch('app.api.v1.routes.schedule.extract_email_from_token')
+    @patch('app.core.auth.resolve_principal')
     @patch('app.api.v1.routes.schedule.create_schedule_db')
-    def test_create_schedule_sets_user_email(self, mock_create, mock_extract, client):
+    def test_create_schedule_sets_user_email(self, mock_create, mock_principal, client):
         """Test create schedule uses token email when no requested_by."""
         from datetime import datetime, timedelta
 
         future_time = (datetime.utcnow() + timedelta(hours=2)).strftime('%Y-%m-%dT%H:%M:%S') + 'Z'
 
-        mock_extract.return_value = 'token@example.com'
+        mock_principal.return_value = Principal(email='token@example.com')
         mock_create.return_value = {
             'schedule_id': 'test-123',
             'requested_by': 'token@example.com',
@@ -531,3 +548,34 @@ class TestScheduleRoutes:
         )
 
         assert response.status_code == 201
+
+    @patch('app.core.auth.resolve_principal')
+    @patch('app.api.v1.routes.schedule.create_schedule_db')
+    def test_create_schedule_other_device_needs_fleet_access(self, mock_create, mock_principal, client):
+        """Test a user who may not address the fleet cannot schedule feeds for another device."""
+        mock_principal.return_value = Principal(email='user@example.com')
+
+        response = client.post(
+            "/api/v1/schedules",
+            json={
+                "requested_by": "user@example.com",
+                "scheduled_time": "2099-01-01T08:00:00Z",
+                "thing_id": "feeder-2"
+            }
+        )
+
+        assert response.status_code == 403
+        mock_create.assert_not_called()
+
+    @patch('app.core.auth.verify_jwt_token')
+    @patch('app.api.v1.routes.schedule.list_schedules_db')
+    def test_invalid_token_is_unauthorized(self, mock_list, mock_verify, client):
+        """Test a token that fails verification is rejected before the handler runs."""
+        from jwt.exceptions import InvalidSignatureError
+        mock_verify.side_effect = InvalidSignatureError("Signature verification failed")
+
+        response = client.get("/api/v1/schedules", headers={"Authorization": "Bearer forged.jwt.token"})
+
+        assert response.status_code == 401
+        assert response.json() == {"detail": "Invalid or expired token"}
+        mock_list.assert_not_called()
@@ -0,0 +1,126 @@
+"""
+Tests for the schedule executor simulation harness.
+"""
+import pytest
+from botocore.exceptions import ClientError
+
+
+class TestInMemoryTable:
+    """Test cases for the DynamoDB table stand-in."""
+
+    def test_conditional_update_applies_and_rejects(self):
+        """Test that update_item applies SET/REMOVE and enforces the condition."""
+        from schedule_simulator import InMemoryTable
+
+        table = InMemoryTable("schedule_id")
+        table.put_item(Item={"schedule_id": "a", "scheduled_time": "t1", "enabled": True})
+
+        table.update_item(
+            Key={"schedule_id": "a"},
+            UpdateExpression="SET claimed_for = :st REMOVE enabled",
+            ConditionExpression="scheduled_time = :st AND attribute_not_exists(claimed_for)",
+            ExpressionAttributeValues={":st": "t1"}
+        )
+
+        assert table.items["a"] == {"schedule_id": "a", "scheduled_time": "t1", "claimed_for": "t1"}
+        with pytest.raises(ClientError) as exc_info:
+            table.update_item(
+                Key={"schedule_id": "a"},
+                UpdateExpression="SET claimed_for = :st",
+                ConditionExpression="attribute_not_exists(claimed_for) OR claimed_for <> :st",
+                ExpressionAttributeValues={":st": "t1"}
+            )
+        assert exc_info.value.response['Error']['Code'] == 'ConditionalCheckFailedException'
+
+    def test_scan_paginates_and_filters(self):
+        """Test that scans page through the table and count every item read."""
+        from schedule_simulator import InMemoryTable
+
+        table = InMemoryTable("schedule_id", page_size=2)
+        for index in range(5):
+            table.put_item(Item={"schedule_id": str(index), "enabled": index != 3})
+
+        response = table.scan(FilterExpression="enabled = :enabled", ExpressionAttributeValues={":enabled": True})
+        found = response["Items"]
+        while "LastEvaluatedKey" in response:
+            response = table.scan(
+                FilterExpression="enabled = :enabled",
+                ExpressionAttributeValues={":enabled": True},
+                ExclusiveStartKey=response["LastEvaluatedKey"]
+            )
+            found += response["Items"]
+
+        assert [item["schedule_id"] for item in found] == ["0", "1", "2", "4"]
+        assert table.items_read == 5
+        assert table.read_requests == 3
+
+    def test_named_conditions_and_stream(self):
+        """Test #name placeholders, conditional puts, get_item and the change stream."""
+        from schedule_simulator import InMemoryTable
+
+        table = InMemoryTable("feed_id", stream=True)
+        table.put_item(Item={"feed_id": "f1", "status": "initiated"}, ConditionExpression="attribute_not_exists(feed_id)")
+        with pytest.raises(ClientError):
+            table.put_item(Item={"feed_id": "f1", "status": "x"}, ConditionExpression="attribute_not_exists(feed_id)")
+        table.update_item(
+            Key={"feed_id": "f1"},
+            UpdateExpression="SET #status = :status",
+            ExpressionAttributeNames={"#status": "status"},
+            ExpressionAttributeValues={":status": "completed"}
+        )
+
+        assert table.get_item(Key={"feed_id": "f1"}) == {"Item": {"feed_id": "f1", "status": "completed"}}
+        assert table.get_item(Key={"feed_id": "f2"}) == {}
+        assert [(name, new["status"]) for name, _, new in table.stream] == [("INSERT", "initiated"), ("MODIFY", "completed")]
+        assert table.conditional_failures == 1
+
+
+class TestScheduleSimulation:
+    """Test cases for end-to-end executor simulations."""
+
+    def test_every_occurrence_fires_exactly_once(self):
+        """Test that the per-tick executor neither duplicates nor misses occurrences."""
+        from schedule_simulator import run_simulation
+
+        report = run_simulation(schedules=30, days=0.25)
+
+        assert report["expected_occurrences"] > 0
+        assert report["duplicates"] == 0
+        assert report["missed"] == 0
+        assert report["dispatches"]["published"] == report["dispatches"]["success"]
+        assert report["lateness_seconds"]["max"] < 60
+
+    def test_sharded_lookahead_fires_on_time(self):
+        """Test that sharded lookahead workers fire every occurrence at its exact second."""
+        from schedule_simulator import run_simulation
+
+        report = run_simulation(
+            schedules=30, days=0.25, lookahead_seconds=60, workers=2, partition_strategy="hash"
+        )
+
+        assert report["duplicates"] == 0
+        assert report["missed"] == 0
+        assert report["lateness_seconds"]["max"] == 0.0
+
+    def test_outage_catch_up_policies(self):
+        """Test that an outage drops stale occurrences under 'skip' but not under 'all'."""
+        from schedule_simulator import run_simulation
+
+        outage = {"schedules": 30, "days": 0.25, "outage_at_hours": 1, "outage_minutes": 120}
+        skipped = run_simulation(catch_up_policy="skip", **outage)
+        caught_up = run_simulation(catch_up_policy="all", **outage)
+
+        assert skipped["missed"] > 0
+        assert skipped["missed"] == skipped["dispatches"]["skipped_occurrences"]
+        assert caught_up["missed"] == 0
+        assert caught_up["duplicates"] == 0
+
+    def test_failed_publishes_are_retried(self):
+        """Test that failed publishes are retried on later ticks without duplicates."""
+        from schedule_simulator import run_simulation
+
+        report = run_simulation(schedules=30, days=0.25, publish_failure_rate=0.3, seed=1)
+
+        assert report["dispatches"]["failed"] > 0
+        assert report["duplicates"] == 0
+        assert report["missed"] == 0
@@ -1,12 +1,13 @@
 """
 Tests for schedule timezone conversion functionality.
 """
-from datetime import datetime, timedelta
+from datetime import UTC, datetime, timedelta
 
 import pytest
+from pydantic import ValidationError
 
 from app.crud.schedule import convert_to_utc
-from app.models.schedule import ScheduleRequest
+from app.models.schedule import ScheduleRequest, ScheduleUpdate
 
 
 class TestTimezoneConversion:
@@ -59,7 +60,7 @@ class TestScheduleValidation:
 
     def test_schedule_validation_future_time_valid(self):
         """Test that future times are accepted."""
-        future_dt = datetime.utcnow() + timedelta(hours=1)
+        future_dt = datetime.now(UTC) + timedelta(hours=1)
         future_time = future_dt.strftime('%Y-%m-%dT%H:%M:%S')
 
         request = ScheduleRequest(
@@ -81,7 +82,7 @@ class TestScheduleValidation:
         try:
             os.environ['ENVIRONMENT'] = 'production'
 
-            future_time = (datetime.utcnow() + timedelta(hours=2)).strftime('%Y-%m-%dT%H:%M:%S')
+            future_time = (datetime.now(UTC) + timedelta(hours=2)).strftime('%Y-%m-%dT%H:%M:%S')
 
             # This should NOT raise an error
             request = ScheduleRequest(
@@ -109,7 +110,7 @@ class TestScheduleValidation:
         try:
             os.environ['ENVIRONMENT'] = 'production'
 
-            past_time = (datetime.utcnow() - timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%S')
+            past_time = (datetime.now(UTC) - timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%S')
 
             with pytest.raises(ValueError, match="scheduled_time must be in the future"):
                 ScheduleRequest(
@@ -128,7 +129,7 @@ class TestScheduleValidation:
 
     def test_schedule_validation_invalid_timezone(self):
         """Test that invalid timezones are rejected."""
-        future_time = (datetime.now() + timedelta(hours=1)).isoformat()
+        future_time = (datetime.now(UTC) + timedelta(hours=1)).isoformat()
 
         with pytest.raises(ValueError, match="Invalid timezone"):
             ScheduleRequest(
@@ -211,7 +212,7 @@ class TestNewRecurrenceOptions:
 
     def test_weekly_recurrence_in_model(self):
         """Test that weekly recurrence is accepted."""
-        future_time = (datetime.utcnow() + timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%S')
+        future_time = (datetime.now(UTC) + timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%S')
 
         request = ScheduleRequest(
             requested_by="test@example.com",
@@ -225,7 +226,7 @@ class TestNewRecurrenceOptions:
 
     def test_monthly_recurrence_in_model(self):
         """Test that monthly recurrence is accepted."""
-        future_time = (datetime.utcnow() + timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%S')
+        future_time = (datetime.now(UTC) + timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%S')
 
         request = ScheduleRequest(
             requested_by="test@example.com",
@@ -236,3 +237,48 @@ class TestNewRecurrenceOptions:
         )
 
         assert request.recurrence == "monthly"
+
+    def test_cron_recurrence_in_model(self):
+        """Test that cron recurrence is accepted with an expression."""
+        future_time = (datetime.now(UTC) + timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%S')
+
+        request = ScheduleRequest(
+            requested_by="test@example.com",
+            scheduled_time=future_time,
+            recurrence="cron",
+            cron_expression="0 8,18 * * *",
+            timezone="UTC"
+        )
+
+        assert request.cron_expression == "0 8,18 * * *"
+
+    def test_cron_recurrence_requires_expression(self):
+        """Test that a new cron schedule needs an expression; an update may rely on the stored one."""
+        future_time = (datetime.now(UTC) + timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%S')
+
+        with pytest.raises(ValidationError, match="cron_expression is required"):
+            ScheduleRequest(requested_by="test@example.com", scheduled_time=future_time, recurrence="cron")
+        assert ScheduleUpdate(recurrence="cron").cron_expression is None
+
+    def test_cron_expression_must_fire(self):
+        """Test that invalid or never-matching expressions are rejected."""
+        with pytest.raises(ValidationError, match="never matches"):
+            ScheduleUpdate(recurrence="cron", cron_expression="0 0 30 2 *")
+        with pytest.raises(ValidationError, match="Invalid cron expression"):
+            ScheduleUpdate(cron_expression="0 25 * * *")
+        assert ScheduleUpdate(feed_cycles=2, cron_expression=None).cron_expression is None
+
+
+class TestWallClockAnchor:
+    """Test cases for storing the local wall-clock time of a schedule."""
+
+    def test_to_wall_clock(self):
+        """Test that local times are kept and offset times are converted."""
+        from app.crud.schedule import to_wall_clock
+
+        assert to_wall_clock("2025-03-09T02:30:00", "America/New_York") == datetime(2025, 3, 9, 2, 30)
+        assert to_wall_clock("2025-03-10T12:00:00+00:00", "America/New_York") == datetime(2025, 3, 10, 8, 0)
+
+    def test_convert_to_utc_with_offset(self):
+        """Test that an explicit offset is honoured."""
+        assert convert_to_utc("2025-12-14T10:00:00+01:00", "America/New_York") == "2025-12-14T09:00:00Z"
@@ -0,0 +1,250 @@
+"""
+Tests for recurrence math and missed-occurrence catch-up planning.
+"""
+from datetime import datetime, timedelta
+
+from app.core.scheduler import (
+    CatchUpPolicy,
+    ExecutionPlan,
+    add_months,
+    due_occurrences,
+    first_occurrence_after,
+    next_execution_time,
+    next_occurrence,
+    plan_execution,
+)
+
+
+class TestRecurrence:
+    """Test cases for occurrence arithmetic."""
+
+    def test_next_occurrence_fixed_steps(self):
+        """Test daily and weekly steps."""
+        dt = datetime(2025, 12, 13, 8, 0)
+        assert next_occurrence(dt, "daily") == datetime(2025, 12, 14, 8, 0)
+        assert next_occurrence(dt, "weekly") == datetime(2025, 12, 20, 8, 0)
+
+    def test_next_occurrence_monthly_and_none(self):
+        """Test monthly steps and one-time schedules."""
+        assert next_occurrence(datetime(2025, 12, 31, 8, 0), "monthly") == datetime(2026, 1, 31, 8, 0)
+        assert next_occurrence(datetime(2025, 12, 31, 8, 0), "none") is None
+
+    def test_add_months_clamps_day(self):
+        """Test that short months clamp the day of month."""
+        assert add_months(datetime(2024, 1, 31), 1) == datetime(2024, 2, 29)
+        assert add_months(datetime(2024, 1, 31), 13) == datetime(2025, 2, 28)
+
+    def test_first_occurrence_after_jumps_in_one_step(self):
+        """Test that a schedule years behind lands on its next future occurrence."""
+        anchor = datetime(2020, 1, 1, 8, 0)
+        now = datetime(2025, 12, 13, 9, 0)
+
+        assert first_occurrence_after(anchor, "daily", now) == datetime(2025, 12, 14, 8, 0)
+        assert first_occurrence_after(anchor, "weekly", now) == datetime(2025, 12, 17, 8, 0)
+        assert first_occurrence_after(now, "daily", anchor) == now
+
+    def test_first_occurrence_after_monthly_keeps_anchor_day(self):
+        """Test that monthly occurrences are counted from the anchor, not chained."""
+        anchor = datetime(2025, 1, 31, 8, 0)
+
+        assert first_occurrence_after(anchor, "monthly", datetime(2025, 3, 1)) == datetime(2025, 3, 31, 8, 0)
+        assert first_occurrence_after(anchor, "monthly", datetime(2025, 3, 31, 9, 0)) == datetime(2025, 4, 30, 8, 0)
+
+    def test_first_occurrence_after_one_time(self):
+        """Test that one-time schedules have no occurrence once passed."""
+        anchor = datetime(2025, 12, 13, 8, 0)
+
+        assert first_occurrence_after(anchor, "none", datetime(2025, 12, 13, 7, 0)) == anchor
+        assert first_occurrence_after(anchor, "none", datetime(2025, 12, 13, 9, 0)) is None
+
+    def test_next_execution_time(self):
+        """Test the next run is the pending occurrence, or the first one after now once it has passed."""
+        anchor = datetime(2025, 12, 13, 8, 0)
+        now = datetime(2025, 12, 13, 9, 0)
+
+        assert next_execution_time(anchor, "daily", anchor - timedelta(hours=1)) == anchor
+        assert next_execution_time(anchor, "daily", now) == datetime(2025, 12, 14, 8, 0)
+        assert next_execution_time(anchor, "cron", now, "0 8,18 * * *") == datetime(2025, 12, 13, 18, 0)
+        assert next_execution_time(anchor, "none", now) == anchor
+
+    def test_due_occurrences(self):
+        """Test listing passed occurrences, limited to the most recent ones."""
+        anchor = datetime(2025, 12, 10, 8, 0)
+        now = datetime(2025, 12, 13, 8, 0)
+
+        assert due_occurrences(anchor, "daily", now) == [anchor + timedelta(days=n) for n in range(4)]
+        assert due_occurrences(anchor, "daily", now, limit=2) == [datetime(2025, 12, 12, 8, 0), now]
+        assert due_occurrences(anchor, "none", now) == [anchor]
+        assert due_occurrences(now, "daily", anchor) == []
+
+
+class TestPlanExecution:
+    """Test cases for catch-up planning."""
+
+    def test_on_time_occurrence_fires(self):
+        """Test that an occurrence within the grace period fires under every policy."""
+        plan = plan_execution(datetime(2025, 12, 13, 8, 0), "daily", datetime(2025, 12, 13, 8, 0, 30))
+
+        assert plan.fire_times == [datetime(2025, 12, 13, 8, 0)]
+        assert plan.skipped == []
+        assert plan.next_time == datetime(2025, 12, 14, 8, 0)
+
+    def test_skip_policy_drops_stale_occurrences(self):
+        """Test that the skip policy drops occurrences older than the grace period."""
+        plan = plan_execution(
+            datetime(2025, 12, 11, 8, 0), "daily", datetime(2025, 12, 13, 10, 0), policy=CatchUpPolicy.SKIP
+        )
+
+        assert plan.fire_times == []
+        assert len(plan.skipped) == 3
+        assert plan.has_work
+
+    def test_latest_policy_fires_most_recent(self):
+        """Test that the latest policy fires only the most recent missed occurrence."""
+        plan = plan_execution(
+            datetime(2025, 12, 11, 8, 0), "daily", datetime(2025, 12, 13, 10, 0), policy=CatchUpPolicy.LATEST
+        )
+
+        assert plan.fire_times == [datetime(2025, 12, 13, 8, 0)]
+        assert plan.skipped == [datetime(2025, 12, 11, 8, 0), datetime(2025, 12, 12, 8, 0)]
+
+    def test_all_policy_fires_everything(self):
+        """Test that the all policy fires every missed occurrence oldest first."""
+        plan = plan_execution(
+            datetime(2025, 12, 11, 8, 0), "daily", datetime(2025, 12, 13, 10, 0), policy=CatchUpPolicy.ALL
+        )
+
+        assert len(plan.fire_times) == 3
+        assert plan.fire_times[0] == datetime(2025, 12, 11, 8, 0)
+
+    def test_already_executed_occurrences_are_ignored(self):
+        """Test that occurrences up to last_executed_at are not planned again."""
+        plan = plan_execution(
+            datetime(2025, 12, 13, 8, 0), "daily", datetime(2025, 12, 13, 8, 1),
+            last_executed_at=datetime(2025, 12, 13, 8, 0, 2)
+        )
+
+        assert plan == ExecutionPlan(next_time=datetime(2025, 12, 14, 8, 0))
+        assert not plan.has_work
+
+    def test_one_time_schedule_has_no_next_time(self):
+        """Test that a passed one-time schedule is planned without a next occurrence."""
+        plan = plan_execution(datetime(2025, 12, 13, 8, 0), "none", datetime(2025, 12, 13, 8, 0, 10))
+
+        assert plan.fire_times == [datetime(2025, 12, 13, 8, 0)]
+        assert plan.next_time is None
+
+
+class TestCronRecurrence:
+    """Test cases for cron recurrence in the planner."""
+
+    def test_next_occurrence_cron(self):
+        """Test that cron schedules step to the next matching minute."""
+        assert next_occurrence(datetime(2025, 12, 13, 8, 0), "cron", "0 8,18 * * *") == datetime(2025, 12, 13, 18, 0)
+
+    def test_first_occurrence_after_cron_jumps_ahead(self):
+        """Test that a cron schedule far behind lands on its next future match."""
+        anchor = datetime(2020, 1, 1, 8, 0)
+
+        result = first_occurrence_after(anchor, "cron", datetime(2025, 12, 13, 9, 0), "0 8,18 * * *")
+
+        assert result == datetime(2025, 12, 13, 18, 0)
+
+    def test_due_occurrences_cron_keeps_most_recent(self):
+        """Test that passed cron matches are listed oldest first and limited."""
+        anchor = datetime(2025, 12, 12, 8, 0)
+        now = datetime(2025, 12, 13, 19, 0)
+
+        assert due_occurrences(anchor, "cron", now, cron_expression="0 8,18 * * *") == [
+            datetime(2025, 12, 12, 8, 0), datetime(2025, 12, 12, 18, 0),
+            datetime(2025, 12, 13, 8, 0), datetime(2025, 12, 13, 18, 0),
+        ]
+        assert due_occurrences(anchor, "cron", now, limit=1, cron_expression="0 8,18 * * *") == [
+            datetime(2025, 12, 13, 18, 0)
+        ]
+
+    def test_plan_execution_cron(self):
+        """Test planning a cron schedule that missed a slot."""
+        plan = plan_execution(
+            datetime(2025, 12, 13, 8, 0), "cron", datetime(2025, 12, 13, 18, 0, 20),
+            cron_expression="0 8,18 * * *"
+        )
+
+        assert plan.fire_times == [datetime(2025, 12, 13, 18, 0)]
+        assert plan.skipped == [datetime(2025, 12, 13, 8, 0)]
+        assert plan.next_time == datetime(2025, 12, 14, 8, 0)
+
+
+class TestTimezoneRecurrence:
+    """Test cases for recurrence in the schedule's local wall-clock time."""
+
+    def test_daily_keeps_wall_clock_across_spring_forward(self):
+        """Test that 08:00 EST becomes 08:00 EDT, one hour earlier in UTC."""
+        result = next_occurrence(datetime(2025, 3, 8, 13, 0), "daily", timezone="America/New_York")
+
+        assert result == datetime(2025, 3, 9, 12, 0)
+
+    def test_wall_clock_anchor_restores_skipped_time(self):
+        """Test that a 02:30 schedule moved by the DST gap returns to 02:30 the next day."""
+        result = first_occurrence_after(
+            datetime(2025, 3, 9, 7, 30), "daily", datetime(2025, 3, 9, 7, 31),
+            timezone="America/New_York", wall_clock_anchor=datetime(2025, 3, 1, 2, 30)
+        )
+
+        assert result == datetime(2025, 3, 10, 6, 30)
+
+    def test_next_occurrence_returns_to_wall_clock_after_each_gap(self):
+        """Test that a daily 02:30 schedule crossing two spring-forward gaps stays at 02:30."""
+        anchor = datetime(2025, 3, 1, 2, 30)
+        current = datetime(2025, 3, 8, 7, 30)  # 02:30 EST
+        times = []
+        for _ in range(366):
+            current = next_occurrence(
+                current, "daily", timezone="America/New_York", wall_clock_anchor=anchor
+            )
+            times.append(current)
+
+        assert times[0] == datetime(2025, 3, 9, 7, 30)  # gap: 03:30 EDT
+        assert times[1] == datetime(2025, 3, 10, 6, 30)  # back to 02:30 EDT
+        assert times[364] == datetime(2026, 3, 8, 7, 30)  # second gap: 03:30 EDT
+        assert times[365] == datetime(2026, 3, 9, 6, 30)
+
+    def test_wall_clock_anchor_keeps_month_end(self):
+        """Test that a month-end schedule clamped to the 28th returns to the 31st."""
+        result = first_occurrence_after(
+            datetime(2025, 2, 28, 8, 0), "monthly", datetime(2025, 2, 28, 8, 1),
+            wall_clock_anchor=datetime(2025, 1, 31, 8, 0)
+        )
+
+        assert result == datetime(2025, 3, 31, 8, 0)
+
+    def test_repeated_hour_is_not_fired_twice(self):
+        """Test that a 01:30 schedule does not fire again in the repeated hour."""
+        after = datetime(2025, 11, 2, 6, 20)  # 01:20 EST, second pass through 01:xx
+        daily = first_occurrence_after(
+            datetime(2025, 11, 2, 5, 30), "daily", after,
+            timezone="America/New_York", wall_clock_anchor=datetime(2025, 11, 2, 1, 30)
+        )
+        cron = first_occurrence_after(
+            datetime(2025, 11, 2, 5, 30), "cron", after, cron_expression="30 1 * * *", timezone="America/New_York"
+        )
+
+        assert daily == datetime(2025, 11, 3, 6, 30)
+        assert cron == datetime(2025, 11, 3, 6, 30)
+
+    def test_due_occurrences_in_timezone(self):
+        """Test listing missed occurrences across a DST change."""
+        occurrences = due_occurrences(
+            datetime(2025, 3, 8, 13, 0), "daily", datetime(2025, 3, 10, 12, 30), timezone="America/New_York"
+        )
+        cron = due_occurrences(
+            datetime(2025, 3, 8, 13, 0), "cron", datetime(2025, 3, 9, 12, 30),
+            cron_expression="0 8 * * *", timezone="America/New_York"
+        )
+
+        assert occurrences == [datetime(2025, 3, 8, 13, 0), datetime(2025, 3, 9, 12, 0), datetime(2025, 3, 10, 12, 0)]
+        assert cron == [datetime(2025, 3, 8, 13, 0), datetime(2025, 3, 9, 12, 0)]
+
+    def test_cron_that_never_fires(self):
+        """Test that an impossible cron expression has no next occurrence."""
+        assert next_occurrence(datetime(2025, 3, 8), "cron", "0 0 30 2 *", "America/New_York") is None
@@ -16,6 +16,13 @@ class TestStatusRoutes:
         from app.main import app
         return TestClient(app)
 
+    @pytest.fixture
+    def as_admin(self):
+        """Resolve every request to an admin, who may address the whole fleet."""
+        from app.core.auth import Principal
+        with patch('app.core.auth.resolve_principal', return_value=Principal(email='admin@example.com', is_admin=True)):
+            yield
+
     @patch('app.api.v1.routes.status.get_hardware_adapter')
     def test_get_status_success(self, mock_get_adapter, client):
         """Test successful status retrieval."""
@@ -35,6 +42,53 @@ class TestStatusRoutes:
         assert data['feeder_state'] == 'CLOSED'
         assert data['network_status'] == 'ONLINE'
 
+    @patch('app.core.auth.get_config_table')
+    @patch('app.api.v1.routes.status.get_hardware_adapter')
+    def test_get_status_with_machine_token(self, mock_get_adapter, mock_get_table, client):
+        """Test a machine client with the status:read scope can read the status."""
+        from app.core.auth import issue_machine_token
+        mock_get_table.return_value.get_item.return_value = {
+            'Item': {'value': {'secret': 'bot-secret', 'scopes': ['status:read']}}
+        }
+        mock_adapter = MagicMock()
+        mock_adapter.get_device_status = AsyncMock(return_value={'feeder_state': 'CLOSED'})
+        mock_get_adapter.return_value = mock_adapter
+        token = issue_machine_token('bot', 'bot-secret', ['status:read'])
+
+        response = client.get("/api/v1/status", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 200
+        assert response.json() == {'feeder_state': 'CLOSED'}
+
+    @pytest.mark.usefixtures('as_admin')
+    @patch('app.api.v1.routes.status.get_hardware_adapter')
+    def test_get_status_for_other_device(self, mock_get_adapter, client):
+        """Test ?thing_id= reads that device's status."""
+        mock_adapter = MagicMock()
+        mock_adapter.get_device_status = AsyncMock(return_value={'thing_id': 'feeder-2'})
+        mock_get_adapter.return_value = mock_adapter
+
+        response = client.get("/api/v1/status?thing_id=feeder-2")
+
+        assert response.status_code == 200
+        mock_adapter.get_device_status.assert_awaited_once_with('feeder-2')
+
+    @patch('app.api.v1.routes.status.get_hardware_adapter')
+    def test_get_status_other_device_needs_fleet_access(self, mock_get_adapter, client):
+        """Test a user who may not address the fleet cannot read another device."""
+        from app.core.auth import Principal
+        with patch('app.core.auth.resolve_principal', return_value=Principal(email='user@example.com')):
+            response = client.get("/api/v1/status?thing_id=feeder-2")
+
+        assert response.status_code == 403
+        mock_get_adapter.return_value.get_device_status.assert_not_called()
+
+    def test_get_status_rejects_invalid_thing_id(self, client):
+        """Test thing ids with MQTT wildcards are rejected."""
+        response = client.get("/api/v1/status", params={"thing_id": "feeder+"})
+
+        assert response.status_code == 422
+
     @patch('app.api.v1.routes.status.get_hardware_adapter')
     def test_get_status_not_found(self, mock_get_adapter, client):
         """Test 404 when device status not found."""
@@ -60,41 +114,58 @@ class TestStatusRoutes:
         assert response.status_code == 500
         assert "error" in response.json()['detail'].lower()
 
-    @patch('app.api.v1.routes.status.asyncio')
+    @pytest.mark.usefixtures('as_admin')
+    @patch('app.core.polling.asyncio.sleep', new_callable=AsyncMock)
     @patch('app.api.v1.routes.status.get_hardware_adapter')
-    def test_request_status_success(self, mock_get_adapter, mock_asyncio, client):
-        """Test successful status request."""
+    def test_request_status_success(self, mock_get_adapter, mock_sleep, client):
+        """Test the endpoint waits for the status that echoes its request id."""
+        requests = []
+        # Stale status, then nothing, then the device's reply
+        reads = [{'feeder_state': 'CLOSED', 'last_request_id': 'older-request'}, None]
+
+        def read_status(*args, **kwargs):
+            if reads:
+                return reads.pop(0)
+            return {'feeder_state': 'CLOSED', 'network_status': 'ONLINE', 'last_request_id': requests[0]}
+
         mock_adapter = MagicMock()
-        mock_adapter.request_status_update = AsyncMock(return_value=True)
-        mock_adapter.get_device_status = AsyncMock(return_value={
-            'feeder_state': 'CLOSED',
-            'network_status': 'ONLINE'
-        })
+        mock_adapter.request_status_update = AsyncMock(side_effect=lambda thing_id, request_id: requests.append(request_id) or True)
+        mock_adapter.get_device_status = AsyncMock(side_effect=read_status)
         mock_get_adapter.return_value = mock_adapter
-        mock_asyncio.sleep = AsyncMock()
 
-        response = client.put("/api/v1/status")
+        response = client.put("/api/v1/status?thing_id=feeder-2")
 
         assert response.status_code == 200
         data = response.json()
         assert data['success'] is True
+        assert data['request_id'] == requests[0]
+        assert data['status']['last_request_id'] == requests[0]
+        mock_adapter.request_status_update.assert_awaited_once_with('feeder-2', requests[0])
+        assert mock_adapter.get_device_status.await_count == 3
+        mock_adapter.get_device_status.assert_awaited_with('feeder-2', consistent_read=True)
+        assert [c.args[0] for c in mock_sleep.await_args_list] == [0.1, 0.2]
 
-    @patch('app.api.v1.routes.status.asyncio')
     @patch('app.api.v1.routes.status.get_hardware_adapter')
-    def test_request_status_no_response(self, mock_get_adapter, mock_asyncio, client):
-        """Test status request when device doesn't respond."""
+    def test_request_status_no_response(self, mock_get_adapter, client):
+        """Test status request when device doesn't respond before the deadline."""
         mock_adapter = MagicMock()
         mock_adapter.request_status_update = AsyncMock(return_value=True)
-        mock_adapter.get_device_status = AsyncMock(return_value=None)
+        mock_adapter.get_device_status = AsyncMock(return_value={'feeder_state': 'CLOSED'})
         mock_get_adapter.return_value = mock_adapter
-        mock_asyncio.sleep = AsyncMock()
 
-        response = client.put("/api/v1/status")
+        response = client.put("/api/v1/status?timeout_ms=0")
 
         assert response.status_code == 200
         data = response.json()
         assert data['success'] is True
         assert data['status'] is None
+        mock_adapter.get_device_status.assert_awaited_once()
+
+    def test_request_status_rejects_long_timeout(self, client):
+        """Test waits longer than the API Gateway timeout allows are rejected."""
+        response = client.put("/api/v1/status?timeout_ms=60000")
+
+        assert response.status_code == 422
 
     @patch('app.api.v1.routes.status.get_hardware_adapter')
     def test_request_status_send_failed(self, mock_get_adapter, client):
@@ -119,3 +190,23 @@ class TestStatusRoutes:
 
         assert response.status_code == 500
         assert "error" in response.json()['detail'].lower()
+
+    @patch('app.api.v1.routes.status.get_config_sync_status', new_callable=AsyncMock)
+    def test_get_config_sync_status(self, mock_sync_status, client):
+        """Test the config sync status is returned."""
+        mock_sync_status.return_value = {'desired_version': 4, 'reported_version': 4, 'in_sync': True, 'pending': {}}
+
+        response = client.get("/api/v1/status/config")
+
+        assert response.status_code == 200
+        assert response.json()['in_sync'] is True
+        mock_sync_status.assert_awaited_once_with(None)
+
+    @patch('app.api.v1.routes.status.get_config_sync_status', new_callable=AsyncMock)
+    def test_get_config_sync_status_error(self, mock_sync_status, client):
+        """Test errors reading the sync status return 500."""
+        mock_sync_status.side_effect = Exception("DynamoDB error")
+
+        response = client.get("/api/v1/status/config")
+
+        assert response.status_code == 500
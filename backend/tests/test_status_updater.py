@@ -6,6 +6,14 @@ from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
 
+def stored_item(update_call):
+    """The status item an update_item call writes (key plus SET attributes)."""
+    kwargs = update_call[1]
+    names = kwargs['ExpressionAttributeNames']
+    values = kwargs['ExpressionAttributeValues']
+    return {**kwargs['Key'], **{names[f"#{key[1:]}"]: value for key, value in values.items()}}
+
+
 class TestStatusUpdater:
     """Test cases for device status update functionality."""
 
@@ -16,18 +24,48 @@ class TestStatusUpdater:
         """Test that handler updates device status in DynamoDB."""
         from status_updater import handler
 
-        mock_table.put_item = MagicMock(return_value={})
+        mock_table.update_item = MagicMock(return_value={})
 
         result = handler(sample_status_event, mock_lambda_context)
 
         assert result['statusCode'] == 200
-        mock_table.put_item.assert_called_once()
-        call_args = mock_table.put_item.call_args
-        item = call_args[1]['Item']
+        mock_table.update_item.assert_called_once()
+        item = stored_item(mock_table.update_item.call_args)
         assert item['feeder_state'] == 'CLOSED'
         assert item['network_status'] == 'ONLINE'
         assert item['current_weight_g'] == Decimal('350.0')
 
+    @patch('status_updater.table')
+    def test_handler_uses_thing_id_from_rule(
+        self, mock_table, sample_status_event, mock_lambda_context
+    ):
+        """Test the thing_id the IoT rule takes from the topic keys the status item."""
+        from status_updater import IOT_THING_ID, handler
+
+        handler({**sample_status_event, 'thing_id': 'feeder-7'}, mock_lambda_context)
+        handler(sample_status_event, mock_lambda_context)
+
+        items = [stored_item(c) for c in mock_table.update_item.call_args_list]
+        assert [item['thing_id'] for item in items] == ['feeder-7', IOT_THING_ID]
+
+    @patch('status_updater.table')
+    def test_handler_mirrors_reported_config(
+        self, mock_table, sample_status_event, mock_lambda_context
+    ):
+        """Test that the config the device reports is stored with its version."""
+        from status_updater import handler
+
+        mock_table.update_item = MagicMock(return_value={})
+        event = {**sample_status_event, 'config': {'version': 4, 'WEIGHT_THRESHOLD_G': 450.0, 'MODE': 'eco'}}
+
+        result = handler(event, mock_lambda_context)
+
+        assert result['statusCode'] == 200
+        item = stored_item(mock_table.update_item.call_args)
+        assert item['reported_config_version'] == 4
+        assert item['reported_config'] == {'WEIGHT_THRESHOLD_G': Decimal('450.0'), 'MODE': 'eco'}
+        assert item['reported_config_at'] == item['last_updated']
+
     @patch('status_updater.table')
     def test_handler_handles_string_event(
         self, mock_table, sample_status_event, mock_lambda_context
@@ -35,7 +73,7 @@ class TestStatusUpdater:
         """Test that handler handles JSON string event."""
         from status_updater import handler
 
-        mock_table.put_item = MagicMock(return_value={})
+        mock_table.update_item = MagicMock(return_value={})
         json_event = json.dumps(sample_status_event)
 
         result = handler(json_event, mock_lambda_context)
@@ -49,17 +87,67 @@ class TestStatusUpdater:
         """Test that handler uses default values for missing fields."""
         from status_updater import handler
 
-        mock_table.put_item = MagicMock(return_value={})
+        mock_table.update_item = MagicMock(return_value={})
         minimal_event = {}
 
         result = handler(minimal_event, mock_lambda_context)
 
         assert result['statusCode'] == 200
-        call_args = mock_table.put_item.call_args
-        item = call_args[1]['Item']
+        item = stored_item(mock_table.update_item.call_args)
         assert item['feeder_state'] == 'unknown'
         assert item['network_status'] == 'unknown'
 
+    @patch('status_updater.table')
+    def test_handler_keeps_echoed_request_id(
+        self, mock_table, sample_status_event, mock_lambda_context
+    ):
+        """Test a reply's request id is stored and later statuses leave it in place."""
+        from status_updater import handler
+
+        handler({**sample_status_event, 'request_id': 'abc123'}, mock_lambda_context)
+        handler(sample_status_event, mock_lambda_context)
+
+        reply, unsolicited = [stored_item(c) for c in mock_table.update_item.call_args_list]
+        assert reply['last_request_id'] == 'abc123'
+        assert 'last_request_id' not in unsolicited
+        assert mock_table.update_item.call_args[1]['UpdateExpression'].startswith('SET #feeder_state = :feeder_state')
+        mock_table.put_item.assert_not_called()
+
+    @patch('status_updater.table')
+    def test_handler_decodes_raw_payloads(
+        self, mock_table, sample_status_event, mock_lambda_context
+    ):
+        """Test base64 payloads from the rule are decoded and the device's format is stored."""
+        import base64
+
+        from app.core.iot_codec import encode_status
+        from status_updater import handler
+
+        compact = {'raw': base64.b64encode(encode_status({**sample_status_event, 'request_id': 'ab' * 16})).decode(),
+                   'thing_id': 'feeder-1'}
+        plain = {'raw': base64.b64encode(json.dumps(sample_status_event).encode()).decode(), 'thing_id': 'feeder-2'}
+
+        assert handler(compact, mock_lambda_context)['statusCode'] == 200
+        assert handler(plain, mock_lambda_context)['statusCode'] == 200
+
+        compact_item, plain_item = [stored_item(c) for c in mock_table.update_item.call_args_list]
+        assert compact_item['thing_id'] == 'feeder-1'
+        assert compact_item['payload_format'] == 'compact-v1'
+        assert compact_item['last_request_id'] == 'ab' * 16
+        assert compact_item['current_weight_g'] == Decimal('350.0')
+        assert compact_item['feeder_state'] == plain_item['feeder_state'] == 'CLOSED'
+        assert plain_item['payload_format'] == 'json'
+
+    def test_handler_returns_400_on_undecodable_payload(self, mock_lambda_context):
+        """Test that handler returns 400 for a compact payload it cannot decode."""
+        import base64
+
+        from status_updater import handler
+
+        result = handler({'raw': base64.b64encode(b'\xa5\x09\x02').decode()}, mock_lambda_context)
+
+        assert result['statusCode'] == 400
+
     def test_handler_returns_400_on_invalid_json(self, mock_lambda_context):
         """Test that handler returns 400 for invalid JSON string."""
         from status_updater import handler
@@ -0,0 +1,48 @@
+"""
+Tests for cached timezone offset tables.
+"""
+from datetime import datetime, timedelta
+
+from app.core.timezones import to_local, to_utc, transition_table, utc_offset
+
+
+class TestTransitionTables:
+    """Test cases for per-zone transition tables."""
+
+    def test_new_york_transitions(self):
+        """Test that both 2025 DST changes are found to the second."""
+        starts, offsets = transition_table("America/New_York", 2025)
+
+        assert starts == (datetime(2025, 1, 1), datetime(2025, 3, 9, 7, 0), datetime(2025, 11, 2, 6, 0))
+        assert offsets == (timedelta(hours=-5), timedelta(hours=-4), timedelta(hours=-5))
+
+    def test_tables_are_cached(self):
+        """Test that a zone/year table is only built once."""
+        assert transition_table("Europe/London", 2025) is transition_table("Europe/London", 2025)
+
+    def test_zone_without_dst(self):
+        """Test a zone with a single offset all year."""
+        assert transition_table("Asia/Tokyo", 2025)[1] == (timedelta(hours=9),)
+        assert utc_offset(datetime(2025, 6, 1), "UTC") == timedelta(0)
+
+
+class TestConversions:
+    """Test cases for UTC <-> local wall-clock conversion."""
+
+    def test_to_local(self):
+        """Test converting UTC instants on both sides of a transition."""
+        assert to_local(datetime(2025, 3, 9, 6, 59), "America/New_York") == datetime(2025, 3, 9, 1, 59)
+        assert to_local(datetime(2025, 3, 9, 7, 0), "America/New_York") == datetime(2025, 3, 9, 3, 0)
+
+    def test_to_utc_regular_and_utc(self):
+        """Test converting unambiguous local times."""
+        assert to_utc(datetime(2025, 7, 1, 8, 0), "America/Sao_Paulo") == datetime(2025, 7, 1, 11, 0)
+        assert to_utc(datetime(2025, 7, 1, 8, 0), "UTC") == datetime(2025, 7, 1, 8, 0)
+
+    def test_to_utc_skipped_time(self):
+        """Test that a time skipped by clocks going forward moves past the gap."""
+        assert to_utc(datetime(2025, 3, 9, 2, 30), "America/New_York") == datetime(2025, 3, 9, 7, 30)
+
+    def test_to_utc_repeated_time(self):
+        """Test that a time repeated by clocks going back resolves to its first occurrence."""
+        assert to_utc(datetime(2025, 11, 2, 1, 30), "America/New_York") == datetime(2025, 11, 2, 5, 30)
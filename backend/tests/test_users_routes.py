@@ -8,6 +8,8 @@ from unittest.mock import MagicMock, patch
 import pytest
 from fastapi.testclient import TestClient
 
+from app.core.auth import Principal
+
 
 def create_mock_jwt(email: str) -> str:
     """Create a mock JWT token for testing."""
@@ -61,88 +63,6 @@ class TestUsersRoutes:
         finally:
             secrets.choice = original_choice
 
-    def test_extract_email_from_token_valid(self):
-        """Test extracting email from valid JWT."""
-        from app.api.v1.routes.users import extract_email_from_token
-        token = create_mock_jwt("test@example.com")
-        email = extract_email_from_token(token)
-
-        assert email == "test@example.com"
-
-    def test_extract_email_from_token_no_bearer(self):
-        """Test extracting email without Bearer prefix."""
-        from app.api.v1.routes.users import extract_email_from_token
-        email = extract_email_from_token("invalid-token")
-
-        assert email is None
-
-    def test_extract_email_from_token_none(self):
-        """Test extracting email with None token."""
-        from app.api.v1.routes.users import extract_email_from_token
-        email = extract_email_from_token(None)
-
-        assert email is None
-
-    def test_extract_email_from_token_invalid_format(self):
-        """Test extracting email from invalid JWT format."""
-        from app.api.v1.routes.users import extract_email_from_token
-        email = extract_email_from_token("Bearer invalid.token")
-
-        assert email is None
-
-    def test_extract_email_from_token_no_email(self):
-        """Test extracting email when token has no email claim."""
-        from app.api.v1.routes.users import extract_email_from_token
-        header = base64.urlsafe_b64encode(b'{"alg":"RS256"}').decode().rstrip('=')
-        payload = base64.urlsafe_b64encode(b'{"sub":"test"}').decode().rstrip('=')
-        signature = base64.urlsafe_b64encode(b'sig').decode().rstrip('=')
-        token = f"Bearer {header}.{payload}.{signature}"
-
-        email = extract_email_from_token(token)
-        assert email is None
-
-    def test_extract_email_from_token_decode_error(self):
-        """Test extracting email when base64 decode fails."""
-        from app.api.v1.routes.users import extract_email_from_token
-        token = "Bearer header.!!!invalid_base64!!!.signature"
-
-        email = extract_email_from_token(token)
-        assert email is None
-
-    @patch('app.api.v1.routes.users.cognito')
-    def test_is_admin_true(self, mock_cognito):
-        """Test is_admin returns True for admin user."""
-        mock_cognito.admin_list_groups_for_user.return_value = {
-            'Groups': [{'GroupName': 'admin'}]
-        }
-
-        from app.api.v1.routes.users import is_admin
-        result = is_admin("admin@example.com")
-
-        assert result is True
-
-    @patch('app.api.v1.routes.users.cognito')
-    def test_is_admin_false(self, mock_cognito):
-        """Test is_admin returns False for non-admin user."""
-        mock_cognito.admin_list_groups_for_user.return_value = {
-            'Groups': [{'GroupName': 'users'}]
-        }
-
-        from app.api.v1.routes.users import is_admin
-        result = is_admin("user@example.com")
-
-        assert result is False
-
-    @patch('app.api.v1.routes.users.cognito')
-    def test_is_admin_error(self, mock_cognito):
-        """Test is_admin returns False on error."""
-        mock_cognito.admin_list_groups_for_user.side_effect = Exception("Error")
-
-        from app.api.v1.routes.users import is_admin
-        result = is_admin("user@example.com")
-
-        assert result is False
-
     @patch('app.api.v1.routes.users.PENDING_USERS_TABLE', None)
     def test_request_access_no_table(self, client):
         """Test request_access when table not configured."""
@@ -241,9 +161,8 @@ class TestUsersRoutes:
             assert response.status_code == 200
             assert 'request_id' in response.json()
 
-    @patch('app.api.v1.routes.users.is_admin', return_value=False)
-    @patch('app.api.v1.routes.users.extract_email_from_token', return_value="user@example.com")
-    def test_list_pending_not_admin(self, mock_extract, mock_admin, client):
+    @patch('app.core.auth.resolve_principal', return_value=Principal(email="user@example.com", is_admin=False))
+    def test_list_pending_not_admin(self, mock_principal, client):
         """Test list pending requires admin."""
         response = client.get(
             "/api/v1/users/pending",
@@ -253,10 +172,9 @@ class TestUsersRoutes:
         assert response.status_code == 403
 
     @patch('app.api.v1.routes.users.PENDING_USERS_TABLE', 'test-table')
-    @patch('app.api.v1.routes.users.is_admin', return_value=True)
-    @patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com")
+    @patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True))
     @patch('app.api.v1.routes.users.dynamodb')
-    def test_list_pending_success(self, mock_dynamodb, mock_extract, mock_admin, client):
+    def test_list_pending_success(self, mock_dynamodb, mock_principal, client):
         """Test successful pending list."""
         mock_table = MagicMock()
         mock_table.scan.return_value = {'Items': [{'request_id': '123'}]}
@@ -271,10 +189,9 @@ class TestUsersRoutes:
         assert 'requests' in response.json()
 
     @patch('app.api.v1.routes.users.PENDING_USERS_TABLE', 'test-table')
-    @patch('app.api.v1.routes.users.is_admin', return_value=True)
-    @patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com")
+    @patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True))
     @patch('app.api.v1.routes.users.dynamodb')
-    def test_approve_user_not_found(self, mock_dynamodb, mock_extract, mock_admin, client):
+    def test_approve_user_not_found(self, mock_dynamodb, mock_principal, client):
         """Test approve non-existent request."""
         mock_table = MagicMock()
         mock_table.get_item.return_value = {}
@@ -288,10 +205,9 @@ class TestUsersRoutes:
         assert response.status_code == 404
 
     @patch('app.api.v1.routes.users.PENDING_USERS_TABLE', 'test-table')
-    @patch('app.api.v1.routes.users.is_admin', return_value=True)
-    @patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com")
+    @patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True))
     @patch('app.api.v1.routes.users.dynamodb')
-    def test_approve_user_already_processed(self, mock_dynamodb, mock_extract, mock_admin, client):
+    def test_approve_user_already_processed(self, mock_dynamodb, mock_principal, client):
         """Test approve already processed request."""
         mock_table = MagicMock()
         mock_table.get_item.return_value = {'Item': {'status': 'approved'}}
@@ -306,11 +222,10 @@ class TestUsersRoutes:
 
     @patch('app.api.v1.routes.users.PENDING_USERS_TABLE', 'test-table')
     @patch('app.api.v1.routes.users.USER_POOL_ID', 'test-pool')
-    @patch('app.api.v1.routes.users.is_admin', return_value=True)
-    @patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com")
+    @patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True))
     @patch('app.api.v1.routes.users.dynamodb')
     @patch('app.api.v1.routes.users.cognito')
-    def test_approve_user_success(self, mock_cognito, mock_dynamodb, mock_extract, mock_admin, client):
+    def test_approve_user_success(self, mock_cognito, mock_dynamodb, mock_principal, client):
         """Test successful user approval."""
         mock_table = MagicMock()
         mock_table.get_item.return_value = {
@@ -329,10 +244,9 @@ class TestUsersRoutes:
         assert 'email' in response.json()
 
     @patch('app.api.v1.routes.users.PENDING_USERS_TABLE', 'test-table')
-    @patch('app.api.v1.routes.users.is_admin', return_value=True)
-    @patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com")
+    @patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True))
     @patch('app.api.v1.routes.users.dynamodb')
-    def test_reject_user_success(self, mock_dynamodb, mock_extract, mock_admin, client):
+    def test_reject_user_success(self, mock_dynamodb, mock_principal, client):
         """Test successful user rejection."""
         mock_table = MagicMock()
         mock_table.get_item.return_value = {
@@ -348,9 +262,8 @@ class TestUsersRoutes:
         assert response.status_code == 200
 
     @patch('app.api.v1.routes.users.USER_POOL_ID', 'test-pool')
-    @patch('app.api.v1.routes.users.is_admin', return_value=True)
-    @patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com")
-    def test_delete_user_self_deletion(self, mock_extract, mock_admin, client):
+    @patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True))
+    def test_delete_user_self_deletion(self, mock_principal, client):
         """Test cannot delete own account."""
         response = client.delete(
             "/api/v1/users/admin@example.com",
@@ -361,10 +274,9 @@ class TestUsersRoutes:
         assert "Cannot delete your own" in response.json()['detail']
 
     @patch('app.api.v1.routes.users.USER_POOL_ID', 'test-pool')
-    @patch('app.api.v1.routes.users.is_admin', return_value=True)
-    @patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com")
+    @patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True))
     @patch('app.api.v1.routes.users.cognito')
-    def test_delete_user_success(self, mock_cognito, mock_extract, mock_admin, client):
+    def test_delete_user_success(self, mock_cognito, mock_principal, client):
         """Test successful user deletion with full cleanup."""
         with patch('app.api.v1.routes.users.SNS_TOPIC_ARN', 'arn:aws:sns:us-east-1:123456789:test-topic'), \
              patch('app.api.v1.routes.users.PENDING_USERS_TABLE', 'pending-users'), \
@@ -414,8 +326,7 @@ class TestUsersRoutes:
         with patch('app.api.v1.routes.users.USER_POOL_ID', 'test-pool'), \
              patch('app.api.v1.routes.users.SNS_TOPIC_ARN', 'arn:aws:sns:us-east-1:123456789:test-topic'), \
              patch('app.api.v1.routes.users.PENDING_USERS_TABLE', 'pending-users'), \
-             patch('app.api.v1.routes.users.is_admin', return_value=True), \
-             patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com"), \
+             patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True)), \
              patch('app.api.v1.routes.users.cognito') as mock_cognito, \
              patch('app.api.v1.routes.users.sns_client') as mock_sns, \
              patch('app.api.v1.routes.users.dynamodb') as mock_dynamodb:
@@ -445,10 +356,9 @@ class TestUsersRoutes:
             assert len(data['deleted']['pending_requests']) == 0
 
     @patch('app.api.v1.routes.users.USER_POOL_ID', 'test-pool')
-    @patch('app.api.v1.routes.users.is_admin', return_value=True)
-    @patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com")
+    @patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True))
     @patch('app.api.v1.routes.users.cognito')
-    def test_list_users_success(self, mock_cognito, mock_extract, mock_admin, client):
+    def test_list_users_success(self, mock_cognito, mock_principal, client):
         """Test successful user list."""
         from datetime import datetime
         mock_paginator = MagicMock()
@@ -509,8 +419,7 @@ class TestUsersRoutes:
     def test_list_pending_generic_error(self, client):
         """Test list_pending generic exception handling."""
         with patch('app.api.v1.routes.users.PENDING_USERS_TABLE', 'test-table'), \
-             patch('app.api.v1.routes.users.is_admin', return_value=True), \
-             patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com"), \
+             patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True)), \
              patch('app.api.v1.routes.users.dynamodb') as mock_dynamodb:
 
             mock_table = MagicMock()
@@ -526,8 +435,7 @@ class TestUsersRoutes:
 
     def test_approve_user_not_admin(self, client):
         """Test approve_user when not admin."""
-        with patch('app.api.v1.routes.users.is_admin', return_value=False), \
-             patch('app.api.v1.routes.users.extract_email_from_token', return_value="user@example.com"):
+        with patch('app.core.auth.resolve_principal', return_value=Principal(email="user@example.com", is_admin=False)):
 
             response = client.post(
                 "/api/v1/users/approve/test-123",
@@ -543,8 +451,7 @@ class TestUsersRoutes:
 
         with patch('app.api.v1.routes.users.PENDING_USERS_TABLE', 'test-table'), \
              patch('app.api.v1.routes.users.USER_POOL_ID', 'test-pool'), \
-             patch('app.api.v1.routes.users.is_admin', return_value=True), \
-             patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com"), \
+             patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True)), \
              patch('app.api.v1.routes.users.dynamodb') as mock_dynamodb, \
              patch('app.api.v1.routes.users.cognito') as mock_cognito:
 
@@ -574,8 +481,7 @@ class TestUsersRoutes:
 
         with patch('app.api.v1.routes.users.PENDING_USERS_TABLE', 'test-table'), \
              patch('app.api.v1.routes.users.USER_POOL_ID', 'test-pool'), \
-             patch('app.api.v1.routes.users.is_admin', return_value=True), \
-             patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com"), \
+             patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True)), \
              patch('app.api.v1.routes.users.dynamodb') as mock_dynamodb, \
              patch('app.api.v1.routes.users.cognito') as mock_cognito:
 
@@ -599,8 +505,7 @@ class TestUsersRoutes:
 
     def test_reject_user_not_admin(self, client):
         """Test reject_user when not admin."""
-        with patch('app.api.v1.routes.users.is_admin', return_value=False), \
-             patch('app.api.v1.routes.users.extract_email_from_token', return_value="user@example.com"):
+        with patch('app.core.auth.resolve_principal', return_value=Principal(email="user@example.com", is_admin=False)):
 
             response = client.post(
                 "/api/v1/users/reject/test-123",
@@ -612,8 +517,7 @@ class TestUsersRoutes:
     def test_reject_user_not_found(self, client):
         """Test reject_user when request not found."""
         with patch('app.api.v1.routes.users.PENDING_USERS_TABLE', 'test-table'), \
-             patch('app.api.v1.routes.users.is_admin', return_value=True), \
-             patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com"), \
+             patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True)), \
              patch('app.api.v1.routes.users.dynamodb') as mock_dynamodb:
 
             mock_table = MagicMock()
@@ -630,8 +534,7 @@ class TestUsersRoutes:
     def test_reject_user_already_processed(self, client):
         """Test reject_user when request already processed."""
         with patch('app.api.v1.routes.users.PENDING_USERS_TABLE', 'test-table'), \
-             patch('app.api.v1.routes.users.is_admin', return_value=True), \
-             patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com"), \
+             patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True)), \
              patch('app.api.v1.routes.users.dynamodb') as mock_dynamodb:
 
             mock_table = MagicMock()
@@ -648,8 +551,7 @@ class TestUsersRoutes:
     def test_reject_user_generic_error(self, client):
         """Test reject_user generic exception handling."""
         with patch('app.api.v1.routes.users.PENDING_USERS_TABLE', 'test-table'), \
-             patch('app.api.v1.routes.users.is_admin', return_value=True), \
-             patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com"), \
+             patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True)), \
              patch('app.api.v1.routes.users.dynamodb') as mock_dynamodb:
 
             mock_table = MagicMock()
@@ -666,8 +568,7 @@ class TestUsersRoutes:
 
     def test_delete_user_not_admin(self, client):
         """Test delete_user when not admin."""
-        with patch('app.api.v1.routes.users.is_admin', return_value=False), \
-             patch('app.api.v1.routes.users.extract_email_from_token', return_value="user@example.com"):
+        with patch('app.core.auth.resolve_principal', return_value=Principal(email="user@example.com", is_admin=False)):
 
             response = client.delete(
                 "/api/v1/users/target@example.com",
@@ -682,8 +583,7 @@ class TestUsersRoutes:
             pass
 
         with patch('app.api.v1.routes.users.USER_POOL_ID', 'test-pool'), \
-             patch('app.api.v1.routes.users.is_admin', return_value=True), \
-             patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com"), \
+             patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True)), \
              patch('app.api.v1.routes.users.cognito') as mock_cognito:
 
             mock_cognito.exceptions = MagicMock()
@@ -699,8 +599,7 @@ class TestUsersRoutes:
 
     def test_list_users_not_admin(self, client):
         """Test list_users when not admin."""
-        with patch('app.api.v1.routes.users.is_admin', return_value=False), \
-             patch('app.api.v1.routes.users.extract_email_from_token', return_value="user@example.com"):
+        with patch('app.core.auth.resolve_principal', return_value=Principal(email="user@example.com", is_admin=False)):
 
             response = client.get(
                 "/api/v1/users",
@@ -710,10 +609,9 @@ class TestUsersRoutes:
             assert response.status_code == 403
 
     @patch('app.api.v1.routes.users.USER_POOL_ID', 'test-pool')
-    @patch('app.api.v1.routes.users.is_admin', return_value=True)
-    @patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com")
+    @patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True))
     @patch('app.api.v1.routes.users.cognito')
-    def test_list_users_group_lookup_error(self, mock_cognito, mock_extract, mock_admin, client):
+    def test_list_users_group_lookup_error(self, mock_cognito, mock_principal, client):
         """Test list_users when group lookup fails."""
         from datetime import datetime
         mock_paginator = MagicMock()
@@ -746,8 +644,7 @@ class TestUsersRoutes:
     def test_list_users_generic_error(self, client):
         """Test list_users generic exception handling."""
         with patch('app.api.v1.routes.users.USER_POOL_ID', 'test-pool'), \
-             patch('app.api.v1.routes.users.is_admin', return_value=True), \
-             patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com"), \
+             patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True)), \
              patch('app.api.v1.routes.users.cognito') as mock_cognito:
 
             mock_cognito.get_paginator.side_effect = Exception("Cognito error")
@@ -764,8 +661,7 @@ class TestUsersRoutes:
         from datetime import datetime
 
         with patch('app.api.v1.routes.users.USER_POOL_ID', 'test-pool'), \
-             patch('app.api.v1.routes.users.is_admin', return_value=True), \
-             patch('app.api.v1.routes.users.extract_email_from_token', return_value="admin@example.com"), \
+             patch('app.core.auth.resolve_principal', return_value=Principal(email="admin@example.com", is_admin=True)), \
              patch('app.api.v1.routes.users.cognito') as mock_cognito:
 
             mock_paginator = MagicMock()
@@ -795,10 +691,9 @@ class TestUsersRoutes:
             data = response.json()
             assert 'users' in data
 
-    @patch('app.api.v1.routes.users.extract_email_from_token', return_value='admin@example.com')
-    @patch('app.api.v1.routes.users.is_admin', return_value=True)
+    @patch('app.core.auth.resolve_principal', return_value=Principal(email='admin@example.com', is_admin=True))
     @patch('app.api.v1.routes.users.cognito')
-    def test_delete_user_sns_error(self, mock_cognito, mock_admin, mock_extract, client):
+    def test_delete_user_sns_error(self, mock_cognito, mock_principal, client):
         """Test user deletion when SNS cleanup fails."""
         with patch('app.api.v1.routes.users.SNS_TOPIC_ARN', 'arn:aws:sns:us-east-1:123456789:test-topic'), \
              patch('app.api.v1.routes.users.PENDING_USERS_TABLE', 'pending-users'), \
@@ -823,10 +718,9 @@ class TestUsersRoutes:
             # Should still succeed even if SNS cleanup fails
             assert response.status_code == 200
 
-    @patch('app.api.v1.routes.users.extract_email_from_token', return_value='admin@example.com')
-    @patch('app.api.v1.routes.users.is_admin', return_value=True)
+    @patch('app.core.auth.resolve_principal', return_value=Principal(email='admin@example.com', is_admin=True))
     @patch('app.api.v1.routes.users.cognito')
-    def test_delete_user_dynamodb_error(self, mock_cognito, mock_admin, mock_extract, client):
+    def test_delete_user_dynamodb_error(self, mock_cognito, mock_principal, client):
         """Test user deletion when DynamoDB cleanup fails."""
         with patch('app.api.v1.routes.users.SNS_TOPIC_ARN', 'arn:aws:sns:us-east-1:123456789:test-topic'), \
              patch('app.api.v1.routes.users.PENDING_USERS_TABLE', 'pending-users'), \
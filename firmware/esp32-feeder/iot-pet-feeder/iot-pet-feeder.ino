@@ -13,11 +13,41 @@
 const char* API_BASE_URL = "https://fk40h8b7gf.execute-api.us-east-2.amazonaws.com/dev/api/v1/config";
 const int API_PORT = 443;
 const int AWS_IOT_PORT = 8883;
-const char* MQTT_SUBSCRIBE_TOPIC = "petfeeder/commands";
-const char* MQTT_PUBLISH_TOPIC = "petfeeder/status";
-const char* MQTT_FEED_EVENT_TOPIC = "petfeeder/feed_event";
+// Per-device topics (petfeeder/<THING_NAME>/...), built in setup()
+String MQTT_SUBSCRIBE_TOPIC;
+String MQTT_PUBLISH_TOPIC;
+String MQTT_FEED_EVENT_TOPIC;
+// Config is fleet-wide: every feeder subscribes to the same topic
 const char* MQTT_CONFIG_TOPIC = "petfeeder/config";
 
+// Compact payloads: fixed-field binary status and feed events instead of JSON
+// (format version 1, backend/app/core/iot_codec.py). The backend decodes both
+// formats and sends feed commands in the format this feeder's status arrives in.
+#define COMPACT_PAYLOADS 1
+const uint8_t FORMAT_MAGIC = 0xA5;
+const uint8_t FORMAT_VERSION = 1;
+const uint8_t MESSAGE_FEED_COMMAND = 1;
+const uint8_t MESSAGE_STATUS = 2;
+const uint8_t MESSAGE_FEED_EVENT = 3;
+const uint8_t STATUS_HAS_REQUEST_ID = 0x01;
+const uint8_t STATUS_HAS_CONFIG = 0x02;
+const uint8_t EVENT_HAS_WEIGHT_BEFORE = 0x01;
+const uint8_t EVENT_HAS_WEIGHT_AFTER = 0x02;
+// Code tables: must match iot_codec.py entry for entry (feeder states follow ServoState)
+const char* const MODES[] = {"unknown", "manual", "api", "scheduled", "consumption", "refill"};
+const char* const FEED_STATUSES[] = {"initiated", "completed", "failed"};
+const char* const EVENT_TYPES[] = {"manual_feed", "scheduled_feed", "consumption", "refill"};
+const char* const TRIGGERS[] = {
+    "unknown", "system", "api", "manual", "scheduled", "button",
+    "servo_event", "weight_monitor", "network_change", "servo_state_change"
+};
+const char* const STATUS_MESSAGES[] = {
+    "", "Ready", "Reconnected", "Heartbeat", "Status requested", "Status changed", "Config applied",
+    "Feeder opening", "Feeder open", "Feeder closing", "Feed completed", "Multi-cycle feeding",
+    "Feeder busy", "Feed denied - threshold exceeded", "Pet ate food", "Food refilled", "Container placed",
+    "Weight changing"
+};
+
 // Pin Configuration
 const int BUTTON_PIN = 27;
 const int SERVO_PIN = 25;
@@ -33,6 +63,7 @@ const unsigned long SERVO_SWEEP_DURATION_MS = 150;
 unsigned long SERVO_OPEN_HOLD_DURATION_MS = 3000;
 float WEIGHT_THRESHOLD_G = 350.0;
 int DEFAULT_FEED_CYCLES = 1;
+unsigned long CONFIG_VERSION = 0; // Desired config version last applied (reported in status)
 
 // Network & Timing
 const unsigned long WIFI_RECONNECT_DELAY_MS = 5000;
@@ -48,7 +79,7 @@ const int DAYLIGHT_OFFSET_SEC = 0;
 
 // Global Objects
 WiFiClientSecure netMqtt, netHttp;
-MQTTClient mqttClient(256);
+MQTTClient mqttClient(640);  // Status payload (up to 448 bytes) plus the per-device topic
 HX711 scale;
 Servo myServo;
 Preferences preferences;
@@ -89,9 +120,14 @@ void loadConfigFromNVS();
 void saveConfigToNVS();
 void handleConfigUpdate(const char* payload);
 void onMqttMessage(String &topic, String &payload);
-void publishDeviceStatus(const char* msg, const char* trigger = nullptr);
-void publishFeedEvent(const char* trigger, const char* status);
-void activateFeeder(const char* trigger = nullptr);
+void onMqttMessageRaw(MQTTClient *client, char topic[], char bytes[], int length);
+void handleCompactCommand(const uint8_t* data, int length);
+void startRequestedFeed(const char* trigger, int cycles, const char* feedId);
+void publishDeviceStatus(const char* msg, const char* trigger = nullptr, const char* requestId = nullptr);
+void publishFeedEvent(const char* trigger, const char* status, const char* feedId = nullptr);
+void sendFeedEvent(const char* feedId, const char* status, const char* mode, const char* eventType,
+                   const char* trigger, const char* requestedBy, float weightBefore, float weightAfter, int cycles);
+void activateFeeder(const char* trigger = nullptr, const char* feedId = nullptr);
 bool canFeed();
 void updateServoState();
 void handleButtonPress();
@@ -108,11 +144,72 @@ void generateFeedId(char* buffer) {
             (esp_random() & 0x3FFF) | 0x8000, esp_random());
 }
 
+// Code of value in a compact payload table; values the table does not know get 0
+template <size_t N>
+uint8_t codeOf(const char* const (&table)[N], const char* value) {
+    if (value) {
+        for (size_t i = 0; i < N; i++) {
+            if (strcmp(table[i], value) == 0) return i;
+        }
+    }
+    return 0;
+}
+
+int hexValue(char c) {
+    if (c >= '0' && c <= '9') return c - '0';
+    if (c >= 'a' && c <= 'f') return c - 'a' + 10;
+    if (c >= 'A' && c <= 'F') return c - 'A' + 10;
+    return -1;
+}
+
+// Little-endian writer for compact payloads
+struct CompactWriter {
+    uint8_t buf[128];
+    size_t len = 0;
+
+    void u8(uint8_t v) { if (len < sizeof(buf)) buf[len++] = v; }
+    void u32(uint32_t v) { for (int i = 0; i < 4; i++) u8((v >> (8 * i)) & 0xFF); }
+    void decigrams(float grams) { u32((uint32_t)(int32_t)lroundf(grams * 10.0)); }
+
+    void header(uint8_t messageType) {
+        time_t now = time(nullptr);
+        u8(FORMAT_MAGIC);
+        u8(FORMAT_VERSION);
+        u8(messageType);
+        u32(now > 1600000000 ? (uint32_t)now : 0);  // 0 until NTP has synced
+    }
+
+    // A UUID string (dashes optional) as its 16 bytes; all zeros when there is none
+    void id(const char* uuid) {
+        uint8_t out[16] = {0};
+        size_t digits = 0;
+        for (const char* p = uuid; p && *p && digits < 32; p++) {
+            int v = hexValue(*p);
+            if (v < 0) continue;
+            out[digits / 2] |= (digits % 2 == 0) ? v << 4 : v;
+            digits++;
+        }
+        for (int i = 0; i < 16; i++) u8(out[i]);
+    }
+
+    // Length byte, then the text cut to what fits
+    void text(const char* value) {
+        size_t n = value ? strlen(value) : 0;
+        size_t room = sizeof(buf) - len - 1;
+        if (n > room) n = room;
+        if (n > 255) n = 255;
+        u8(n);
+        if (n) memcpy(buf + len, value, n);
+        len += n;
+    }
+};
+
 void loadConfigFromNVS() {
     preferences.begin("feeder-config", true);
     SERVO_OPEN_HOLD_DURATION_MS = preferences.getULong("servo_duration", 3000);
     WEIGHT_THRESHOLD_G = preferences.getFloat("weight_thresh", 450.0);
     DEFAULT_FEED_CYCLES = preferences.getInt("feed_cycles", 1);
+    CONFIG_VERSION = preferences.getULong("config_ver", 0);
     preferences.end();
     Serial.printf("Config loaded: servo=%lums, thresh=%.1fg, cycles=%d\n", SERVO_OPEN_HOLD_DURATION_MS, WEIGHT_THRESHOLD_G, DEFAULT_FEED_CYCLES);
 }
@@ -122,6 +219,7 @@ void saveConfigToNVS() {
     preferences.putULong("servo_duration", SERVO_OPEN_HOLD_DURATION_MS);
     preferences.putFloat("weight_thresh", WEIGHT_THRESHOLD_G);
     preferences.putInt("feed_cycles", DEFAULT_FEED_CYCLES);
+    preferences.putULong("config_ver", CONFIG_VERSION);
     preferences.end();
     Serial.println("Config saved to NVS");
 }
@@ -146,10 +244,16 @@ void handleConfigUpdate(const char* payload) {
         int val = doc["DEFAULT_FEED_CYCLES"];
         if (val >= 1 && val <= 10) { DEFAULT_FEED_CYCLES = val; changed = true; }
     }
+    if (doc.containsKey("version")) {
+        unsigned long ver = doc["version"];
+        if (ver != CONFIG_VERSION) { CONFIG_VERSION = ver; changed = true; }
+    }
     if (changed) {
         saveConfigToNVS();
         Serial.println("Config updated via MQTT");
     }
+    // Acknowledge with the config now in effect, so the backend can clear the pending delta
+    publishDeviceStatus("Config applied", "system");
 }
 
 float getMedianWeight(int samples) {
@@ -220,6 +324,11 @@ void setup() {
     while (!Serial && millis() < 5000) delay(1);
     Serial.println("\n=== Pet Feeder Setup ===");
 
+    String topicPrefix = String("petfeeder/") + THING_NAME;
+    MQTT_SUBSCRIBE_TOPIC = topicPrefix + "/commands";
+    MQTT_PUBLISH_TOPIC = topicPrefix + "/status";
+    MQTT_FEED_EVENT_TOPIC = topicPrefix + "/feed_event";
+
     pinMode(BUTTON_PIN, INPUT_PULLUP);
     pinMode(GREEN_LED_PIN, OUTPUT);
     pinMode(RED_LED_PIN, OUTPUT);
@@ -234,7 +343,7 @@ void setup() {
     netMqtt.setPrivateKey(AWS_CERT_PRIVATE);
 
     mqttClient.begin(AWS_IOT_ENDPOINT, AWS_IOT_PORT, netMqtt);
-    mqttClient.onMessage(onMqttMessage);
+    mqttClient.onMessageAdvanced(onMqttMessageRaw);
     mqttClient.setKeepAlive(30);
     mqttClient.setTimeout(10000);
 
@@ -436,18 +545,12 @@ void onMqttMessage(String &topic, String &payload) {
                 int cycles = doc.containsKey("feed_cycles") ? doc["feed_cycles"].as<int>() : DEFAULT_FEED_CYCLES;
                 const char* trigger = doc.containsKey("mode") ? doc["mode"].as<const char*>() : "api";
                 activeFeedRequestedBy = doc.containsKey("requested_by") ? doc["requested_by"].as<String>() : "api_user";
-                if (cycles < 1 || cycles > 10) cycles = DEFAULT_FEED_CYCLES;
-
-                if (canFeed()) {
-                    totalFeedCycles = cycles;
-                    currentFeedCycle = 0;
-                    activeFeedTrigger = trigger;
-                    activateFeeder(trigger);
-                } else {
-                    publishDeviceStatus("Feed denied - threshold exceeded", trigger);
-                }
+                // The API sends the feed_id it returned to the caller so it can wait for this feed's result
+                const char* feedId = doc["feed_id"] | (const char*)nullptr;
+                startRequestedFeed(trigger, cycles, feedId);
             } else if (strcmp(cmd, "GET_STATUS") == 0) {
-                publishDeviceStatus("Status requested", "system");
+                // Echo the API's request_id so it can tell this reply from other status updates
+                publishDeviceStatus("Status requested", "system", doc["request_id"] | (const char*)nullptr);
             }
         } else {
             if (payload == "FEED_NOW") {
@@ -468,16 +571,72 @@ void onMqttMessage(String &topic, String &payload) {
     }
 }
 
+// Compact commands may contain NUL bytes, which the String callback would cut off
+void onMqttMessageRaw(MQTTClient *client, char topic[], char bytes[], int length) {
+    if (length > 0 && (uint8_t)bytes[0] == FORMAT_MAGIC) {
+        if (MQTT_SUBSCRIBE_TOPIC == topic) handleCompactCommand((const uint8_t*)bytes, length);
+        return;
+    }
+    String topicStr(topic);
+    String payload(bytes);  // The library NUL-terminates the payload
+    onMqttMessage(topicStr, payload);
+}
+
+// Compact FEED_NOW: header, mode, cycles, feed_id (16 bytes), requested_by (length byte + text)
+void handleCompactCommand(const uint8_t* data, int length) {
+    if (length < 26 || data[1] != FORMAT_VERSION || data[2] != MESSAGE_FEED_COMMAND) {
+        Serial.printf("Unsupported compact command (%d bytes)\n", length);
+        return;
+    }
+
+    uint8_t mode = data[7];
+    const char* trigger = (mode > 0 && mode < sizeof(MODES) / sizeof(MODES[0])) ? MODES[mode] : "api";
+    int cycles = data[8] ? data[8] : DEFAULT_FEED_CYCLES;
+
+    const uint8_t* id = data + 9;
+    bool hasFeedId = false;
+    for (int i = 0; i < 16; i++) hasFeedId |= id[i] != 0;
+    char feedId[37] = {0};
+    if (hasFeedId) {
+        sprintf(feedId, "%02x%02x%02x%02x-%02x%02x-%02x%02x-%02x%02x-%02x%02x%02x%02x%02x%02x",
+                id[0], id[1], id[2], id[3], id[4], id[5], id[6], id[7],
+                id[8], id[9], id[10], id[11], id[12], id[13], id[14], id[15]);
+    }
+
+    int nameLength = min((int)data[25], length - 26);
+    char requestedBy[256];
+    memcpy(requestedBy, data + 26, nameLength);
+    requestedBy[nameLength] = '\0';
+    activeFeedRequestedBy = nameLength > 0 ? requestedBy : "api_user";
+
+    Serial.printf("MSG: compact FEED_NOW (%s, %d cycles)\n", trigger, cycles);
+    startRequestedFeed(trigger, cycles, hasFeedId ? feedId : nullptr);
+}
+
+// FEED_NOW from the API, in either payload format
+void startRequestedFeed(const char* trigger, int cycles, const char* feedId) {
+    if (cycles < 1 || cycles > 10) cycles = DEFAULT_FEED_CYCLES;
+
+    if (canFeed()) {
+        totalFeedCycles = cycles;
+        currentFeedCycle = 0;
+        activeFeedTrigger = trigger;
+        activateFeeder(trigger, feedId);
+    } else {
+        publishDeviceStatus("Feed denied - threshold exceeded", trigger);
+        if (feedId) publishFeedEvent(trigger, "failed", feedId);
+    }
+}
+
 bool canFeed() {
     float w = getWeight();
     if (w < 0.0) return true;
     return w < WEIGHT_THRESHOLD_G;
 }
 
-void publishDeviceStatus(const char* msg, const char* trigger) {
+void publishDeviceStatus(const char* msg, const char* trigger, const char* requestId) {
     if (!mqttClient.connected()) return;
 
-    StaticJsonDocument<256> doc;
     float w = lastValidWeight;
 
     bool shouldRead = (servoState == CLOSED || servoState == IDLE) && scaleInitialized;
@@ -489,6 +648,22 @@ void publishDeviceStatus(const char* msg, const char* trigger) {
         }
     }
 
+#if COMPACT_PAYLOADS
+    CompactWriter out;
+    out.header(MESSAGE_STATUS);
+    out.decigrams(w);
+    out.u8(servoState);
+    out.u8(isWiFiConnected() ? (isAWSConnected() ? 0 : 1) : 2);
+    out.u8(codeOf(STATUS_MESSAGES, msg));
+    out.u8(codeOf(TRIGGERS, trigger));
+    out.u32(CONFIG_VERSION);
+    out.u32(SERVO_OPEN_HOLD_DURATION_MS);
+    out.decigrams(WEIGHT_THRESHOLD_G);
+    out.u8(STATUS_HAS_CONFIG | (requestId ? STATUS_HAS_REQUEST_ID : 0));
+    if (requestId) out.id(requestId);
+    mqttClient.publish(MQTT_PUBLISH_TOPIC.c_str(), (const char*)out.buf, out.len);
+#else
+    StaticJsonDocument<448> doc;
     doc["current_weight_g"] = round(w * 10.0) / 10.0;
 
     switch (servoState) {
@@ -509,10 +684,17 @@ void publishDeviceStatus(const char* msg, const char* trigger) {
 
     doc["message"] = msg;
     doc["trigger_method"] = trigger ? trigger : "unknown";
+    if (requestId) doc["request_id"] = requestId;
 
-    char buf[256];
+    JsonObject config = doc.createNestedObject("config");
+    config["version"] = CONFIG_VERSION;
+    config["SERVO_OPEN_HOLD_DURATION_MS"] = SERVO_OPEN_HOLD_DURATION_MS;
+    config["WEIGHT_THRESHOLD_G"] = WEIGHT_THRESHOLD_G;
+
+    char buf[448];
     serializeJson(doc, buf);
     mqttClient.publish(MQTT_PUBLISH_TOPIC, buf);
+#endif
 
     lastPublishedServoState = servoState;
     lastPublishedWeight = w;
@@ -520,61 +702,87 @@ void publishDeviceStatus(const char* msg, const char* trigger) {
     lastMQTTStatus = isAWSConnected();
 }
 
-void publishFeedEvent(const char* trigger, const char* status) {
+void publishFeedEvent(const char* trigger, const char* status, const char* feedId) {
     if (!mqttClient.connected()) return;
 
-    StaticJsonDocument<256> doc;
-    doc["feed_id"] = currentFeedId;
+    const char* mode = "unknown";
+    const char* requestedBy = "unknown";
+    const char* eventType = "manual_feed";
 
     if (strcmp(trigger, "button") == 0) {
-        doc["mode"] = "manual";
-        doc["requested_by"] = "physical_button";
-        doc["event_type"] = "manual_feed";
+        mode = "manual";
+        requestedBy = "physical_button";
     } else if (strcmp(trigger, "api") == 0) {
-        doc["mode"] = "api";
-        doc["requested_by"] = activeFeedRequestedBy.length() > 0 ? activeFeedRequestedBy.c_str() : "api_user";
-        doc["event_type"] = "manual_feed";
+        mode = "api";
+        requestedBy = activeFeedRequestedBy.length() > 0 ? activeFeedRequestedBy.c_str() : "api_user";
     } else if (strcmp(trigger, "scheduled") == 0) {
-        doc["mode"] = "scheduled";
-        doc["requested_by"] = activeFeedRequestedBy.length() > 0 ? activeFeedRequestedBy.c_str() : "scheduler";
-        doc["event_type"] = "scheduled_feed";
-    } else {
-        doc["mode"] = "unknown";
-        doc["requested_by"] = "unknown";
-        doc["event_type"] = "manual_feed";
+        mode = "scheduled";
+        requestedBy = activeFeedRequestedBy.length() > 0 ? activeFeedRequestedBy.c_str() : "scheduler";
+        eventType = "scheduled_feed";
     }
 
-    doc["status"] = status;
-    doc["trigger_method"] = trigger;
-
+    float weightBefore = -1.0;
+    float weightAfter = -1.0;
     if (strcmp(status, "initiated") == 0 && scaleInitialized) {
         float w = getWeight();
         if (w >= 0.0) {
             weightBeforeFeed = w;
-            doc["weight_before_g"] = round(w * 10.0) / 10.0;
+            weightBefore = w;
         }
     } else if (strcmp(status, "completed") == 0 && scaleInitialized) {
         // Use pre-captured weight if available (manual/API feeds)
         // Otherwise capture now (consumption/refill events)
-        float w = (weightAfterDispense >= 0.0) ? weightAfterDispense : getWeight();
-        if (w >= 0.0) {
-            doc["weight_after_g"] = round(w * 10.0) / 10.0;
-        }
+        weightAfter = (weightAfterDispense >= 0.0) ? weightAfterDispense : getWeight();
     }
 
-    if (totalFeedCycles > 1) {
-        doc["cycles"] = totalFeedCycles;
-    }
+    sendFeedEvent(feedId ? feedId : currentFeedId, status, mode, eventType, trigger, requestedBy,
+                  weightBefore, weightAfter, totalFeedCycles > 1 ? totalFeedCycles : 1);
+}
+
+// One feed event in the configured payload format; negative weights are left out
+void sendFeedEvent(const char* feedId, const char* status, const char* mode, const char* eventType,
+                   const char* trigger, const char* requestedBy, float weightBefore, float weightAfter, int cycles) {
+#if COMPACT_PAYLOADS
+    CompactWriter out;
+    out.header(MESSAGE_FEED_EVENT);
+    out.id(feedId);
+    out.u8(codeOf(FEED_STATUSES, status));
+    out.u8(codeOf(MODES, mode));
+    out.u8(codeOf(EVENT_TYPES, eventType));
+    out.u8(codeOf(TRIGGERS, trigger));
+    out.u8((weightBefore >= 0.0 ? EVENT_HAS_WEIGHT_BEFORE : 0) | (weightAfter >= 0.0 ? EVENT_HAS_WEIGHT_AFTER : 0));
+    out.decigrams(weightBefore >= 0.0 ? weightBefore : 0.0);
+    out.decigrams(weightAfter >= 0.0 ? weightAfter : 0.0);
+    out.u8(cycles);
+    out.text(requestedBy);
+    mqttClient.publish(MQTT_FEED_EVENT_TOPIC.c_str(), (const char*)out.buf, out.len);
+    Serial.printf("Feed event: %s %s (%u bytes)\n", feedId, status, (unsigned)out.len);
+#else
+    StaticJsonDocument<256> doc;
+    doc["feed_id"] = feedId;
+    doc["mode"] = mode;
+    doc["requested_by"] = requestedBy;
+    doc["event_type"] = eventType;
+    doc["status"] = status;
+    doc["trigger_method"] = trigger;
+    if (weightBefore >= 0.0) doc["weight_before_g"] = round(weightBefore * 10.0) / 10.0;
+    if (weightAfter >= 0.0) doc["weight_after_g"] = round(weightAfter * 10.0) / 10.0;
+    if (cycles > 1) doc["cycles"] = cycles;
 
     char buf[256];
     serializeJson(doc, buf);
     mqttClient.publish(MQTT_FEED_EVENT_TOPIC, buf);
     Serial.printf("Feed event: %s\n", buf);
+#endif
 }
 
-void activateFeeder(const char* trigger) {
+void activateFeeder(const char* trigger, const char* feedId) {
     if (servoState == CLOSED) {
-        generateFeedId(currentFeedId);
+        if (feedId && strlen(feedId) < sizeof(currentFeedId)) {
+            strlcpy(currentFeedId, feedId, sizeof(currentFeedId));
+        } else {
+            generateFeedId(currentFeedId);
+        }
         Serial.printf("Feed ID: %s\n", currentFeedId);
         weightAfterDispense = -1.0;  // Reset for new feed
         servoState = OPENING;
@@ -586,7 +794,8 @@ void activateFeeder(const char* trigger) {
         if (strlen(currentFeedId) == 0) {
             generateFeedId(currentFeedId);
         }
-        publishFeedEvent(trigger, "failed");
+        // A requested feed that cannot start fails under its own id, leaving the running feed's id alone
+        publishFeedEvent(trigger, "failed", feedId);
     }
 }
 
@@ -759,30 +968,11 @@ void monitorWeightChanges() {
                 if (delta < 0 && pendingWeightBefore > MINIMAL_FOOD_WEIGHT_G) {
                     generateFeedId(currentFeedId);
 
-                    StaticJsonDocument<256> doc;
-                    doc["feed_id"] = currentFeedId;
-                    doc["mode"] = "consumption";
-                    doc["requested_by"] = "pet";
-                    doc["status"] = "initiated";
-                    doc["trigger_method"] = "weight_monitor";
-                    doc["event_type"] = "consumption";
-                    doc["weight_before_g"] = round(pendingWeightBefore * 10.0) / 10.0;
-
-                    char buf[256];
-                    serializeJson(doc, buf);
-                    mqttClient.publish(MQTT_FEED_EVENT_TOPIC, buf);
-                    Serial.printf("Consumption initiated: %s\n", buf);
-
+                    sendFeedEvent(currentFeedId, "initiated", "consumption", "consumption", "weight_monitor", "pet",
+                                  pendingWeightBefore, -1.0, 1);
                     delay(100);
-
-                    doc.clear();
-                    doc["feed_id"] = currentFeedId;
-                    doc["status"] = "completed";
-                    doc["weight_after_g"] = round(currentWeight * 10.0) / 10.0;
-
-                    serializeJson(doc, buf);
-                    mqttClient.publish(MQTT_FEED_EVENT_TOPIC, buf);
-                    Serial.printf("Consumption completed: %s\n", buf);
+                    sendFeedEvent(currentFeedId, "completed", "consumption", "consumption", "weight_monitor", "pet",
+                                  -1.0, currentWeight, 1);
 
                     // Update lastPublishedWeight BEFORE publishing status to prevent duplicate detections
                     lastPublishedWeight = currentWeight;
@@ -803,30 +993,11 @@ void monitorWeightChanges() {
                         // Actual refill - container was on scale, weight increased
                         generateFeedId(currentFeedId);
 
-                        StaticJsonDocument<256> doc;
-                        doc["feed_id"] = currentFeedId;
-                        doc["mode"] = "refill";
-                        doc["requested_by"] = "human";
-                        doc["status"] = "initiated";
-                        doc["trigger_method"] = "weight_monitor";
-                        doc["event_type"] = "refill";
-                        doc["weight_before_g"] = round(pendingWeightBefore * 10.0) / 10.0;
-
-                        char buf[256];
-                        serializeJson(doc, buf);
-                        mqttClient.publish(MQTT_FEED_EVENT_TOPIC, buf);
-                        Serial.printf("Refill initiated: %s\n", buf);
-
+                        sendFeedEvent(currentFeedId, "initiated", "refill", "refill", "weight_monitor", "human",
+                                      pendingWeightBefore, -1.0, 1);
                         delay(100);
-
-                        doc.clear();
-                        doc["feed_id"] = currentFeedId;
-                        doc["status"] = "completed";
-                        doc["weight_after_g"] = round(currentWeight * 10.0) / 10.0;
-
-                        serializeJson(doc, buf);
-                        mqttClient.publish(MQTT_FEED_EVENT_TOPIC, buf);
-                        Serial.printf("Refill completed: %s\n", buf);
+                        sendFeedEvent(currentFeedId, "completed", "refill", "refill", "weight_monitor", "human",
+                                      -1.0, currentWeight, 1);
 
                         // Update lastPublishedWeight BEFORE publishing status to prevent duplicate detections
                         lastPublishedWeight = currentWeight;
@@ -65,7 +65,7 @@ resource "aws_s3_bucket_policy" "lambda_deployment_bucket" {
 # --- IAM Policies (shared across multiple resources/modules) ---
 resource "aws_iam_policy" "iot_publish_policy" {
   name        = "${var.project_name}-iot-publish-policy-${var.environment}"
-  description = "IAM policy for Lambda to publish messages to AWS IoT Core"
+  description = "IAM policy for Lambda to publish messages to AWS IoT Core and resolve device groups"
 
   policy = jsonencode({
     Version = "2012-10-17",
@@ -77,9 +77,19 @@ resource "aws_iam_policy" "iot_publish_policy" {
         ],
         Effect = "Allow",
         Resource = [
-          "arn:aws:iot:${var.aws_region}:${data.aws_caller_identity.current.account_id}:topic/petfeeder/commands",
+          "arn:aws:iot:${var.aws_region}:${data.aws_caller_identity.current.account_id}:topic/petfeeder/*/commands",
+          "arn:aws:iot:${var.aws_region}:${data.aws_caller_identity.current.account_id}:topic/petfeeder/config",
           "arn:aws:iot:${var.aws_region}:${data.aws_caller_identity.current.account_id}:client/${module.iot_device.thing_name}"
         ]
+      },
+      {
+        Action = [
+          "iot:ListThingsInThingGroup"
+        ],
+        Effect = "Allow",
+        Resource = [
+          "arn:aws:iot:${var.aws_region}:${data.aws_caller_identity.current.account_id}:thinggroup/*"
+        ]
       }
     ]
   })
@@ -95,7 +105,9 @@ resource "aws_iam_policy" "dynamodb_access_policy" {
       {
         Action = [
           "dynamodb:GetItem",
+          "dynamodb:BatchGetItem",
           "dynamodb:PutItem",
+          "dynamodb:BatchWriteItem",
           "dynamodb:UpdateItem",
           "dynamodb:DeleteItem",
           "dynamodb:Scan",
@@ -257,7 +269,6 @@ module "api_lambda" {
     PROJECT_NAME               = var.project_name
     ENVIRONMENT                = var.environment
     IOT_ENDPOINT               = data.aws_iot_endpoint.iot_data_endpoint.endpoint_address
-    IOT_PUBLISH_TOPIC          = "petfeeder/commands"
     IOT_THING_ID               = module.iot_device.thing_name
     DYNAMO_FEED_HISTORY_TABLE  = module.feed_history_table.table_name
     DEVICE_STATUS_TABLE_NAME   = module.device_status_table.table_name
@@ -266,6 +277,7 @@ module "api_lambda" {
     SNS_TOPIC_ARN              = aws_sns_topic.feed_notification_topic.arn
     DYNAMO_PENDING_USERS_TABLE = var.environment != "demo" ? module.pending_users_table[0].table_name : ""
     COGNITO_USER_POOL_ID       = var.environment != "demo" ? module.cognito_user_pool[0].user_pool_id : ""
+    AUTH_MODE                  = "gateway"
     SES_SENDER_EMAIL           = "iot-pet-feeder@${var.domain_name}"
     SES_CONFIGURATION_SET      = aws_ses_configuration_set.main.name
     CORS_ALLOWED_ORIGINS       = "https://dev.d2w2idwvj381w0.amplifyapp.com,https://iot-pet-feeder.arthurbryan.dev.br"
@@ -278,6 +290,38 @@ module "api_lambda" {
   ], var.environment != "demo" ? [aws_iam_policy.cognito_admin_policy[0].arn] : [])
 }
 
+# API Gateway token authorizer: lets machine clients call POST /feeds and GET/PUT /status
+module "api_authorizer_lambda" {
+  count = var.environment != "demo" ? 1 : 0
+
+  source                = "../../modules/lambda"
+  project_name          = var.project_name
+  aws_region            = var.aws_region
+  aws_account_id        = data.aws_caller_identity.current.account_id
+  function_name         = "${var.project_name}-api-authorizer-${var.environment}"
+  s3_bucket_id          = aws_s3_bucket.lambda_deployment_bucket.id
+  source_path           = "../../../../backend"
+  handler               = "api_authorizer.handler"
+  runtime               = var.python_version
+  timeout               = 10
+  memory_size           = 128
+  layer_arns            = [module.python_dependencies_layer.layer_arn]
+  environment_variables = {
+    PROJECT_NAME                  = var.project_name
+    ENVIRONMENT                   = var.environment
+    IOT_THING_ID                  = module.iot_device.thing_name
+    DYNAMO_FEED_HISTORY_TABLE     = module.feed_history_table.table_name
+    DEVICE_STATUS_TABLE_NAME      = module.device_status_table.table_name
+    DYNAMO_FEED_SCHEDULE_TABLE    = module.feed_schedule_table.table_name
+    DYNAMO_FEED_CONFIG_TABLE_NAME = module.feed_config_table.table_name
+    COGNITO_USER_POOL_ID          = module.cognito_user_pool[0].user_pool_id
+    COGNITO_APP_CLIENT_ID         = module.cognito_user_pool[0].user_pool_client_id
+  }
+  attached_policy_arns = [
+    aws_iam_policy.dynamodb_access_policy.arn
+  ]
+}
+
 # NEW: IAM Policy for API Lambda to manage SNS subscriptions
 resource "aws_iam_policy" "sns_manage_subscriptions_policy" {
   name        = "${var.project_name}-sns-manage-subscriptions-policy-${var.environment}"
@@ -437,15 +481,23 @@ module "api_gateway" {
   # Cognito authorization (only for non-demo environments)
   enable_cognito_auth   = var.environment != "demo"
   cognito_user_pool_arn = var.environment != "demo" ? module.cognito_user_pool[0].user_pool_arn : ""
+
+  # Machine client tokens on POST /feeds and GET/PUT /status
+  enable_machine_auth              = var.environment != "demo"
+  machine_authorizer_arn           = var.environment != "demo" ? module.api_authorizer_lambda[0].lambda_arn : ""
+  machine_authorizer_function_name = var.environment != "demo" ? module.api_authorizer_lambda[0].lambda_function_name : ""
 }
 
 # IoT Topic Rule for Device Status
+# Both device rules pass the payload through base64-encoded: feeders may publish
+# compact binary payloads (backend/app/core/iot_codec.py) as well as JSON
 module "iot_status_rule" {
   source                        = "../../modules/iot_rule"
   project_name                  = var.project_name
   rule_name                     = "IoT_StatusRule_${var.environment}"
   rule_description              = "Routes device status messages to a Lambda function for DynamoDB update (${var.environment} environment)."
-  mqtt_topic                    = "petfeeder/status"
+  mqtt_topic                    = "petfeeder/+/status"
+  sql_select                    = "encode(*, 'base64') AS raw, topic(2) AS thing_id"
   lambda_function_arn           = module.status_lambda.lambda_arn
   lambda_function_name_for_permission = module.status_lambda.lambda_function_name
   lambda_execution_role_arn     = aws_iam_role.iot_rule_cloudwatch_role.arn
@@ -457,7 +509,8 @@ module "iot_feed_event_rule" {
   project_name                  = var.project_name
   rule_name                     = "IoT_FeedEventRule_${var.environment}"
   rule_description              = "Routes feed event messages to Lambda for logging (${var.environment} environment)."
-  mqtt_topic                    = "petfeeder/feed_event"
+  mqtt_topic                    = "petfeeder/+/feed_event"
+  sql_select                    = "encode(*, 'base64') AS raw, topic(2) AS thing_id"
   lambda_function_arn           = module.feed_event_logger_lambda.lambda_arn
   lambda_function_name_for_permission = module.feed_event_logger_lambda.lambda_function_name
   lambda_execution_role_arn     = aws_iam_role.iot_rule_cloudwatch_role.arn
@@ -474,7 +527,8 @@ module "schedule_executor_lambda" {
   source_path           = "../../../../backend"
   handler               = "schedule_executor.handler"
   runtime               = var.python_version
-  timeout               = 30
+  # Lookahead mode keeps the invocation alive until the last reserved schedule fires
+  timeout               = 90
   memory_size           = 256
   layer_arns            = [module.python_dependencies_layer.layer_arn]
   environment_variables = {
@@ -487,7 +541,8 @@ module "schedule_executor_lambda" {
     SCHEDULE_EXECUTION_HISTORY_TABLE  = module.schedule_execution_history_table.table_name
     IOT_THING_ID                      = module.iot_device.thing_name
     IOT_ENDPOINT                      = data.aws_iot_endpoint.iot_data_endpoint.endpoint_address
-    IOT_TOPIC_FEED                    = "petfeeder/commands"
+    SCHEDULE_LOOKAHEAD_SECONDS        = "60" # Matches the rate(1 minute) EventBridge trigger
+    SCHEDULE_CATCH_UP_POLICY          = "skip"
   }
   attached_policy_arns = [
     aws_iam_policy.dynamodb_access_policy.arn,
@@ -24,10 +24,38 @@ resource "aws_api_gateway_authorizer" "cognito" {
   identity_source = "method.request.header.Authorization"
 }
 
+# Lambda token authorizer for the methods machine clients may call (only created if enabled)
+# It accepts Cognito tokens as well as HMAC-signed machine tokens (backend/api_authorizer.py)
+resource "aws_api_gateway_authorizer" "machine" {
+  count = var.enable_cognito_auth && var.enable_machine_auth ? 1 : 0
+
+  name                             = "${var.project_name}-machine-authorizer"
+  rest_api_id                      = aws_api_gateway_rest_api.this.id
+  type                             = "TOKEN"
+  authorizer_uri                   = "arn:aws:apigateway:${var.aws_region}:lambda:path/2015-03-31/functions/${var.machine_authorizer_arn}/invocations"
+  identity_source                  = "method.request.header.Authorization"
+  identity_validation_expression   = "^Bearer .+$"
+  authorizer_result_ttl_in_seconds = 300
+}
+
+resource "aws_lambda_permission" "apigw_machine_authorizer_permission" {
+  count = var.enable_cognito_auth && var.enable_machine_auth ? 1 : 0
+
+  statement_id  = "AllowAPIGatewayInvokeAuthorizer"
+  action        = "lambda:InvokeFunction"
+  function_name = var.machine_authorizer_function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_api_gateway_rest_api.this.execution_arn}/authorizers/${aws_api_gateway_authorizer.machine[0].id}"
+}
+
 # Local variable for authorization type
 locals {
   authorization_type = var.enable_cognito_auth ? "COGNITO_USER_POOLS" : "NONE"
   authorizer_id      = var.enable_cognito_auth ? aws_api_gateway_authorizer.cognito[0].id : null
+
+  # Methods open to machine clients (scope-checked by the API) use the Lambda authorizer
+  machine_authorization_type = var.enable_cognito_auth && var.enable_machine_auth ? "CUSTOM" : local.authorization_type
+  machine_authorizer_id      = var.enable_cognito_auth && var.enable_machine_auth ? aws_api_gateway_authorizer.machine[0].id : local.authorizer_id
 }
 
 # Documentation endpoints (public, no auth)
@@ -67,6 +95,18 @@ resource "aws_api_gateway_resource" "feeds_resource" {
   path_part   = "feeds"
 }
 
+resource "aws_api_gateway_resource" "feed_groups_resource" {
+  rest_api_id = aws_api_gateway_rest_api.this.id
+  parent_id   = aws_api_gateway_resource.feeds_resource.id
+  path_part   = "groups"
+}
+
+resource "aws_api_gateway_resource" "feed_group_resource" {
+  rest_api_id = aws_api_gateway_rest_api.this.id
+  parent_id   = aws_api_gateway_resource.feed_groups_resource.id
+  path_part   = "{group}"
+}
+
 resource "aws_api_gateway_resource" "feed_events_resource" {
   rest_api_id = aws_api_gateway_rest_api.this.id
   parent_id   = aws_api_gateway_resource.v1_resource.id
@@ -106,6 +146,12 @@ resource "aws_api_gateway_resource" "status_resource" {
   path_part   = "status"
 }
 
+resource "aws_api_gateway_resource" "status_config_resource" {
+  rest_api_id = aws_api_gateway_rest_api.this.id
+  parent_id   = aws_api_gateway_resource.status_resource.id
+  path_part   = "config"
+}
+
 # --- NEW: Notifications Resources ---
 resource "aws_api_gateway_resource" "notifications_resource" {
   rest_api_id = aws_api_gateway_rest_api.this.id
@@ -301,8 +347,8 @@ resource "aws_api_gateway_method" "post_feeds_method" {
   rest_api_id   = aws_api_gateway_rest_api.this.id
   resource_id   = aws_api_gateway_resource.feeds_resource.id
   http_method   = "POST"
-  authorization = local.authorization_type
-  authorizer_id = local.authorizer_id
+  authorization = local.machine_authorization_type
+  authorizer_id = local.machine_authorizer_id
 }
 
 resource "aws_api_gateway_integration" "post_feeds_integration" {
@@ -364,6 +410,74 @@ resource "aws_api_gateway_integration_response" "options_feeds_integration_200"
 }
 # --- End CORS for /api/v1/feeds ---
 
+# API Gateway Method: POST /api/v1/feeds/groups/{group}
+resource "aws_api_gateway_method" "post_feed_group_method" {
+  rest_api_id   = aws_api_gateway_rest_api.this.id
+  resource_id   = aws_api_gateway_resource.feed_group_resource.id
+  http_method   = "POST"
+  authorization = local.machine_authorization_type
+  authorizer_id = local.machine_authorizer_id
+}
+
+resource "aws_api_gateway_integration" "post_feed_group_integration" {
+  rest_api_id             = aws_api_gateway_rest_api.this.id
+  resource_id             = aws_api_gateway_resource.feed_group_resource.id
+  http_method             = aws_api_gateway_method.post_feed_group_method.http_method
+  integration_http_method = "POST"
+  type                    = "AWS_PROXY"
+  uri                     = "arn:aws:apigateway:${var.aws_region}:lambda:path/2015-03-31/functions/${var.lambda_invoke_arn}/invocations"
+}
+
+# --- CORS for /api/v1/feeds/groups/{group} ---
+resource "aws_api_gateway_method" "options_feed_group_method" {
+  rest_api_id   = aws_api_gateway_rest_api.this.id
+  resource_id   = aws_api_gateway_resource.feed_group_resource.id
+  http_method   = "OPTIONS"
+  authorization = "NONE"
+  request_models = {
+    "application/json" = "Error"
+  }
+}
+
+resource "aws_api_gateway_integration" "options_feed_group_integration" {
+  rest_api_id             = aws_api_gateway_rest_api.this.id
+  resource_id             = aws_api_gateway_resource.feed_group_resource.id
+  http_method             = aws_api_gateway_method.options_feed_group_method.http_method
+  type                    = "MOCK"
+  request_templates = {
+    "application/json" = "{ \"statusCode\": 200 }"
+  }
+}
+
+resource "aws_api_gateway_method_response" "options_feed_group_200" {
+  rest_api_id = aws_api_gateway_rest_api.this.id
+  resource_id = aws_api_gateway_resource.feed_group_resource.id
+  http_method = aws_api_gateway_method.options_feed_group_method.http_method
+  status_code = "200"
+  response_parameters = {
+    "method.response.header.Access-Control-Allow-Headers" = true,
+    "method.response.header.Access-Control-Allow-Methods" = true,
+    "method.response.header.Access-Control-Allow-Origin"  = true
+  }
+}
+
+resource "aws_api_gateway_integration_response" "options_feed_group_integration_200" {
+  rest_api_id = aws_api_gateway_rest_api.this.id
+  resource_id = aws_api_gateway_resource.feed_group_resource.id
+  http_method = aws_api_gateway_method.options_feed_group_method.http_method
+  status_code = aws_api_gateway_method_response.options_feed_group_200.status_code
+  response_templates = {
+    "application/json" = ""
+  }
+  response_parameters = {
+    "method.response.header.Access-Control-Allow-Headers" = "'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token,X-Amz-User-Agent'",
+    "method.response.header.Access-Control-Allow-Methods" = "'OPTIONS,POST'",
+    "method.response.header.Access-Control-Allow-Origin"  = "'*'"
+  }
+  depends_on = [aws_api_gateway_integration.options_feed_group_integration]
+}
+# --- End CORS for /api/v1/feeds/groups/{group} ---
+
 
 # API Gateway Method: GET /api/v1/feed-events
 resource "aws_api_gateway_method" "get_feed_events_method" {
@@ -609,6 +723,91 @@ resource "aws_api_gateway_integration_response" "options_schedules_proxy_integra
 }
 # --- END CORS for /api/v1/schedules ---
 
+# API Gateway Method: GET /api/v1/config (several keys in one request)
+resource "aws_api_gateway_method" "get_config_method" {
+  rest_api_id   = aws_api_gateway_rest_api.this.id
+  resource_id   = aws_api_gateway_resource.config_resource.id
+  http_method   = "GET"
+  authorization = local.authorization_type
+  authorizer_id = local.authorizer_id
+}
+
+resource "aws_api_gateway_integration" "get_config_integration" {
+  rest_api_id             = aws_api_gateway_rest_api.this.id
+  resource_id             = aws_api_gateway_resource.config_resource.id
+  http_method             = aws_api_gateway_method.get_config_method.http_method
+  integration_http_method = "POST"
+  type                    = "AWS_PROXY"
+  uri                     = "arn:aws:apigateway:${var.aws_region}:lambda:path/2015-03-31/functions/${var.lambda_invoke_arn}/invocations"
+}
+
+# API Gateway Method: PUT /api/v1/config (several keys in one request)
+resource "aws_api_gateway_method" "put_config_method" {
+  rest_api_id   = aws_api_gateway_rest_api.this.id
+  resource_id   = aws_api_gateway_resource.config_resource.id
+  http_method   = "PUT"
+  authorization = local.authorization_type
+  authorizer_id = local.authorizer_id
+}
+
+resource "aws_api_gateway_integration" "put_config_integration" {
+  rest_api_id             = aws_api_gateway_rest_api.this.id
+  resource_id             = aws_api_gateway_resource.config_resource.id
+  http_method             = aws_api_gateway_method.put_config_method.http_method
+  integration_http_method = "POST"
+  type                    = "AWS_PROXY"
+  uri                     = "arn:aws:apigateway:${var.aws_region}:lambda:path/2015-03-31/functions/${var.lambda_invoke_arn}/invocations"
+}
+
+# --- CORS for /api/v1/config (OPTIONS) ---
+resource "aws_api_gateway_method" "options_config_method" {
+  rest_api_id   = aws_api_gateway_rest_api.this.id
+  resource_id   = aws_api_gateway_resource.config_resource.id
+  http_method   = "OPTIONS"
+  authorization = "NONE"
+  request_models = {
+    "application/json" = "Error"
+  }
+}
+
+resource "aws_api_gateway_integration" "options_config_integration" {
+  rest_api_id             = aws_api_gateway_rest_api.this.id
+  resource_id             = aws_api_gateway_resource.config_resource.id
+  http_method             = aws_api_gateway_method.options_config_method.http_method
+  type                    = "MOCK"
+  request_templates = {
+    "application/json" = "{ \"statusCode\": 200 }"
+  }
+}
+
+resource "aws_api_gateway_method_response" "options_config_200" {
+  rest_api_id = aws_api_gateway_rest_api.this.id
+  resource_id = aws_api_gateway_resource.config_resource.id
+  http_method = aws_api_gateway_method.options_config_method.http_method
+  status_code = "200"
+  response_parameters = {
+    "method.response.header.Access-Control-Allow-Headers" = true,
+    "method.response.header.Access-Control-Allow-Methods" = true,
+    "method.response.header.Access-Control-Allow-Origin"  = true
+  }
+}
+
+resource "aws_api_gateway_integration_response" "options_config_integration_200" {
+  rest_api_id = aws_api_gateway_rest_api.this.id
+  resource_id = aws_api_gateway_resource.config_resource.id
+  http_method = aws_api_gateway_method.options_config_method.http_method
+  status_code = aws_api_gateway_method_response.options_config_200.status_code
+  response_templates = {
+    "application/json" = ""
+  }
+  response_parameters = {
+    "method.response.header.Access-Control-Allow-Headers" = "'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token,X-Amz-User-Agent'",
+    "method.response.header.Access-Control-Allow-Methods" = "'OPTIONS,GET,PUT'",
+    "method.response.header.Access-Control-Allow-Origin"  = "'*'"
+  }
+  depends_on = [aws_api_gateway_integration.options_config_integration]
+}
+
 resource "aws_api_gateway_method" "get_config_key_method" {
   rest_api_id   = aws_api_gateway_rest_api.this.id
   resource_id   = aws_api_gateway_resource.config_key_resource.id
@@ -699,8 +898,8 @@ resource "aws_api_gateway_method" "get_status_method" {
   rest_api_id   = aws_api_gateway_rest_api.this.id
   resource_id   = aws_api_gateway_resource.status_resource.id
   http_method   = "GET"
-  authorization = local.authorization_type
-  authorizer_id = local.authorizer_id
+  authorization = local.machine_authorization_type
+  authorizer_id = local.machine_authorizer_id
 }
 
 resource "aws_api_gateway_integration" "get_status_integration" {
@@ -717,8 +916,8 @@ resource "aws_api_gateway_method" "put_status_method" {
   rest_api_id   = aws_api_gateway_rest_api.this.id
   resource_id   = aws_api_gateway_resource.status_resource.id
   http_method   = "PUT"
-  authorization = local.authorization_type
-  authorizer_id = local.authorizer_id
+  authorization = local.machine_authorization_type
+  authorizer_id = local.machine_authorizer_id
 }
 
 resource "aws_api_gateway_integration" "put_status_integration" {
@@ -780,6 +979,74 @@ resource "aws_api_gateway_integration_response" "options_status_integration_200"
 }
 # --- End CORS for /api/v1/status ---
 
+# API Gateway Method: GET /api/v1/status/config (desired vs reported device config)
+resource "aws_api_gateway_method" "get_status_config_method" {
+  rest_api_id   = aws_api_gateway_rest_api.this.id
+  resource_id   = aws_api_gateway_resource.status_config_resource.id
+  http_method   = "GET"
+  authorization = local.authorization_type
+  authorizer_id = local.authorizer_id
+}
+
+resource "aws_api_gateway_integration" "get_status_config_integration" {
+  rest_api_id             = aws_api_gateway_rest_api.this.id
+  resource_id             = aws_api_gateway_resource.status_config_resource.id
+  http_method             = aws_api_gateway_method.get_status_config_method.http_method
+  integration_http_method = "POST"
+  type                    = "AWS_PROXY"
+  uri                     = "arn:aws:apigateway:${var.aws_region}:lambda:path/2015-03-31/functions/${var.lambda_invoke_arn}/invocations"
+}
+
+# --- CORS for /api/v1/status/config ---
+resource "aws_api_gateway_method" "options_status_config_method" {
+  rest_api_id   = aws_api_gateway_rest_api.this.id
+  resource_id   = aws_api_gateway_resource.status_config_resource.id
+  http_method   = "OPTIONS"
+  authorization = "NONE"
+  request_models = {
+    "application/json" = "Error"
+  }
+}
+
+resource "aws_api_gateway_integration" "options_status_config_integration" {
+  rest_api_id             = aws_api_gateway_rest_api.this.id
+  resource_id             = aws_api_gateway_resource.status_config_resource.id
+  http_method             = aws_api_gateway_method.options_status_config_method.http_method
+  type                    = "MOCK"
+  request_templates = {
+    "application/json" = "{ \"statusCode\": 200 }"
+  }
+}
+
+resource "aws_api_gateway_method_response" "options_status_config_200" {
+  rest_api_id = aws_api_gateway_rest_api.this.id
+  resource_id = aws_api_gateway_resource.status_config_resource.id
+  http_method = aws_api_gateway_method.options_status_config_method.http_method
+  status_code = "200"
+  response_parameters = {
+    "method.response.header.Access-Control-Allow-Headers" = true,
+    "method.response.header.Access-Control-Allow-Methods" = true,
+    "method.response.header.Access-Control-Allow-Origin"  = true
+  }
+}
+
+resource "aws_api_gateway_integration_response" "options_status_config_integration_200" {
+  rest_api_id = aws_api_gateway_rest_api.this.id
+  resource_id = aws_api_gateway_resource.status_config_resource.id
+  http_method = aws_api_gateway_method.options_status_config_method.http_method
+  status_code = aws_api_gateway_method_response.options_status_config_200.status_code
+  response_templates = {
+    "application/json" = ""
+  }
+  response_parameters = {
+    "method.response.header.Access-Control-Allow-Headers" = "'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token,X-Amz-User-Agent'",
+    "method.response.header.Access-Control-Allow-Methods" = "'OPTIONS,GET'",
+    "method.response.header.Access-Control-Allow-Origin"  = "'*'"
+  }
+  depends_on = [aws_api_gateway_integration.options_status_config_integration]
+}
+# --- End CORS for /api/v1/status/config ---
+
 
 # --- NEW: Notifications Methods ---
 # POST /api/v1/notifications/subscribe (and other POST endpoints)
@@ -1185,18 +1452,25 @@ resource "aws_api_gateway_deployment" "this" {
     aws_api_gateway_integration.get_openapi_json_integration,
     aws_api_gateway_integration.options_openapi_json_integration,
     aws_api_gateway_integration.post_feeds_integration,
+    aws_api_gateway_integration.post_feed_group_integration,
+    aws_api_gateway_integration.options_feed_group_integration,
     aws_api_gateway_integration.get_feed_events_integration,
     aws_api_gateway_integration.delete_feed_events_integration,
     aws_api_gateway_integration.get_status_integration,
     aws_api_gateway_integration.put_status_integration,
     aws_api_gateway_integration.options_feeds_integration,
     aws_api_gateway_integration.options_status_integration,
+    aws_api_gateway_integration.get_status_config_integration,
+    aws_api_gateway_integration.options_status_config_integration,
     aws_api_gateway_integration.get_schedules_integration,
     aws_api_gateway_integration.post_schedules_integration,
     aws_api_gateway_integration.any_schedules_proxy_integration,
     aws_api_gateway_integration.options_schedules_integration,
     aws_api_gateway_integration.options_schedules_proxy_integration,
     aws_api_gateway_integration.options_feed_events_integration,
+    aws_api_gateway_integration.get_config_integration,
+    aws_api_gateway_integration.put_config_integration,
+    aws_api_gateway_integration.options_config_integration,
     aws_api_gateway_integration.get_config_key_integration,
     aws_api_gateway_integration.put_config_key_integration,
     aws_api_gateway_integration.options_config_key_integration,
@@ -1222,10 +1496,13 @@ resource "aws_api_gateway_deployment" "this" {
       aws_api_gateway_resource.api_resource.id,
       aws_api_gateway_resource.v1_resource.id,
       aws_api_gateway_resource.feeds_resource.id,
+      aws_api_gateway_resource.feed_groups_resource.id,
+      aws_api_gateway_resource.feed_group_resource.id,
       aws_api_gateway_resource.feed_events_resource.id,
       aws_api_gateway_resource.schedules_resource.id,
       aws_api_gateway_resource.schedules_proxy_resource.id,
       aws_api_gateway_resource.status_resource.id,
+      aws_api_gateway_resource.status_config_resource.id,
       aws_api_gateway_resource.config_resource.id,
       aws_api_gateway_resource.config_key_resource.id,
       aws_api_gateway_resource.notifications_resource.id,
@@ -1241,18 +1518,25 @@ resource "aws_api_gateway_deployment" "this" {
       aws_api_gateway_method.get_openapi_json_method.id,
       aws_api_gateway_method.options_openapi_json_method.id,
       aws_api_gateway_method.post_feeds_method.id,
+      aws_api_gateway_method.post_feed_group_method.id,
+      aws_api_gateway_method.options_feed_group_method.id,
       aws_api_gateway_method.get_feed_events_method.id,
       aws_api_gateway_method.delete_feed_events_method.id,
       aws_api_gateway_method.get_status_method.id,
       aws_api_gateway_method.put_status_method.id,
       aws_api_gateway_method.options_feeds_method.id,
       aws_api_gateway_method.options_status_method.id,
+      aws_api_gateway_method.get_status_config_method.id,
+      aws_api_gateway_method.options_status_config_method.id,
       aws_api_gateway_method.get_schedules_method.id,
       aws_api_gateway_method.post_schedules_method.id,
       aws_api_gateway_method.any_schedules_proxy_method.id,
       aws_api_gateway_method.options_schedules_method.id,
       aws_api_gateway_method.options_schedules_proxy_method.id,
       aws_api_gateway_method.options_feed_events_method.id,
+      aws_api_gateway_method.get_config_method.id,
+      aws_api_gateway_method.put_config_method.id,
+      aws_api_gateway_method.options_config_method.id,
       aws_api_gateway_method.get_config_key_method.id,
       aws_api_gateway_method.put_config_key_method.id,
       aws_api_gateway_method.options_config_key_method.id,
@@ -1266,7 +1550,9 @@ resource "aws_api_gateway_deployment" "this" {
       aws_api_gateway_method.options_users_method.id,
       aws_api_gateway_method.options_users_request_access_method.id,
       aws_api_gateway_method.options_users_pending_method.id,
-      aws_api_gateway_method.options_users_proxy_method.id
+      aws_api_gateway_method.options_users_proxy_method.id,
+      local.machine_authorization_type,
+      local.machine_authorizer_id
     ]))
   }
 
@@ -46,6 +46,24 @@ variable "enable_cognito_auth" {
   default     = false
 }
 
+variable "enable_machine_auth" {
+  description = "Whether POST /feeds and GET/PUT /status use the Lambda token authorizer, which also accepts machine client tokens. Requires enable_cognito_auth."
+  type        = bool
+  default     = false
+}
+
+variable "machine_authorizer_arn" {
+  description = "ARN of the api_authorizer Lambda function (used when enable_machine_auth is true)."
+  type        = string
+  default     = ""
+}
+
+variable "machine_authorizer_function_name" {
+  description = "Name of the api_authorizer Lambda function (used when enable_machine_auth is true)."
+  type        = string
+  default     = ""
+}
+
 variable "custom_domain_name" {
   description = "Custom domain name for API Gateway (e.g., api.example.com). If not provided, no custom domain is created."
   type        = string
@@ -11,10 +11,16 @@ resource "aws_cloudwatch_event_rule" "schedule_rule" {
   }
 }
 
+# One target per executor worker; each invocation receives its partition in the event
 resource "aws_cloudwatch_event_target" "lambda_target" {
+  count     = var.worker_count
   rule      = aws_cloudwatch_event_rule.schedule_rule.name
-  target_id = "ScheduleExecutorLambda"
+  target_id = var.worker_count == 1 ? "ScheduleExecutorLambda" : "ScheduleExecutorLambda-${count.index}"
   arn       = var.lambda_function_arn
+  input = jsonencode({
+    worker_index = count.index
+    worker_count = var.worker_count
+  })
 }
 
 resource "aws_lambda_permission" "allow_eventbridge" {
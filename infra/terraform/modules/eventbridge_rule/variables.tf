@@ -34,3 +34,14 @@ variable "lambda_function_name" {
   description = "Name of the Lambda function for permissions"
   type        = string
 }
+
+variable "worker_count" {
+  description = "Number of parallel executor workers (one target per worker, each handling one partition)"
+  type        = number
+  default     = 1
+
+  validation {
+    condition     = var.worker_count >= 1
+    error_message = "worker_count must be at least 1."
+  }
+}
@@ -18,6 +18,8 @@ resource "aws_iot_certificate" "this" {
   active = true # <<< CORRECTED THIS: Using 'active' as per the error message
 }
 
+# One policy for the whole fleet: the thing name policy variable limits each feeder
+# to its own client id and petfeeder/<thing>/... topics, plus the shared config topic
 resource "aws_iot_policy" "this" {
   name = var.policy_name
 
@@ -27,42 +29,42 @@ resource "aws_iot_policy" "this" {
       {
         Effect = "Allow",
         Action = ["iot:Connect"],
-        Resource = "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:client/${var.thing_name}"
+        Resource = "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:client/$${iot:Connection.Thing.ThingName}"
       },
       {
         Effect = "Allow",
         Action = ["iot:Publish"],
         Resource = [
-          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/petfeeder/status",
-          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/petfeeder/feed_event",
-          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/$aws/things/${var.thing_name}/shadow/update",
-          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/$aws/things/${var.thing_name}/shadow/get"
+          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/petfeeder/$${iot:Connection.Thing.ThingName}/status",
+          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/petfeeder/$${iot:Connection.Thing.ThingName}/feed_event",
+          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/$aws/things/$${iot:Connection.Thing.ThingName}/shadow/update",
+          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/$aws/things/$${iot:Connection.Thing.ThingName}/shadow/get"
         ]
       },
       {
         Effect = "Allow",
         Action = ["iot:Subscribe"],
         Resource = [
-          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topicfilter/petfeeder/commands",
+          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topicfilter/petfeeder/$${iot:Connection.Thing.ThingName}/commands",
           "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topicfilter/petfeeder/config",
-          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topicfilter/$aws/things/${var.thing_name}/shadow/update/delta",
-          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topicfilter/$aws/things/${var.thing_name}/shadow/update/accepted",
-          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topicfilter/$aws/things/${var.thing_name}/shadow/update/rejected",
-          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topicfilter/$aws/things/${var.thing_name}/shadow/get/accepted",
-          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topicfilter/$aws/things/${var.thing_name}/shadow/get/rejected"
+          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topicfilter/$aws/things/$${iot:Connection.Thing.ThingName}/shadow/update/delta",
+          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topicfilter/$aws/things/$${iot:Connection.Thing.ThingName}/shadow/update/accepted",
+          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topicfilter/$aws/things/$${iot:Connection.Thing.ThingName}/shadow/update/rejected",
+          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topicfilter/$aws/things/$${iot:Connection.Thing.ThingName}/shadow/get/accepted",
+          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topicfilter/$aws/things/$${iot:Connection.Thing.ThingName}/shadow/get/rejected"
         ]
       },
       {
         Effect = "Allow",
         Action = ["iot:Receive"],
         Resource = [
-          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/petfeeder/commands",
+          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/petfeeder/$${iot:Connection.Thing.ThingName}/commands",
           "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/petfeeder/config",
-          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/$aws/things/${var.thing_name}/shadow/update/delta",
-          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/$aws/things/${var.thing_name}/shadow/update/accepted",
-          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/$aws/things/${var.thing_name}/shadow/update/rejected",
-          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/$aws/things/${var.thing_name}/shadow/get/accepted",
-          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/$aws/things/${var.thing_name}/shadow/get/rejected"
+          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/$aws/things/$${iot:Connection.Thing.ThingName}/shadow/update/delta",
+          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/$aws/things/$${iot:Connection.Thing.ThingName}/shadow/update/accepted",
+          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/$aws/things/$${iot:Connection.Thing.ThingName}/shadow/update/rejected",
+          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/$aws/things/$${iot:Connection.Thing.ThingName}/shadow/get/accepted",
+          "arn:aws:iot:${var.aws_region}:${var.aws_account_id}:topic/$aws/things/$${iot:Connection.Thing.ThingName}/shadow/get/rejected"
         ]
       }
     ]
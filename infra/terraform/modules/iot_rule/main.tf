@@ -2,7 +2,7 @@ resource "aws_iot_topic_rule" "this" {
   name        = var.rule_name
   description = var.rule_description
   enabled     = true
-  sql         = "SELECT * FROM '${var.mqtt_topic}'"
+  sql         = "SELECT ${var.sql_select} FROM '${var.mqtt_topic}'"
   sql_version = "2016-03-23"
 
   lambda {
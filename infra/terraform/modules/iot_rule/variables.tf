@@ -18,6 +18,12 @@ variable "mqtt_topic" {
   type        = string
 }
 
+variable "sql_select" {
+  description = "The SELECT clause of the rule query (e.g. to add fields taken from the topic)."
+  type        = string
+  default     = "*"
+}
+
 variable "lambda_function_arn" {
   description = "The ARN of the Lambda function to invoke."
   type        = string